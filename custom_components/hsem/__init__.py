@@ -171,6 +171,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: HSEMConfigEntry) -> bool
 
     # Create the shared DataUpdateCoordinator and run the first update cycle.
     coordinator = HSEMDataUpdateCoordinator(hass, entry)
+    # Import numpy/scipy in the background.  Setup does not wait for it: a
+    # cycle that plans earlier serves a heuristic plan and re-plans with
+    # the MILP once the import is done.
+    coordinator.async_start_prewarm()
 
     try:
         await coordinator.async_setup()
@@ -472,12 +472,19 @@ class HSEMConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # pyright: igno
         errors = {}
 
         if user_input is not None:
-            errors = await validate_battery_economics_input(user_input)
+            errors = await validate_battery_economics_input(
+                user_input,
+                self._user_input.get("hsem_recommendation_interval_length"),
+                None,
+            )
             if not errors:
                 self._user_input.update(user_input)
                 return await self.async_step_power()
 
-        data_schema = await get_battery_economics_step_schema(None)
+        data_schema = await get_battery_economics_step_schema(
+            None,
+            self._user_input.get("hsem_recommendation_interval_length"),
+        )
 
         return self.async_show_form(
             step_id="battery_economics",
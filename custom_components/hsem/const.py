@@ -95,6 +95,30 @@ DEFAULT_CONFIG_VALUES = {
     # (e.g. ev_smart_charging ↔ batteries_charge_solar) by enforcing a
     # minimum hold time (minutes).  0 disables the feature.
     "hsem_planner_window_hysteresis_minutes": 10,
+    # Opt-in true MILP (binary charge/discharge) with a relative gap (%) and
+    # a wall-clock budget (s); falls back to the LP relaxation on timeout.
+    "hsem_planner_milp_integer_mode": False,
+    "hsem_planner_milp_gap_percentage": 0.5,
+    "hsem_planner_milp_time_budget_seconds": 5.0,
+    # Opt-in variable-resolution horizon: slots beyond the full-resolution
+    # window (hours) are merged into blocks (minutes) for the MILP solve.
+    "hsem_planner_horizon_compression": False,
+    "hsem_planner_horizon_full_resolution_hours": 6.0,
+    "hsem_planner_horizon_block_minutes": 60,
+    # Opt-in rolling horizon: the MILP solves the first hours, the DP the
+    # rest; iterated at most this many times on the energy left at the split.
+    "hsem_planner_rolling_horizon": False,
+    "hsem_planner_rolling_head_hours": 24.0,
+    "hsem_planner_rolling_iterations": 3,
+    # Opt-in dedicated planner process (outside HA's shared executor) and its
+    # per-run timeout before falling back to an in-process run.
+    "hsem_planner_worker_process": False,
+    "hsem_planner_worker_timeout_seconds": 60.0,
+    "hsem_planner_profiling": False,
+    # Opt-in anytime planning: apply a heuristic plan when the full solve
+    # misses the per-cycle deadline (seconds), swap in the optimum later.
+    "hsem_planner_anytime": False,
+    "hsem_planner_anytime_deadline_seconds": 1.0,
     "hsem_house_consumption_energy_weight_14d": 15,
     "hsem_house_consumption_energy_weight_1d": 25,
     "hsem_house_consumption_energy_weight_3d": 30,
@@ -150,6 +174,7 @@ DEFAULT_CONFIG_VALUES = {
     "hsem_ml_consumption_history_days": 14,
     "hsem_ml_consumption_net_consumption": False,
     "hsem_ml_consumption_sequential": False,
+    "hsem_ml_consumption_use_statistics": False,
     "hsem_ml_consumption_temperature_entity": vol.UNDEFINED,
     # EV charging — auto-Full on negative price (issue #609)
     "hsem_ev_auto_full_negative_price": False,
@@ -32,9 +32,11 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import math
+import time
 from collections.abc import Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import date, datetime, timedelta
+from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING, override
 
@@ -83,6 +85,9 @@ from custom_components.hsem.models.state_snapshot import StateSnapshot
 from custom_components.hsem.planner import run_planner
 from custom_components.hsem.planner.charge_scheduler import apply_window_hysteresis
 from custom_components.hsem.planner.ev_planner import EVChargingPlan
+from custom_components.hsem.planner.milp._lp_cache import invalidate_lp_structure_cache
+from custom_components.hsem.planner.plan_cache import PlanCache
+from custom_components.hsem.utils.anytime_planner import AnytimePlanner
 from custom_components.hsem.utils.capacity_learner import CapacityLearner
 from custom_components.hsem.utils.charge_rate_learner import CHARGE_RATE_LEARNER
 from custom_components.hsem.utils.datetime_utils import (
@@ -103,10 +108,19 @@ from custom_components.hsem.utils.logger import (
     set_hsem_verbose,
 )
 from custom_components.hsem.utils.misc import ema_filter, get_config_value
+from custom_components.hsem.utils.planner_profile_tracker import (
+    PLAN_SOURCE_CACHE,
+    PLAN_SOURCE_FULL,
+    PLAN_SOURCE_HEURISTIC,
+    PLAN_SOURCE_SWAP,
+    PlannerProfileTracker,
+)
+from custom_components.hsem.utils.planner_worker import PlannerWorker
 from custom_components.hsem.utils.prediction_tracker import (
     PredictionTracker,
     _action_label,
 )
+from custom_components.hsem.utils.prewarm import NumericPrewarm
 from custom_components.hsem.utils.recommendations import Recommendations
 from custom_components.hsem.utils.solar_corrector import SolarForecastCorrector
 from custom_components.hsem.utils.units import usable_kwh_from_rated
@@ -409,6 +423,21 @@ class CoordinatorData:
     ocpp_chargers: dict | None = None
     #: OCPP completed session log for the sessions sensor.
     ocpp_sessions: list | None = None
+    #: Plan-cache counters (hits, misses, entries, last fingerprint) for the
+    #: degraded-mode diagnostic sensor.
+    plan_cache_stats: dict = field(default_factory=dict)
+    #: Planner worker-process counters (runs, fallbacks, restarts, last
+    #: error); empty when the dedicated planner process is disabled.
+    planner_worker_stats: dict = field(default_factory=dict)
+    #: Rolling per-stage planner timings (p50/p95/max) for the planner
+    #: profile diagnostic sensor; empty when profiling is disabled.
+    planner_profile: dict = field(default_factory=dict)
+    #: Anytime-planning mode, heuristic / optimal solve timings and swap
+    #: counters; empty when anytime planning is disabled.
+    anytime_planner_stats: dict = field(default_factory=dict)
+    #: Startup numpy/scipy import and first-solve timings; empty until the
+    #: prewarm has finished.
+    prewarm_stats: dict = field(default_factory=dict)
 
 
 # ---------------------------------------------------------------------------
@@ -488,6 +517,21 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
         # Most recent planner input/output retained for diagnostics dumps.
         self._last_planner_input: PlannerInput | None = None
         self._last_planner_output: PlannerOutput | None = None
+        # Content-addressed plan cache: an input identical to a recent one
+        # (same slot, same data) reuses its plan instead of re-solving.
+        self._plan_cache: PlanCache = PlanCache()
+        # Opt-in dedicated planner process; created on first use.
+        self._planner_worker: PlannerWorker | None = None
+        # Opt-in anytime planning: heuristic plan first, optimal plan later.
+        self._anytime_planner = AnytimePlanner()
+        # Background numpy/scipy import and first HiGHS solve; started by
+        # async_start_prewarm() from async_setup_entry.
+        self._prewarm = NumericPrewarm()
+        # Rolling per-stage timings of solved plans and per-cycle plan wait
+        # times by source (opt-in profiling).
+        self._planner_profile_tracker = PlannerProfileTracker()
+        # Where the last _async_run_planner plan came from (PLAN_SOURCE_*).
+        self._last_plan_source: str = PLAN_SOURCE_FULL
 
         # Previous planner winner name and score for hysteresis (issue #372).
         # Persisted across cycles so the planner can compare against the
@@ -588,6 +632,10 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
         # ML consumption predictor — cached across cycles so the retrain
         # gate can skip re-fitting when no new history has arrived.
         self._ml_predictor: ConsumptionPredictor | None = None
+        # On-disk snapshot of the predictor: restored on the first ML cycle,
+        # rewritten after each refit (fit time of the last write).
+        self._ml_snapshot_restored: bool = False
+        self._ml_snapshot_fit_time: datetime | None = None
 
         # Background task handle for option-change-triggered pipeline runs.
         # Tracked so repeated toggles cancel the pending run and so teardown
@@ -597,6 +645,9 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
         # Debounce task for option changes.  Rapid toggles restart this timer
         # so the planner only runs once after the user stops clicking.
         self._options_update_debounce_task: asyncio.Task | None = None
+        # Full re-plan queued by a cycle that served a heuristic plan while
+        # the numeric prewarm was still running.
+        self._prewarm_replan_task: asyncio.Task | None = None
 
     # ------------------------------------------------------------------
     # HA lifecycle
@@ -645,6 +696,141 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
             second=10,
         )
 
+    def async_start_prewarm(self) -> None:
+        """Import the numerical stack in the background (see ``utils/prewarm``).
+
+        Call before :meth:`async_setup`.  Setup does not wait for it: a
+        cycle that plans before it is done serves a heuristic plan and
+        queues a full re-plan for when it is (anytime planning races the
+        import against its deadline instead).
+        """
+        self._prewarm.start()
+
+    async def _async_planner(
+        self, cfg: SensorConfig
+    ) -> Callable[[PlannerInput], PlannerOutput]:
+        """Return the planner callable for this cycle.
+
+        The dedicated planner process is started lazily on first use and
+        stopped as soon as the option is switched off.
+        """
+        if not cfg.planner_worker_process:
+            await self._async_stop_planner_worker()
+            return run_planner
+        if self._planner_worker is None:
+            self._planner_worker = PlannerWorker()
+        self._planner_worker.timeout_s = cfg.planner_worker_timeout_seconds
+        return self._planner_worker.run
+
+    async def _async_run_planner(
+        self, planner_input: PlannerInput, cfg: SensorConfig
+    ) -> PlannerOutput:
+        """Return the plan for this cycle.
+
+        The planner runs in HA's executor pool.  The MILP/ML solver is
+        CPU-bound; running it in the event-loop thread blocks the HA UI for
+        the full solve duration.  The plan cache returns the previous output
+        when the normalised input is unchanged (options reload, forced
+        recalculation, repeated event triggers).  With the dedicated planner
+        process enabled the executor thread only waits while the worker
+        process solves.
+
+        With anytime planning enabled a heuristic plan is returned when the
+        full solve misses the deadline; the optimal plan is swapped in by
+        the cycle that :meth:`_async_apply_optimal_plan` schedules, unless
+        it no longer fits this cycle's input, in which case it re-plans.
+        Without it, a cycle that starts while the numeric prewarm is still
+        running returns a heuristic plan and
+        :meth:`_async_replan_after_prewarm` re-plans once the prewarm is
+        done, so setup never waits for the scipy import.
+        """
+        optimal = self._anytime_planner.take_optimal(planner_input)
+        if optimal is not None:
+            # Keep diagnostics dumps consistent with the plan in use.
+            self._last_planner_input, planner_output = optimal
+            self._last_plan_source = PLAN_SOURCE_SWAP
+            return planner_output
+        planner = await self._async_planner(cfg)
+        if cfg.planner_anytime:
+            planner_output = await self._anytime_planner.async_plan(
+                planner_input,
+                partial(self._plan_cache.run, planner=planner),
+                deadline_s=cfg.planner_anytime_deadline_seconds,
+                on_optimal=self._schedule_optimal_plan,
+            )
+        elif not self._prewarm.ready:
+            # scipy is still being imported: serve a plan without the MILP
+            # now, so setup does not wait for the import, and re-plan once
+            # the prewarm is done.
+            planner_output = await self.hass.async_add_executor_job(
+                run_planner, replace(planner_input, planner_heuristic_only=True)
+            )
+            planner_output.warnings.append(
+                "Heuristic plan: the optimizer is still loading; "
+                "the full plan follows when it is ready"
+            )
+            self._schedule_replan_after_prewarm()
+            self._last_plan_source = PLAN_SOURCE_HEURISTIC
+            return planner_output
+        else:
+            planner_output = await self.hass.async_add_executor_job(
+                self._plan_cache.run, planner_input, planner
+            )
+        if cfg.planner_anytime and self._anytime_planner.serving_heuristic:
+            self._last_plan_source = PLAN_SOURCE_HEURISTIC
+        elif self._plan_cache.last_hit:
+            self._last_plan_source = PLAN_SOURCE_CACHE
+        else:
+            self._last_plan_source = PLAN_SOURCE_FULL
+        return planner_output
+
+    def _schedule_replan_after_prewarm(self) -> None:
+        """Queue one full re-plan for when the numeric prewarm is done."""
+        task = self._prewarm_replan_task
+        if task is not None and not task.done():
+            return
+        self._prewarm_replan_task = self.hass.async_create_task(
+            self._async_replan_after_prewarm(),
+            name="hsem_replan_after_prewarm",
+            eager_start=False,
+        )
+
+    async def _async_replan_after_prewarm(self) -> None:
+        """Wait for the prewarm, then run a cycle with the full planner.
+
+        Like :meth:`_async_apply_optimal_plan` this waits for the update
+        lock instead of dropping the cycle.
+        """
+        await self._prewarm.async_wait()
+        async with self._update_lock:
+            await self._async_run_update_cycle()
+
+    def _schedule_optimal_plan(self) -> None:
+        """Run a cycle to apply the optimal plan of a background solve."""
+        self.hass.async_create_task(
+            self._async_apply_optimal_plan(),
+            name="hsem_apply_optimal_plan",
+            eager_start=False,
+        )
+
+    async def _async_apply_optimal_plan(self) -> None:
+        """Wait for any running cycle, then run one to swap in the plan.
+
+        Unlike :meth:`_async_handle_update` this waits for the lock instead
+        of dropping the update, so the optimal plan is never lost.
+        """
+        async with self._update_lock:
+            if self._anytime_planner.has_optimal:
+                await self._async_run_update_cycle()
+
+    async def _async_stop_planner_worker(self) -> None:
+        """Shut down the dedicated planner process, if one is running."""
+        worker = getattr(self, "_planner_worker", None)
+        if worker is None:
+            return
+        self._planner_worker = None
+        await self.hass.async_add_executor_job(worker.shutdown)
+
     async def async_teardown(self) -> None:
         """Cancel all registered timers and state-change listeners.
 
@@ -670,6 +856,9 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
             midnight()
             self._midnight_unsub = None
 
+        # Stop the dedicated planner process if it was started.
+        await self._async_stop_planner_worker()
+
         # Stop the OCPP server if it was started.
         ocpp = getattr(self, "_ocpp_server", None)
         if ocpp is not None:
@@ -685,6 +874,10 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
         if debounce_task is not None and not debounce_task.done():
             debounce_task.cancel()
             self._options_update_debounce_task = None
+        replan_task = getattr(self, "_prewarm_replan_task", None)
+        if replan_task is not None and not replan_task.done():
+            replan_task.cancel()
+            self._prewarm_replan_task = None
 
     async def async_options_updated(self) -> None:
         """Schedule a debounced pipeline re-run after an options change.
@@ -700,7 +893,14 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
         only trigger a single planner run after the user stops clicking.
         The background task is created with ``eager_start=False`` so the
         switch service call returns before any setup work begins.
+
+        Cached MILP constraint skeletons are dropped here: the new options
+        may change efficiencies or power limits, and the next run should
+        start from a freshly assembled LP.  Cached plans are dropped too, so
+        no plan computed under the old options is served again.
         """
+        invalidate_lp_structure_cache("options_updated")
+        self._plan_cache.invalidate("options_updated")
         if (
             self._options_update_debounce_task is not None
             and not self._options_update_debounce_task.done()
@@ -940,6 +1140,8 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
                     populate_ml_house_consumption,
                 )
 
+                if not self._ml_snapshot_restored:
+                    await self._async_restore_ml_snapshot(cfg)
                 (
                     consumption_ok,
                     self._ml_predictor,
@@ -949,6 +1151,8 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
                     cfg,
                     self._ml_predictor,
                 )
+                if consumption_ok:
+                    await self._async_save_ml_snapshot(cfg)
                 async_log(
                     "debug",
                     "[ml] populate_ml_house_consumption returned %s",
@@ -1118,8 +1322,11 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
                         live.ev_second.power_w or 0.0
                     ) / 1000.0
 
-                # Determine whether a full re-plan is needed.
-                should_replan = self._should_replan(live, now)
+                # Determine whether a full re-plan is needed.  A finished
+                # background solve (anytime planning) is always swapped in.
+                should_replan = self._anytime_planner.has_optimal or (
+                    self._should_replan(live, now)
+                )
 
                 if should_replan:
                     planner_input = build_planner_input(
@@ -1162,13 +1369,23 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
                     # standard Home Assistant log when the user enables
                     # verbose logging.
                     set_hsem_verbose(cfg.verbose_logging)
-                    # Run the planner in HA's executor pool.  The MILP/ML
-                    # solver is CPU-bound; running it in the event-loop
-                    # thread blocks the HA UI for the full solve duration.
-                    planner_output = await self.hass.async_add_executor_job(
-                        run_planner, planner_input
-                    )
+                    plan_started = time.perf_counter()
+                    planner_output = await self._async_run_planner(planner_input, cfg)
                     self._last_planner_output = planner_output
+                    # Every cycle books how long it waited for its plan, by
+                    # source.  Stage timings are booked for fresh full
+                    # solves only: cache hits carry the profile of the run
+                    # that produced them and heuristic plans have no MILP
+                    # stage.
+                    self._planner_profile_tracker.record_cycle(
+                        self._last_plan_source,
+                        (time.perf_counter() - plan_started) * 1000.0,
+                    )
+                    if (
+                        planner_output.profile is not None
+                        and self._last_plan_source == PLAN_SOURCE_FULL
+                    ):
+                        self._planner_profile_tracker.record(planner_output.profile)
 
                     # Record the time this plan was created so the slot-boundary
                     # check in _should_replan uses the actual plan time.
@@ -1491,6 +1708,32 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
             financial_tracker=getattr(self, "_financial_tracker", None),
             prediction_tracker=getattr(self, "_prediction_tracker", None),
             savings_tracker=getattr(self, "_savings_tracker", SavingsTracker()),
+            plan_cache_stats=(
+                self._plan_cache.stats() if hasattr(self, "_plan_cache") else {}
+            ),
+            planner_worker_stats=(
+                worker.stats()
+                if (worker := getattr(self, "_planner_worker", None)) is not None
+                else {}
+            ),
+            planner_profile=(
+                self._planner_profile_tracker.summary()
+                if getattr(getattr(self, "_cfg", None), "planner_profiling", False)
+                and hasattr(self, "_planner_profile_tracker")
+                else {}
+            ),
+            anytime_planner_stats=(
+                self._anytime_planner.stats()
+                if getattr(getattr(self, "_cfg", None), "planner_anytime", False)
+                and hasattr(self, "_anytime_planner")
+                else {}
+            ),
+            prewarm_stats=(
+                prewarm.stats.as_dict()
+                if (prewarm := getattr(self, "_prewarm", None)) is not None
+                and prewarm.stats is not None
+                else {}
+            ),
         )
 
         # Notify all subscriber entities atomically.
@@ -1946,6 +2189,8 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
             rec.estimated_battery_soc_pct = slot.estimated_battery_soc_pct
             rec.grid_import_kwh = slot.grid_import_kwh
             rec.grid_export_kwh = slot.grid_export_kwh
+            rec.marginal_energy_value = slot.marginal_energy_value
+            rec.marginal_load_cost = slot.marginal_load_cost
             # Copy the planner's PV estimate so that solcast_pv_estimate,
             # estimated_net_consumption, and ev_planned_load_kwh are all
             # internally consistent in the final HourlyRecommendation output.
@@ -1973,8 +2218,16 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
         self._data_quality = output.data_quality
 
         # Persist the winning candidate name and score for hysteresis (issue #372).
-        # The next planner run will compare against these values.
-        if output.winner_name and output.candidates:
+        # The next planner run will compare against these values.  A heuristic
+        # (anytime or prewarm) plan is a stopgap and must not become the plan
+        # to preserve.
+        anytime = getattr(self, "_anytime_planner", None)
+        if (
+            output.winner_name
+            and output.candidates
+            and not (anytime is not None and anytime.serving_heuristic)
+            and getattr(self, "_last_plan_source", None) != PLAN_SOURCE_HEURISTIC
+        ):
             winner_score = 0.0
             for c in output.candidates:
                 if (
@@ -2199,6 +2452,69 @@ class HSEMDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
             )
             self._financial_tracker_initialized = True  # don't retry
 
+    def _ml_snapshot_path(self) -> Path:
+        from custom_components.hsem.ml.predictor_store import snapshot_path
+
+        return snapshot_path(self.hass.config.config_dir, self._config_entry.entry_id)
+
+    async def _async_restore_ml_snapshot(self, cfg: SensorConfig) -> None:
+        """Warm-start the ML predictor from its on-disk snapshot (once).
+
+        The restored history series are only used when they match the
+        current energy entities and slot length; the predictor itself is
+        replaced by the populator when its settings no longer match.
+        """
+        from custom_components.hsem.ml.populator import restore_history_series
+        from custom_components.hsem.ml.predictor_store import read_snapshot
+
+        self._ml_snapshot_restored = True
+        if self._ml_predictor is not None:
+            return
+        snapshot = await self.hass.async_add_executor_job(
+            read_snapshot, self._ml_snapshot_path()
+        )
+        if snapshot is None:
+            return
+        self._ml_predictor = snapshot.predictor
+        self._ml_snapshot_fit_time = snapshot.predictor.last_fit_time
+        series_restored = snapshot.import_series is not None and (
+            restore_history_series(
+                self.hass, cfg, snapshot.import_series, snapshot.export_series
+            )
+        )
+        async_log(
+            "debug",
+            "[ml] Restored predictor snapshot (fitted %s, history %s)",
+            snapshot.predictor.last_fit_time,
+            "restored" if series_restored else "re-read",
+        )
+
+    async def _async_save_ml_snapshot(self, cfg: SensorConfig) -> None:
+        """Persist the ML predictor after a refit."""
+        from custom_components.hsem.ml.populator import get_history_series
+        from custom_components.hsem.ml.predictor_store import (
+            PredictorSnapshot,
+            write_snapshot,
+        )
+
+        predictor = self._ml_predictor
+        if (
+            predictor is None
+            or not predictor.trained
+            or predictor.last_fit_time == self._ml_snapshot_fit_time
+        ):
+            return
+        import_series, export_series = get_history_series(self.hass, cfg) or (
+            None,
+            None,
+        )
+        if await self.hass.async_add_executor_job(
+            write_snapshot,
+            self._ml_snapshot_path(),
+            PredictorSnapshot(predictor, import_series, export_series),
+        ):
+            self._ml_snapshot_fit_time = predictor.last_fit_time
+
     async def _load_financial_tracker(self) -> None:
         """Load financial tracker state from the JSON persistence file."""
         path = Path(self._financial_tracker.history_file)
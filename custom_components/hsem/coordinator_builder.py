@@ -373,6 +373,28 @@ def build_planner_input(
         planner_hysteresis_percentage=(
             convert_to_float(cfg.planner_hysteresis_percentage) or 0.0
         ),
+        planner_milp_integer_mode=bool(cfg.planner_milp_integer_mode),
+        planner_milp_gap_percentage=(
+            convert_to_float(cfg.planner_milp_gap_percentage) or 0.0
+        ),
+        planner_milp_time_budget_seconds=(
+            convert_to_float(cfg.planner_milp_time_budget_seconds) or 5.0
+        ),
+        planner_horizon_compression=bool(cfg.planner_horizon_compression),
+        planner_horizon_full_resolution_hours=(
+            convert_to_float(cfg.planner_horizon_full_resolution_hours) or 6.0
+        ),
+        planner_horizon_block_minutes=(
+            convert_to_int(cfg.planner_horizon_block_minutes) or 60
+        ),
+        planner_rolling_horizon=bool(cfg.planner_rolling_horizon),
+        planner_rolling_head_hours=(
+            convert_to_float(cfg.planner_rolling_head_hours) or 24.0
+        ),
+        planner_rolling_iterations=(
+            convert_to_int(cfg.planner_rolling_iterations) or 3
+        ),
+        planner_profiling_enabled=bool(cfg.planner_profiling),
         previous_winner_name=previous_winner_name,
         previous_winner_score=previous_winner_score,
         ev_session_charge_kw=(ev_session_kw.get("ev") if ev_session_kw else None),
@@ -93,6 +93,72 @@ def build_sensor_config(
         )
         or 0
     )
+    cfg.planner_milp_integer_mode = convert_to_boolean(
+        get_config_value(config_entry, "hsem_planner_milp_integer_mode")
+    )
+    cfg.planner_milp_gap_percentage = (
+        convert_to_float(
+            get_config_value(config_entry, "hsem_planner_milp_gap_percentage")
+        )
+        or 0.0
+    )
+    cfg.planner_milp_time_budget_seconds = (
+        convert_to_float(
+            get_config_value(config_entry, "hsem_planner_milp_time_budget_seconds")
+        )
+        or 5.0
+    )
+    cfg.planner_horizon_compression = convert_to_boolean(
+        get_config_value(config_entry, "hsem_planner_horizon_compression")
+    )
+    cfg.planner_horizon_full_resolution_hours = (
+        convert_to_float(
+            get_config_value(config_entry, "hsem_planner_horizon_full_resolution_hours")
+        )
+        or 6.0
+    )
+    cfg.planner_horizon_block_minutes = (
+        convert_to_int(
+            get_config_value(config_entry, "hsem_planner_horizon_block_minutes")
+        )
+        or 60
+    )
+    cfg.planner_rolling_horizon = convert_to_boolean(
+        get_config_value(config_entry, "hsem_planner_rolling_horizon")
+    )
+    cfg.planner_rolling_head_hours = (
+        convert_to_float(
+            get_config_value(config_entry, "hsem_planner_rolling_head_hours")
+        )
+        or 24.0
+    )
+    cfg.planner_rolling_iterations = (
+        convert_to_int(
+            get_config_value(config_entry, "hsem_planner_rolling_iterations")
+        )
+        or 3
+    )
+    cfg.planner_worker_process = convert_to_boolean(
+        get_config_value(config_entry, "hsem_planner_worker_process")
+    )
+    cfg.planner_worker_timeout_seconds = (
+        convert_to_float(
+            get_config_value(config_entry, "hsem_planner_worker_timeout_seconds")
+        )
+        or 60.0
+    )
+    cfg.planner_profiling = convert_to_boolean(
+        get_config_value(config_entry, "hsem_planner_profiling")
+    )
+    cfg.planner_anytime = convert_to_boolean(
+        get_config_value(config_entry, "hsem_planner_anytime")
+    )
+    cfg.planner_anytime_deadline_seconds = (
+        convert_to_float(
+            get_config_value(config_entry, "hsem_planner_anytime_deadline_seconds")
+        )
+        or 1.0
+    )
     _update_interval = convert_to_int(
         get_config_value(config_entry, "hsem_update_interval")
     )
@@ -500,6 +566,9 @@ def build_sensor_config(
     cfg.ml_consumption_sequential = bool(
         get_config_value(config_entry, "hsem_ml_consumption_sequential")
     )
+    cfg.ml_consumption_use_statistics = bool(
+        get_config_value(config_entry, "hsem_ml_consumption_use_statistics")
+    )
     cfg.ml_consumption_temperature_entity = _optional_entity(
         get_config_value(config_entry, "hsem_ml_consumption_temperature_entity")
     )
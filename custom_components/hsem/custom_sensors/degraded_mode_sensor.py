@@ -148,7 +148,9 @@ class HSEMDegradedModeSensor(
         """Return diagnostic attributes visible on the entity detail page.
 
         Includes system-health details plus planning horizon, forecast mode,
-        and current slot information for easier debugging from the HA UI.
+        current slot information, the plan-cache hit/miss counters, the
+        planner worker-process counters and the anytime-planning timings for
+        easier debugging from the HA UI.
         """
         data: CoordinatorData | None = self.coordinator.data
         if data is None or data.live is None:
@@ -160,6 +162,9 @@ class HSEMDegradedModeSensor(
                 "planning_interval_minutes": None,
                 "forecast_mode": None,
                 "current_slot_recommendation": None,
+                "plan_cache": {},
+                "planner_worker": {},
+                "anytime_planner": {},
             }
         live = data.live
         cfg = data.cfg
@@ -188,6 +193,10 @@ class HSEMDegradedModeSensor(
                 if data.apply_summary is not None
                 else None
             ),
+            "plan_cache": dict(data.plan_cache_stats),
+            "planner_worker": dict(data.planner_worker_stats),
+            "anytime_planner": dict(data.anytime_planner_stats),
+            "numeric_prewarm": dict(data.prewarm_stats),
         }
         if cfg is not None:
             attrs["planning_horizon_hours"] = cfg.recommendation_interval_length
@@ -0,0 +1,136 @@
+"""Diagnostic sensor exposing per-stage planner timings.
+
+When planner profiling is enabled (``hsem_planner_profiling``), this sensor
+shows the wall-clock milliseconds of the most recent planner run and
+exposes rolling p50 / p95 / max per stage, plus the LP size and HiGHS
+iteration count of the last solve, as attributes.  The ``cycles``
+attribute summarises how long every cycle waited for its plan, per plan
+source (full solve, plan cache, heuristic, swap).  When disabled, the
+sensor state is ``"disabled"``.
+
+The sensor is a *diagnostic* entity (``entity_category = EntityCategory.DIAGNOSTIC``)
+so it appears in the *Diagnostic* section of the device page and is excluded
+from the default Lovelace dashboard.
+"""
+
+from __future__ import annotations
+
+from typing import Any, override
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_UNAVAILABLE, EntityCategory
+
+from custom_components.hsem.coordinator import (
+    CoordinatorData,
+    HSEMDataUpdateCoordinator,
+)
+from custom_components.hsem.entity import HSEMCoordinatorEntity, HSEMEntity
+from custom_components.hsem.utils.sensornames.diagnostics import (
+    get_planner_profile_sensor_entity_id,
+    get_planner_profile_sensor_name,
+    get_planner_profile_sensor_unique_id,
+)
+
+
+class HSEMPlannerProfileSensor(
+    HSEMCoordinatorEntity,
+    SensorEntity,
+    HSEMEntity,
+):
+    """Diagnostic sensor exposing per-stage planner timings.
+
+    State is the wall-clock milliseconds of the last solved plan (e.g.
+    ``"412.7"``; the last cycle's plan wait before the first full solve)
+    when profiling is enabled, ``"disabled"`` when not.
+    Timings are not restored across restarts: they describe this process.
+    """
+
+    _attr_icon = "mdi:timer-cog-outline"
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        config_entry: ConfigEntry,
+        coordinator: HSEMDataUpdateCoordinator,
+    ) -> None:
+        """Initialise the planner profile sensor.
+
+        Args:
+            config_entry: The HSEM config entry.
+            coordinator: The shared :class:`HSEMDataUpdateCoordinator`.
+        """
+        HSEMCoordinatorEntity.__init__(self, coordinator)
+        HSEMEntity.__init__(self, config_entry)
+
+        self._config_entry = config_entry
+
+        self._attr_unique_id = get_planner_profile_sensor_unique_id(
+            config_entry.entry_id
+        )
+        self.entity_id = get_planner_profile_sensor_entity_id()
+        self._name = get_planner_profile_sensor_name()
+
+    # ------------------------------------------------------------------
+    # HA entity properties
+    # ------------------------------------------------------------------
+
+    @property
+    @override
+    def name(self) -> str:
+        """Return the display name."""
+        return self._name
+
+    @property
+    @override
+    def unique_id(self) -> str | None:
+        """Return the unique ID."""
+        return self._attr_unique_id
+
+    @property  # type: ignore[misc]  # HA stub declares state as @final
+    @override
+    def state(self) -> str:
+        """Return the last run's wall-clock milliseconds, or ``"disabled"``."""
+        data: CoordinatorData | None = self.coordinator.data
+        if data is None:
+            return STATE_UNAVAILABLE
+        profile = data.planner_profile
+        if not profile:
+            return "disabled"
+        last_ms = profile["last_total_wall_ms"]
+        if last_ms is None:
+            # No full solve yet: report the last cycle's wait instead.
+            last_ms = profile["cycles"]["last_wall_ms"]
+        return f"{last_ms:.1f}"
+
+    @property
+    @override
+    def should_poll(self) -> bool:
+        """No polling — driven by the coordinator."""
+        return False
+
+    @property
+    @override
+    def available(self) -> bool:
+        """True once the coordinator has completed at least one successful cycle."""
+        return (
+            self.coordinator.last_update_success and self.coordinator.data is not None
+        )
+
+    @property
+    @override
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the rolling per-stage timing summary."""
+        data: CoordinatorData | None = self.coordinator.data
+        profile = data.planner_profile if data is not None else {}
+        return {
+            "enabled": bool(profile),
+            "samples": profile.get("samples", 0),
+            "last_total_cpu_ms": profile.get("last_total_cpu_ms"),
+            "last_stage_ms": profile.get("last_wall_ms", {}),
+            "wall_ms": profile.get("wall_ms", {}),
+            "cpu_ms": profile.get("cpu_ms", {}),
+            "lp": profile.get("lp", {}),
+            "cycles": profile.get("cycles", {}),
+        }
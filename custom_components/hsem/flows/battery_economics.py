@@ -1,33 +1,62 @@
 """Config flow step for battery economics and planner hysteresis.
 
-This module covers battery depreciation, round-trip efficiency, and
+This module covers battery depreciation, round-trip efficiency,
 planner anti-flapping hysteresis settings — both plan-level (issue #372)
-and window-level (issue #315).
+and window-level (issue #315) — and the opt-in MILP solver options
+(integer mode, variable-resolution and rolling horizons, dedicated
+planner process, per-stage profiling).
 """
 
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE
+from homeassistant.const import PERCENTAGE, UnitOfTime
 from homeassistant.helpers.selector import selector
 
 from custom_components.hsem.utils.config_validator import merge_errors, validate_price
+from custom_components.hsem.utils.conversion import convert_to_float, convert_to_int
 from custom_components.hsem.utils.misc import get_config_value
 
+# Shortest rolling-horizon head; matches planner/rolling_horizon.py.
+_MIN_ROLLING_HEAD_HOURS = 2
+
+
+def _max_rolling_head_hours(
+    config_entry: ConfigEntry | None, horizon_hours: int | str | None = None
+) -> int:
+    """Return the longest rolling head that leaves a tail in the horizon.
+
+    *horizon_hours* is the ``hsem_recommendation_interval_length`` chosen
+    earlier in the same flow; the stored value is used when it is ``None``.
+    """
+    if horizon_hours is None:
+        horizon_hours = get_config_value(
+            config_entry, "hsem_recommendation_interval_length"
+        )
+    horizon = convert_to_int(horizon_hours) or 48
+    return max(horizon - 1, _MIN_ROLLING_HEAD_HOURS)
+
 
 async def get_battery_economics_step_schema(  # NOSONAR
     config_entry: ConfigEntry | None,
+    horizon_hours: int | str | None = None,
 ) -> vol.Schema:
     """Return the data schema for the 'battery_economics' step.
 
     Args:
         config_entry: Existing config entry (used during options flow editing)
             or ``None`` for the initial config flow.
+        horizon_hours: Planning horizon chosen in the init step; bounds the
+            rolling-horizon head.  Defaults to the stored value.
 
     Returns:
         A ``vol.Schema`` with number/selector inputs for battery economics
         and planner hysteresis.
     """
+    max_head_hours = _max_rolling_head_hours(config_entry, horizon_hours)
+    head_hours = convert_to_int(
+        get_config_value(config_entry, "hsem_planner_rolling_head_hours")
+    )
     return vol.Schema(
         {
             vol.Required(
@@ -172,17 +201,181 @@ async def get_battery_economics_step_schema(  # NOSONAR
                     }
                 }
             ),
+            # --- Optimizer: opt-in true MILP with gap and time budget ---
+            vol.Required(
+                "hsem_planner_milp_integer_mode",
+                default=get_config_value(
+                    config_entry, "hsem_planner_milp_integer_mode"
+                ),
+            ): selector({"boolean": {}}),
+            vol.Required(
+                "hsem_planner_milp_gap_percentage",
+                default=get_config_value(
+                    config_entry, "hsem_planner_milp_gap_percentage"
+                ),
+            ): selector(
+                {
+                    "number": {
+                        "min": 0,
+                        "max": 10,
+                        "step": 0.1,
+                        "unit_of_measurement": PERCENTAGE,
+                        "mode": "box",
+                    }
+                }
+            ),
+            vol.Required(
+                "hsem_planner_milp_time_budget_seconds",
+                default=get_config_value(
+                    config_entry, "hsem_planner_milp_time_budget_seconds"
+                ),
+            ): selector(
+                {
+                    "number": {
+                        "min": 0.5,
+                        "max": 60,
+                        "step": 0.5,
+                        "mode": "box",
+                    }
+                }
+            ),
+            # --- Optimizer: variable-resolution horizon ---
+            vol.Required(
+                "hsem_planner_horizon_compression",
+                default=get_config_value(
+                    config_entry, "hsem_planner_horizon_compression"
+                ),
+            ): selector({"boolean": {}}),
+            vol.Required(
+                "hsem_planner_horizon_full_resolution_hours",
+                default=get_config_value(
+                    config_entry, "hsem_planner_horizon_full_resolution_hours"
+                ),
+            ): selector(
+                {
+                    "number": {
+                        "min": 2,
+                        "max": 48,
+                        "step": 0.5,
+                        "unit_of_measurement": UnitOfTime.HOURS,
+                        "mode": "box",
+                    }
+                }
+            ),
+            vol.Required(
+                "hsem_planner_horizon_block_minutes",
+                default=get_config_value(
+                    config_entry, "hsem_planner_horizon_block_minutes"
+                ),
+            ): selector(
+                {
+                    "number": {
+                        "min": 15,
+                        "max": 240,
+                        "step": 15,
+                        "unit_of_measurement": UnitOfTime.MINUTES,
+                        "mode": "box",
+                    }
+                }
+            ),
+            # --- Optimizer: rolling horizon ---
+            vol.Required(
+                "hsem_planner_rolling_horizon",
+                default=get_config_value(config_entry, "hsem_planner_rolling_horizon"),
+            ): selector({"boolean": {}}),
+            vol.Required(
+                "hsem_planner_rolling_head_hours",
+                default=min(head_hours or 24, max_head_hours),
+            ): selector(
+                {
+                    "number": {
+                        "min": _MIN_ROLLING_HEAD_HOURS,
+                        "max": max_head_hours,
+                        "step": 1,
+                        "unit_of_measurement": UnitOfTime.HOURS,
+                        "mode": "box",
+                    }
+                }
+            ),
+            vol.Required(
+                "hsem_planner_rolling_iterations",
+                default=get_config_value(
+                    config_entry, "hsem_planner_rolling_iterations"
+                ),
+            ): selector(
+                {
+                    "number": {
+                        "min": 1,
+                        "max": 10,
+                        "step": 1,
+                        "mode": "box",
+                    }
+                }
+            ),
+            # --- Optimizer: dedicated planner process ---
+            vol.Required(
+                "hsem_planner_worker_process",
+                default=get_config_value(config_entry, "hsem_planner_worker_process"),
+            ): selector({"boolean": {}}),
+            vol.Required(
+                "hsem_planner_worker_timeout_seconds",
+                default=get_config_value(
+                    config_entry, "hsem_planner_worker_timeout_seconds"
+                ),
+            ): selector(
+                {
+                    "number": {
+                        "min": 10,
+                        "max": 600,
+                        "step": 5,
+                        "unit_of_measurement": UnitOfTime.SECONDS,
+                        "mode": "box",
+                    }
+                }
+            ),
+            # --- Optimizer: per-stage profiling ---
+            vol.Required(
+                "hsem_planner_profiling",
+                default=get_config_value(config_entry, "hsem_planner_profiling"),
+            ): selector({"boolean": {}}),
+            # --- Optimizer: anytime planning ---
+            vol.Required(
+                "hsem_planner_anytime",
+                default=get_config_value(config_entry, "hsem_planner_anytime"),
+            ): selector({"boolean": {}}),
+            vol.Required(
+                "hsem_planner_anytime_deadline_seconds",
+                default=get_config_value(
+                    config_entry, "hsem_planner_anytime_deadline_seconds"
+                ),
+            ): selector(
+                {
+                    "number": {
+                        "min": 0.1,
+                        "max": 30,
+                        "step": 0.1,
+                        "unit_of_measurement": UnitOfTime.SECONDS,
+                        "mode": "box",
+                    }
+                }
+            ),
         }
     )
 
 
 async def validate_battery_economics_input(
     user_input: dict,
+    horizon_hours: int | str | None = None,
+    config_entry: ConfigEntry | None = None,
 ) -> dict[str, str]:  # NOSONAR
     """Validate user input for the 'battery_economics' step.
 
     Args:
         user_input: Dict of field name → value submitted by the user.
+        horizon_hours: Planning horizon chosen in the init step.  With the
+            rolling horizon enabled the head must be shorter than it.
+        config_entry: Existing config entry, for the stored horizon when
+            *horizon_hours* is ``None``.
 
     Returns:
         Dict mapping field names to translation error keys; empty on success.
@@ -198,6 +391,20 @@ async def validate_battery_economics_input(
         "hsem_planner_hysteresis_absolute",
         "hsem_planner_hysteresis_percentage",
         "hsem_planner_window_hysteresis_minutes",
+        "hsem_planner_milp_integer_mode",
+        "hsem_planner_milp_gap_percentage",
+        "hsem_planner_milp_time_budget_seconds",
+        "hsem_planner_horizon_compression",
+        "hsem_planner_horizon_full_resolution_hours",
+        "hsem_planner_horizon_block_minutes",
+        "hsem_planner_rolling_horizon",
+        "hsem_planner_rolling_head_hours",
+        "hsem_planner_rolling_iterations",
+        "hsem_planner_worker_process",
+        "hsem_planner_worker_timeout_seconds",
+        "hsem_planner_profiling",
+        "hsem_planner_anytime",
+        "hsem_planner_anytime_deadline_seconds",
     ]
     required_errors: dict[str, str] = {
         f: "required" for f in scalar_required if f not in user_input
@@ -211,4 +418,13 @@ async def validate_battery_economics_input(
         allow_negative=False,
     )
 
-    return merge_errors(required_errors, price_errors)
+    head_errors: dict[str, str] = {}
+    head_hours = convert_to_float(user_input.get("hsem_planner_rolling_head_hours"))
+    if (
+        user_input.get("hsem_planner_rolling_horizon")
+        and head_hours is not None
+        and head_hours > _max_rolling_head_hours(config_entry, horizon_hours)
+    ):
+        head_errors["hsem_planner_rolling_head_hours"] = "rolling_head_exceeds_horizon"
+
+    return merge_errors(required_errors, price_errors, head_errors)
@@ -85,11 +85,17 @@ async def get_init_step_schema(
                         "multiple": False,
                         "translation_key": "update_interval_length",
                         "mode": "list",
+                        # Multi-day horizons give the rolling-horizon tail
+                        # (battery_economics step) days to plan beyond the
+                        # head window.
                         "options": [
                             "12",
                             "24",
                             "36",
                             "48",
+                            "72",
+                            "96",
+                            "168",
                         ],
                     }
                 }
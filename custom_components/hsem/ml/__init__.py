@@ -19,11 +19,14 @@ When disabled, the existing averaging-sensor pipeline continues to run unchanged
 Design goals:
 - Minimal dependencies (no NumPy, no scikit-learn).
 - ~200 lines of Python, not ~2 000.
-- Stateless — predictions are recomputed from recorder history on every planner cycle.
+- Recorder-derived — the model is rebuilt from recorder history; the on-disk
+  snapshot only saves the history read and refit after a restart.
 - Interpretable — the model is just a per-DOW-hour weighted average.
 
 See also:
 - :mod:`custom_components.hsem.ml.history_reader` — recorder queries.
 - :mod:`custom_components.hsem.ml.consumption_predictor` — the prediction model.
+- :mod:`custom_components.hsem.ml.temperature_index` — nearest-temperature lookups.
 - :mod:`custom_components.hsem.ml.populator` — slot population.
+- :mod:`custom_components.hsem.ml.predictor_store` — on-disk predictor snapshot.
 """
@@ -8,19 +8,26 @@ Features (index order):
   0 .. 7*S-1    one-hot (DOW, slot)     — 672 for 15-min
   7*S, 7*S+1    sin/cos day-of-year      — seasonality
   7*S+2         temperature (optional)   — weather-driven load
+
+Training never materialises the one-hot block: each sample carries its
+(DOW, slot) group as an integer index, the group and slot means come from
+``np.bincount`` and only the few continuous columns are kept as a matrix.
 """
 
 from __future__ import annotations
 
 import math
 from datetime import UTC, datetime, timedelta
-from typing import override
+from typing import Any, override
 
 import numpy as np
 
-type _SampleFingerprint = tuple[
-    datetime, int, int, int, float, float | None, float | None
-]
+from custom_components.hsem.ml.temperature_index import TemperatureIndex
+
+type _SampleFingerprint = tuple[float, int, int, int, float, float | None, float | None]
+
+# ``date.toordinal()`` of 1970-01-01, to turn ordinals into ``datetime64[D]``.
+_UNIX_EPOCH_ORDINAL = 719163
 
 
 class ConsumptionPredictor:
@@ -74,7 +81,11 @@ class ConsumptionPredictor:
         self._coef: np.ndarray | None = None
         self._intercept: float = 0.0
 
-        self._X: np.ndarray | None = None
+        # Training data of the last pass: (DOW, slot) group index per sample,
+        # the continuous feature columns (layout from ``_doy_offset`` on),
+        # targets and time-decay weights.
+        self._groups: np.ndarray | None = None
+        self._cont: np.ndarray | None = None
         self._y: np.ndarray | None = None
         self._w: np.ndarray | None = None
 
@@ -117,7 +128,7 @@ class ConsumptionPredictor:
         self,
         history: list[tuple[datetime, int, float]],
         reference_time: datetime | None = None,
-        temperatures: dict[datetime, float] | None = None,
+        temperatures: dict[datetime, float] | TemperatureIndex | None = None,
     ) -> None:
         """Fit ridge regression on historical per-slot data.
 
@@ -125,7 +136,10 @@ class ConsumptionPredictor:
             history: List of ``(timestamp, slot_index, energy_kwh)``.
             reference_time: The "now" time for computing sample ages.
             temperatures: Optional dict mapping slot-start timestamps to
-                temperature (°C) values.  Ignored when use_temperature=False.
+                temperature (°C) values, or a prebuilt
+                :class:`TemperatureIndex` over them.  Naive dict keys are
+                taken in *reference_time*'s timezone.  Ignored when
+                use_temperature=False.
         """
         if reference_time is None:
             reference_time = datetime.now().astimezone()
@@ -147,100 +161,105 @@ class ConsumptionPredictor:
             self._coef = None
             return
 
-        k = self._n_features
-        X = np.zeros((n, k), dtype=np.float64)
-        y = np.zeros(n, dtype=np.float64)
-        w = np.zeros(n, dtype=np.float64)
-
-        temps = temperatures or {}
+        # One pass over the datetimes; everything else works on arrays.
+        aware = [as_aware(ts) for ts, _slot, _energy in history]
+        epoch = np.fromiter((ts.timestamp() for ts in aware), np.float64, n)
+        ordinal = np.fromiter((ts.toordinal() for ts in aware), np.int64, n)
+        slots = np.fromiter((sample[1] for sample in history), np.int64, n)
+        energy = np.fromiter((sample[2] for sample in history), np.float64, n)
+
+        # Physical (UTC) order; the lag follows physical time, not wall slots.
+        order = np.argsort(epoch, kind="stable")
+        age_days = (reference_aware.timestamp() - epoch[order]) / 86400.0
+        keep = (
+            (slots[order] >= 0)
+            & (slots[order] < self._slots_per_day)
+            & np.isfinite(energy[order])
+            & (energy[order] > 0)
+            & (age_days >= 0)
+        )
+        order = order[keep]
+        valid = len(order)
+        epoch = epoch[order]
+        slots = slots[order]
+        y = energy[order]
+        age_days = age_days[keep]
+        local_day = (ordinal[order] - _UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+        dow = (ordinal[order] - 1) % 7
+        doy = (local_day - local_day.astype("datetime64[Y]")).astype(np.int64) + 1
+
+        # Store raw data for uncertainty estimation.
         self._raw_groups.clear()
+        for group_dow, slot, age, value in zip(
+            dow.tolist(), slots.tolist(), age_days.tolist(), y.tolist(), strict=True
+        ):
+            self._raw_groups.setdefault((group_dow, slot), []).append((age, value))
 
-        # Sequential lag follows physical time, not wall-clock slot order.
-        slot_duration = timedelta(minutes=1440 // self._slots_per_day)
-        prev_energy = 0.0
-        prev_timestamp_utc: datetime | None = None
-        valid_fingerprints: set[_SampleFingerprint] = set()
+        if valid < 2:
+            self._coef = None
+            return
 
-        valid = 0
-        ordered_history = sorted(
-            history,
-            key=lambda sample: as_aware(sample[0]).astimezone(UTC),
-        )
-        for ts, slot, energy in ordered_history:
-            if slot < 0 or slot >= self._slots_per_day:
-                continue
-            if not math.isfinite(energy) or energy <= 0:
-                continue
-
-            ts_aware = as_aware(ts)
-            ts_utc = ts_aware.astimezone(UTC)
-            age_days = (
-                reference_aware.astimezone(UTC) - ts_utc
-            ).total_seconds() / 86400.0
-            if age_days < 0:
-                continue
-
-            dow = ts_aware.weekday()
-            doy = ts_aware.timetuple().tm_yday
-
-            # Store raw data for uncertainty estimation.
-            self._raw_groups.setdefault((dow, slot), []).append((age_days, energy))
-
-            # One-hot (DOW, slot) feature.
-            X[valid, dow * self._slots_per_day + slot] = 1.0
-
-            # Day-of-year seasonality features.
-            X[valid, self._doy_offset] = math.sin(2 * math.pi * doy / 365.0)
-            X[valid, self._doy_offset + 1] = math.cos(2 * math.pi * doy / 365.0)
-
-            # Temperature feature.
-            temperature_value: float | None = None
-            if self._use_temperature:
-                # Match temperature by slot-start timestamp (nearest).
-                slot_start = ts_aware.replace(
-                    minute=(ts_aware.minute // (1440 // self._slots_per_day))
-                    * (1440 // self._slots_per_day),
-                    second=0,
-                    microsecond=0,
-                )
-                temperature_value = self._lookup_temperature(temps, slot_start)
-                X[valid, self._temp_offset] = temperature_value
-
-            # A lag is valid only across one exact physical interval.  Reset
-            # after recorder gaps, rejected readings, and accumulator resets.
-            lag_value: float | None = None
-            if self._use_sequential:
-                is_contiguous = (
-                    prev_timestamp_utc is not None
-                    and ts_utc - prev_timestamp_utc == slot_duration
-                )
-                lag_value = prev_energy if is_contiguous else 0.0
-                X[valid, self._lag_offset] = lag_value
-
-            # Fingerprint every input that can change this sample's feature
-            # row or target.  UTC identifies the physical observation while
-            # local calendar fields preserve the model's HA-local features.
-            valid_fingerprints.add(
+        groups = dow * self._slots_per_day + slots
+        w = np.exp(-age_days / max(self._decay_days, 0.5))
+
+        # Continuous columns: sin/cos day-of-year, temperature, lag.
+        cont = np.zeros((valid, self._n_features - self._n_onehot), np.float64)
+        cont[:, 0] = np.sin(2 * np.pi * doy / 365.0)
+        cont[:, 1] = np.cos(2 * np.pi * doy / 365.0)
+
+        temperature_values: list[float | None] = [None] * valid
+        if self._use_temperature:
+            # Match temperature by slot-start timestamp (nearest), all
+            # samples in one sorted-index lookup.
+            slot_minutes = 1440 // self._slots_per_day
+            into_slot = np.fromiter(
                 (
-                    ts_utc,
-                    dow,
-                    doy,
-                    slot,
-                    float(energy),
-                    temperature_value,
-                    lag_value,
-                )
+                    (ts.minute % slot_minutes) * 60 + ts.second + ts.microsecond / 1e6
+                    for ts in (aware[idx] for idx in order.tolist())
+                ),
+                np.float64,
+                valid,
+            )
+            index = (
+                temperatures
+                if isinstance(temperatures, TemperatureIndex)
+                else TemperatureIndex(temperatures, reference_aware.tzinfo)
             )
+            matched = np.nan_to_num(index.nearest_epoch(epoch - into_slot), nan=0.0)
+            cont[:, self._temp_offset - self._n_onehot] = matched
+            temperature_values[:] = matched.tolist()
 
-            y[valid] = energy
-            w[valid] = math.exp(-age_days / max(self._decay_days, 0.5))
-            prev_energy = energy
-            prev_timestamp_utc = ts_utc
-            valid += 1
+        # A lag is valid only across one exact physical interval.  Reset
+        # after recorder gaps, rejected readings, and accumulator resets.
+        lag_values: list[float | None] = [None] * valid
+        if self._use_sequential:
+            slot_seconds = 86400.0 / self._slots_per_day
+            lag = np.zeros(valid, np.float64)
+            contiguous = np.abs(np.diff(epoch) - slot_seconds) < 1e-6
+            lag[1:] = np.where(contiguous, y[:-1], 0.0)
+            cont[:, self._lag_offset - self._n_onehot] = lag
+            lag_values[:] = lag.tolist()
+
+        # Fingerprint every input that can change this sample's feature
+        # row or target.  UTC identifies the physical observation while
+        # local calendar fields preserve the model's HA-local features.
+        valid_fingerprints: set[_SampleFingerprint] = set(
+            zip(
+                epoch.tolist(),
+                dow.tolist(),
+                doy.tolist(),
+                slots.tolist(),
+                y.tolist(),
+                temperature_values,
+                lag_values,
+                strict=True,
+            )
+        )
 
-        if valid < 2:
-            self._coef = None
-            return
+        self._groups = groups
+        self._cont = cont
+        self._y = y
+        self._w = w
 
         # Retrain only after enough genuinely new or revised valid samples.
         # A rolling history often keeps a constant length, so sample count
@@ -251,19 +270,9 @@ class ConsumptionPredictor:
             and self._last_fit_fingerprints
             and changed_samples < self._retrain_min_new
         ):
-            self._X = X[:valid]
-            self._y = y[:valid]
-            self._w = w[:valid]
             return
 
-        X = X[:valid]
-        y = y[:valid]
-        w = w[:valid]
-
-        self._X = X
-        self._y = y
-        self._w = w
-        self._fit(X, y, w)
+        self._fit(groups, cont, y, w)
         self._last_fit_time = reference_aware
         self._last_fit_fingerprints = valid_fingerprints
 
@@ -334,12 +343,13 @@ class ConsumptionPredictor:
         The caller supplies the real HA-local recommendation timestamps.
         Canonical UTC keys keep both autumn folds distinct, while physical
         ordering skips nonexistent spring wall slots.  Any physical gap
-        resets the lag instead of joining unrelated observations.
+        resets the lag instead of joining unrelated observations.  Naive
+        *temperatures* keys are taken in the slots' timezone, as
+        :meth:`train` takes them in the reference time's.
         """
         if self._coef is None:
             return {}
 
-        temps = temperatures or {}
         slot_minutes = 1440 // self._slots_per_day
         slot_duration = timedelta(minutes=slot_minutes)
         prev = 0.0
@@ -354,11 +364,21 @@ class ConsumptionPredictor:
             )
             physical_slots[aware.astimezone(UTC)] = aware
 
+        ordered_starts = sorted(physical_slots)
+        slot_temperatures: list[float | None] = [None] * len(ordered_starts)
+        if temperatures and ordered_starts:
+            local_tz = physical_slots[ordered_starts[0]].tzinfo
+            slot_temperatures[:] = np.nan_to_num(
+                TemperatureIndex(temperatures, local_tz).nearest_many(ordered_starts),
+                nan=0.0,
+            ).tolist()
+
         result: dict[datetime, float] = {}
-        for physical_start in sorted(physical_slots):
+        for physical_start, temp_val in zip(
+            ordered_starts, slot_temperatures, strict=True
+        ):
             slot_dt = physical_slots[physical_start]
             slot = (slot_dt.hour * 60 + slot_dt.minute) // slot_minutes
-            temp_val = self._lookup_temperature(temps, slot_dt) if temps else None
             is_contiguous = (
                 prev_timestamp_utc is not None
                 and physical_start - prev_timestamp_utc == slot_duration
@@ -439,7 +459,13 @@ class ConsumptionPredictor:
     # Fitting
     # ------------------------------------------------------------------
 
-    def _fit(self, X: np.ndarray, y: np.ndarray, w: np.ndarray) -> None:
+    def _fit(
+        self,
+        groups: np.ndarray,
+        cont: np.ndarray,
+        y: np.ndarray,
+        w: np.ndarray,
+    ) -> None:
         """Two-stage (backfitting) weighted ridge regression.
 
         A joint ridge over 674 features with only a handful of samples is
@@ -460,49 +486,37 @@ class ConsumptionPredictor:
            the *residual* (y minus the group mean), so they only capture
            seasonality/weather effects the group means cannot explain.
         """
-        n_samples = X.shape[0]
-
         # --- Stage 1: one-hot group means with slot-level shrinkage ----
         # Per-(DOW, slot) and per-slot weighted sums.
-        group_w: dict[int, float] = {}
-        group_wy: dict[int, float] = {}
-        slot_w: dict[int, float] = {}
-        slot_wy: dict[int, float] = {}
-        onehot_cols = X[:, : self._n_onehot]
-        for i in range(n_samples):
-            g = int(np.argmax(onehot_cols[i]))  # one-hot index for this sample
-            slot = g % self._slots_per_day
-            wi = float(w[i])
-            group_w[g] = group_w.get(g, 0.0) + wi
-            group_wy[g] = group_wy.get(g, 0.0) + wi * float(y[i])
-            slot_w[slot] = slot_w.get(slot, 0.0) + wi
-            slot_wy[slot] = slot_wy.get(slot, 0.0) + wi * float(y[i])
-
+        group_w = np.bincount(groups, weights=w, minlength=self._n_onehot)
+        group_wy = np.bincount(groups, weights=w * y, minlength=self._n_onehot)
+        slot_w = group_w.reshape(7, self._slots_per_day).sum(axis=0)
+        slot_wy = group_wy.reshape(7, self._slots_per_day).sum(axis=0)
+
+        has_group = group_w > 1e-12
+        has_slot = np.tile(slot_w > 1e-12, 7)
+        gbar = np.divide(group_wy, group_w, out=np.zeros_like(group_w), where=has_group)
         # Slot-level weighted mean = shrinkage prior.
-        slot_mean: dict[int, float] = {
-            s: slot_wy[s] / slot_w[s] for s in slot_w if slot_w[s] > 1e-12
-        }
+        slot_mean = np.tile(
+            np.divide(slot_wy, slot_w, out=np.zeros_like(slot_w), where=slot_w > 1e-12),
+            7,
+        )
+        prior = np.where(has_slot, slot_mean, gbar)
 
         coef = np.zeros(self._n_features, dtype=np.float64)
         floor = 0.001
-        for g in range(self._n_onehot):
-            wg = group_w.get(g, 0.0)
-            if wg > 1e-12:
-                gbar = group_wy[g] / wg
-                prior = slot_mean.get(g % self._slots_per_day, gbar)
-                # Shrink the group mean toward its slot-level mean.
-                shrunk = (wg * gbar + self._alpha * prior) / (wg + self._alpha)
-                coef[g] = max(shrunk, floor)
-            else:
-                coef[g] = floor
+        # Shrink the group mean toward its slot-level mean.
+        shrunk = (group_w * gbar + self._alpha * prior) / np.maximum(
+            group_w + self._alpha, 1e-12
+        )
+        coef[: self._n_onehot] = np.where(has_group, np.maximum(shrunk, floor), floor)
 
         # --- Stage 2: continuous features on the residual --------------
-        resid = y - onehot_cols @ coef[: self._n_onehot]
-        cont_cols = X[:, self._n_onehot :]
-        k_cont = cont_cols.shape[1]
+        resid = y - coef[groups]
+        k_cont = cont.shape[1]
         if k_cont > 0:
             sqrt_w = np.sqrt(w)
-            xw = cont_cols * sqrt_w[:, np.newaxis]
+            xw = cont * sqrt_w[:, np.newaxis]
             yw = resid * sqrt_w
             ridge = xw.T @ xw + self._alpha * np.eye(k_cont, dtype=np.float64)
             xtwy = xw.T @ yw
@@ -515,7 +529,7 @@ class ConsumptionPredictor:
         self._intercept = 0.0
         self._coef = coef
 
-        self._last_fit_samples = X.shape[0]
+        self._last_fit_samples = len(y)
 
     def _weighted_std(self, samples: list[tuple[float, float]]) -> float:
         """Compute time-decay weighted standard deviation."""
@@ -533,33 +547,119 @@ class ConsumptionPredictor:
         w_var = np.average((values - w_mean) ** 2, weights=weights)
         return float(np.sqrt(w_var))
 
-    @staticmethod
-    def _lookup_temperature(
-        temperatures: dict[datetime, float],
-        target: datetime,
-    ) -> float:
-        """Find the temperature closest to the target physical timestamp."""
-        finite_temperatures = [
-            (timestamp, value)
-            for timestamp, value in temperatures.items()
-            if math.isfinite(value)
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def snapshot_state(self) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+        """Return JSON-safe metadata and arrays describing the fitted model.
+
+        Holds everything prediction and the retrain gate need: coefficients,
+        the per-(DOW, slot) samples behind :meth:`predict_with_std`, the fit
+        fingerprints and ``training_context``.  The training matrices are
+        not included; the next :meth:`train` rebuilds them.
+        """
+        groups = [
+            (dow, slot, age, energy)
+            for (dow, slot), entries in self._raw_groups.items()
+            for age, energy in entries
         ]
-        if not finite_temperatures:
-            return 0.0
-        target_aware = target if target.tzinfo is not None else target.astimezone()
-        target_utc = target_aware.astimezone(UTC)
+        fingerprints = list(self._last_fit_fingerprints)
+        meta: dict[str, Any] = {
+            "decay_days": self._decay_days,
+            "alpha": self._alpha,
+            "slots_per_day": self._slots_per_day,
+            "retrain_min_new_samples": self._retrain_min_new,
+            "use_temperature": self._use_temperature,
+            "use_sequential": self._use_sequential,
+            "intercept": self._intercept,
+            "last_fit_samples": self._last_fit_samples,
+            "last_fit_time": (
+                self._last_fit_time.isoformat() if self._last_fit_time else None
+            ),
+            "actual_history_days": self.actual_history_days,
+            "training_context": self.training_context,
+        }
 
-        def physical_distance(item: tuple[datetime, float]) -> float:
-            timestamp = item[0]
-            aware = (
-                timestamp
-                if timestamp.tzinfo is not None
-                else timestamp.replace(tzinfo=target_aware.tzinfo)
+        def column(rows: list[tuple[Any, ...]], i: int, dtype: Any) -> np.ndarray:
+            # ``None`` (no temperature / lag feature) is stored as NaN.
+            return np.array(
+                [np.nan if row[i] is None else row[i] for row in rows], dtype=dtype
             )
-            return abs((aware.astimezone(UTC) - target_utc).total_seconds())
 
-        _best_timestamp, best_value = min(finite_temperatures, key=physical_distance)
-        return best_value
+        arrays = {
+            "coef": (self._coef if self._coef is not None else np.zeros(0, np.float64)),
+            "raw_dow": column(groups, 0, np.int64),
+            "raw_slot": column(groups, 1, np.int64),
+            "raw_age": column(groups, 2, np.float64),
+            "raw_energy": column(groups, 3, np.float64),
+            "fp_epoch": column(fingerprints, 0, np.float64),
+            "fp_dow": column(fingerprints, 1, np.int64),
+            "fp_doy": column(fingerprints, 2, np.int64),
+            "fp_slot": column(fingerprints, 3, np.int64),
+            "fp_energy": column(fingerprints, 4, np.float64),
+            "fp_temperature": column(fingerprints, 5, np.float64),
+            "fp_lag": column(fingerprints, 6, np.float64),
+        }
+        return meta, arrays
+
+    @classmethod
+    def from_snapshot_state(
+        cls, meta: dict[str, Any], arrays: dict[str, np.ndarray]
+    ) -> ConsumptionPredictor:
+        """Rebuild a predictor from :meth:`snapshot_state` output.
+
+        Raises:
+            KeyError, ValueError: When the snapshot is incomplete or its
+                coefficients do not match the feature layout.
+        """
+        predictor = cls(
+            decay_days=float(meta["decay_days"]),
+            alpha=float(meta["alpha"]),
+            slots_per_day=int(meta["slots_per_day"]),
+            retrain_min_new_samples=int(meta["retrain_min_new_samples"]),
+            use_temperature=bool(meta["use_temperature"]),
+            use_sequential=bool(meta["use_sequential"]),
+        )
+        coef = np.asarray(arrays["coef"], dtype=np.float64)
+        if coef.size:
+            if coef.shape != (predictor._n_features,):
+                msg = f"coefficient shape {coef.shape} does not match the layout"
+                raise ValueError(msg)
+            predictor._coef = coef
+        predictor._intercept = float(meta["intercept"])
+        predictor._last_fit_samples = int(meta["last_fit_samples"])
+        if meta["last_fit_time"]:
+            predictor._last_fit_time = datetime.fromisoformat(meta["last_fit_time"])
+        predictor.actual_history_days = float(meta["actual_history_days"])
+        context = meta["training_context"]
+        predictor.training_context = tuple(context) if context is not None else None  # type: ignore[assignment]  # JSON list back to the context tuple
+
+        for dow, slot, age, energy in zip(
+            arrays["raw_dow"].tolist(),
+            arrays["raw_slot"].tolist(),
+            arrays["raw_age"].tolist(),
+            arrays["raw_energy"].tolist(),
+            strict=True,
+        ):
+            predictor._raw_groups.setdefault((dow, slot), []).append((age, energy))
+
+        def optional(values: np.ndarray) -> list[float | None]:
+            return [None if math.isnan(v) else v for v in values.tolist()]
+
+        predictor._last_fit_fingerprints = set(
+            zip(
+                arrays["fp_epoch"].tolist(),
+                arrays["fp_dow"].tolist(),
+                arrays["fp_doy"].tolist(),
+                arrays["fp_slot"].tolist(),
+                arrays["fp_energy"].tolist(),
+                optional(arrays["fp_temperature"]),
+                optional(arrays["fp_lag"]),
+                strict=True,
+            )
+        )
+        return predictor
 
     # ------------------------------------------------------------------
     # Properties
@@ -571,9 +671,9 @@ class ConsumptionPredictor:
 
     @property
     def group_count(self) -> int:
-        if self._X is None:
+        if self._groups is None:
             return 0
-        return int(np.sum(np.max(self._X[:, : self._n_onehot], axis=0) > 0))
+        return int(np.unique(self._groups).size)
 
     @property
     def slots_per_day(self) -> int:
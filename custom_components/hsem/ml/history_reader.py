@@ -6,18 +6,30 @@ resolution (default 15-minute slots = 96 slots/day).
 
 Uses the HA recorder API with proper executor offloading to keep the event
 loop responsive.
+
+:class:`EnergyHistorySeries` keeps the processed series between refreshes
+and extends it incrementally: only the states since the last processed slot
+are fetched, the new deltas are appended and samples older than the window
+are evicted.  A full fetch rebuilds the series once a day.
+
+:meth:`HistoryReader.read_energy_statistics` reads the same per-slot series
+from the recorder's 5-minute statistics (and, for hourly slots, the hourly
+statistics) instead of raw states.
 """
 
 from __future__ import annotations
 
 import math
-from datetime import datetime, timedelta
-from typing import Any
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any, Protocol
 
 from homeassistant.components.recorder import (
     get_instance,  # pyright: ignore[reportPrivateImportUsage] — HA public API, not in stubs
 )
 from homeassistant.components.recorder.history import get_significant_states
+from homeassistant.components.recorder.statistics import statistics_during_period
 from homeassistant.core import HomeAssistant
 
 from custom_components.hsem.utils.datetime_utils import (
@@ -45,6 +57,15 @@ DEFAULT_SLOT_MINUTES = 15
 # Maximum sane per-slot consumption in kWh (cap for data errors).
 MAX_SLOT_KWH = 12.5
 
+# Period of the recorder's short-term statistics, in minutes.
+SHORT_TERM_STATISTICS_MINUTES = 5
+
+# An incrementally extended series is rebuilt from the full window this
+# often, so recorder corrections and purges are picked up.
+FULL_HISTORY_RESYNC = timedelta(hours=24)
+
+type EnergySample = tuple[datetime, int, float]
+
 
 class HistoryReader:
     """Reads historical energy sensor data from the HA recorder.
@@ -77,6 +98,7 @@ class HistoryReader:
         days: int = DEFAULT_MIN_HISTORY_DAYS,
         max_days: int = DEFAULT_MAX_HISTORY_DAYS,
         slot_minutes: int = DEFAULT_SLOT_MINUTES,
+        since: datetime | None = None,
     ) -> list[tuple[datetime, int, float]]:
         """Read historical energy accumulator data and compute per-slot deltas.
 
@@ -88,6 +110,10 @@ class HistoryReader:
             max_days: Maximum days of history to fetch (performance guard).
             slot_minutes: Slot width in minutes (default 15).  Must divide
                 evenly into 60.  Supported: 15, 30, 60.
+            since: Fetch from this instant instead of *max_days* ago and
+                skip the minimum-history check (incremental refresh).  The
+                first slot at or after it only provides the left boundary
+                for the next slot's delta.
 
         Returns:
             A list of ``(datetime, slot_index, energy_kwh)`` tuples sorted
@@ -100,6 +126,8 @@ class HistoryReader:
         now = hsem_now()
         end_time = utc_key(now)
         start_time = end_time - timedelta(days=max_days)
+        if since is not None:
+            start_time = max(start_time, utc_key(since))
 
         _LOGGER.debug(
             "ML history: fetching states for %s from %s to %s",
@@ -167,7 +195,7 @@ class HistoryReader:
         history = self._compute_slot_deltas(readings, now, slot_minutes, slots_per_day)
 
         # Check minimum history requirement.
-        if history:
+        if history and since is None:
             earliest = history[0][0]
             actual_days = (utc_key(now) - utc_key(earliest)).total_seconds() / 86400.0
             if actual_days < days:
@@ -182,6 +210,123 @@ class HistoryReader:
 
         return history
 
+    async def read_energy_statistics(
+        self,
+        entity_id: str,
+        days: int = DEFAULT_MIN_HISTORY_DAYS,
+        max_days: int = DEFAULT_MAX_HISTORY_DAYS,
+        slot_minutes: int = DEFAULT_SLOT_MINUTES,
+        since: datetime | None = None,
+    ) -> list[tuple[datetime, int, float]]:
+        """Read per-slot energy deltas from the recorder's statistics.
+
+        A drop-in for :meth:`read_energy_history` for sensors with long-term
+        statistics (``state_class: total_increasing``).  The ``change`` of
+        the 5-minute short-term statistics is summed per slot.  With hourly
+        slots, hours older than the short-term retention come from the
+        hourly statistics, so the window can reach past ``purge_keep_days``;
+        shorter slots do not use them, as an hourly total carries no
+        intra-hour profile.  Slots after the last compiled statistics
+        period are read from raw states.  Without statistics for
+        *entity_id* the whole window is read from raw states.
+
+        Args:
+            entity_id: The HA entity ID of the energy sensor.
+            days: Minimum number of days of history required.
+            max_days: Maximum days of history to fetch (performance guard).
+            slot_minutes: Slot width in minutes; 15, 30 or 60.
+            since: Fetch from this instant instead of *max_days* ago and
+                skip the minimum-history check (incremental refresh).
+
+        Returns:
+            Same as :meth:`read_energy_history`.
+        """
+        now = hsem_now()
+        end_time = utc_key(now)
+        start_time = end_time - timedelta(days=max_days)
+        if since is not None:
+            start_time = max(start_time, utc_key(since))
+
+        # An incremental read stays within the short-term retention, and
+        # hourly rows only resolve hourly slots.
+        periods = (
+            ("5minute", "hour")
+            if since is None and slot_minutes == 60
+            else ("5minute",)
+        )
+        rows: dict[str, list[Any]] = {"5minute": [], "hour": []}
+        for period in periods:
+            stats: dict[str, list[Any]] = await get_instance(
+                self._hass
+            ).async_add_executor_job(
+                statistics_during_period,
+                self._hass,
+                start_time,
+                end_time,
+                {entity_id},
+                period,
+                {"energy": "kWh"},
+                {"change"},
+            )
+            rows[period] = stats.get(entity_id, [])
+
+        if not rows["5minute"] and not rows["hour"]:
+            _LOGGER.debug(
+                "ML history: no statistics for %s, reading raw states.", entity_id
+            )
+            return await self.read_energy_history(
+                entity_id,
+                days=days,
+                max_days=max_days,
+                slot_minutes=slot_minutes,
+                since=since,
+            )
+
+        history = self._compute_statistics_slots(
+            rows["5minute"], rows["hour"], now, slot_minutes
+        )
+        _LOGGER.debug(
+            "ML history: %d slots from %d short-term and %d hourly statistics "
+            "rows for %s",
+            len(history),
+            len(rows["5minute"]),
+            len(rows["hour"]),
+            entity_id,
+        )
+
+        # Statistics are compiled after each period ends; the slots since
+        # the last compiled period come from raw states.
+        compiled_until = max(row["end"] for row in rows["5minute"] or rows["hour"])
+        tail_start = slot_key(
+            datetime.fromtimestamp(compiled_until, tz=UTC), slot_minutes
+        )
+        if tail_start < slot_key(now, slot_minutes):
+            tail = await self.read_energy_history(
+                entity_id,
+                days=days,
+                max_days=max_days,
+                slot_minutes=slot_minutes,
+                since=tail_start - timedelta(minutes=slot_minutes),
+            )
+            history = [s for s in history if utc_key(s[0]) < tail_start] + [
+                s for s in tail if utc_key(s[0]) >= tail_start
+            ]
+
+        if history and since is None:
+            earliest = history[0][0]
+            actual_days = (utc_key(now) - utc_key(earliest)).total_seconds() / 86400.0
+            if actual_days < days:
+                _LOGGER.info(
+                    "ML history: only %.1f days of statistics for %s (need %d). "
+                    "Predictions will use fallback.",
+                    actual_days,
+                    entity_id,
+                    days,
+                )
+                return []
+
+        return history
+
     async def read_instantaneous_history(
         self,
         entity_id: str,
@@ -422,3 +567,182 @@ class HistoryReader:
             history.append((slot_start, slot_index, round(delta_kwh, 4)))
 
         return history
+
+    @staticmethod
+    def _compute_statistics_slots(
+        short_term_rows: Sequence[Mapping[str, Any]],
+        hourly_rows: Sequence[Mapping[str, Any]],
+        now: datetime,
+        slot_minutes: int,
+    ) -> list[tuple[datetime, int, float]]:
+        """Compute per-slot deltas from statistics ``change`` rows.
+
+        A slot takes the sum of its 5-minute rows and is skipped unless all
+        of them are present (a recorder gap, as in
+        :meth:`_compute_slot_deltas`).  With hourly slots, hours that end
+        before the first 5-minute row fill their slot from *hourly_rows*;
+        shorter slots ignore them rather than spreading an hourly total
+        evenly, which would flatten the intra-hour profile.  The slot in
+        progress is excluded and the same non-positive and
+        :data:`MAX_SLOT_KWH` filters apply.
+        """
+        step = timedelta(minutes=slot_minutes)
+        rows_per_slot = max(slot_minutes // SHORT_TERM_STATISTICS_MINUTES, 1)
+
+        parts: dict[datetime, list[float]] = {}
+        for row in short_term_rows:
+            if row.get("change") is None:
+                continue
+            start = datetime.fromtimestamp(row["start"], tz=UTC)
+            parts.setdefault(slot_key(start, slot_minutes), []).append(
+                float(row["change"])
+            )
+        changes = {
+            key: math.fsum(values)
+            for key, values in parts.items()
+            if len(values) == rows_per_slot
+        }
+
+        short_term_start = min(parts, default=None)
+        for row in hourly_rows if slot_minutes == 60 else ():
+            start = datetime.fromtimestamp(row["start"], tz=UTC)
+            if row.get("change") is None or (
+                short_term_start is not None and start + step > short_term_start
+            ):
+                continue
+            changes[start] = float(row["change"])
+
+        now_key = slot_key(now, slot_minutes)
+        history: list[tuple[datetime, int, float]] = []
+        for key in sorted(changes):
+            energy_kwh = changes[key]
+            if key >= now_key or not math.isfinite(energy_kwh):
+                continue
+            if energy_kwh <= 0 or energy_kwh > MAX_SLOT_KWH:
+                continue
+            slot_start = normalize_slot_start(key, slot_minutes)
+            slot_index = (slot_start.hour * 60 + slot_start.minute) // slot_minutes
+            history.append((slot_start, slot_index, round(energy_kwh, 4)))
+
+        return history
+
+
+class _EnergyHistorySource(Protocol):
+    async def read_energy_history(
+        self,
+        entity_id: str,
+        days: int = ...,
+        max_days: int = ...,
+        slot_minutes: int = ...,
+        since: datetime | None = ...,
+    ) -> list[EnergySample]: ...
+
+    async def read_energy_statistics(
+        self,
+        entity_id: str,
+        days: int = ...,
+        max_days: int = ...,
+        slot_minutes: int = ...,
+        since: datetime | None = ...,
+    ) -> list[EnergySample]: ...
+
+
+@dataclass
+class EnergyHistorySeries:
+    """Per-slot deltas of one accumulator, extended by incremental fetches.
+
+    The first :meth:`refresh` reads the full window.  Later refreshes fetch
+    the recorder states from the start of the last slot that was complete
+    at the previous fetch (its final reading is the left boundary of the
+    next delta), merge the returned deltas into the series (a fetched slot
+    replaces the stored one) and evict samples older than *max_days*.  The
+    result matches a full fetch, apart from a slot whose only reading is the
+    recorder's start-of-window state.
+
+    Attributes:
+        entity_id: The energy accumulator entity.
+        slot_minutes: Slot width in minutes.
+        use_statistics: Read through
+            :meth:`HistoryReader.read_energy_statistics` instead of raw states.
+        samples: ``(slot_start, slot_index, energy_kwh)`` oldest first.
+        processed_until: UTC start of the slot that was in progress at the
+            last fetch; every earlier slot has been processed.
+        full_fetch_at: When the series was last rebuilt from the full window.
+    """
+
+    entity_id: str
+    slot_minutes: int = DEFAULT_SLOT_MINUTES
+    use_statistics: bool = False
+    samples: list[EnergySample] = field(default_factory=list)
+    processed_until: datetime | None = None
+    full_fetch_at: datetime | None = None
+
+    async def refresh(
+        self,
+        reader: _EnergyHistorySource,
+        now: datetime,
+        days: int = DEFAULT_MIN_HISTORY_DAYS,
+        max_days: int = DEFAULT_MAX_HISTORY_DAYS,
+    ) -> list[EnergySample]:
+        """Bring the series up to *now* and return a copy of its samples.
+
+        *days* is only checked by a full fetch, which returns an empty list
+        (and resets the series) while the recorder holds less history.
+        """
+        read = (
+            reader.read_energy_statistics
+            if self.use_statistics
+            else reader.read_energy_history
+        )
+        now_key = slot_key(now, self.slot_minutes)
+        if self._can_extend(now_key):
+            assert self.processed_until is not None  # checked by _can_extend
+            resume = self.processed_until - timedelta(minutes=self.slot_minutes)
+            new_samples = await read(
+                entity_id=self.entity_id,
+                days=days,
+                max_days=max_days,
+                slot_minutes=self.slot_minutes,
+                since=resume,
+            )
+            added = self._merge(new_samples, now, max_days)
+            _LOGGER.debug(
+                "ML history: added %d new samples for %s (%d in window).",
+                added,
+                self.entity_id,
+                len(self.samples),
+            )
+        else:
+            self.samples = list(
+                await read(
+                    entity_id=self.entity_id,
+                    days=days,
+                    max_days=max_days,
+                    slot_minutes=self.slot_minutes,
+                )
+            )
+            if not self.samples:
+                self.processed_until = self.full_fetch_at = None
+                return []
+            self.full_fetch_at = now
+        self.processed_until = now_key
+        return list(self.samples)
+
+    def _can_extend(self, now_key: datetime) -> bool:
+        """Return whether the next refresh may fetch only the newest states."""
+        if self.processed_until is None or self.full_fetch_at is None:
+            return False
+        age = now_key - utc_key(self.full_fetch_at)
+        return now_key >= self.processed_until and age < FULL_HISTORY_RESYNC
+
+    def _merge(
+        self, new_samples: list[EnergySample], now: datetime, max_days: int
+    ) -> int:
+        """Merge fetched samples by physical slot and evict the expired ones."""
+        by_slot = {utc_key(sample[0]): sample for sample in self.samples}
+        known = len(by_slot)
+        by_slot.update((utc_key(sample[0]), sample) for sample in new_samples)
+        added = len(by_slot) - known
+        window_start = utc_key(now) - timedelta(days=max_days)
+        self.samples = [by_slot[key] for key in sorted(by_slot) if key >= window_start]
+        return added
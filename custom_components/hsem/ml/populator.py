@@ -13,15 +13,18 @@ but uses ML predictions instead of rolling-average sensor states.
 from __future__ import annotations
 
 import math
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 
 from homeassistant.core import HomeAssistant
 
 from custom_components.hsem.ml.consumption_predictor import ConsumptionPredictor
 from custom_components.hsem.ml.history_reader import (
     DEFAULT_MAX_HISTORY_DAYS,
+    EnergyHistorySeries,
     HistoryReader,
 )
+from custom_components.hsem.ml.temperature_index import TemperatureIndex
 from custom_components.hsem.models.hourly_recommendation import HourlyRecommendation
 from custom_components.hsem.models.sensor_config import SensorConfig
 from custom_components.hsem.utils.datetime_utils import (
@@ -33,16 +36,27 @@ from custom_components.hsem.utils.datetime_utils import (
 from custom_components.hsem.utils.logger import HSEM_LOGGER
 
 type _HistorySample = tuple[datetime, int, float]
-type _HistoryCacheKey = tuple[int, str, str | None, bool, int, int]
+type _HistoryCacheKey = tuple[int, str, str | None, bool, int, int, bool]
 type _TemperatureCacheKey = tuple[int, str, int]
 type _PredictorContext = tuple[str, str | None, bool, int, int, str | None]
 
+
+@dataclass
+class _HistoryCacheEntry:
+    """Processed history plus the per-entity series it was derived from."""
+
+    cached_at: datetime
+    history: list[_HistorySample]
+    import_series: EnergyHistorySeries
+    export_series: EnergyHistorySeries | None = None
+
+
 # Cache final, fully processed history rather than an import-only intermediate.
 # The effective configuration is part of the key so another config entry,
-# source entity, cadence, history window, or net/gross mode cannot reuse it.
-_processed_history_cache: dict[
-    _HistoryCacheKey, tuple[datetime, list[_HistorySample]]
-] = {}
+# source entity, cadence, history window, net/gross mode, or source table
+# (raw states or statistics) cannot reuse it.
+# The entry keeps the raw series so a stale entry is extended incrementally.
+_processed_history_cache: dict[_HistoryCacheKey, _HistoryCacheEntry] = {}
 _temperature_history_cache: dict[
     _TemperatureCacheKey, tuple[datetime, dict[datetime, float]]
 ] = {}
@@ -87,8 +101,9 @@ async def populate_ml_house_consumption(
 
     reader = HistoryReader(hass)
 
-    # Full history fetch — cache the processed series for 60 minutes to avoid
-    # hammering the recorder database on every 1–5 minute coordinator cycle.
+    # Cache the processed series for 60 minutes to avoid hammering the
+    # recorder database on every 1–5 minute coordinator cycle.  Once stale,
+    # only the states since the last processed slot are fetched.
     now_ts = hsem_now()
     net_enabled = cfg.ml_consumption_net_consumption
     if net_enabled and not cfg.grid_export_energy_entity:
@@ -98,31 +113,29 @@ async def populate_ml_house_consumption(
         )
         return False, None
     export_entity = cfg.grid_export_energy_entity if net_enabled else None
-    cache_key: _HistoryCacheKey = (
-        id(hass),
-        energy_entity,
-        export_entity,
-        net_enabled,
-        slot_minutes,
-        min_days,
-    )
+    use_statistics = cfg.ml_consumption_use_statistics
+    cache_key = _history_cache_key(hass, cfg, energy_entity)
     cached = _processed_history_cache.get(cache_key)
-    cache_valid = cached is not None and _cache_is_fresh(cached[0], now_ts)
+    cache_valid = cached is not None and _cache_is_fresh(cached.cached_at, now_ts)
 
     history: list[_HistorySample]
     if cache_valid and cached is not None:
-        history = cached[1]
+        history = cached.history
         HSEM_LOGGER.debug(
             "ML populator: using cached history (%d samples, age %.0f min).",
             len(history),
-            _physical_elapsed(now_ts, cached[0]).total_seconds() / 60,
+            _physical_elapsed(now_ts, cached.cached_at).total_seconds() / 60,
         )
     else:
-        import_history = await reader.read_energy_history(
-            entity_id=energy_entity,
-            days=min_days,
-            slot_minutes=slot_minutes,
-            max_days=DEFAULT_MAX_HISTORY_DAYS,
+        # A failed refresh starts over with a full fetch next cycle.
+        _processed_history_cache.pop(cache_key, None)
+        import_series = (
+            cached.import_series
+            if cached is not None
+            else EnergyHistorySeries(energy_entity, slot_minutes, use_statistics)
+        )
+        import_history = await import_series.refresh(
+            reader, now_ts, days=min_days, max_days=DEFAULT_MAX_HISTORY_DAYS
         )
         if not import_history:
             HSEM_LOGGER.info(
@@ -134,12 +147,15 @@ async def populate_ml_house_consumption(
             return False, None
 
         history = import_history
+        export_series: EnergyHistorySeries | None = None
         if net_enabled and export_entity is not None:
-            export_history = await reader.read_energy_history(
-                entity_id=export_entity,
-                days=min_days,
-                slot_minutes=slot_minutes,
-                max_days=DEFAULT_MAX_HISTORY_DAYS,
+            export_series = (
+                cached.export_series
+                if cached is not None and cached.export_series is not None
+                else EnergyHistorySeries(export_entity, slot_minutes, use_statistics)
+            )
+            export_history = await export_series.refresh(
+                reader, now_ts, days=min_days, max_days=DEFAULT_MAX_HISTORY_DAYS
             )
             if export_history:
                 history = _compute_net_consumption(import_history, export_history)
@@ -159,9 +175,11 @@ async def populate_ml_house_consumption(
                 return False, None
 
         if history:
-            _processed_history_cache[cache_key] = (now_ts, history)
+            _processed_history_cache[cache_key] = _HistoryCacheEntry(
+                now_ts, history, import_series, export_series
+            )
         HSEM_LOGGER.debug(
-            "ML populator: fetched fresh processed history (%d samples).",
+            "ML populator: refreshed processed history (%d samples).",
             len(history),
         )
 
@@ -216,6 +234,10 @@ async def populate_ml_house_consumption(
             "ML populator: temperature history unavailable;"
             " fitting without temperature."
         )
+    # One sorted index serves both the fit and the inference lookup.
+    temperature_index = (
+        TemperatureIndex(temperatures, reference_time.tzinfo) if use_temp else None
+    )
 
     training_context: _PredictorContext = (
         energy_entity,
@@ -251,7 +273,7 @@ async def populate_ml_house_consumption(
     # pool to avoid blocking the event loop.
     was_fitted_before = predictor.trained
     await hass.async_add_executor_job(
-        predictor.train, history, reference_time, temperatures
+        predictor.train, history, reference_time, temperature_index
     )
 
     if not predictor.trained:
@@ -328,7 +350,7 @@ async def populate_ml_house_consumption(
     # This naturally skips spring's nonexistent hour and preserves both
     # physical folds of autumn's repeated wall hour.
     seq_predictions: dict[datetime, float] = {}
-    prediction_temperature = _nearest_temperature(temperatures, reference_time)
+    prediction_temperature = _nearest_temperature(temperature_index, reference_time)
     if cfg.ml_consumption_sequential:
         sequence_keys = sorted(
             {
@@ -423,6 +445,71 @@ async def populate_ml_house_consumption(
     return True, predictor
 
 
+def get_history_series(
+    hass: HomeAssistant, cfg: SensorConfig
+) -> tuple[EnergyHistorySeries, EnergyHistorySeries | None] | None:
+    """Return the cached import/export series for *cfg*, if any."""
+    energy_entity = cfg.ml_consumption_energy_entity or cfg.grid_import_energy_entity
+    if not energy_entity:
+        return None
+    cached = _processed_history_cache.get(_history_cache_key(hass, cfg, energy_entity))
+    if cached is None:
+        return None
+    return cached.import_series, cached.export_series
+
+
+def restore_history_series(
+    hass: HomeAssistant,
+    cfg: SensorConfig,
+    import_series: EnergyHistorySeries,
+    export_series: EnergyHistorySeries | None,
+) -> bool:
+    """Seed the history cache with persisted series (warm start).
+
+    The entry is stale from the start, so the next populate extends the
+    series with only the states since their last processed slot.  Series
+    that do not match the current configuration are rejected.
+    """
+    energy_entity = cfg.ml_consumption_energy_entity or cfg.grid_import_energy_entity
+    if not energy_entity:
+        return False
+    key = _history_cache_key(hass, cfg, energy_entity)
+    _hass_id, _entity, export_entity, _net, slot_minutes, _days, use_statistics = key
+
+    def matches(series: EnergyHistorySeries | None, entity_id: str | None) -> bool:
+        if series is None or entity_id is None:
+            return series is None and entity_id is None
+        return (
+            series.entity_id == entity_id
+            and series.slot_minutes == slot_minutes
+            and series.use_statistics == use_statistics
+        )
+
+    if not (
+        matches(import_series, energy_entity) and matches(export_series, export_entity)
+    ):
+        return False
+    _processed_history_cache[key] = _HistoryCacheEntry(
+        datetime.min.replace(tzinfo=UTC), [], import_series, export_series
+    )
+    return True
+
+
+def _history_cache_key(
+    hass: HomeAssistant, cfg: SensorConfig, energy_entity: str
+) -> _HistoryCacheKey:
+    net_enabled = cfg.ml_consumption_net_consumption
+    return (
+        id(hass),
+        energy_entity,
+        cfg.grid_export_energy_entity if net_enabled else None,
+        net_enabled,
+        cfg.recommendation_interval_minutes,
+        cfg.ml_consumption_history_days,
+        cfg.ml_consumption_use_statistics,
+    )
+
+
 def _physical_elapsed(later: datetime, earlier: datetime) -> timedelta:
     """Return elapsed time by UTC instant, retaining local calendar timestamps."""
     later_aware = later if later.tzinfo is not None else later.astimezone()
@@ -481,7 +568,7 @@ def _compute_net_consumption(
 
 
 def _nearest_temperature(
-    temperatures: dict[datetime, float] | None,
+    temperature_index: TemperatureIndex | None,
     target: datetime,
 ) -> float | None:
     """Return the temperature nearest to *target* by physical time.
@@ -490,19 +577,9 @@ def _nearest_temperature(
     forecast, so inference deliberately persists the newest nearby reading
     through the prediction horizon.
     """
-    finite_temperatures = {
-        timestamp: value
-        for timestamp, value in (temperatures or {}).items()
-        if math.isfinite(value)
-    }
-    if not finite_temperatures:
+    if temperature_index is None:
         return None
-    target_key = utc_key(target)
-    nearest = min(
-        finite_temperatures,
-        key=lambda timestamp: abs((utc_key(timestamp) - target_key).total_seconds()),
-    )
-    return finite_temperatures[nearest]
+    return temperature_index.nearest(target)
 
 
 async def _read_temperature_history(
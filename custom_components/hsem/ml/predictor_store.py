@@ -0,0 +1,192 @@
+"""On-disk snapshot of the trained ML consumption model.
+
+The predictor and the per-slot energy history it was trained on otherwise
+live only in memory, so the first ML cycle after a restart re-read the
+full recorder window and refitted.  A snapshot holds:
+
+- the fitted :class:`ConsumptionPredictor` (coefficients, the per-(DOW, slot)
+  samples behind ``predict_with_std``, fit fingerprints, ``training_context``);
+- the :class:`EnergyHistorySeries` of the import (and, in net mode, export)
+  entity, including the last processed slot.
+
+Restored, the series extends itself with only the states since the last
+processed slot, and the retrain gate compares against the restored
+fingerprints.  Temperature history is not included; it is re-read on the
+first cycle.
+
+The snapshot is a single compressed ``.npz`` in ``.storage``: the arrays plus
+a JSON ``meta`` entry carrying :data:`SNAPSHOT_VERSION`.  Reading and writing
+are blocking and run in the executor; writes are atomic.  A snapshot of
+another version, or one that fails to parse, is ignored.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from custom_components.hsem.ml.consumption_predictor import ConsumptionPredictor
+from custom_components.hsem.ml.history_reader import EnergyHistorySeries
+from custom_components.hsem.utils.datetime_utils import normalize_datetime
+from custom_components.hsem.utils.logger import HSEM_LOGGER as _LOGGER
+
+SNAPSHOT_VERSION = 1
+
+_SERIES_ROLES = ("import", "export")
+
+
+@dataclass
+class PredictorSnapshot:
+    """A fitted predictor and the history series it was trained on."""
+
+    predictor: ConsumptionPredictor
+    import_series: EnergyHistorySeries | None = None
+    export_series: EnergyHistorySeries | None = None
+
+
+def snapshot_path(config_dir: str, entry_id: str) -> Path:
+    """Return the snapshot file of one config entry."""
+    return Path(config_dir) / ".storage" / f"hsem_ml_predictor_{entry_id}.npz"
+
+
+def write_snapshot(path: Path, snapshot: PredictorSnapshot) -> bool:
+    """Write *snapshot* to *path* atomically (blocking; executor only)."""
+    meta, predictor_arrays = snapshot.predictor.snapshot_state()
+    arrays = {f"predictor_{name}": value for name, value in predictor_arrays.items()}
+    series_meta: dict[str, Any] = {}
+    for role, series in zip(
+        _SERIES_ROLES, (snapshot.import_series, snapshot.export_series), strict=True
+    ):
+        if series is None:
+            continue
+        series_meta[role] = _series_meta(series)
+        arrays.update(
+            {f"{role}_{name}": value for name, value in _series_arrays(series).items()}
+        )
+    blob = {"version": SNAPSHOT_VERSION, "predictor": meta, "series": series_meta}
+    arrays["meta"] = np.array(json.dumps(blob))
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            suffix=".npz", prefix=".hsem_ml_predictor_", dir=str(path.parent)
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)  # type: ignore[arg-type]  # numpy stubs
+            os.replace(tmp_path, path)
+        except Exception:
+            with suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+    except OSError as err:
+        _LOGGER.warning("ML snapshot: could not write %s: %s", path, err)
+        return False
+    return True
+
+
+def read_snapshot(path: Path) -> PredictorSnapshot | None:
+    """Read a snapshot written by :func:`write_snapshot` (blocking).
+
+    Returns ``None`` when the file is missing, of another version or
+    malformed.
+    """
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        blob = json.loads(str(arrays.pop("meta")))
+        if blob.get("version") != SNAPSHOT_VERSION:
+            _LOGGER.info(
+                "ML snapshot: ignoring %s (version %s, expected %d).",
+                path,
+                blob.get("version"),
+                SNAPSHOT_VERSION,
+            )
+            return None
+        predictor = ConsumptionPredictor.from_snapshot_state(
+            blob["predictor"], _with_prefix(arrays, "predictor")
+        )
+        series = {
+            role: _series_from(meta, _with_prefix(arrays, role))
+            for role, meta in blob["series"].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError) as err:
+        _LOGGER.warning("ML snapshot: ignoring unreadable %s: %s", path, err)
+        return None
+    return PredictorSnapshot(predictor, series.get("import"), series.get("export"))
+
+
+def _with_prefix(arrays: dict[str, np.ndarray], role: str) -> dict[str, np.ndarray]:
+    prefix = f"{role}_"
+    return {
+        name.removeprefix(prefix): value
+        for name, value in arrays.items()
+        if name.startswith(prefix)
+    }
+
+
+def _series_meta(series: EnergyHistorySeries) -> dict[str, Any]:
+    return {
+        "entity_id": series.entity_id,
+        "slot_minutes": series.slot_minutes,
+        "use_statistics": series.use_statistics,
+        "processed_until": _iso(series.processed_until),
+        "full_fetch_at": _iso(series.full_fetch_at),
+    }
+
+
+def _series_arrays(series: EnergyHistorySeries) -> dict[str, np.ndarray]:
+    n = len(series.samples)
+    return {
+        "epoch": np.fromiter(
+            (start.timestamp() for start, _slot, _energy in series.samples),
+            np.float64,
+            n,
+        ),
+        "slot": np.fromiter(
+            (slot for _start, slot, _energy in series.samples), np.int64, n
+        ),
+        "energy": np.fromiter(
+            (energy for _start, _slot, energy in series.samples), np.float64, n
+        ),
+    }
+
+
+def _series_from(
+    meta: dict[str, Any], arrays: dict[str, np.ndarray]
+) -> EnergyHistorySeries:
+    samples = [
+        (normalize_datetime(datetime.fromtimestamp(epoch, tz=UTC)), slot, energy)
+        for epoch, slot, energy in zip(
+            arrays["epoch"].tolist(),
+            arrays["slot"].tolist(),
+            arrays["energy"].tolist(),
+            strict=True,
+        )
+    ]
+    return EnergyHistorySeries(
+        entity_id=meta["entity_id"],
+        slot_minutes=int(meta["slot_minutes"]),
+        use_statistics=bool(meta["use_statistics"]),
+        samples=samples,
+        processed_until=_from_iso(meta["processed_until"]),
+        full_fetch_at=_from_iso(meta["full_fetch_at"]),
+    )
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _from_iso(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
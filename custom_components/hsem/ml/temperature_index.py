@@ -0,0 +1,94 @@
+"""Nearest-reading lookups into a temperature history.
+
+Temperature readings arrive at irregular instants, while the predictor
+needs a value per slot start.  :class:`TemperatureIndex` keeps the finite
+readings as epoch-sorted NumPy arrays, so each lookup is a binary search
+(``np.searchsorted``) instead of a scan over the whole history, and
+:meth:`TemperatureIndex.nearest_many` aligns every slot start of a training
+set in one call.
+
+Matching is by physical time: both folds of an autumn repeated hour stay
+distinct, and an equidistant target takes the earlier reading.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from datetime import datetime, tzinfo
+
+import numpy as np
+
+
+class TemperatureIndex:
+    """Finite temperature readings sorted by physical time.
+
+    Args:
+        temperatures: Timestamp → temperature (°C).  Non-finite values are
+            dropped.
+        naive_tz: Timezone assumed for naive timestamps; the system local
+            timezone when ``None``.
+    """
+
+    __slots__ = ("_epoch", "_values")
+
+    def __init__(
+        self,
+        temperatures: Mapping[datetime, float] | None,
+        naive_tz: tzinfo | None = None,
+    ) -> None:
+        items = list((temperatures or {}).items())
+        epoch = _epoch_seconds([timestamp for timestamp, _value in items], naive_tz)
+        values = np.fromiter(
+            (value for _timestamp, value in items), np.float64, len(items)
+        )
+        finite = np.isfinite(values)
+        order = np.argsort(epoch[finite], kind="stable")
+        self._epoch = epoch[finite][order]
+        self._values = values[finite][order]
+
+    def __len__(self) -> int:
+        """Return the number of finite readings."""
+        return len(self._values)
+
+    def nearest(self, target: datetime) -> float | None:
+        """Return the reading nearest to *target*, or ``None`` when empty."""
+        if not len(self):
+            return None
+        return float(self.nearest_epoch(_epoch_seconds([target], target.tzinfo))[0])
+
+    def nearest_many(
+        self, targets: Sequence[datetime], naive_tz: tzinfo | None = None
+    ) -> np.ndarray:
+        """Return the nearest reading for each target (NaN when empty)."""
+        return self.nearest_epoch(_epoch_seconds(targets, naive_tz))
+
+    def nearest_epoch(self, epoch: np.ndarray) -> np.ndarray:
+        """Return the nearest reading for each epoch second (NaN when empty)."""
+        if not len(self):
+            return np.full(len(epoch), np.nan)
+        right = np.searchsorted(self._epoch, epoch, side="left")
+        left = np.clip(right - 1, 0, len(self) - 1)
+        right = np.clip(right, 0, len(self) - 1)
+        take_left = np.abs(epoch - self._epoch[left]) <= np.abs(
+            self._epoch[right] - epoch
+        )
+        return np.where(take_left, self._values[left], self._values[right])
+
+
+def _epoch_seconds(
+    timestamps: Sequence[datetime], naive_tz: tzinfo | None
+) -> np.ndarray:
+    """Return POSIX seconds for *timestamps*, localising naive ones."""
+
+    def aware(timestamp: datetime) -> datetime:
+        if timestamp.tzinfo is not None:
+            return timestamp
+        if naive_tz is None:
+            return timestamp.astimezone()
+        return timestamp.replace(tzinfo=naive_tz)
+
+    return np.fromiter(
+        (aware(timestamp).timestamp() for timestamp in timestamps),
+        np.float64,
+        len(timestamps),
+    )
@@ -55,6 +55,11 @@ class HourlyRecommendation:
             plotting in an Apex chart time-series.
         grid_import_kwh: Energy imported from the grid during this slot (kWh).
         grid_export_kwh: Energy exported to the grid during this slot (kWh).
+        marginal_energy_value: Value of one more kWh in the battery at the
+            start of the slot (local currency/kWh), from the optimizer's
+            dual solution.  ``None`` when the plan carries no duals.
+        marginal_load_cost: Cost of one more kWh of house load in the slot
+            (local currency/kWh), from the LP's energy-balance dual.
     """
 
     start: datetime
@@ -81,3 +86,5 @@ class HourlyRecommendation:
     ev_total_planned_load_kwh: float = 0.0
     ev_charger_calculated_power: float = 0.0
     ev_second_charger_calculated_power: float = 0.0
+    marginal_energy_value: float | None = None
+    marginal_load_cost: float | None = None
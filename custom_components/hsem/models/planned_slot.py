@@ -106,6 +106,14 @@ class PlannedSlot:
             the go-e (or compatible) API instead of running at full speed.
         ev_second_charger_calculated_power:
             Same as ``ev_charger_calculated_power``, but for the second EV.
+        marginal_energy_value:
+            Value (currency/kWh) of one more kWh in the battery at the
+            start of this slot, from the optimizer's dual solution.
+            ``None`` when the winning plan did not come from the LP or the
+            DP optimizer.
+        marginal_load_cost:
+            Cost (currency/kWh) of one more kWh of house load in this slot,
+            from the LP's energy-balance dual.  ``None`` when not available.
     """
 
     start: datetime
@@ -131,3 +139,17 @@ class PlannedSlot:
     grid_import_kwh: float = 0.0
     grid_export_kwh: float = 0.0
     recommendation: str | None = None
+    marginal_energy_value: float | None = None
+    marginal_load_cost: float | None = None
+
+    def clone(self) -> PlannedSlot:
+        """Return an independent shallow copy of this slot.
+
+        Every field is an immutable scalar, ``datetime`` or
+        :class:`SlotPrice`, so copying the instance ``__dict__`` is enough.
+        This is several times faster than :func:`copy.copy`, which goes
+        through the pickle ``__reduce_ex__`` protocol for each slot.
+        """
+        new = object.__new__(type(self))
+        new.__dict__ = self.__dict__.copy()
+        return new
@@ -276,6 +276,34 @@ class PlannerInput:
     #: Window-level hysteresis — minimum hold time (minutes) before
     #: allowing any recommendation change.  0 disables the feature.
     planner_window_hysteresis_minutes: int = 10
+    #: Opt-in true MILP via ``scipy.optimize.milp`` with binary
+    #: charge/discharge indicators.  False keeps the LP relaxation.
+    planner_milp_integer_mode: bool = False
+    #: Relative MIP gap (%) at which branch-and-bound stops.
+    planner_milp_gap_percentage: float = 0.5
+    #: Wall-clock budget (s) for the integer solve; on timeout the LP
+    #: relaxation is solved instead.
+    planner_milp_time_budget_seconds: float = 5.0
+    #: Opt-in variable-resolution horizon: the MILP solves distant slots
+    #: as merged blocks and the plan is expanded back to per-slot values.
+    planner_horizon_compression: bool = False
+    #: Hours from now kept at full slot resolution (minimum 2).
+    planner_horizon_full_resolution_hours: float = 6.0
+    #: Length (minutes) of the merged blocks beyond that window.
+    planner_horizon_block_minutes: int = 60
+    #: Opt-in rolling horizon: the MILP solves the head window, the DP the
+    #: remaining days and passes back the value of the energy left at the
+    #: split.  Takes precedence over ``planner_horizon_compression``.
+    planner_rolling_horizon: bool = False
+    #: Hours from now solved at full fidelity by the MILP (minimum 2).
+    planner_rolling_head_hours: float = 24.0
+    #: Upper bound on head solves while the split energy converges.
+    planner_rolling_iterations: int = 3
+    #: Record per-stage wall-clock / CPU timings in ``PlannerOutput.profile``.
+    planner_profiling_enabled: bool = False
+    #: Skip the MILP candidate and plan with the heuristic candidates only.
+    #: Set by the anytime planner for its fast first plan; never configured.
+    planner_heuristic_only: bool = False
     #: Name of the winning candidate from the previous planner run.
     #: ``None`` on the first run (no active plan to preserve).
     previous_winner_name: str | None = None
@@ -10,6 +10,7 @@ from custom_components.hsem.models.data_quality import DataQuality
 from custom_components.hsem.models.discharge_window import DischargeWindow
 from custom_components.hsem.models.plan_explanation import PlanExplanation
 from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.models.planner_profile import PlannerProfile
 
 if TYPE_CHECKING:
     from custom_components.hsem.models.time_series import TimeSeriesIndex
@@ -90,6 +91,9 @@ class PlannerOutput:
     #: ``"aggressive"``).  Used by the coordinator to persist the active plan
     #: name across cycles for hysteresis (issue #372).
     winner_name: str = ""
+    #: Per-stage wall-clock / CPU timings and the LP size of this run.
+    #: ``None`` unless ``PlannerInput.planner_profiling_enabled`` is set.
+    profile: PlannerProfile | None = field(default=None, repr=False, compare=False)
 
     # ------------------------------------------------------------------
     # Convenience helpers used by tests
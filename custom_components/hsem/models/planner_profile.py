@@ -0,0 +1,45 @@
+"""Dataclass for per-stage timings of one HSEM planning run."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class PlannerProfile:
+    """Wall-clock and CPU time per planner stage, plus the LP size.
+
+    Populated by :func:`~custom_components.hsem.planner.engine_core.run_planner`
+    when ``PlannerInput.planner_profiling_enabled`` is set.  Stages appear in
+    execution order: ``populate``, ``ev_injection``, ``schedule``,
+    ``candidates`` (generation, including the MILP solve), ``selection`` and
+    ``finalize``.
+
+    Attributes:
+        wall_ms:
+            Wall-clock milliseconds per stage.
+        cpu_ms:
+            Process CPU milliseconds per stage.  Lower than ``wall_ms`` when
+            the planner thread waited on the GIL or the host was busy.
+        lp:
+            Size and effort of the MILP candidate's solve: ``n_vars``,
+            ``n_eq_rows``, ``n_ub_rows``, ``nnz``, HiGHS ``iterations``
+            (simplex / IPM iterations of the LP, or ``mip_node_count`` in
+            integer mode), ``mode`` and ``solve_ms``.  Empty when no MILP
+            candidate was solved.
+    """
+
+    wall_ms: dict[str, float] = field(default_factory=dict)
+    cpu_ms: dict[str, float] = field(default_factory=dict)
+    lp: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def total_wall_ms(self) -> float:
+        """Return the wall-clock milliseconds of the whole run."""
+        return round(sum(self.wall_ms.values()), 3)
+
+    @property
+    def total_cpu_ms(self) -> float:
+        """Return the CPU milliseconds of the whole run."""
+        return round(sum(self.cpu_ms.values()), 3)
@@ -275,6 +275,7 @@ class SensorConfig:
     ml_consumption_history_days: int = 14
     ml_consumption_net_consumption: bool = False
     ml_consumption_sequential: bool = False
+    ml_consumption_use_statistics: bool = False
     ml_consumption_temperature_entity: str | None = None
 
     # Planner hysteresis — keep the active plan unless a new plan is
@@ -285,6 +286,29 @@ class SensorConfig:
     # Window-level hysteresis — minimum hold time (minutes) before allowing
     # any recommendation change.  0 disables the feature.
     planner_window_hysteresis_minutes: int = 10
+    # Opt-in true MILP (binary charge/discharge) with relative gap (%) and
+    # wall-clock budget (s).  Falls back to the LP relaxation on timeout.
+    planner_milp_integer_mode: bool = False
+    planner_milp_gap_percentage: float = 0.5
+    planner_milp_time_budget_seconds: float = 5.0
+    # Opt-in variable-resolution horizon for the MILP: slots beyond the
+    # full-resolution window (hours) are merged into blocks (minutes).
+    planner_horizon_compression: bool = False
+    planner_horizon_full_resolution_hours: float = 6.0
+    planner_horizon_block_minutes: int = 60
+    # Opt-in rolling horizon: MILP over the head window (hours), DP over the
+    # remaining days, iterated at most the given number of times.
+    planner_rolling_horizon: bool = False
+    planner_rolling_head_hours: float = 24.0
+    planner_rolling_iterations: int = 3
+    # Opt-in dedicated planner process with a per-run timeout (seconds).
+    planner_worker_process: bool = False
+    planner_worker_timeout_seconds: float = 60.0
+    planner_profiling: bool = False
+    # Opt-in anytime planning with a per-cycle deadline (seconds) for the
+    # full solve before a heuristic plan is applied.
+    planner_anytime: bool = False
+    planner_anytime_deadline_seconds: float = 1.0
 
     # Embedded OCPP 1.6 server for EV charger control (issue #603).
     ocpp_enabled: bool = False
@@ -0,0 +1,224 @@
+"""Columnar (struct-of-arrays) view of a planner slot list.
+
+The planner's stages exchange ``list[PlannedSlot]``: one dataclass per slot,
+read and written one attribute at a time.  Numeric kernels — the MILP
+assembly, the SoC simulation, the cost scoring — want the opposite layout:
+one contiguous ``float64`` array per field.
+
+:class:`SlotFrame` is that layout.  It is built from a slot list in one pass
+(:meth:`SlotFrame.from_slots`), sliced and combined with numpy, and written
+back to ``PlannedSlot`` objects only at the output boundary
+(:meth:`SlotFrame.write_slots` / :meth:`SlotFrame.to_slots`).
+
+Layout
+------
+``start_s`` / ``end_s``
+    Slot boundaries as ``int64`` epoch seconds.  Comparing these against
+    ``now.timestamp()`` is DST-safe and replaces per-slot ``as_tz`` calls.
+``import_price`` / ``export_price``
+    The two halves of :attr:`PlannedSlot.price`.
+One column per name in :data:`FLOAT_FIELDS`
+    Same name and unit as the :class:`PlannedSlot` attribute.
+``recommendation``
+    ``object`` array of recommendation strings (or ``None``).
+
+Values are copied bit-for-bit (Python ``float`` is IEEE-754 ``float64``), so
+``from_slots`` → ``write_slots`` is lossless.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, tzinfo
+from operator import attrgetter
+
+import numpy as np
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.utils.prices import SlotPrice
+
+#: Numeric ``PlannedSlot`` attributes stored as ``float64`` columns.
+FLOAT_FIELDS: tuple[str, ...] = (
+    "solcast_pv_estimate_kwh",
+    "avg_house_consumption_kwh",
+    "avg_house_consumption_1d_kwh",
+    "avg_house_consumption_3d_kwh",
+    "avg_house_consumption_7d_kwh",
+    "avg_house_consumption_14d_kwh",
+    "ev_planned_load_kwh",
+    "ev_accounted_load_kwh",
+    "ev_total_planned_load_kwh",
+    "ev_charger_calculated_power",
+    "ev_second_charger_calculated_power",
+    "estimated_net_consumption_kwh",
+    "estimated_cost_currency",
+    "estimated_battery_soc_pct",
+    "estimated_battery_capacity_kwh",
+    "batteries_charged_kwh",
+    "batteries_discharged_kwh",
+    "grid_import_kwh",
+    "grid_export_kwh",
+)
+
+
+@dataclass
+class SlotFrame:
+    """Struct-of-arrays counterpart of ``list[PlannedSlot]``.
+
+    Attributes:
+        start_s: Slot starts as epoch seconds (``int64``).
+        end_s: Slot ends as epoch seconds (``int64``).
+        columns: ``float64`` array per name in :data:`FLOAT_FIELDS` plus
+            ``import_price`` and ``export_price``.
+        recommendation: ``object`` array of recommendation strings.
+        tz: Time zone used to rebuild ``datetime`` boundaries in
+            :meth:`to_slots` (taken from the first slot).
+    """
+
+    start_s: np.ndarray
+    end_s: np.ndarray
+    columns: dict[str, np.ndarray] = field(default_factory=dict)
+    recommendation: np.ndarray = field(
+        default_factory=lambda: np.empty(0, dtype=object)
+    )
+    tz: tzinfo | None = None
+
+    @classmethod
+    def from_slots(
+        cls,
+        slots: list[PlannedSlot],
+        fields: tuple[str, ...] = FLOAT_FIELDS,
+        grid: SlotFrame | None = None,
+    ) -> SlotFrame:
+        """Build a frame from *slots* in one pass.
+
+        ``fields`` limits the float columns that are read (all of
+        :data:`FLOAT_FIELDS` by default); prices and recommendations are
+        always included.  ``grid`` is a frame known to have the same slot
+        boundaries; its ``start_s`` / ``end_s`` are shared instead of
+        converting every ``datetime`` again.
+        """
+        n = len(slots)
+        getter = attrgetter(*fields) if fields else None
+        rows = [getter(s) for s in slots] if getter else []
+        values = np.array(rows, dtype=np.float64).reshape(n, len(fields))
+        columns = dict(zip(fields, np.ascontiguousarray(values.T), strict=True))
+        prices = np.array([s.price for s in slots], dtype=np.float64).reshape(n, 2)
+        columns["import_price"] = prices[:, 0].copy()
+        columns["export_price"] = prices[:, 1].copy()
+        recommendation = np.empty(n, dtype=object)
+        recommendation[:] = [s.recommendation for s in slots]
+        if grid is not None:
+            start_s, end_s = grid.start_s, grid.end_s
+        else:
+            start_s = np.fromiter(
+                (int(s.start.timestamp()) for s in slots), dtype=np.int64, count=n
+            )
+            end_s = np.fromiter(
+                (int(s.end.timestamp()) for s in slots), dtype=np.int64, count=n
+            )
+        return cls(
+            start_s=start_s,
+            end_s=end_s,
+            columns=columns,
+            recommendation=recommendation,
+            tz=slots[0].start.tzinfo if slots else None,
+        )
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return len(self.start_s)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Return the column *name* (a :data:`FLOAT_FIELDS` entry or price)."""
+        return self.columns[name]
+
+    @property
+    def duration_hours(self) -> np.ndarray:
+        """Slot widths in hours (DST-safe: computed from epoch seconds)."""
+        hours: np.ndarray = (self.end_s - self.start_s) / 3600.0
+        return hours
+
+    @property
+    def net_load_kwh(self) -> np.ndarray:
+        """``avg_house_consumption + ev_planned_load − PV`` per slot."""
+        net: np.ndarray = (
+            self.columns["avg_house_consumption_kwh"]
+            + self.columns["ev_planned_load_kwh"]
+            - self.columns["solcast_pv_estimate_kwh"]
+        )
+        return net
+
+    def future_mask(self, now: datetime) -> np.ndarray:
+        """Return a boolean mask of slots that end after *now*."""
+        return self.end_s > now.timestamp()
+
+    def take(self, indices: np.ndarray | list[int]) -> SlotFrame:
+        """Return a new frame holding copies of the rows at *indices*."""
+        idx = np.asarray(indices, dtype=np.intp)
+        return SlotFrame(
+            start_s=self.start_s[idx],
+            end_s=self.end_s[idx],
+            columns={name: col[idx] for name, col in self.columns.items()},
+            recommendation=self.recommendation[idx],
+            tz=self.tz,
+        )
+
+    def copy(self) -> SlotFrame:
+        """Return a deep copy (independent column arrays)."""
+        return SlotFrame(
+            start_s=self.start_s.copy(),
+            end_s=self.end_s.copy(),
+            columns={name: col.copy() for name, col in self.columns.items()},
+            recommendation=self.recommendation.copy(),
+            tz=self.tz,
+        )
+
+    def write_slots(
+        self,
+        slots: list[PlannedSlot],
+        fields: tuple[str, ...] | None = None,
+    ) -> None:
+        """Copy frame values back onto *slots* (same length and order).
+
+        Args:
+            slots: Slot objects to update in place.
+            fields: Attribute names to write.  ``None`` writes every
+                :data:`FLOAT_FIELDS` column, the prices and the
+                recommendation.  ``"price"`` and ``"recommendation"`` are
+                accepted alongside the float field names.
+        """
+        if len(slots) != len(self):
+            raise ValueError(
+                f"SlotFrame has {len(self)} rows but {len(slots)} slots were given"
+            )
+        names = (*FLOAT_FIELDS, "price", "recommendation") if fields is None else fields
+        for name in names:
+            if name == "price":
+                pairs = zip(
+                    self.columns["import_price"].tolist(),
+                    self.columns["export_price"].tolist(),
+                    strict=True,
+                )
+                for slot, (imp, exp) in zip(slots, pairs, strict=True):
+                    slot.price = SlotPrice(imp, exp)
+            elif name == "recommendation":
+                for slot, rec in zip(slots, self.recommendation.tolist(), strict=True):
+                    slot.recommendation = rec
+            else:
+                for slot, value in zip(slots, self.columns[name].tolist(), strict=True):
+                    setattr(slot, name, value)
+
+    def to_slots(self) -> list[PlannedSlot]:
+        """Materialise a new ``list[PlannedSlot]`` from the frame."""
+        slots = [
+            PlannedSlot(
+                start=datetime.fromtimestamp(start, self.tz),
+                end=datetime.fromtimestamp(end, self.tz),
+            )
+            for start, end in zip(
+                self.start_s.tolist(), self.end_s.tolist(), strict=True
+            )
+        ]
+        self.write_slots(slots)
+        return slots
@@ -229,12 +229,19 @@ class HSEMOptionsFlow(config_entries.OptionsFlow):
         errors = {}
 
         if user_input is not None:
-            errors = await validate_battery_economics_input(user_input)
+            errors = await validate_battery_economics_input(
+                user_input,
+                self._user_input.get("hsem_recommendation_interval_length"),
+                self._config_entry,
+            )
             if not errors:
                 self._user_input.update(user_input)
                 return await self.async_step_power()
 
-        data_schema = await get_battery_economics_step_schema(self._config_entry)
+        data_schema = await get_battery_economics_step_schema(
+            self._config_entry,
+            self._user_input.get("hsem_recommendation_interval_length"),
+        )
 
         return self.async_show_form(
             step_id="battery_economics",
@@ -34,12 +34,17 @@ Candidates produced
                         battery size (fix for issue #416 Bug 2).
 8. ``milp``           — globally-optimal LP solution (when scipy is available);
                         falls back gracefully if the solver fails.
+9. ``dp``             — numpy-only dynamic-programming plan over a discretised
+                        SoC grid; only when the MILP is unavailable, skipped
+                        (heuristic-only run) or failed.
 """
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import partial
 
 from custom_components.hsem.models.ev_config import EVConfig
 from custom_components.hsem.models.planned_slot import PlannedSlot
@@ -50,11 +55,14 @@ from custom_components.hsem.planner.candidates._mutations import (
     _copy_slots,
 )
 from custom_components.hsem.planner.cost_function import PlanCostBreakdown
+from custom_components.hsem.planner.dp_optimizer import CANDIDATE_DP, solve_dp
+from custom_components.hsem.planner.horizon_compression import solve_milp_compressed
 from custom_components.hsem.planner.milp_optimizer import (
     CANDIDATE_MILP,
     is_scipy_available,
     solve_milp,
 )
+from custom_components.hsem.planner.rolling_horizon import solve_milp_rolling
 from custom_components.hsem.utils.logger import log_planner
 from custom_components.hsem.utils.misc import (
     calculate_recommended_threshold,
@@ -101,7 +109,7 @@ _SOC_FRACTIONS: dict[str, float] = {
     CANDIDATE_SOC_FULL: 2.00,  # fill to max usable capacity
 }
 
-# Re-export MILP candidate name so callers only need to import from here
+# Re-export optimizer candidate names so callers only need to import from here
 __all__ = [
     "CANDIDATE_BASELINE",
     "CANDIDATE_NO_ACTION",
@@ -118,6 +126,7 @@ __all__ = [
     "CANDIDATE_SOC_125",
     "CANDIDATE_SOC_FULL",
     "CANDIDATE_MILP",
+    "CANDIDATE_DP",
     "CandidatePlan",
     "generate_candidates",
 ]
@@ -276,19 +285,47 @@ def generate_candidates(
     # for soc_candidate_name, charge_fraction in _SOC_FRACTIONS.items():
     #     ...
 
-    # 9. MILP — globally-optimal LP solution (requires scipy, falls back gracefully)
-    if is_scipy_available():
-        # Use the canonical resolve_cycle_cost() — same as engine_core and
-        # cost_helpers.py — so the MILP optimises against the same value.
-        effective_cycle_cost = resolve_cycle_cost(
+    # Use the canonical resolve_cycle_cost() — same as engine_core and
+    # cost_helpers.py — so the optimizers optimise against the same value.
+    effective_cycle_cost = resolve_cycle_cost(
+        purchase_price=inp.battery_purchase_price,
+        usable_kwh=usable_kwh,
+        expected_cycles=inp.battery_expected_cycles,
+        capacity_loss_pct=inp.battery_capacity_loss_pct,
+        user_margin=inp.battery_cycle_cost_per_kwh,
+    )
+    min_export_price = max(
+        inp.export_min_price,
+        calculate_recommended_threshold(
             purchase_price=inp.battery_purchase_price,
-            usable_kwh=usable_kwh,
             expected_cycles=inp.battery_expected_cycles,
+            usable_capacity=usable_kwh,
             capacity_loss_pct=inp.battery_capacity_loss_pct,
-            user_margin=inp.battery_cycle_cost_per_kwh,
-        )
+        ),
+    )
 
-        milp_result = solve_milp(
+    # 9. MILP — globally-optimal LP solution (requires scipy, falls back gracefully)
+    milp_result = None
+    # Heuristic-only runs must not trigger the lazy scipy import.
+    if not inp.planner_heuristic_only and is_scipy_available():
+        # Opt-in rolling horizon: the first day is solved by the MILP and the
+        # rest by the DP, which values the energy left at the split.  Else
+        # opt-in variable resolution: distant slots are merged into blocks
+        # for the LP and the plan is expanded back to per-slot values.
+        solve: Callable[..., tuple[list[PlannedSlot], dict] | None] = solve_milp
+        if inp.planner_rolling_horizon:
+            solve = partial(
+                solve_milp_rolling,
+                head_hours=inp.planner_rolling_head_hours,
+                max_iterations=inp.planner_rolling_iterations,
+            )
+        elif inp.planner_horizon_compression:
+            solve = partial(
+                solve_milp_compressed,
+                full_resolution_hours=inp.planner_horizon_full_resolution_hours,
+                block_minutes=inp.planner_horizon_block_minutes,
+            )
+        milp_result = solve(
             baseline_slots,
             now,
             current_kwh=current_kwh,
@@ -300,21 +337,16 @@ def generate_candidates(
             discharge_efficiency_pct=inp.battery_discharge_efficiency_pct,
             time_discount_rate=inp.time_discount_rate,
             replacement_price_per_kwh=replacement_price_per_kwh,
-            min_export_price=max(
-                inp.export_min_price,
-                calculate_recommended_threshold(
-                    purchase_price=inp.battery_purchase_price,
-                    expected_cycles=inp.battery_expected_cycles,
-                    usable_capacity=usable_kwh,
-                    capacity_loss_pct=inp.battery_capacity_loss_pct,
-                ),
-            ),
+            min_export_price=min_export_price,
             ev_configs=ev_configs,
             no_export=not inp.excess_export_enabled,
             main_fuse_amps=inp.main_fuse_amps,
             main_fuse_phases=inp.main_fuse_phases,
             max_grid_export_power_kw=inp.max_grid_export_power_kw,
             battery_export_min_price=inp.battery_export_min_price,
+            integer_mode=inp.planner_milp_integer_mode,
+            mip_rel_gap=inp.planner_milp_gap_percentage / 100.0,
+            mip_time_limit_s=inp.planner_milp_time_budget_seconds,
         )
         log_planner(
             "debug",
@@ -324,15 +356,7 @@ def generate_candidates(
             effective_cycle_cost,
             not inp.excess_export_enabled,
             inp.excess_export_enabled,
-            max(
-                inp.export_min_price,
-                calculate_recommended_threshold(
-                    purchase_price=inp.battery_purchase_price,
-                    expected_cycles=inp.battery_expected_cycles,
-                    usable_capacity=usable_kwh,
-                    capacity_loss_pct=inp.battery_capacity_loss_pct,
-                ),
-            ),
+            min_export_price,
             inp.battery_export_min_price,
             len(ev_configs) if ev_configs else 0,
         )
@@ -356,7 +380,39 @@ def generate_candidates(
                 "[gen] MILP candidate skipped — solver returned None (infeasible or timeout)",
             )
     else:
-        log_planner("debug", "[gen] MILP candidate skipped — scipy not available")
+        log_planner(
+            "debug",
+            "[gen] MILP candidate skipped — scipy not available or heuristic-only run",
+        )
+
+    # 10. DP — numpy-only near-optimal plan when the MILP is unavailable,
+    # skipped or failed.  EV loads stay fixed (no EV co-optimisation).
+    if milp_result is None:
+        dp_result = solve_dp(
+            baseline_slots,
+            now,
+            current_kwh=current_kwh,
+            usable_kwh=usable_kwh,
+            max_charge_per_slot=max_charge_per_slot,
+            max_discharge_per_slot=max_discharge_per_slot,
+            cycle_cost_per_kwh=effective_cycle_cost,
+            charge_efficiency_pct=inp.battery_charge_efficiency_pct,
+            discharge_efficiency_pct=inp.battery_discharge_efficiency_pct,
+            time_discount_rate=inp.time_discount_rate,
+            replacement_price_per_kwh=replacement_price_per_kwh,
+            min_export_price=min_export_price,
+            no_export=not inp.excess_export_enabled,
+            main_fuse_amps=inp.main_fuse_amps,
+            main_fuse_phases=inp.main_fuse_phases,
+            max_grid_export_power_kw=inp.max_grid_export_power_kw,
+            battery_export_min_price=inp.battery_export_min_price,
+        )
+        if dp_result is not None:
+            dp_slots, dp_diag = dp_result
+            candidates.append(
+                CandidatePlan(name=CANDIDATE_DP, slots=dp_slots, diagnostics=dp_diag)
+            )
+            log_planner("debug", "[gen] DP candidate added (MILP unavailable)")
 
     # Log candidate slot-level recommendations for debugging
     log_planner(
@@ -7,13 +7,16 @@ one, and picks the best valid plan.
 Selection algorithm
 -------------------
 1. Run :func:`~custom_components.hsem.planner.soc_simulation.simulate_soc`
-   on each candidate to populate ``grid_import_kwh``, ``grid_export_kwh``,
+   on each candidate (batched through
+   :func:`~custom_components.hsem.planner.soc_kernel.simulate_soc_batch`) to
+   populate ``grid_import_kwh``, ``grid_export_kwh``,
    and ``estimated_battery_soc``.
 2. Validate the candidate — a plan is *invalid* if the simulated SoC ever
    violates the end-of-discharge floor by more than a small numerical
    tolerance.  (The SoC simulation already clamps, so this is a sanity check
    for edge cases.)
-3. Score all valid candidates with :func:`~cost_function.score_plan`.
+3. Score all valid candidates with :func:`~cost_function.score_plan`
+   (batched through :func:`~cost_batch.score_plans`).
 4. Pick the candidate with the **lowest total cost** (lower = better).
 5. If no candidate is valid (degenerate edge case), fall back to ``baseline``.
 6. Return the winning slots plus a list of
@@ -38,16 +41,18 @@ from datetime import datetime, timedelta
 from custom_components.hsem.models.rejected_plan import RejectedPlan
 from custom_components.hsem.planner.candidate_generator import (
     CANDIDATE_BASELINE,
+    CANDIDATE_DP,
     CANDIDATE_MILP,
     CANDIDATE_NO_ACTION,
     CandidatePlan,
 )
-from custom_components.hsem.planner.cost_function import CostWeights, score_plan
+from custom_components.hsem.planner.cost_batch import score_plans
+from custom_components.hsem.planner.cost_function import CostWeights
 from custom_components.hsem.planner.discharge_scheduler import (
     apply_optimization_strategy,
     concentrate_discharge_on_expensive_slots,
 )
-from custom_components.hsem.planner.soc_simulation import simulate_soc
+from custom_components.hsem.planner.soc_kernel import simulate_soc_batch
 from custom_components.hsem.utils.datetime_utils import as_tz
 from custom_components.hsem.utils.logger import log_planner
 from custom_components.hsem.utils.recommendations import (
@@ -234,21 +239,25 @@ def select_best_candidate(  # NOSONAR
         )
 
     # --- Step 1 & 2: simulate and validate each candidate ---------------
+    # All candidates share one time grid, so they are simulated as a single
+    # candidates × slots batch (see :mod:`soc_kernel`).
+    simulate_soc_batch(
+        [candidate.slots for candidate in candidates],
+        now,
+        current_kwh,
+        usable_kwh,
+        max_soc_capacity_kwh,
+        max_charge_per_slot,
+        max_discharge_per_slot,
+        rated_kwh=rated_kwh,
+        end_of_discharge_soc_pct=end_of_discharge_soc_pct,
+        charge_efficiency_pct=charge_efficiency_pct,
+        discharge_efficiency_pct=discharge_efficiency_pct,
+        milp_prepopulated=[
+            candidate.name in (CANDIDATE_MILP, CANDIDATE_DP) for candidate in candidates
+        ],
+    )
     for candidate in candidates:
-        simulate_soc(
-            candidate.slots,
-            now,
-            current_kwh,
-            usable_kwh,
-            max_soc_capacity_kwh,
-            max_charge_per_slot,
-            max_discharge_per_slot,
-            rated_kwh=rated_kwh,
-            end_of_discharge_soc_pct=end_of_discharge_soc_pct,
-            charge_efficiency_pct=charge_efficiency_pct,
-            discharge_efficiency_pct=discharge_efficiency_pct,
-            milp_prepopulated=(candidate.name == CANDIDATE_MILP),
-        )
         candidate.is_valid, candidate.rejection_reason = _validate_candidate(
             candidate, end_of_discharge_soc_pct
         )
@@ -295,16 +304,17 @@ def select_best_candidate(  # NOSONAR
         cost_weights.max_charge_per_slot_kwh = max_charge_per_slot
 
         # Score all valid candidates (including no_action for diagnostics)
-        for candidate in valid:
-            candidate._cost = score_plan(
-                candidate.slots,
-                cost_weights,
-                slot_duration_hours=slot_duration_hours,
-                now=now,
-                initial_battery_kwh=current_kwh,
-                replacement_price_per_kwh=replacement_price_per_kwh,
-            )
-            c_cost = candidate._cost
+        # in one candidates × slots batch.
+        costs = score_plans(
+            [candidate.slots for candidate in valid],
+            cost_weights,
+            slot_duration_hours=slot_duration_hours,
+            now=now,
+            initial_battery_kwh=current_kwh,
+            replacement_price_per_kwh=replacement_price_per_kwh,
+        ).breakdowns()
+        for candidate, c_cost in zip(valid, costs, strict=True):
+            candidate._cost = c_cost
             log_planner(
                 "debug",
                 "[selector] score  candidate=%-20s  "
@@ -6,7 +6,6 @@ mutations (solar charging, grid charging, discharge clearing).
 
 from __future__ import annotations
 
-import copy
 from datetime import datetime
 
 from custom_components.hsem.models.planned_slot import PlannedSlot
@@ -21,19 +20,19 @@ from custom_components.hsem.utils.recommendations import (
 def _copy_slots(slots: list[PlannedSlot]) -> list[PlannedSlot]:
     """Return an independent copy of *slots* for candidate isolation.
 
-    Uses a shallow copy of each :class:`PlannedSlot` dataclass.  This is
+    Uses :meth:`PlannedSlot.clone` (a shallow copy) for each slot.  This is
     safe because every field on ``PlannedSlot`` is either an immutable scalar
     (``float``, ``str | None``) or an immutable named-tuple
     (:class:`~custom_components.hsem.utils.prices.SlotPrice`, ``datetime``).
     There are intentionally **no mutable container fields** (lists, dicts)
     on ``PlannedSlot`` — if any are added in the future this function must be
-    updated to use ``copy.deepcopy`` instead.
+    updated to copy them too.
 
     Each returned slot is an independent object: mutating ``recommendation``,
     ``batteries_charged``, ``ev_planned_load_kwh``, or any other scalar field
     on a copy does **not** affect the original or any other copy.
     """
-    return [copy.copy(s) for s in slots]
+    return [s.clone() for s in slots]
 
 
 def _clear_all_charge_discharge(slots: list[PlannedSlot]) -> None:
@@ -0,0 +1,444 @@
+"""Batched plan scoring for the HSEM planner.
+
+:func:`~custom_components.hsem.planner.cost_function.score_plan` used to
+walk one candidate's slots in a Python loop; the selector called it once per
+candidate.  This module scores a whole ``candidates × slots`` batch in one
+call:
+
+- :func:`score_plan_arrays` takes the per-slot prices and flows as 2-D
+  arrays and returns every :class:`PlanCostBreakdown` term as a
+  per-candidate array (:class:`PlanCostArrays`).
+- :func:`score_plans` is the ``PlannedSlot`` boundary: it packs candidate
+  slot lists into those arrays (shorter lists are padded with inactive
+  slots) and calls the kernel.  ``score_plan`` is ``score_plans`` on a
+  single candidate.
+
+The terms and their gating are documented in
+:mod:`~custom_components.hsem.planner.cost_function`.  Each term is formed
+per slot exactly as the scalar expression was and then summed left to right
+(``np.cumsum``), so the result is bit-for-bit the old loop's.  NaN prices
+count as ``0.0``; where the old code used Python ``max`` / ``min`` on a
+value that may still be NaN, the kernel uses the same comparison via
+``np.where``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.models.slot_frame import SlotFrame
+from custom_components.hsem.planner.cost_helpers import (
+    _OVERRIDE_RECOMMENDATIONS,
+    _resolve_cycle_cost,
+    compute_charge_premium_array,
+    deferred_export_price_array,
+)
+from custom_components.hsem.planner.cost_types import CostWeights, PlanCostBreakdown
+from custom_components.hsem.utils.logger import log_planner
+from custom_components.hsem.utils.misc import clamp_efficiency
+from custom_components.hsem.utils.recommendations import Recommendations
+from custom_components.hsem.utils.units import hours_ahead
+
+# Slot fields read by ``score_plans``.
+_SCORE_FIELDS = (
+    "solcast_pv_estimate_kwh",
+    "avg_house_consumption_kwh",
+    "grid_import_kwh",
+    "grid_export_kwh",
+    "batteries_charged_kwh",
+    "batteries_discharged_kwh",
+    "estimated_battery_soc_pct",
+)
+
+# PlanCostBreakdown terms in field order (``total`` mirrors ``score``).
+_TERMS = (
+    "import_cost",
+    "export_revenue",
+    "conversion_loss_cost",
+    "cycle_cost",
+    "soc_penalty",
+    "grid_limit_penalty",
+    "override_penalty",
+    "terminal_soc_value",
+    "total_cost",
+    "score",
+)
+
+
+@dataclass
+class PlanCostArrays:
+    """Per-candidate cost terms from :func:`score_plan_arrays`.
+
+    Every attribute is a ``float64`` array of length *candidates*, rounded
+    to 6 decimals like :class:`PlanCostBreakdown`.  See that class for the
+    meaning of each term.
+    """
+
+    import_cost: np.ndarray
+    export_revenue: np.ndarray
+    conversion_loss_cost: np.ndarray
+    cycle_cost: np.ndarray
+    soc_penalty: np.ndarray
+    grid_limit_penalty: np.ndarray
+    override_penalty: np.ndarray
+    terminal_soc_value: np.ndarray
+    total_cost: np.ndarray
+    score: np.ndarray
+
+    def __len__(self) -> int:
+        """Return the number of candidates."""
+        return len(self.score)
+
+    def breakdown(self, row: int) -> PlanCostBreakdown:
+        """Return candidate *row* as a :class:`PlanCostBreakdown`."""
+        values = {name: float(getattr(self, name)[row]) for name in _TERMS}
+        return PlanCostBreakdown(**values, total=values["score"])
+
+    def breakdowns(self) -> list[PlanCostBreakdown]:
+        """Return one :class:`PlanCostBreakdown` per candidate."""
+        return [self.breakdown(row) for row in range(len(self))]
+
+
+def score_plan_arrays(
+    *,
+    import_price: np.ndarray,
+    export_price: np.ndarray,
+    grid_import_kwh: np.ndarray,
+    grid_export_kwh: np.ndarray,
+    batteries_charged_kwh: np.ndarray,
+    batteries_discharged_kwh: np.ndarray,
+    pv_kwh: np.ndarray,
+    soc_pct: np.ndarray,
+    active: np.ndarray,
+    override: np.ndarray,
+    weights: CostWeights,
+    slot_duration_hours: float = 1.0,
+    grid_limit_kw: float | None = None,
+    discount: np.ndarray | None = None,
+    deferred_export_price: np.ndarray | None = None,
+    replacement_price_per_kwh: float | None = None,
+) -> PlanCostArrays:
+    """Score a ``candidates × slots`` batch of plans.
+
+    The price and flow arguments are ``candidates × slots`` arrays with the
+    meaning of the same-named ``PlannedSlot`` fields (prices may be NaN).
+    ``active`` masks the slots that are scored (past and padding slots are
+    ``False``); ``override`` marks forced-override slots.
+
+    Args:
+        weights: Cost weights (see :class:`CostWeights`).
+        slot_duration_hours: Slot length, for the grid-limit check.
+        grid_limit_kw: Grid limit in kW; ``None`` uses
+            ``weights.grid_limit_kw``.
+        discount: Per-slot time-discount factors; ``None`` scores
+            undiscounted (``score`` is then built from the raw terms).
+        deferred_export_price: Per-slot deferred-export price (NaN where
+            there is none); ``None`` disables the correction.
+        replacement_price_per_kwh: Enables the terminal-SoC term when not
+            ``None`` and non-zero.  Callers pass ``None`` when the initial
+            battery energy is unknown.
+    """
+    imp_raw, exp_raw, gi, ge, chg, dis, pv, soc = (
+        np.atleast_2d(np.asarray(a, dtype=np.float64))
+        for a in (
+            import_price,
+            export_price,
+            grid_import_kwh,
+            grid_export_kwh,
+            batteries_charged_kwh,
+            batteries_discharged_kwh,
+            pv_kwh,
+            soc_pct,
+        )
+    )
+    active = np.atleast_2d(np.asarray(active, dtype=bool))
+    override = np.atleast_2d(np.asarray(override, dtype=bool))
+    disc = None if discount is None else np.atleast_2d(discount)
+    limit_kw = grid_limit_kw if grid_limit_kw is not None else weights.grid_limit_kw
+    cycle_cost_kwh = _resolve_cycle_cost(weights)
+    charge_eff = clamp_efficiency(weights.charge_efficiency_pct)
+    discharge_eff = clamp_efficiency(weights.discharge_efficiency_pct)
+    charge_loss_fraction = 1.0 - charge_eff
+    discharge_loss_fraction = 1.0 - discharge_eff
+    export_floor = weights.battery_export_min_price
+
+    imp = np.where(np.isnan(imp_raw), 0.0, imp_raw)
+    exp = np.where(np.isnan(exp_raw), 0.0, exp_raw)
+    # Sanitised (non-negative) import price — the MILP's p_imp_obj clamp
+    # (issue #655).
+    imp_obj = np.maximum(imp, 0.0)
+    no_pv = pv <= 1e-9
+    exporting = ge > 1e-9
+    # Battery-destined export below battery_export_min_price can never be
+    # realised (issue #752).
+    below_floor = (export_floor > 1e-9) & (exp < export_floor) & no_pv
+
+    # 1. Import cost.
+    import_cost = _terms(active & (gi > 1e-9), gi * imp_obj)
+    # 2. Export revenue.
+    exp_eff = np.where(below_floor & (dis > 1e-9), 0.0, exp)
+    export_revenue = _terms(active & exporting, ge * exp_eff)
+    # 3. Conversion loss: charge side at the import price, discharge side at
+    #    the destination price (issue #641).
+    charge_conv = _terms(
+        active & (chg > 1e-9) & (charge_loss_fraction > 1e-9),
+        chg * charge_loss_fraction * imp_obj,
+    )
+    p_loss = np.where(
+        exporting, np.maximum(np.where(below_floor, 0.0, exp), 0.0), imp_obj
+    )
+    discharge_conv = _terms(
+        active & (dis > 1e-9) & (discharge_loss_fraction > 1e-9),
+        dis * discharge_loss_fraction * p_loss,
+    )
+    # 4. Cycle depreciation.
+    throughput = np.maximum(chg, dis)
+    cycle = _terms(
+        active & (throughput > 1e-9) & (cycle_cost_kwh > 1e-9),
+        throughput * cycle_cost_kwh,
+    )
+    # 5. Quadratic SoC guard.
+    low = soc < weights.min_soc_pct
+    high = ~low & (soc > weights.max_soc_pct)
+    soc_pen = np.where(
+        low,
+        weights.soc_low_penalty_weight * (weights.min_soc_pct - soc) ** 2,
+        weights.soc_high_penalty_weight * (soc - weights.max_soc_pct) ** 2,
+    )
+    soc_pen = _terms(active & (low | high), soc_pen)
+    # 6. Grid limit, import then export.
+    if limit_kw is not None and slot_duration_hours > 1e-9:
+        excess_in = gi / slot_duration_hours - limit_kw
+        excess_out = ge / slot_duration_hours - limit_kw
+        grid_in = _terms(
+            active & (excess_in > 1e-9),
+            excess_in * slot_duration_hours * weights.grid_limit_penalty_per_kwh,
+        )
+        grid_out = _terms(
+            active & (excess_out > 1e-9),
+            excess_out * slot_duration_hours * weights.grid_limit_penalty_per_kwh,
+        )
+    else:
+        grid_in = grid_out = np.zeros_like(gi)
+    # 7. Override.
+    override_w = weights.override_penalty_per_slot
+    override_pen = _terms(
+        active & override & (abs(override_w) > 1e-9),
+        np.full_like(gi, override_w),
+    )
+    # 8. Terminal-SoC opportunity cost (undiscounted; issues #655 / #694 /
+    #    #592).  Python ``max(0.0, x)`` keeps 0.0 for NaN, hence ``where``.
+    terminal = np.zeros_like(gi)
+    if replacement_price_per_kwh is not None and abs(replacement_price_per_kwh) > 1e-9:
+        premium = replacement_price_per_kwh - imp_obj
+        terminal_premium = np.where(premium > 0.0, premium, 0.0)
+        charge_premium = compute_charge_premium_array(
+            replacement_price_per_kwh=replacement_price_per_kwh,
+            imp_price_obj=imp_obj,
+            exp_price=exp_raw,
+            charge_eff=charge_eff,
+            deferred_export_price=(
+                None
+                if deferred_export_price is None
+                else np.atleast_2d(deferred_export_price)
+            ),
+        )
+        terminal = _terms(active, -chg * charge_premium + dis * terminal_premium)
+
+    conversion = _interleave(charge_conv, discharge_conv)
+    grid = _interleave(grid_in, grid_out)
+    sums = {
+        "import_cost": _seq_sum(import_cost),
+        "export_revenue": _seq_sum(export_revenue),
+        "conversion_loss_cost": _seq_sum(conversion),
+        "cycle_cost": _seq_sum(cycle),
+        "soc_penalty": _seq_sum(soc_pen),
+        "grid_limit_penalty": _seq_sum(grid),
+        "override_penalty": _seq_sum(override_pen),
+        "terminal_soc_value": _seq_sum(terminal),
+    }
+    sums["total_cost"] = (
+        sums["import_cost"]
+        - sums["export_revenue"]
+        + sums["conversion_loss_cost"]
+        + sums["cycle_cost"]
+    )
+    if disc is not None:
+        # Discounted selector score; ``total_cost`` stays raw money.
+        sums["score"] = (
+            _seq_sum(import_cost * disc)
+            - _seq_sum(export_revenue * disc)
+            + _seq_sum(conversion * np.repeat(disc, 2, axis=-1))
+            + _seq_sum(cycle * disc)
+            + _seq_sum(soc_pen * disc)
+            + _seq_sum(grid * np.repeat(disc, 2, axis=-1))
+            + sums["override_penalty"]
+            + sums["terminal_soc_value"]
+        )
+    else:
+        sums["score"] = (
+            sums["total_cost"]
+            + sums["soc_penalty"]
+            + sums["grid_limit_penalty"]
+            + sums["override_penalty"]
+            + sums["terminal_soc_value"]
+        )
+    return PlanCostArrays(
+        **{
+            name: np.array([round(v, 6) for v in values.tolist()])
+            for name, values in sums.items()
+        }
+    )
+
+
+def score_plans(
+    candidates: Sequence[Sequence[PlannedSlot]],
+    weights: CostWeights | None = None,
+    *,
+    slot_duration_hours: float = 1.0,
+    grid_limit_kw: float | None = None,
+    now: datetime | None = None,
+    initial_battery_kwh: float | None = None,
+    replacement_price_per_kwh: float | None = None,
+) -> PlanCostArrays:
+    """Score every slot list in *candidates* in one batch.
+
+    Arguments are those of
+    :func:`~custom_components.hsem.planner.cost_function.score_plan`; row
+    *i* of the result is ``score_plan(candidates[i], ...)``.  The slot
+    lists are never mutated.
+    """
+    if weights is None:
+        weights = CostWeights()
+    batch = len(candidates)
+    n = max((len(slots) for slots in candidates), default=0)
+    use_discount = weights.time_discount_rate < 1.0 - 1e-9 and now is not None
+    terminal_price = (
+        replacement_price_per_kwh if initial_battery_kwh is not None else None
+    )
+    use_deferred = (
+        terminal_price is not None
+        and abs(terminal_price) > 1e-9
+        and weights.battery_usable_capacity_kwh > 1e-9
+        and weights.max_charge_per_slot_kwh > 1e-9
+    )
+
+    cols = {name: np.zeros((batch, n)) for name in _SCORE_FIELDS}
+    prices = {name: np.zeros((batch, n)) for name in ("import_price", "export_price")}
+    active = np.zeros((batch, n), dtype=bool)
+    future = np.zeros((batch, n), dtype=bool)
+    override = np.zeros((batch, n), dtype=bool)
+    discount = np.ones((batch, n))
+    # Candidates normally share one time grid: boundaries, the past mask and
+    # the discounts are worked out once per distinct grid.  Past / discount
+    # use the same datetime arithmetic as the MILP objective.
+    grid: tuple[Sequence[PlannedSlot], SlotFrame, np.ndarray, np.ndarray] | None = None
+    for row, slots in enumerate(candidates):
+        k = len(slots)
+        shared = grid if grid is not None and _same_times(grid[0], slots) else None
+        frame = SlotFrame.from_slots(
+            list(slots),
+            fields=_SCORE_FIELDS,
+            grid=shared[1] if shared is not None else None,
+        )
+        if shared is None:
+            grid = shared = (
+                slots,
+                frame,
+                np.array([now is None or s.end > now for s in slots], dtype=bool),
+                _discounts(slots, now, weights.time_discount_rate)
+                if use_discount and now is not None
+                else np.ones(k),
+            )
+        for name in _SCORE_FIELDS:
+            cols[name][row, :k] = frame[name]
+        for name in prices:
+            prices[name][row, :k] = frame[name]
+        recs = frame.recommendation.tolist()
+        override[row, :k] = [r in _OVERRIDE_RECOMMENDATIONS for r in recs]
+        future[row, :k] = shared[2]
+        if now is None:
+            active[row, :k] = [r != Recommendations.TimePassed.value for r in recs]
+        else:
+            active[row, :k] = shared[2]
+        discount[row, :k] = shared[3]
+
+    deferred = None
+    if use_deferred:
+        deferred = deferred_export_price_array(
+            cols["solcast_pv_estimate_kwh"],
+            cols["avg_house_consumption_kwh"],
+            prices["export_price"],
+            future,
+            usable_kwh=weights.battery_usable_capacity_kwh,
+            max_charge_per_slot=weights.max_charge_per_slot_kwh,
+        )
+    result = score_plan_arrays(
+        import_price=prices["import_price"],
+        export_price=prices["export_price"],
+        grid_import_kwh=cols["grid_import_kwh"],
+        grid_export_kwh=cols["grid_export_kwh"],
+        batteries_charged_kwh=cols["batteries_charged_kwh"],
+        batteries_discharged_kwh=cols["batteries_discharged_kwh"],
+        pv_kwh=cols["solcast_pv_estimate_kwh"],
+        soc_pct=cols["estimated_battery_soc_pct"],
+        active=active,
+        override=override,
+        weights=weights,
+        slot_duration_hours=slot_duration_hours,
+        grid_limit_kw=grid_limit_kw,
+        discount=discount if use_discount else None,
+        deferred_export_price=deferred,
+        replacement_price_per_kwh=terminal_price,
+    )
+    log_planner(
+        "debug",
+        "[cost] score_plans  candidates=%d  slots=%d  scores=%s",
+        batch,
+        n,
+        result.score.tolist(),
+    )
+    return result
+
+
+def _discounts(
+    slots: Sequence[PlannedSlot], now: datetime, discount_rate: float
+) -> np.ndarray:
+    """Return ``discount_rate ** hours_ahead(now, slot_mid)`` per slot."""
+    return np.array(
+        [
+            discount_rate ** hours_ahead(now, s.start + (s.end - s.start) / 2)
+            for s in slots
+        ]
+    )
+
+
+def _same_times(a: Sequence[PlannedSlot], b: Sequence[PlannedSlot]) -> bool:
+    """Return True when *a* and *b* have the same slot boundaries."""
+    return len(a) == len(b) and all(
+        x.start == y.start and x.end == y.end for x, y in zip(a, b, strict=True)
+    )
+
+
+def _terms(mask: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Return *values* where *mask* holds and ``0.0`` elsewhere."""
+    return np.where(mask, values, 0.0)
+
+
+def _interleave(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Interleave two per-slot terms so slot order is kept when summing."""
+    batch, n = first.shape
+    return np.stack([first, second], axis=-1).reshape(batch, 2 * n)
+
+
+def _seq_sum(values: np.ndarray) -> np.ndarray:
+    """Sum each row left to right (matches a Python ``+=`` loop exactly)."""
+    if values.shape[-1] == 0:
+        return np.zeros(values.shape[0])
+    total: np.ndarray = np.cumsum(values, axis=-1)[:, -1]
+    return total
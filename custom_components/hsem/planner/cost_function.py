@@ -67,6 +67,9 @@ Design constraints
   read-only scan.
 - **Money / selector split** — ``total_cost`` never includes synthetic
   penalties; ``score`` always does.  The selector minimises ``score``.
+- **Batched** — the terms are computed by
+  :func:`~custom_components.hsem.planner.cost_batch.score_plans` over a
+  ``candidates × slots`` batch; :func:`score_plan` scores a batch of one.
 
 Backward compatibility
 ----------------------
@@ -78,25 +81,16 @@ or ``score`` (selector) explicitly.
 
 from __future__ import annotations
 
-import math
 from collections.abc import Sequence
 from datetime import datetime
 
 from custom_components.hsem.models.planned_slot import PlannedSlot
-from custom_components.hsem.planner.cost_helpers import (
-    _is_override_slot,
-    _resolve_cycle_cost,
-    compute_charge_premium,
-    deferred_export_price_by_slot,
-)
+from custom_components.hsem.planner.cost_batch import score_plans
 from custom_components.hsem.planner.cost_types import (  # noqa: F401
     CostWeights,
     PlanCostBreakdown,
 )
 from custom_components.hsem.utils.logger import log_planner
-from custom_components.hsem.utils.misc import clamp_efficiency
-from custom_components.hsem.utils.recommendations import Recommendations
-from custom_components.hsem.utils.units import hours_ahead
 
 # Re-export CostWeights and PlanCostBreakdown so existing importers don't break.
 __all__ = ["CostWeights", "PlanCostBreakdown", "compare_plans", "score_plan"]
@@ -229,332 +223,15 @@ def score_plan(
         ),
     )
 
-    # Resolve grid limit (keyword arg takes precedence)
-    effective_grid_limit_kw: float | None = (
-        grid_limit_kw if grid_limit_kw is not None else weights.grid_limit_kw
-    )
-
-    cycle_cost_kwh = _resolve_cycle_cost(weights)
-
-    # Deferred-export correction (issue #592): mirror the MILP's objective
-    # so the selector's terminal-SoC charge credit matches what the LP
-    # actually optimised for.  Computed once for the whole slot list.
-    _deferred_prices: list[float | None] | None = None
-    if (
-        replacement_price_per_kwh is not None
-        and abs(replacement_price_per_kwh) > 1e-9
-        and weights.battery_usable_capacity_kwh > 1e-9
-        and weights.max_charge_per_slot_kwh > 1e-9
-    ):
-        _deferred_prices = deferred_export_price_by_slot(
-            slots,
-            usable_kwh=weights.battery_usable_capacity_kwh,
-            max_charge_per_slot=weights.max_charge_per_slot_kwh,
-            now=now,
-        )
-
-    # Resolve the effective roundtrip loss fraction.
-    # When separate charge/discharge efficiencies are provided (both non-default),
-    # we compute the roundtrip loss from them:
-    #   roundtrip_loss = 1 - (charge_eff × discharge_eff)
-    # Compute roundtrip loss from charge/discharge efficiencies.
-    charge_eff = clamp_efficiency(weights.charge_efficiency_pct)
-    discharge_eff = clamp_efficiency(weights.discharge_efficiency_pct)
-
-    import_cost = 0.0
-    export_revenue = 0.0
-    conversion_loss_cost = 0.0
-    cycle_cost_total = 0.0
-    soc_penalty = 0.0
-    grid_limit_penalty = 0.0
-    override_penalty = 0.0
-    terminal_soc_value = 0.0
-
-    # Discounted versions for the selector score (total_cost stays raw).
-    # time_discount_rate < 1.0 means future savings are worth less.
-    discount_rate = weights.time_discount_rate
-    use_discount = discount_rate < 1.0 - 1e-9 and now is not None
-    import_cost_disc = 0.0
-    export_revenue_disc = 0.0
-    conversion_loss_cost_disc = 0.0
-    cycle_cost_total_disc = 0.0
-    soc_penalty_disc = 0.0
-    grid_limit_penalty_disc = 0.0
-
-    _time_passed_value = Recommendations.TimePassed.value
-
-    for slot_idx, slot in enumerate(slots):
-        # Skip past slots entirely.  The SoC simulation zeros
-        # estimated_battery_soc_pct on past slots as a sentinel, which would
-        # falsely trigger the SoC-low penalty on every past slot.
-        # Energy-flow fields (grid_import_kwh, grid_export_kwh, etc.) are
-        # no longer zeroed for past slots (they are preserved for the daily
-        # plan-vs-actual tracker), but skipping past slots here has no
-        # effect on import cost, cycle cost, or any other term since they
-        # belong to a completed time period.
-        #
-        # Primary guard: slot.end <= now (time-based, no string coupling).
-        # Fallback guard: recommendation == TimePassed (used when now is None,
-        # e.g. in unit tests that call score_plan without a clock).
-        if now is not None:
-            if slot.end <= now:
-                continue
-        elif slot.recommendation == _time_passed_value:
-            continue
-
-        # Compute time discount for this slot.
-        # discount = discount_rate ^ hours_from_now
-        # Past slots are already skipped above, so hours_ahead >= 0.
-        if use_discount:
-            assert (
-                now is not None
-            )  # guarded by use_discount = discount_rate < 1.0 and now is not None
-            slot_mid = slot.start + (slot.end - slot.start) / 2
-            hours_ahead_val = hours_ahead(now, slot_mid)
-            discount = discount_rate**hours_ahead_val
-        else:
-            discount = 1.0
-
-        imp_price = slot.price.import_price
-        exp_price = slot.price.export_price
-
-        # Treat NaN prices as zero to avoid propagation
-        if math.isnan(imp_price):
-            imp_price = 0.0
-        if math.isnan(exp_price):
-            exp_price = 0.0
-
-        # Sanitised (non-negative) import price — mirrors milp_optimizer.py's
-        # p_imp_obj clamp.  A negative spot price must never be scored as a
-        # profit for importing or for lossy conversion: the MILP's own
-        # objective never rewards those events (its gi[t]/ec[t]/ed[t]
-        # coefficients use p_imp_obj = max(p_imp, 0)), so the selector must
-        # value the identical physical decisions the same way, or its score
-        # no longer matches what the LP actually optimised for (issue #655).
-        # The raw (possibly negative) imp_price is still used for export
-        # clamping logic elsewhere and is unaffected by this sanitisation.
-        imp_price_obj = max(imp_price, 0.0)
-
-        # 1. Import cost — grid_import_kwh already reflects the extra grid draw
-        #    needed to store energy through the charge efficiency (i.e. the
-        #    simulation writes grid_import_kwh = charge_stored / charge_eff).
-        if slot.grid_import_kwh > 1e-9:
-            cost = slot.grid_import_kwh * imp_price_obj
-            import_cost += cost
-            import_cost_disc += cost * discount
-
-        # 2. Export revenue — PV export is always counted at the live
-        #    export price.  Battery-destined export revenue is zeroed when
-        #    the slot is below the user's ``battery_export_min_price`` floor
-        #    (issue #752): the MILP caps ``ed[t]`` there, so that export can
-        #    never be realised by the battery.  The legacy
-        #    ``export_min_price`` blanket clamp has been removed because the
-        #    applier no longer physically blocks all grid export (issue
-        #    #767); it is now a battery-export floor enforced by the MILP.
-        if slot.grid_export_kwh > 1e-9:
-            effective_exp_price = exp_price
-            if (
-                weights.battery_export_min_price > 1e-9
-                and effective_exp_price < weights.battery_export_min_price
-                and slot.batteries_discharged_kwh > 1e-9
-                and slot.solcast_pv_estimate_kwh <= 1e-9
-            ):
-                effective_exp_price = 0.0
-            rev = slot.grid_export_kwh * effective_exp_price
-            export_revenue += rev
-            export_revenue_disc += rev * discount
-
-        # 3. Conversion loss cost — opportunity cost of energy lost in the
-        #    round-trip.  The loss occurred at purchase time (charge slot) and
-        #    at delivery time (discharge slot).
-        #
-        #    Charge-side loss is priced at the sanitised (non-negative)
-        #    import price of the charge slot — the price of the energy that
-        #    was lost during input (issue #655).
-        #
-        #    Discharge-side loss is priced based on the slot's actual
-        #    resolved energy flow (destination-aware pricing, issue #641):
-        #
-        #    - If the slot is a net EXPORTER (grid_export_kwh > 0): the
-        #      discharge is destined for export, so the lost energy's true
-        #      marginal value is the export price (foregone export revenue).
-        #      Use the sanitised export price (after min-export-price clamp,
-        #      floored at 0).
-        #    - Otherwise (slot is importing or idle): the discharge serves
-        #      house load, so the lost energy's true marginal value is the
-        #      import price (avoided import cost).  Use imp_price_obj.
-        #
-        #    This differs from the LP's pre-solve objective coefficient,
-        #    which uses imp_price_obj unconditionally as a conservative
-        #    approximation (the LP cannot know the destination before
-        #    solving).  The scorer has access to the solved energy flows and
-        #    can make the correct destination-aware valuation.  This is not
-        #    a violation of the LP/cost-function consistency rule — the
-        #    rule requires that the LP's decisions are scoreable
-        #    consistently, not that a necessarily-uninformed pre-solve
-        #    coefficient matches a fully-informed post-solve number.
-        charge_loss_fraction = 1.0 - charge_eff
-        discharge_loss_fraction = 1.0 - discharge_eff
-        if slot.batteries_charged_kwh > 1e-9 and charge_loss_fraction > 1e-9:
-            lost_kwh_charge = slot.batteries_charged_kwh * charge_loss_fraction
-            conv = lost_kwh_charge * imp_price_obj
-            conversion_loss_cost += conv
-            conversion_loss_cost_disc += conv * discount
-        if slot.batteries_discharged_kwh > 1e-9 and discharge_loss_fraction > 1e-9:
-            lost_kwh_discharge = slot.batteries_discharged_kwh * discharge_loss_fraction
-            # Destination-aware discharge loss pricing (issue #641):
-            # net-exporter → price loss at export price; otherwise import price.
-            if slot.grid_export_kwh > 1e-9:
-                p_loss = exp_price
-                # Battery-destined export floored by battery_export_min_price
-                # (issue #752): when the slot's raw export price is below
-                # the user's floor and the discharge is battery-destined (no
-                # PV surplus), that export can never be realised, so the
-                # foregone-export valuation is 0.
-                if (
-                    weights.battery_export_min_price > 1e-9
-                    and p_loss < weights.battery_export_min_price
-                    and slot.solcast_pv_estimate_kwh <= 1e-9
-                ):
-                    p_loss = 0.0
-                p_loss = max(p_loss, 0.0)
-            else:
-                p_loss = imp_price_obj
-            conv = lost_kwh_discharge * p_loss
-            conversion_loss_cost += conv
-            conversion_loss_cost_disc += conv * discount
-
-        # 4. Battery cycle depreciation
-        throughput_kwh = max(slot.batteries_charged_kwh, slot.batteries_discharged_kwh)
-        if throughput_kwh > 1e-9 and cycle_cost_kwh > 1e-9:
-            cycle = throughput_kwh * cycle_cost_kwh
-            cycle_cost_total += cycle
-            cycle_cost_total_disc += cycle * discount
-
-        # 5. SoC guard penalties (quadratic in the violation magnitude).
-        soc = slot.estimated_battery_soc_pct
-        if soc < weights.min_soc_pct:
-            violation = weights.min_soc_pct - soc
-            pen = weights.soc_low_penalty_weight * violation**2
-            soc_penalty += pen
-            soc_penalty_disc += pen * discount
-        elif soc > weights.max_soc_pct:
-            violation = soc - weights.max_soc_pct
-            pen = weights.soc_high_penalty_weight * violation**2
-            soc_penalty += pen
-            soc_penalty_disc += pen * discount
-
-        # 6. Grid limit penalty
-        if effective_grid_limit_kw is not None and slot_duration_hours > 1e-9:
-            import_kw = slot.grid_import_kwh / slot_duration_hours
-            export_kw = slot.grid_export_kwh / slot_duration_hours
-            for kw in (import_kw, export_kw):
-                excess_kw = kw - effective_grid_limit_kw
-                if excess_kw > 1e-9:
-                    pen = (
-                        excess_kw
-                        * slot_duration_hours
-                        * weights.grid_limit_penalty_per_kwh
-                    )
-                    grid_limit_penalty += pen
-                    grid_limit_penalty_disc += pen * discount
-
-        # 7. Override penalty
-        if _is_override_slot(slot) and abs(weights.override_penalty_per_slot) > 1e-9:
-            override_penalty += weights.override_penalty_per_slot
-
-        # 8. Terminal-SoC opportunity cost (selector-only).
-        #
-        # Per-slot incentive capped by the opportunity-cost DIFFERENTIAL
-        # between the replacement price and this slot's own (sanitised)
-        # import price — mirrors milp_optimizer.py's terminal_premium term
-        # exactly, so the selector's score matches what the LP actually
-        # optimised for (issue #655).  When replacement_price <=
-        # imp_price_obj[t], the premium is zero: charging/discharging in
-        # that slot is not discouraged or encouraged by terminal-SoC alone.
-        # Charging (batteries_charged_kwh) earns a credit; discharging
-        # (batteries_discharged_kwh) incurs a penalty.  Undiscounted —
-        # matches milp_optimizer.py's treatment of this term.
-        #
-        # SECOND CAP (issue #694): the terminal premium must never make
-        # battery charging more attractive than grid export.  Mirrors the
-        # identical cap in milp_optimizer.py's _build_objective().
-        #
-        # Gated on initial_battery_kwh as well (even though this per-slot
-        # formula no longer needs its value) to preserve the documented
-        # enablement contract: terminal-SoC accounting requires BOTH
-        # initial_battery_kwh and replacement_price_per_kwh to be provided.
-        if (
-            initial_battery_kwh is not None
-            and replacement_price_per_kwh is not None
-            and abs(replacement_price_per_kwh) > 1e-9
-        ):
-            terminal_premium = max(0.0, replacement_price_per_kwh - imp_price_obj)
-            # Cap the CHARGE credit only: the terminal premium for
-            # charging is reduced by the opportunity cost of not
-            # exporting the same PV surplus (issue #694), and corrected by
-            # the deferred-export spread when a future slot's PV surplus
-            # exceeds the battery's absorption capacity (issue #592).
-            # Mirrors milp/_objective.py exactly.  The discharge penalty
-            # is NOT capped.
-            _charge_premium = compute_charge_premium(
-                replacement_price_per_kwh=replacement_price_per_kwh,
-                imp_price_obj=imp_price_obj,
-                exp_price=slot.price.export_price,
-                charge_eff=charge_eff,
-                deferred_export_price=(
-                    _deferred_prices[slot_idx] if _deferred_prices else None
-                ),
-            )
-            # Charge earns the capped credit; discharge incurs the full penalty
-            terminal_soc_value += (
-                -slot.batteries_charged_kwh * _charge_premium
-                + slot.batteries_discharged_kwh * terminal_premium
-            )
-
-    # ``total_cost`` is money only — never includes synthetic penalties.
-    total_cost = import_cost - export_revenue + conversion_loss_cost + cycle_cost_total
-
-    # ``score`` is the selector objective.  It uses discounted values when
-    # time_discount_rate < 1.0 so that uncertain distant savings are weighted
-    # less than near-term certain savings.  ``total_cost`` is always raw
-    # (undiscounted) so it remains auditable as real money.
-    if use_discount:
-        score = (
-            import_cost_disc
-            - export_revenue_disc
-            + conversion_loss_cost_disc
-            + cycle_cost_total_disc
-            + soc_penalty_disc
-            + grid_limit_penalty_disc
-            + override_penalty
-            + terminal_soc_value
-        )
-    else:
-        score = (
-            total_cost
-            + soc_penalty
-            + grid_limit_penalty
-            + override_penalty
-            + terminal_soc_value
-        )
-
-    score_rounded = round(score, 6)
-
-    result = PlanCostBreakdown(
-        import_cost=round(import_cost, 6),
-        export_revenue=round(export_revenue, 6),
-        conversion_loss_cost=round(conversion_loss_cost, 6),
-        cycle_cost=round(cycle_cost_total, 6),
-        soc_penalty=round(soc_penalty, 6),
-        grid_limit_penalty=round(grid_limit_penalty, 6),
-        override_penalty=round(override_penalty, 6),
-        terminal_soc_value=round(terminal_soc_value, 6),
-        total_cost=round(total_cost, 6),
-        score=score_rounded,
-        # ``total`` is a deprecated alias for ``score`` (issue #413).
-        total=score_rounded,
-    )
+    result = score_plans(
+        [slots],
+        weights,
+        slot_duration_hours=slot_duration_hours,
+        grid_limit_kw=grid_limit_kw,
+        now=now,
+        initial_battery_kwh=initial_battery_kwh,
+        replacement_price_per_kwh=replacement_price_per_kwh,
+    ).breakdown(0)
 
     log_planner(
         "debug",
@@ -6,6 +6,8 @@ import math
 from collections.abc import Sequence
 from datetime import datetime
 
+import numpy as np
+
 from custom_components.hsem.models.planned_slot import PlannedSlot
 from custom_components.hsem.planner.cost_types import CostWeights
 from custom_components.hsem.utils.logger import log_planner
@@ -184,6 +186,36 @@ def compute_charge_premium(
     return max(0.0, premium)
 
 
+def compute_charge_premium_array(
+    *,
+    replacement_price_per_kwh: float,
+    imp_price_obj: np.ndarray,
+    exp_price: np.ndarray,
+    charge_eff: float,
+    deferred_export_price: np.ndarray | None = None,
+) -> np.ndarray:
+    """Array form of :func:`compute_charge_premium` (same formula, per slot).
+
+    ``deferred_export_price`` holds NaN where a slot has no deferred-export
+    price.  Python's ``max`` / ``min`` semantics are kept for NaN export
+    prices (``max(0.0, nan)`` is ``0.0``).
+    """
+    premium = replacement_price_per_kwh - imp_price_obj
+    if charge_eff <= 1e-9:
+        terminal_premium: np.ndarray = np.where(premium > 0.0, premium, 0.0)
+        return terminal_premium
+    premium = premium - exp_price / charge_eff
+    if deferred_export_price is not None:
+        refill = np.where(
+            exp_price < deferred_export_price, exp_price, deferred_export_price
+        )
+        premium = np.where(
+            np.isnan(deferred_export_price), premium, premium + refill / charge_eff
+        )
+    capped: np.ndarray = np.where(premium > 0.0, premium, 0.0)
+    return capped
+
+
 def deferred_export_price_by_slot(
     slots: Sequence[PlannedSlot],
     *,
@@ -238,3 +270,30 @@ def deferred_export_price_by_slot(
             if not math.isnan(p) and (best is None or p < best):
                 best = p
     return result
+
+
+def deferred_export_price_array(
+    pv_kwh: np.ndarray,
+    house_kwh: np.ndarray,
+    export_price: np.ndarray,
+    future: np.ndarray,
+    *,
+    usable_kwh: float,
+    max_charge_per_slot: float,
+) -> np.ndarray:
+    """Array form of :func:`deferred_export_price_by_slot`.
+
+    Inputs are ``candidates × slots`` arrays; ``future`` masks the slots
+    that count (``False`` for past and padding slots).  Returns NaN where
+    the list form returns ``None``.
+    """
+    surplus = np.maximum(pv_kwh - house_kwh, 0.0)
+    absorbable = min(usable_kwh, max_charge_per_slot)
+    qualifies = future & (surplus > absorbable + 1e-9) & ~np.isnan(export_price)
+    prices = np.where(qualifies, export_price, np.inf)
+    # Minimum over strictly later slots: suffix minimum shifted by one.
+    suffix_min = np.minimum.accumulate(prices[..., ::-1], axis=-1)[..., ::-1]
+    later = np.full_like(suffix_min, np.inf)
+    later[..., :-1] = suffix_min[..., 1:]
+    result: np.ndarray = np.where(np.isinf(later), np.nan, later)
+    return result
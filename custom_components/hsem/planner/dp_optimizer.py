@@ -0,0 +1,367 @@
+"""Dynamic-programming battery scheduler (numpy only, no scipy).
+
+:func:`solve_dp` optimises the same objective as :func:`solve_milp` over a
+discretised SoC grid: the battery energy of every slot is one of ``K + 1``
+levels ``step`` kWh apart, aligned so the current energy is a level (an
+idle slot is then exactly zero charge / discharge).  A backward Bellman pass
+computes, for every slot and level, the cheapest cost-to-go; a forward pass
+from the current energy picks, slot by slot, the change with the lowest
+slot cost plus cost-to-go.
+
+Each Bellman update is vectorised over all ``level × next level`` pairs.
+The slot cost only depends on the energy change ``d = next − level``, so it
+is evaluated once per slot for every possible ``d`` and gathered into the
+``(K + 1) × (K + 1)`` matrix through a constant index table.  Three
+off-grid changes per slot are also tried — discharging exactly the house
+load, charging exactly the PV surplus, and the discharge limit — with the
+cost-to-go of the state they reach interpolated between levels.  Without
+them a plan that follows the load is rounded to whole steps.
+
+Slot cost for a change ``d`` (``ec = max(d, 0)``, ``ed = max(−d, 0)``):
+
+- the MILP's per-kWh ``ec`` / ``ed`` / cycle-cost coefficients, taken from
+  :func:`~custom_components.hsem.planner.milp._objective._build_objective`
+  (conversion losses, terminal-SoC premiums, time discount);
+- grid import ``max(net, 0)`` at the sanitised import price, where
+  ``net = base_load + ec/η_chg − ed·η_dis − pv_avail``;
+- export ``max(−net, 0)`` at the export price, capped at the grid export
+  limit and curtailed when the export price is not positive;
+- import above the main-fuse limit at the MILP's fuse penalty.
+
+Changes above the per-slot charge / discharge limits are infeasible, as is
+discharging beyond house load where battery export is blocked (no-export
+mode, battery-export floors, EV-accounted load).  EV loads are taken from
+the slots as fixed inputs; EV co-optimisation needs the MILP.
+
+The result is written with the MILP's write-out helper, so the slots carry
+the same fields as a ``solve_milp`` plan and are pre-populated for
+``simulate_soc``.  Each slot's ``marginal_energy_value`` is minus the slope
+of the cost-to-go at the slot's planned start energy.  The discretisation makes the plan near-optimal rather
+than optimal (within about 1 % of the MILP objective on the benchmark
+fixtures).
+
+Pure Python + numpy, no HA imports — testable with plain pytest.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from custom_components.hsem.models.slot_frame import SlotFrame
+from custom_components.hsem.planner.milp._duals import slot_discounts
+from custom_components.hsem.planner.milp._export_cap import _resolve_export_cap
+from custom_components.hsem.planner.milp._objective import _build_objective
+from custom_components.hsem.planner.milp._price_sanitise import sanitize_prices
+from custom_components.hsem.planner.milp._write_results import (
+    _write_milp_results_to_slots,
+)
+from custom_components.hsem.utils.logger import log_planner
+from custom_components.hsem.utils.misc import clamp_efficiency
+from custom_components.hsem.utils.units import fuse_max_energy_per_slot_kwh
+
+if TYPE_CHECKING:
+    from custom_components.hsem.models.planned_slot import PlannedSlot
+
+# Candidate name, next to ``CANDIDATE_MILP`` in the selector.
+CANDIDATE_DP = "dp"
+
+# Default number of SoC intervals across the usable capacity.  101 levels
+# keep a 96-slot horizon in the tens of milliseconds.
+DEFAULT_SOC_LEVELS = 100
+
+# Energy changes below this are treated as idle (matches ``solve_milp``).
+_MIN_ACTION_KWH = 1e-4
+
+
+def solve_dp(
+    slots: list[PlannedSlot],
+    now: datetime,
+    current_kwh: float,
+    usable_kwh: float,
+    max_charge_per_slot: float,
+    max_discharge_per_slot: float | None,
+    cycle_cost_per_kwh: float = 0.0,
+    charge_efficiency_pct: float = 97.0,
+    discharge_efficiency_pct: float = 97.0,
+    time_discount_rate: float = 1.0,
+    replacement_price_per_kwh: float | None = None,
+    *,
+    min_export_price: float = 0.0,
+    no_export: bool = False,
+    main_fuse_amps: float | None = None,
+    main_fuse_phases: int = 3,
+    max_grid_export_power_kw: float | None = None,
+    battery_export_min_price: float = 0.0,
+    soc_levels: int = DEFAULT_SOC_LEVELS,
+    slot_weights: list[float] | None = None,
+) -> tuple[list[PlannedSlot], dict] | None:
+    """Return a deep-copy slot list with DP-optimised recommendations.
+
+    Arguments mean the same as for :func:`solve_milp`; *soc_levels* is the
+    number of SoC intervals across *usable_kwh*.  *slot_weights* (merged
+    blocks, see ``horizon_compression``) should be whole numbers so that
+    full-power charging stays on the SoC grid.
+
+    Returns:
+        ``(slots, diagnostics)`` like :func:`solve_milp`, or ``None`` when
+        there is no battery capacity or no future slot.  ``diagnostics``
+        holds ``engine``, ``soc_levels``, ``soc_step_kwh``, ``objective``,
+        ``has_violations`` and ``total_violation_kwh``.
+    """
+    if usable_kwh <= 0 or max_charge_per_slot <= 0 or not slots:
+        log_planner(
+            "debug",
+            "[dp] Skipping — usable_kwh=%.3f max_charge_per_slot=%.3f",
+            usable_kwh,
+            max_charge_per_slot,
+        )
+        return None
+
+    frame = SlotFrame.from_slots(slots)
+    future_idx = np.flatnonzero(frame.future_mask(now)).tolist()
+    if not future_idx:
+        return None
+    m = len(future_idx)
+    future = frame.take(future_idx)
+
+    p_imp = future["import_price"]
+    p_imp_obj, p_exp, battery_export_blocked = sanitize_prices(
+        p_imp,
+        future["export_price"],
+        min_export_price=min_export_price,
+        battery_export_min_price=battery_export_min_price,
+    )
+    net_load = future.net_load_kwh
+    pv_avail = np.maximum(-net_load, 0.0)
+    base_load = np.maximum(net_load, 0.0)
+    ev_accounted = future["ev_accounted_load_kwh"]
+
+    charge_eff = clamp_efficiency(charge_efficiency_pct)
+    discharge_eff = clamp_efficiency(discharge_efficiency_pct)
+    w = (
+        np.ones(m)
+        if slot_weights is None
+        else np.asarray(slot_weights, dtype=float)[future_idx]
+    )
+    ec_ub = max_charge_per_slot * w
+
+    # Per-kWh coefficients from the MILP objective (no EVs, no fuse block).
+    c_obj = _build_objective(
+        slots,
+        future_idx,
+        now,
+        m,
+        9 * m,
+        0,
+        m,
+        2 * m,
+        3 * m,
+        5 * m,
+        6 * m,
+        7 * m,
+        0,
+        [],
+        [],
+        [],
+        p_imp,
+        p_imp_obj,
+        p_exp,
+        0.0,
+        cycle_cost_per_kwh,
+        1.0 - charge_eff,
+        1.0 - discharge_eff,
+        time_discount_rate,
+        replacement_price_per_kwh,
+        False,
+        usable_kwh=usable_kwh,
+        max_charge_per_slot=max_charge_per_slot,
+        current_kwh=current_kwh,
+        pv_avail=pv_avail,
+        base_load=base_load,
+        slot_weights=w,
+    )
+    c_ec, c_ed = c_obj[0:m], c_obj[m : 2 * m]
+    c_gi, c_ge = c_obj[2 * m : 3 * m], c_obj[3 * m : 4 * m]
+    c_cycle = c_obj[5 * m : 6 * m]
+
+    # Per-slot limits, mirroring ``_build_constraints``.
+    max_dis = (
+        max_discharge_per_slot if max_discharge_per_slot is not None else usable_kwh
+    )
+    ed_ub = float(max_dis) * w
+    house_cap = base_load / discharge_eff
+    ev_guard = ev_accounted > 1e-9
+    house_cap[ev_guard] = (
+        np.maximum(base_load[ev_guard] - ev_accounted[ev_guard], 0.0) / discharge_eff
+    )
+    capped = ev_guard | battery_export_blocked
+    if no_export:
+        capped[:] = True
+    ed_ub[capped] = np.minimum(house_cap[capped], ed_ub[capped])
+
+    # Both caps are resolved for the first slot and scale with the weights.
+    export_cap_active, export_cap_kwh = _resolve_export_cap(
+        max_grid_export_power_kw, slots, future_idx
+    )
+    export_cap_kwh = export_cap_kwh * w / w[0]
+    fuse_kwh = np.full(m, math.inf)
+    if main_fuse_amps is not None and main_fuse_amps > 1e-9:
+        first = slots[future_idx[0]]
+        fuse_kwh = (
+            fuse_max_energy_per_slot_kwh(
+                main_fuse_amps,
+                main_fuse_phases,
+                (first.end - first.start).total_seconds() / 3600.0,
+            )
+            * w
+            / w[0]
+        )
+    p_fuse = max(float(np.max(p_imp)), 0.1) * 100.0
+
+    def move_cost(moves: np.ndarray) -> np.ndarray:
+        """Return the slot cost of each energy change in *moves* (m × A)."""
+        ec = np.maximum(moves, 0.0)
+        ed = np.maximum(-moves, 0.0)
+        net = base_load[:, None] + ec / charge_eff - ed * discharge_eff
+        net -= pv_avail[:, None]
+        grid_import = np.maximum(net, 0.0)
+        grid_export = np.maximum(-net, 0.0)
+        if export_cap_active:
+            grid_export = np.minimum(grid_export, export_cap_kwh[:, None])
+        grid_export = np.where(c_ge[:, None] < 0.0, grid_export, 0.0)
+        over_fuse = grid_import - np.maximum(fuse_kwh, base_load)[:, None]
+        cost = (
+            c_ec[:, None] * ec
+            + c_ed[:, None] * ed
+            + c_cycle[:, None] * (ec + ed)
+            + c_gi[:, None] * grid_import
+            + c_ge[:, None] * grid_export
+            + p_fuse * np.maximum(over_fuse, 0.0)
+        )
+        feasible = (ec <= ec_ub[:, None] + 1e-9) & (ed <= ed_ub[:, None] + 1e-9)
+        return np.where(feasible, cost, np.inf)
+
+    # SoC grid aligned on the current energy: level k is start + (k − k0)·step.
+    # The charge limit is a whole number of steps, so full-power charging
+    # stays on the grid.
+    start_kwh = min(max(current_kwh, 0.0), usable_kwh)
+    step = usable_kwh / max(int(soc_levels), 1)
+    step = max_charge_per_slot / math.ceil(max_charge_per_slot / step - 1e-9)
+    k0 = int(math.floor(start_kwh / step + 1e-9))
+    k_max = k0 + int(math.floor((usable_kwh - start_kwh) / step + 1e-9))
+    levels = np.arange(k_max + 1)
+    energy = start_kwh + (levels - k0) * step
+    # gather[i, j] indexes the grid moves for a change from level i to j.
+    gather = levels[None, :] - levels[:, None] + k_max
+    grid_moves = np.arange(-k_max, k_max + 1) * step
+    grid_cost = move_cost(np.broadcast_to(grid_moves, (m, grid_moves.size)))
+    # Off-grid moves that follow the house exactly: discharge to cover the
+    # load, charge to absorb the PV surplus, and the discharge limit.  Their
+    # successor states are valued by linear interpolation.
+    exact_moves = np.stack(
+        [
+            -np.minimum(base_load / discharge_eff, ed_ub),
+            np.minimum(pv_avail * charge_eff, ec_ub),
+            -ed_ub,
+        ],
+        axis=1,
+    )
+    exact_cost = move_cost(exact_moves)
+
+    # Backward pass: value[t][k] is the cheapest cost from slot t onwards
+    # when slot t starts at level k.
+    value = np.zeros((m + 1, levels.size))
+    for t in range(m - 1, -1, -1):
+        q_grid = grid_cost[t][gather] + value[t + 1][None, :]
+        after = energy[:, None] + exact_moves[t][None, :]
+        q_exact = exact_cost[t][None, :] + np.interp(after, energy, value[t + 1])
+        q_exact[(after < -1e-9) | (after > usable_kwh + 1e-9)] = np.inf
+        value[t] = np.minimum(q_grid.min(axis=1), q_exact.min(axis=1))
+
+    # Forward pass from the exact current energy, one step of look-ahead
+    # on the value function.
+    moves = np.zeros(m)
+    starts = np.zeros(m)
+    objective = 0.0
+    soc = start_kwh
+    for t in range(m):
+        starts[t] = soc
+        options = np.concatenate([grid_moves, exact_moves[t]])
+        after = soc + options
+        cost = np.concatenate([grid_cost[t], exact_cost[t]])
+        q = cost + np.interp(after, energy, value[t + 1])
+        q[(after < -1e-9) | (after > usable_kwh + 1e-9)] = np.inf
+        best = int(np.argmin(q))
+        moves[t] = options[best]
+        objective += float(cost[best])
+        soc = min(max(after[best], 0.0), usable_kwh)
+    ec_sol = np.where(moves > _MIN_ACTION_KWH, moves, 0.0)
+    ed_sol = np.where(moves < -_MIN_ACTION_KWH, -moves, 0.0)
+
+    flow = base_load + ec_sol / charge_eff - ed_sol * discharge_eff - pv_avail
+    ge_sol = np.maximum(-flow, 0.0)
+    if export_cap_active:
+        ge_sol = np.minimum(ge_sol, export_cap_kwh)
+    ge_sol = np.where(c_ge < 0.0, ge_sol, 0.0)
+    curt_sol = np.maximum(-flow, 0.0) - ge_sol
+
+    out_slots = _write_milp_results_to_slots(
+        slots,
+        future_idx,
+        now,
+        ec_sol,
+        ed_sol,
+        ge_sol,
+        m,
+        0,
+        [],
+        [],
+        pv_avail,
+        base_load,
+        charge_eff,
+        discharge_eff,
+        p_exp,
+        min_export_price,
+        False,
+        set(),
+        start_kwh,
+        usable_kwh,
+        curt_sol,
+        _min_action_kwh=_MIN_ACTION_KWH,
+    )
+    # Marginal value of stored energy: minus the slope of the cost-to-go at
+    # the planned start energy of each slot (the LP dual's counterpart).
+    if levels.size > 1:
+        slope = np.gradient(value[:m], energy, axis=1)
+        marginal = -np.array(
+            [np.interp(starts[t], energy, slope[t]) for t in range(m)]
+        ) / slot_discounts(slots, future_idx, now, time_discount_rate)
+        for lp_t, slot_i in enumerate(future_idx):
+            out_slots[slot_i].marginal_energy_value = (
+                round(float(marginal[lp_t]), 4) + 0.0
+            )
+
+    diagnostics: dict[str, Any] = {
+        "engine": CANDIDATE_DP,
+        "soc_levels": int(levels.size),
+        "soc_step_kwh": round(step, 4),
+        "objective": round(objective, 4),
+        "has_violations": False,
+        "total_violation_kwh": 0.0,
+    }
+    log_planner(
+        "debug",
+        "[dp] solved  slots=%d  levels=%d  step=%.3f kWh  objective=%.4f  "
+        "charged=%.3f  discharged=%.3f",
+        m,
+        levels.size,
+        step,
+        objective,
+        float(np.sum(ec_sol)),
+        float(np.sum(ed_sol)),
+    )
+    return out_slots, diagnostics
@@ -38,6 +38,7 @@ from custom_components.hsem.planner.discharge_scheduler import (
 from custom_components.hsem.planner.engine_ev import (
     _build_and_inject_for_ev,
     _compute_ev_charger_power,
+    _reapply_ev_min_power,
 )
 from custom_components.hsem.planner.engine_ev_milp import (
     _build_ev_configs_for_milp,
@@ -47,23 +48,27 @@ from custom_components.hsem.planner.engine_explanation import (
     _derive_windows,
 )
 from custom_components.hsem.planner.engine_population import (
-    _inject_live_data_into_current_slot,
+    PopulationCache,
     _parse_now,
-    _populate_slots,
+    populate_horizon,
 )
 from custom_components.hsem.planner.ev_planner import (
     EVChargingPlan,
     rebuild_ev_plan_from_slots,
 )
 from custom_components.hsem.planner.slot_population import (
-    build_slots,
-    build_time_series_index,
     mark_time_passed,
     populate_battery_capacity,
     populate_estimated_cost,
     populate_net_consumption,
     usable_capacity,
 )
+from custom_components.hsem.planner.stage_timer import (
+    _NULL_TIMER,
+    StageTimer,
+    _NullStageTimer,
+    stage_timer,
+)
 from custom_components.hsem.utils.datetime_utils import as_tz
 from custom_components.hsem.utils.logger import log_planner
 from custom_components.hsem.utils.misc import (
@@ -74,7 +79,6 @@ from custom_components.hsem.utils.misc import (
 from custom_components.hsem.utils.recommendations import Recommendations
 from custom_components.hsem.utils.units import (
     fuse_max_energy_per_slot_kwh,
-    hours_ahead,
     max_energy_per_slot_kwh,
     roundtrip_loss_pct,
 )
@@ -223,6 +227,7 @@ def _select_candidate(
     sdh: float,
     rc: float,
     ev_configs: list[EVConfig] | None = None,
+    timer: StageTimer | _NullStageTimer = _NULL_TIMER,
 ) -> tuple:
     """Generate and select best candidate plan."""
     candidates = generate_candidates(
@@ -236,6 +241,10 @@ def _select_candidate(
         replacement_price_per_kwh=rppk,
         ev_configs=ev_configs,
     )
+    timer.mark("candidates")
+    for c in candidates:
+        if c.name == CANDIDATE_MILP:
+            timer.record_lp(c.diagnostics)
     winner, rejected, hyst = select_best_candidate(
         candidates,
         now=now,
@@ -260,6 +269,7 @@ def _select_candidate(
         previous_winner_name=inp.previous_winner_name,
         previous_winner_score=inp.previous_winner_score,
     )
+    timer.mark("selection")
     log_planner(
         "debug",
         "[core] _select_candidate DONE  candidates=%d  winner=%s  rejected=%d  hyst=%s",
@@ -271,8 +281,15 @@ def _select_candidate(
     return candidates, winner, rejected, hyst
 
 
-def run_planner(inp: PlannerInput) -> PlannerOutput:
-    """Execute the HSEM planner and return a :class:`PlannerOutput`."""
+def run_planner(
+    inp: PlannerInput, *, population: PopulationCache | None = None
+) -> PlannerOutput:
+    """Execute the HSEM planner and return a :class:`PlannerOutput`.
+
+    *population* memoises steps 1/1b across a batch of runs that share
+    their time-series inputs (see :class:`PopulationCache`).
+    """
+    timer = stage_timer(inp.planner_profiling_enabled)
     warnings: list[str] = []
     missing_inputs: list[str] = []
     now = _parse_now(inp.now_iso)
@@ -316,8 +333,14 @@ def run_planner(inp: PlannerInput) -> PlannerOutput:
         warnings.append(
             f"Consumption weights sum to {ws}, not 100. Results may not be meaningful."
         )
-    tsi = build_time_series_index(inp, now)
-    slots = build_slots(inp, now)
+    # Step 1 — populate time-series data; 1b — inject live solar and
+    # consumption into the current slot
+    if population is not None:
+        tsi, slots, data_quality = population.populate(
+            inp, now, warnings, missing_inputs
+        )
+    else:
+        tsi, slots, data_quality = populate_horizon(inp, now, warnings, missing_inputs)
     if not slots:
         log_planner(
             "warning",
@@ -327,10 +350,6 @@ def run_planner(inp: PlannerInput) -> PlannerOutput:
             "No slots generated; check interval_minutes and interval_length_hours."
         )
         return PlannerOutput(missing_inputs=missing_inputs, warnings=warnings)
-    # Step 1 — populate time-series data
-    data_quality, warnings, missing_inputs = _populate_slots(
-        slots, inp, tsi, warnings, missing_inputs
-    )
     log_planner(
         "debug",
         "[core] run_planner  step=1_populate_slots COMPLETE  "
@@ -341,8 +360,7 @@ def run_planner(inp: PlannerInput) -> PlannerOutput:
         len(warnings),
         len(missing_inputs),
     )
-    # Step 1b — inject live solar and consumption into the current slot
-    _inject_live_data_into_current_slot(slots, inp, now)
+    timer.mark("populate")
 
     # Step 2 — EV planned load injection
     ev_cp: EVChargingPlan | None = None
@@ -417,6 +435,7 @@ def run_planner(inp: PlannerInput) -> PlannerOutput:
     _compute_ev_charger_power(slots, ss, ev2_cp, inp.interval_minutes, now, second=True)
     populate_net_consumption(slots)
     populate_estimated_cost(slots, export_min_price=inp.export_min_price)
+    timer.mark("ev_injection")
     rt = calculate_recommended_threshold(
         purchase_price=inp.battery_purchase_price,
         expected_cycles=inp.battery_expected_cycles,
@@ -459,6 +478,7 @@ def run_planner(inp: PlannerInput) -> PlannerOutput:
         effective_cycle_cost,
         warnings,
     )
+    timer.mark("schedule")
     log_planner(
         "debug",
         "[core] run_planner  step=3_schedule_slots COMPLETE",
@@ -514,6 +534,7 @@ def run_planner(inp: PlannerInput) -> PlannerOutput:
         sdh,
         rc,
         ev_configs=ev_configs,
+        timer=timer,
     )
     # Surface MILP penalty violations in warnings if the winner used penalties
     if (
@@ -606,99 +627,7 @@ def run_planner(inp: PlannerInput) -> PlannerOutput:
                 )
 
     # Re-apply per-EV minimum-power floor after MILP and fuse throttling.
-    #
-    # Both _compute_ev_charger_power() (for non-MILP candidates) and the
-    # MILP's own EV power computation already set ev_charger_calculated_power
-    # and ev_second_charger_calculated_power correctly per-EV, and the
-    # main-fuse throttling block above correctly adjusts them per-field.
-    #
-    # This block checks whether any power field fell below its OWN charger's
-    # minimum operating power due to fuse throttling, and zeroes it if so.
-    # The energy contribution is reverse-engineered from the power field and
-    # subtracted from the combined slot energy totals so net consumption and
-    # cost remain consistent.
-    #
-    # IMPORTANT: This block MUST NOT recompute per-EV power from the combined
-    # ev_planned_load_kwh / ev_accounted_load_kwh totals.  Those fields are
-    # the SUM across both EVs; deriving a per-EV power from them would
-    # corrupt the per-EV output field with the combined total.
-    _slot_hours = inp.interval_minutes / 60.0
-    _ev_power_checks: list[tuple[str, float, bool]] = []
-    if inp.ev_planned_load_enabled:
-        _ev_power_checks.append(
-            (
-                "ev_charger_calculated_power",
-                inp.ev_planned_load_charger_min_power_w,
-                inp.ev_planned_load_base_load_includes_ev,
-            )
-        )
-    if inp.ev_second_planned_load_enabled:
-        _ev_power_checks.append(
-            (
-                "ev_second_charger_calculated_power",
-                inp.ev_second_planned_load_charger_min_power_w,
-                inp.ev_second_planned_load_base_load_includes_ev,
-            )
-        )
-
-    for s in slots:
-        for attr, min_pwr_w, base_includes in _ev_power_checks:
-            ev_w = round(getattr(s, attr))
-            if ev_w <= 0:
-                continue
-            if min_pwr_w > 1e-9 and ev_w < min_pwr_w:
-                # Below this EV's own minimum — charger won't start.
-                # Reverse-engineer the energy contribution from the
-                # power field to subtract from combined slot totals.
-                s_end_tz = as_tz(s.end, now.tzinfo)
-                if as_tz(s.start, now.tzinfo) <= now < s_end_tz:
-                    remaining_h = max(
-                        hours_ahead(now, s_end_tz),
-                        1.0 / 3600.0,
-                    )
-                    ev_energy = round((ev_w / 1000.0) * remaining_h, 3)
-                else:
-                    ev_energy = round((ev_w / 1000.0) * _slot_hours, 3)
-
-                log_planner(
-                    "debug",
-                    "[core] EV power below %s minimum (%d < %d), "
-                    "zeroing field and subtracting %.3f kWh",
-                    attr,
-                    ev_w,
-                    min_pwr_w,
-                    ev_energy,
-                )
-
-                # Zero this EV's power field only (not the other EV's).
-                setattr(s, attr, 0)
-
-                # Remove this EV's energy contribution from the combined
-                # slot energy fields.  The energy bucket depends on whether
-                # base load already includes EV consumption.
-                if base_includes:
-                    s.ev_accounted_load_kwh = round(
-                        max(0.0, s.ev_accounted_load_kwh - ev_energy), 3
-                    )
-                else:
-                    s.ev_planned_load_kwh = round(
-                        max(0.0, s.ev_planned_load_kwh - ev_energy), 3
-                    )
-                s.ev_total_planned_load_kwh = round(
-                    s.ev_planned_load_kwh + s.ev_accounted_load_kwh, 3
-                )
-
-                # Recompute net consumption and cost with the reduced EV load.
-                s.estimated_net_consumption_kwh = (
-                    s.avg_house_consumption_kwh
-                    + s.ev_planned_load_kwh
-                    - s.solcast_pv_estimate_kwh
-                )
-                net = s.estimated_net_consumption_kwh
-                if net > 0:
-                    s.estimated_cost_currency = round(net * s.price.import_price, 4)
-                else:
-                    s.estimated_cost_currency = round(net * s.price.export_price, 4)
+    _reapply_ev_min_power(slots, inp, now)
 
     # Spec (planner-spec.md, Layer 2): slots with ev_total_planned_load_kwh > 0
     # are relabelled ev_smart_charging UNLESS the recommendation is one of the
@@ -779,6 +708,7 @@ def run_planner(inp: PlannerInput) -> PlannerOutput:
                 is_second=True,
             )
 
+    timer.mark("finalize")
     return PlannerOutput(
         slots=slots,
         charge_windows=cw_out,
@@ -796,4 +726,5 @@ def run_planner(inp: PlannerInput) -> PlannerOutput:
         winner_name=winner.name,
         ev_charging_plan=ev_cp,
         ev_second_charging_plan=ev2_cp,
+        profile=timer.profile(),
     )
@@ -4,13 +4,16 @@ from __future__ import annotations
 
 from datetime import datetime
 
+from custom_components.hsem.models.planner_input import PlannerInput
 from custom_components.hsem.planner.ev_planner import (
     EVChargingPlan,
     EVPlannerInput,
     apply_ev_planned_load_to_slots,
     build_ev_charging_plan,
 )
+from custom_components.hsem.utils.datetime_utils import as_tz
 from custom_components.hsem.utils.logger import log_planner
+from custom_components.hsem.utils.units import hours_ahead
 
 
 def _compute_ev_charger_power(
@@ -194,3 +197,101 @@ def _build_and_inject_for_ev(
         plan.total_kwh_needed,
     )
     return plan
+
+
+def _reapply_ev_min_power(slots: list, inp: PlannerInput, now: datetime) -> None:
+    """Re-apply the per-EV minimum-power floor after MILP and fuse throttling.
+
+    Both :func:`_compute_ev_charger_power` (for non-MILP candidates) and the
+    MILP's own EV power computation already set ``ev_charger_calculated_power``
+    and ``ev_second_charger_calculated_power`` correctly per-EV, and the
+    main-fuse throttling in :func:`run_planner` adjusts them per-field.
+
+    This checks whether any power field fell below its OWN charger's minimum
+    operating power due to fuse throttling, and zeroes it if so.  The energy
+    contribution is reverse-engineered from the power field and subtracted
+    from the combined slot energy totals so net consumption and cost remain
+    consistent.
+
+    IMPORTANT: this MUST NOT recompute per-EV power from the combined
+    ``ev_planned_load_kwh`` / ``ev_accounted_load_kwh`` totals.  Those fields
+    are the SUM across both EVs; deriving a per-EV power from them would
+    corrupt the per-EV output field with the combined total.
+    """
+    _slot_hours = inp.interval_minutes / 60.0
+    _ev_power_checks: list[tuple[str, float, bool]] = []
+    if inp.ev_planned_load_enabled:
+        _ev_power_checks.append(
+            (
+                "ev_charger_calculated_power",
+                inp.ev_planned_load_charger_min_power_w,
+                inp.ev_planned_load_base_load_includes_ev,
+            )
+        )
+    if inp.ev_second_planned_load_enabled:
+        _ev_power_checks.append(
+            (
+                "ev_second_charger_calculated_power",
+                inp.ev_second_planned_load_charger_min_power_w,
+                inp.ev_second_planned_load_base_load_includes_ev,
+            )
+        )
+
+    for s in slots:
+        for attr, min_pwr_w, base_includes in _ev_power_checks:
+            ev_w = round(getattr(s, attr))
+            if ev_w <= 0:
+                continue
+            if min_pwr_w > 1e-9 and ev_w < min_pwr_w:
+                # Below this EV's own minimum — charger won't start.
+                # Reverse-engineer the energy contribution from the
+                # power field to subtract from combined slot totals.
+                s_end_tz = as_tz(s.end, now.tzinfo)
+                if as_tz(s.start, now.tzinfo) <= now < s_end_tz:
+                    remaining_h = max(
+                        hours_ahead(now, s_end_tz),
+                        1.0 / 3600.0,
+                    )
+                    ev_energy = round((ev_w / 1000.0) * remaining_h, 3)
+                else:
+                    ev_energy = round((ev_w / 1000.0) * _slot_hours, 3)
+
+                log_planner(
+                    "debug",
+                    "[core] EV power below %s minimum (%d < %d), "
+                    "zeroing field and subtracting %.3f kWh",
+                    attr,
+                    ev_w,
+                    min_pwr_w,
+                    ev_energy,
+                )
+
+                # Zero this EV's power field only (not the other EV's).
+                setattr(s, attr, 0)
+
+                # Remove this EV's energy contribution from the combined
+                # slot energy fields.  The energy bucket depends on whether
+                # base load already includes EV consumption.
+                if base_includes:
+                    s.ev_accounted_load_kwh = round(
+                        max(0.0, s.ev_accounted_load_kwh - ev_energy), 3
+                    )
+                else:
+                    s.ev_planned_load_kwh = round(
+                        max(0.0, s.ev_planned_load_kwh - ev_energy), 3
+                    )
+                s.ev_total_planned_load_kwh = round(
+                    s.ev_planned_load_kwh + s.ev_accounted_load_kwh, 3
+                )
+
+                # Recompute net consumption and cost with the reduced EV load.
+                s.estimated_net_consumption_kwh = (
+                    s.avg_house_consumption_kwh
+                    + s.ev_planned_load_kwh
+                    - s.solcast_pv_estimate_kwh
+                )
+                net = s.estimated_net_consumption_kwh
+                if net > 0:
+                    s.estimated_cost_currency = round(net * s.price.import_price, 4)
+                else:
+                    s.estimated_cost_currency = round(net * s.price.export_price, 4)
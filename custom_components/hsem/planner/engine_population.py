@@ -1,13 +1,25 @@
-"""Slot population and live-data injection for the HSEM planner."""
+"""Slot population and live-data injection for the HSEM planner.
+
+:class:`PopulationCache` memoises the populated horizon for callers that
+plan many variants of one input (the ``simulate`` service): every variant
+that shares the prices, forecasts, consumption averages and live readings
+starts from a clone of the same populated slots.
+"""
 
 from __future__ import annotations
 
+import threading
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Any
 
 from custom_components.hsem.models.data_quality import DataQuality
+from custom_components.hsem.models.planned_slot import PlannedSlot
 from custom_components.hsem.models.planner_input import PlannerInput
 from custom_components.hsem.models.time_series import TimeSeriesIndex
 from custom_components.hsem.planner.slot_population import (
+    build_slots,
+    build_time_series_index,
     populate_consumption,
     populate_prices,
     populate_solcast,
@@ -243,3 +255,104 @@ def _inject_live_data_into_current_slot(
             # inflated by unmeasured EV load when no EV power sensor is
             # configured, so the historical windows are the only clean source.
             break
+
+
+def populate_horizon(
+    inp: PlannerInput,
+    now: datetime,
+    warnings: list[str],
+    missing_inputs: list[str],
+) -> tuple[TimeSeriesIndex, list[PlannedSlot], DataQuality]:
+    """Build and populate the planning horizon (planner steps 1 and 1b).
+
+    Returns the time-series index, the populated slots with live data
+    injected into the current slot, and the data-quality report.  The slot
+    list is empty (and nothing is populated) when the horizon has no slots.
+    """
+    tsi = build_time_series_index(inp, now)
+    slots = build_slots(inp, now)
+    if not slots:
+        return tsi, slots, DataQuality()
+    data_quality, _, _ = _populate_slots(slots, inp, tsi, warnings, missing_inputs)
+    _inject_live_data_into_current_slot(slots, inp, now)
+    return tsi, slots, data_quality
+
+
+# Inputs read by ``populate_horizon``: compared by value ...
+_POPULATION_VALUE_FIELDS = (
+    "now_iso",
+    "interval_minutes",
+    "interval_length_hours",
+    "weight_1d",
+    "weight_3d",
+    "weight_7d",
+    "weight_14d",
+    "live_solar_production_w",
+    "live_house_consumption_w",
+    "house_power_includes_ev",
+    "ev_session_charge_kw",
+    "ev_second_session_charge_kw",
+)
+# ... and by identity (``dataclasses.replace`` shares them between variants).
+_POPULATION_SOURCE_FIELDS = (
+    "price_points",
+    "solcast_slots",
+    "consumption_averages",
+    "solar_corrector",
+)
+
+
+@dataclass
+class _PopulatedHorizon:
+    sources: tuple[Any, ...]
+    tsi: TimeSeriesIndex
+    slots: list[PlannedSlot]
+    data_quality: DataQuality
+    warnings: list[str]
+    missing_inputs: list[str]
+
+
+class PopulationCache:
+    """Thread-safe memo of :func:`populate_horizon` results.
+
+    Pass one instance to every :func:`~custom_components.hsem.planner.engine_core.run_planner`
+    call of a batch.  Each call receives fresh slot clones; the time-series
+    index and data-quality report are shared read-only.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[Any, ...], _PopulatedHorizon] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def populate(
+        self,
+        inp: PlannerInput,
+        now: datetime,
+        warnings: list[str],
+        missing_inputs: list[str],
+    ) -> tuple[TimeSeriesIndex, list[PlannedSlot], DataQuality]:
+        """Return :func:`populate_horizon` for *inp*, populating at most once."""
+        key = tuple(getattr(inp, name) for name in _POPULATION_VALUE_FIELDS)
+        sources = tuple(getattr(inp, name) for name in _POPULATION_SOURCE_FIELDS)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or any(
+                a is not b for a, b in zip(entry.sources, sources, strict=True)
+            ):
+                own_warnings: list[str] = []
+                own_missing: list[str] = []
+                tsi, slots, data_quality = populate_horizon(
+                    inp, now, own_warnings, own_missing
+                )
+                entry = _PopulatedHorizon(
+                    sources, tsi, slots, data_quality, own_warnings, own_missing
+                )
+                self._entries[key] = entry
+                self.misses += 1
+            else:
+                self.hits += 1
+        warnings.extend(entry.warnings)
+        missing_inputs.extend(entry.missing_inputs)
+        return entry.tsi, [s.clone() for s in entry.slots], entry.data_quality
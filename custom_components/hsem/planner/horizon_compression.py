@@ -0,0 +1,408 @@
+"""Variable-resolution planning horizon for the MILP solve.
+
+``build_slots`` produces uniform slots for the whole horizon, so a
+15-minute configuration hands the LP 192 slots even for tomorrow evening,
+where only hourly prices exist.  This stage keeps the near-term slots at
+full resolution and merges the distant ones into clock-aligned blocks
+(hourly by default) before the solve:
+
+.. code-block:: text
+
+    now ──── full resolution (default 6 h) ────┬── 60-min blocks ──────▶
+    │15│15│15│15│15│15│ … │15│15│15│15│15│15│  │   60   │   60   │ …
+
+A merged block sums its sub-slots' consumption, PV and EV loads and
+averages their prices.  ``solve_milp`` receives a per-slot weight (the
+block length in base slots) so every power limit scales with the block.
+The solution is then expanded back onto the original slots:
+
+- **Charge** goes to sub-slots with PV surplus first; grid charge is then
+  levelled so the sub-slots' grid import stays as flat as possible (fuse).
+- **Discharge** covers each sub-slot's house load first; export is then
+  levelled the same way (export cap).  Both respect the per-slot limits.
+- **EV charging** is spread evenly; the charger power is the block's
+  average power.
+- Grid import/export are re-derived from each sub-slot's own energy balance.
+
+The SoC simulation and scoring downstream still run per slot on the
+expanded plan, so their results stay exact; only the LP sees the coarse
+horizon.  Opt-in via ``hsem_planner_horizon_compression``.
+
+Pure Python, no HA imports — testable with plain pytest.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from statistics import fmean
+from typing import Any
+
+from custom_components.hsem.models.ev_config import EVConfig
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.planner.milp_optimizer import solve_milp
+from custom_components.hsem.utils.datetime_utils import as_tz
+from custom_components.hsem.utils.logger import log_planner
+from custom_components.hsem.utils.misc import clamp_efficiency
+from custom_components.hsem.utils.prices import SlotPrice
+from custom_components.hsem.utils.recommendations import Recommendations
+
+DEFAULT_FULL_RESOLUTION_HOURS = 6.0
+DEFAULT_BLOCK_MINUTES = 60
+
+# The MILP treats the first two hours of an active EV session as fixed
+# per-slot demand, so that window is never merged.
+_MIN_FULL_RESOLUTION_HOURS = 2.0
+
+_MIN_ACTION_KWH = 1e-4
+
+# Energy fields summed when sub-slots are merged into one block.
+_SUMMED_FIELDS = (
+    "avg_house_consumption_kwh",
+    "solcast_pv_estimate_kwh",
+    "ev_planned_load_kwh",
+    "ev_accounted_load_kwh",
+    "ev_total_planned_load_kwh",
+    "estimated_net_consumption_kwh",
+)
+
+
+def plan_horizon_blocks(
+    slots: list[PlannedSlot],
+    now: datetime,
+    full_resolution_hours: float = DEFAULT_FULL_RESOLUTION_HOURS,
+    block_minutes: int = DEFAULT_BLOCK_MINUTES,
+) -> list[list[int]]:
+    """Group slot indices into LP slots.
+
+    Slots starting before ``now + full_resolution_hours`` stay single.
+    Later slots are merged into blocks aligned to multiples of
+    *block_minutes*; a block never spans a gap or a change of slot width.
+
+    Returns:
+        A list of index groups covering every slot in order.
+    """
+    cutoff = now + timedelta(
+        hours=max(full_resolution_hours, _MIN_FULL_RESOLUTION_HOURS)
+    )
+    block_s = max(int(block_minutes), 0) * 60
+    groups: list[list[int]] = []
+    for i, slot in enumerate(slots):
+        if block_s > 0 and groups and slot.start >= cutoff:
+            prev = groups[-1]
+            head = slots[prev[0]]
+            tail = slots[prev[-1]]
+            if (
+                head.start >= cutoff
+                and tail.end == slot.start
+                and tail.end - tail.start == slot.end - slot.start
+                and int(head.start.timestamp()) // block_s
+                == int(slot.start.timestamp()) // block_s
+            ):
+                prev.append(i)
+                continue
+        groups.append([i])
+    return groups
+
+
+def merge_slot_blocks(
+    slots: list[PlannedSlot], groups: list[list[int]]
+) -> tuple[list[PlannedSlot], list[float]]:
+    """Build one slot per group and its weight in base slots.
+
+    Single-slot groups reuse the original slot object; merged blocks are
+    copies of their first sub-slot spanning the whole group.
+    """
+    blocks: list[PlannedSlot] = []
+    weights: list[float] = []
+    for group in groups:
+        if len(group) == 1:
+            blocks.append(slots[group[0]])
+            weights.append(1.0)
+            continue
+        members = [slots[i] for i in group]
+        block = members[0].clone()
+        block.end = members[-1].end
+        block.price = SlotPrice(
+            import_price=fmean(s.price.import_price for s in members),
+            export_price=fmean(s.price.export_price for s in members),
+        )
+        for name in _SUMMED_FIELDS:
+            setattr(block, name, sum(getattr(s, name) for s in members))
+        blocks.append(block)
+        weights.append(float(len(group)))
+    return blocks, weights
+
+
+def solve_milp_compressed(
+    slots: list[PlannedSlot],
+    now: datetime,
+    current_kwh: float,
+    usable_kwh: float,
+    max_charge_per_slot: float,
+    max_discharge_per_slot: float | None,
+    *,
+    full_resolution_hours: float = DEFAULT_FULL_RESOLUTION_HOURS,
+    block_minutes: int = DEFAULT_BLOCK_MINUTES,
+    ev_configs: list[EVConfig] | None = None,
+    charge_efficiency_pct: float = 97.0,
+    discharge_efficiency_pct: float = 97.0,
+    **kwargs: Any,
+) -> tuple[list[PlannedSlot], dict] | None:
+    """Run ``solve_milp`` on a compressed horizon and expand the result.
+
+    Takes the same arguments as :func:`solve_milp` plus the compression
+    settings, and returns the same ``(slots, diagnostics)`` shape with one
+    slot per input slot.  ``diagnostics["horizon_compression"]`` reports
+    the future slot count before and after merging.
+    """
+    groups = plan_horizon_blocks(slots, now, full_resolution_hours, block_minutes)
+    block_slots, weights = merge_slot_blocks(slots, groups)
+    future_groups = [g for g in groups if as_tz(slots[g[-1]].end, now.tzinfo) > now]
+    stats = {
+        "slots": sum(len(g) for g in future_groups),
+        "lp_slots": len(future_groups),
+        "full_resolution_hours": full_resolution_hours,
+        "block_minutes": block_minutes,
+    }
+    merged = len(block_slots) < len(slots)
+
+    result = solve_milp(
+        block_slots if merged else slots,
+        now,
+        current_kwh,
+        usable_kwh,
+        max_charge_per_slot,
+        max_discharge_per_slot,
+        ev_configs=(
+            _remap_ev_deadlines(ev_configs, future_groups)
+            if merged and ev_configs
+            else ev_configs
+        ),
+        charge_efficiency_pct=charge_efficiency_pct,
+        discharge_efficiency_pct=discharge_efficiency_pct,
+        slot_weights=weights if merged else None,
+        **kwargs,
+    )
+    if result is None:
+        return None
+    out_slots, diagnostics = result
+    diagnostics["horizon_compression"] = stats
+    if not merged:
+        return out_slots, diagnostics
+
+    log_planner(
+        "debug",
+        "[milp] Horizon compression: %d future slots → %d LP slots "
+        "(full resolution %.1f h, %d-min blocks)",
+        stats["slots"],
+        stats["lp_slots"],
+        full_resolution_hours,
+        block_minutes,
+    )
+    expanded = expand_block_plan(
+        slots,
+        groups,
+        out_slots,
+        max_charge_per_slot=max_charge_per_slot,
+        max_discharge_per_slot=(
+            max_discharge_per_slot if max_discharge_per_slot is not None else usable_kwh
+        ),
+        charge_eff=clamp_efficiency(charge_efficiency_pct),
+        discharge_eff=clamp_efficiency(discharge_efficiency_pct),
+        ev_co_optimised=_has_active_evs(ev_configs),
+    )
+    return expanded, diagnostics
+
+
+def expand_block_plan(
+    slots: list[PlannedSlot],
+    groups: list[list[int]],
+    block_out: list[PlannedSlot],
+    *,
+    max_charge_per_slot: float,
+    max_discharge_per_slot: float,
+    charge_eff: float,
+    discharge_eff: float,
+    ev_co_optimised: bool,
+) -> list[PlannedSlot]:
+    """Spread each solved block back onto its original sub-slots.
+
+    Single-slot groups are returned as solved.  For merged blocks the
+    battery energy is split by :func:`_spread` (see the module docstring)
+    and grid flows follow from each sub-slot's energy balance, so the
+    result satisfies the same invariants as a full-resolution solve.
+    """
+    out: list[PlannedSlot] = []
+    for group, block in zip(groups, block_out, strict=True):
+        if len(group) == 1:
+            out.append(block)
+            continue
+        subs = [slots[i].clone() for i in group]
+        w = len(subs)
+        ev_load = [0.0 if ev_co_optimised else s.ev_planned_load_kwh for s in subs]
+        net = [
+            s.avg_house_consumption_kwh + ev - s.solcast_pv_estimate_kwh
+            for s, ev in zip(subs, ev_load, strict=True)
+        ]
+        pv_avail = [max(-x, 0.0) for x in net]
+        base_load = [max(x, 0.0) for x in net]
+
+        charged = _spread(
+            block.batteries_charged_kwh,
+            [max_charge_per_slot] * w,
+            preferred=pv_avail,
+            occupancy=[b * charge_eff for b in base_load],
+        )
+        discharged = _spread(
+            block.batteries_discharged_kwh,
+            [max_discharge_per_slot] * w,
+            preferred=[b / discharge_eff for b in base_load],
+            occupancy=[p / discharge_eff for p in pv_avail],
+        )
+
+        # Curtailment the LP chose for the whole block, recovered from its
+        # energy balance and shared in proportion to PV surplus.
+        ev_ac = block.ev_total_planned_load_kwh
+        curt = (block.grid_import_kwh - block.grid_export_kwh) - (
+            sum(net)
+            + block.batteries_charged_kwh / charge_eff
+            - block.batteries_discharged_kwh * discharge_eff
+            + ev_ac
+        )
+        pv_total = sum(pv_avail)
+        curt = max(curt, 0.0) if pv_total > _MIN_ACTION_KWH else 0.0
+
+        for k, sub in enumerate(subs):
+            ec = round(charged[k], 3)
+            ed = round(discharged[k], 3)
+            for name in (
+                "ev_planned_load_kwh",
+                "ev_accounted_load_kwh",
+                "ev_total_planned_load_kwh",
+            ):
+                setattr(sub, name, round(getattr(block, name) / w, 3))
+            sub.ev_charger_calculated_power = block.ev_charger_calculated_power
+            sub.ev_second_charger_calculated_power = (
+                block.ev_second_charger_calculated_power
+            )
+            sub.marginal_energy_value = block.marginal_energy_value
+            sub.marginal_load_cost = block.marginal_load_cost
+            ev_charging = sub.ev_total_planned_load_kwh > _MIN_ACTION_KWH
+
+            sub.recommendation = None
+            if ec > _MIN_ACTION_KWH:
+                sub.recommendation = (
+                    Recommendations.BatteriesChargeSolar.value
+                    if pv_avail[k] > _MIN_ACTION_KWH and not ev_charging
+                    else Recommendations.BatteriesChargeGrid.value
+                )
+            elif ed > _MIN_ACTION_KWH:
+                exports = ed * discharge_eff > base_load[k] + _MIN_ACTION_KWH
+                sub.recommendation = (
+                    Recommendations.ForceBatteriesDischarge.value
+                    if exports
+                    and block.recommendation
+                    == Recommendations.ForceBatteriesDischarge.value
+                    else Recommendations.BatteriesDischargeMode.value
+                )
+            sub.batteries_charged_kwh = ec
+            sub.batteries_discharged_kwh = ed
+
+            net_flow = (
+                base_load[k]
+                + ec / charge_eff
+                - ed * discharge_eff
+                + (curt * pv_avail[k] / pv_total if curt > 0 else 0.0)
+                + (ev_ac / w if ev_co_optimised else 0.0)
+                - pv_avail[k]
+            )
+            sub.grid_import_kwh = round(max(net_flow, 0.0), 3)
+            sub.grid_export_kwh = round(max(-net_flow, 0.0), 3)
+
+            if ev_co_optimised:
+                sub.estimated_net_consumption_kwh = (
+                    sub.avg_house_consumption_kwh
+                    + sub.ev_planned_load_kwh
+                    - sub.solcast_pv_estimate_kwh
+                )
+                price = (
+                    sub.price.import_price
+                    if sub.estimated_net_consumption_kwh > 0
+                    else sub.price.export_price
+                )
+                sub.estimated_cost_currency = round(
+                    sub.estimated_net_consumption_kwh * price, 4
+                )
+        out.extend(subs)
+    return out
+
+
+def _spread(
+    total: float,
+    caps: list[float],
+    *,
+    preferred: list[float],
+    occupancy: list[float],
+) -> list[float]:
+    """Split *total* over sub-slots without exceeding *caps*.
+
+    *preferred* amounts are filled first (scaled down together when
+    *total* is smaller).  The remainder is water-filled on top of
+    *occupancy* — the grid flow a sub-slot already has in the same
+    direction, in battery-side kWh — so grid-side peaks (fuse, export
+    cap) stay as flat as the block allows.
+    """
+    first = [min(p, c) for p, c in zip(preferred, caps, strict=True)]
+    first_total = sum(first)
+    scale = min(total / first_total, 1.0) if first_total > 1e-9 else 0.0
+    alloc = [f * scale for f in first]
+    rest = total - sum(alloc)
+    if rest <= 1e-9:
+        return alloc
+
+    def _fill(level: float) -> list[float]:
+        return [
+            min(max(level - occ, 0.0), cap - a)
+            for occ, cap, a in zip(occupancy, caps, alloc, strict=True)
+        ]
+
+    lo, hi = min(occupancy), max(occupancy) + rest
+    for _ in range(50):
+        mid = (lo + hi) / 2.0
+        if sum(_fill(mid)) < rest:
+            lo = mid
+        else:
+            hi = mid
+    return [a + extra for a, extra in zip(alloc, _fill(hi), strict=True)]
+
+
+def _remap_ev_deadlines(
+    ev_configs: list[EVConfig], future_groups: list[list[int]]
+) -> list[EVConfig]:
+    """Translate ``deadline_slot`` from base future slots to LP slots.
+
+    A deadline inside a merged block maps to the previous block, so the
+    target is still met by the original deadline.
+    """
+    ends: list[int] = []
+    count = 0
+    for group in future_groups:
+        count += len(group)
+        ends.append(count)
+    remapped = []
+    for ev in ev_configs:
+        if ev.deadline_slot is not None:
+            lp_deadline = max(bisect_right(ends, ev.deadline_slot + 1) - 1, 0)
+            ev = dataclasses.replace(ev, deadline_slot=lp_deadline)
+        remapped.append(ev)
+    return remapped
+
+
+def _has_active_evs(ev_configs: list[EVConfig] | None) -> bool:
+    """Mirror ``solve_milp``'s test for EV co-optimisation."""
+    return any(
+        ev.enabled and ev.capacity_kwh > 1e-9 and ev.max_charge_per_slot > 1e-9
+        for ev in ev_configs or []
+    )
@@ -1,17 +1,100 @@
 """Build MILP constraints and variable bounds.
 
 Extracted from ``solve_milp`` so the orchestrator remains under 30 KB.
+
+The constraint matrices are assembled as sparse COO triplets and handed to
+HiGHS in CSR form.  The SoC recurrence uses explicit per-slot ``soc[t]``
+state variables, so on long horizons each SoC row has two non-zeros
+instead of a cumulative sum and the matrix grows linearly with the horizon.
 """
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
 if TYPE_CHECKING:
     from custom_components.hsem.models.ev_config import EVConfig
 
+# Horizons longer than this bound the explicit soc[t] state variables;
+# shorter ones keep the cumulative Σ(ec − ed) SoC rows (O(m²) non-zeros,
+# negligible at this size).
+_SOC_STATE_ROWS_MIN_SLOTS = 96
+
+
+class _SparseRows:
+    """Row-wise COO accumulator for one LP constraint matrix.
+
+    Each :meth:`add` call appends a block of rows.  ``local_rows`` index
+    into the new block (0-based), ``cols`` are absolute variable indices,
+    and ``vals`` are the coefficients.  Scalars broadcast against the
+    array arguments so a whole per-slot family can be added in one call.
+
+    With ``collect=False`` only the right-hand side is recorded — used when
+    the matrix itself comes from the LP structure cache (``_lp_cache``).
+    """
+
+    def __init__(self, collect: bool = True) -> None:
+        """Start an empty matrix."""
+        self.n_rows = 0
+        self._collect = collect
+        self._rows: list[np.ndarray] = []  # type: ignore[name-defined]
+        self._cols: list[np.ndarray] = []  # type: ignore[name-defined]
+        self._vals: list[np.ndarray] = []  # type: ignore[name-defined]
+        self._rhs: list[np.ndarray] = []  # type: ignore[name-defined]
+
+    def add(
+        self,
+        n_rows: int,
+        local_rows: Any,
+        cols: Any,
+        vals: Any,
+        rhs: Any,
+    ) -> None:
+        """Append *n_rows* rows with the given triplets and right-hand side."""
+        if n_rows <= 0:
+            return
+        self._rhs.append(np.broadcast_to(np.asarray(rhs, dtype=float), (n_rows,)))
+        if not self._collect:
+            self.n_rows += n_rows
+            return
+        rows_a, cols_a, vals_a = np.broadcast_arrays(
+            np.asarray(local_rows, dtype=np.int64),
+            np.asarray(cols, dtype=np.int64),
+            np.asarray(vals, dtype=float),
+        )
+        self._rows.append(rows_a.ravel() + self.n_rows)
+        self._cols.append(cols_a.ravel())
+        self._vals.append(vals_a.ravel())
+        self.n_rows += n_rows
+
+    def build(self, n_vars: int, matrix: Any = None) -> tuple[Any, np.ndarray]:  # type: ignore[name-defined]
+        """Return ``(csr_matrix, rhs)`` for the accumulated rows.
+
+        Duplicate ``(row, col)`` entries are summed by the COO → CSR
+        conversion; callers never emit duplicates.  A cached *matrix* is
+        returned as-is alongside the freshly computed right-hand side.
+        """
+        from scipy.sparse import coo_matrix
+
+        rhs = (
+            np.concatenate(self._rhs).astype(float, copy=True)
+            if self._rhs
+            else np.zeros(0)
+        )
+        if matrix is not None:
+            return matrix, rhs
+        if self._rows:
+            rows = np.concatenate(self._rows)
+            cols = np.concatenate(self._cols)
+            vals = np.concatenate(self._vals)
+        else:
+            rows = cols = np.zeros(0, dtype=np.int64)
+            vals = np.zeros(0)
+        matrix = coo_matrix((vals, (rows, cols)), shape=(self.n_rows, n_vars)).tocsr()
+        return matrix, rhs
+
 
 def _build_constraints(
     m: int,
@@ -49,15 +132,40 @@ def _build_constraints(
     max_grid_export_per_slot_kwh: float = 0.0,
     export_limit_active: bool = False,
     battery_export_blocked: np.ndarray | None = None,  # type: ignore[name-defined]
+    *,
+    soc_off: int,
+    skeleton: tuple[Any, Any] | None = None,
+    slot_weights: np.ndarray | None = None,  # type: ignore[name-defined]
 ) -> dict:
     """Build all LP constraint matrices and variable bounds.
 
+    ``soc_off`` is the start of the ``soc[t]`` state-variable block (the
+    last block of the variable vector, see ``solve_milp``).  ``soc[t]`` is
+    the battery energy above the floor at the end of slot ``t``.
+
+    ``skeleton`` is an ``(A_eq, A_ub)`` pair from the LP structure cache.
+    When given, the triplets are not assembled again; only the right-hand
+    sides and bounds are recomputed for this cycle.
+
+    ``slot_weights`` gives each LP slot's length in base slots (``1.0``
+    for a full-resolution slot, ``4.0`` for an hour merged from four
+    quarter-hours by ``horizon_compression``).  Every per-slot power limit
+    — charge, discharge, mutex, fuse, export cap and EV charge — scales
+    with it.  ``None`` means a uniform horizon.
+
     Returns a dict with keys:
-        ``A_eq``, ``b_eq``, ``A_ub``, ``b_ub``, ``bounds``,
-        ``ev_discharge_guard_active``, ``ed_ub_per_slot``.
+        ``A_eq``, ``b_eq``, ``A_ub``, ``b_ub`` (``A_*`` are
+        ``scipy.sparse.csr_matrix``), ``bounds``,
+        ``ev_discharge_guard_active``, ``ed_ub_per_slot``, ``ec_ub_per_slot``.
     """
     import numpy as np
 
+    t_idx = np.arange(m)
+    w = np.ones(m) if slot_weights is None else np.asarray(slot_weights, dtype=float)
+    ec_ub = max_charge_per_slot * w
+    eq = _SparseRows(collect=skeleton is None)
+    ub = _SparseRows(collect=skeleton is None)
+
     # ------------------------------------------------------------------
     # Equality constraints: energy balance per slot
     # gi[t] + pv[t] + ed[t]*discharge_eff
@@ -72,72 +180,118 @@ def _build_constraints(
     # curt[t] allows the LP to explicitly curtail PV when battery is full
     # and export prices are low/negative.
     # ------------------------------------------------------------------
-    A_eq = np.zeros((m, n_vars))  # NOSONAR
-    for t in range(m):
-        A_eq[t, ec_off + t] = -1.0 / charge_eff  # -ec[t]/charge_eff
-        A_eq[t, ed_off + t] = 1.0 * discharge_eff  # +ed[t]*discharge_eff
-        A_eq[t, gi_off + t] = 1.0  # +gi[t]
-        A_eq[t, ge_off + t] = -1.0  # -ge[t]
-        A_eq[t, pv_off + t] = 1.0  # +pv[t] (fixed to pv_avail[t])
-        A_eq[t, curt_off + t] = -1.0  # -curt[t] (curtailment reduces available PV)
-        # EV AC load: -ev_c[t] / charger_eff per active EV
-        for ev_idx, ev in enumerate(active_evs):
-            A_eq[t, ev_var_offsets[ev_idx] + t] = -1.0 / ev.charger_efficiency
-    b_eq = base_load.copy()  # always non-negative — pv[t] covers surplus
+    balance_cols = [
+        (ec_off, -1.0 / charge_eff),  # -ec[t]/charge_eff
+        (ed_off, 1.0 * discharge_eff),  # +ed[t]*discharge_eff
+        (gi_off, 1.0),  # +gi[t]
+        (ge_off, -1.0),  # -ge[t]
+        (pv_off, 1.0),  # +pv[t] (fixed to pv_avail[t])
+        (curt_off, -1.0),  # -curt[t] (curtailment reduces available PV)
+    ]
+    # EV AC load: -ev_c[t] / charger_eff per active EV
+    balance_cols += [
+        (ev_var_offsets[ev_idx], -1.0 / ev.charger_efficiency)
+        for ev_idx, ev in enumerate(active_evs)
+    ]
+    eq.add(
+        m,
+        np.tile(t_idx, len(balance_cols)),
+        np.concatenate([off + t_idx for off, _v in balance_cols]),
+        np.repeat([v for _o, v in balance_cols], m),
+        base_load,  # always non-negative — pv[t] covers surplus
+    )
+
+    # ------------------------------------------------------------------
+    # SoC recurrence (equality), with explicit state variables soc[t]:
+    #   soc[t] = soc[t-1] + ec[t] − ed[t],   soc[-1] = current_kwh
+    #   → soc[t] − soc[t-1] − ec[t] + ed[t] = 0   (t ≥ 1)
+    #   → soc[0] − ec[0] + ed[0] = current_kwh
+    # This is exactly the cumulative form soc0 + Σ_{k≤t}(ec[k] − ed[k])
+    # but with 3-4 non-zeros per row instead of O(t).
+    # ------------------------------------------------------------------
+    soc_rhs = np.zeros(m)
+    if m > 0:
+        soc_rhs[0] = current_kwh
+    eq.add(
+        m,
+        np.concatenate([t_idx, t_idx, t_idx, t_idx[1:]]),
+        np.concatenate(
+            [soc_off + t_idx, ec_off + t_idx, ed_off + t_idx, soc_off + t_idx[:-1]]
+        ),
+        np.concatenate([np.ones(m), -np.ones(m), np.ones(m), -np.ones(max(m - 1, 0))]),
+        soc_rhs,
+    )
 
     # ------------------------------------------------------------------
     # Inequality constraints:
-    #   1. SoC recurrence: soc[t] = soc[0] + Σ_{k≤t} (ec[k] − ed[k])
-    #      Upper (soft): Σ_{k≤t}(ec[k]−ed[k]) − s_max_pen[t] ≤ usable−soc0
-    #      Lower (soft): −Σ_{k≤t}(ec[k]−ed[k]) − s_min_pen[t] ≤ soc0
+    #   1. SoC soft bounds:
+    #      Upper (soft): soc[t] − s_max_pen[t] ≤ usable_kwh
+    #      Lower (soft): −soc[t] − s_min_pen[t] ≤ 0
     #      Penalty variables s_max_pen[t] and s_min_pen[t] absorb violations
     #      at high cost, preventing infeasibility from out-of-bounds initial SoC.
     #   2. Mutual exclusion: ec[t]/max_charge + ed[t]/max_dis ≤ 1
     #   3. ec[t] ≤ max_charge_per_slot  (via bounds)
     #   4. ed[t] ≤ max_dis              (via bounds)
-    # ------------------------------------------------------------------
-    # We encode SoC bounds as inequality rows:
+    #
+    # Long horizons bound the soc[t] state variables directly (two
+    # non-zeros per row).  Short horizons keep the historical cumulative
+    # form, which is still small there and keeps HiGHS's choice between
+    # equal-cost vertices unchanged for existing installations:
     #   upper: cumsum(ec−ed)[t] − s_max_pen[t] ≤ (usable_kwh − current_kwh)
     #   lower: −cumsum(ec−ed)[t] − s_min_pen[t] ≤ current_kwh
-    soc_rows = 2 * m
-    # Mutual exclusion rows: ec[t]/max_charge + ed[t]/max_dis <= 1
-    mutex_rows = m
-    # Cycle cost auxiliary rows: m[t] >= ec[t] and m[t] >= ed[t]
-    #   → -m[t] + ec[t] <= 0  and  -m[t] + ed[t] <= 0
-    cycle_rows = 2 * m
-    A_ub = np.zeros((soc_rows + mutex_rows + cycle_rows, n_vars))  # NOSONAR
-    b_ub = np.zeros(soc_rows + mutex_rows + cycle_rows)
-
-    for t in range(m):
-        for k in range(t + 1):
-            # Upper SoC bound row (soft)
-            A_ub[t, ec_off + k] = 1.0
-            A_ub[t, ed_off + k] = -1.0
-            # Lower SoC bound row (soft)
-            A_ub[m + t, ec_off + k] = -1.0
-            A_ub[m + t, ed_off + k] = 1.0
-        # Penalty variable absorbs violation in upper bound
-        A_ub[t, s_max_off + t] = -1.0
-        # Penalty variable absorbs violation in lower bound
-        A_ub[m + t, s_min_off + t] = -1.0
-        b_ub[t] = usable_kwh - current_kwh  # upper SoC headroom
-        b_ub[m + t] = current_kwh  # lower SoC headroom
-
-        # Mutual exclusion: ec[t]/max_charge + ed[t]/max_dis <= 1
-        A_ub[2 * m + t, ec_off + t] = 1.0 / max_charge_per_slot
-        A_ub[2 * m + t, ed_off + t] = 1.0 / max_dis
-        b_ub[2 * m + t] = 1.0
-
+    # ------------------------------------------------------------------
+    if m > _SOC_STATE_ROWS_MIN_SLOTS:
+        ub.add(
+            m,
+            np.tile(t_idx, 2),
+            np.concatenate([soc_off + t_idx, s_max_off + t_idx]),
+            np.repeat([1.0, -1.0], m),
+            usable_kwh,  # upper SoC bound
+        )
+        ub.add(
+            m,
+            np.tile(t_idx, 2),
+            np.concatenate([soc_off + t_idx, s_min_off + t_idx]),
+            np.repeat([-1.0, -1.0], m),
+            0.0,  # lower SoC bound
+        )
+    else:
+        rows_k, cols_k = np.tril_indices(m)  # every k ≤ t for each row t
+        for sign, pen_off, rhs in (
+            (1.0, s_max_off, usable_kwh - current_kwh),  # upper SoC headroom
+            (-1.0, s_min_off, current_kwh),  # lower SoC headroom
+        ):
+            ub.add(
+                m,
+                np.concatenate([rows_k, rows_k, t_idx]),
+                np.concatenate([ec_off + cols_k, ed_off + cols_k, pen_off + t_idx]),
+                np.concatenate(
+                    [
+                        np.full(len(rows_k), sign),
+                        np.full(len(rows_k), -sign),
+                        np.full(m, -1.0),
+                    ]
+                ),
+                rhs,
+            )
+    # Mutual exclusion: ec[t]/max_charge + ed[t]/max_dis <= 1
+    ub.add(
+        m,
+        np.tile(t_idx, 2),
+        np.concatenate([ec_off + t_idx, ed_off + t_idx]),
+        np.concatenate([1.0 / ec_ub, 1.0 / (max_dis * w)]),
+        1.0,
+    )
     # Cycle cost auxiliary: m[t] >= ec[t]  →  -m[t] + ec[t] <= 0
     #                     m[t] >= ed[t]  →  -m[t] + ed[t] <= 0
-    cycle_row_start = soc_rows + mutex_rows  # = 3m
-    for t in range(m):
-        A_ub[cycle_row_start + t, ec_off + t] = 1.0
-        A_ub[cycle_row_start + t, m_off + t] = -1.0
-        b_ub[cycle_row_start + t] = 0.0
-        A_ub[cycle_row_start + m + t, ed_off + t] = 1.0
-        A_ub[cycle_row_start + m + t, m_off + t] = -1.0
-        b_ub[cycle_row_start + m + t] = 0.0
+    for flow_off in (ec_off, ed_off):
+        ub.add(
+            m,
+            np.tile(t_idx, 2),
+            np.concatenate([flow_off + t_idx, m_off + t_idx]),
+            np.repeat([1.0, -1.0], m),
+            0.0,
+        )
 
     # ------------------------------------------------------------------
     # EV discharge guard: when base_load_includes_ev=True and EV
@@ -200,177 +354,104 @@ def _build_constraints(
             or bool(battery_export_blocked[t])
             or (ev_discharge_guard_active and ev_accounted[t] > 1e-9)
         ):
-            ed_ub_per_slot.append(min(cap_house_load, max_dis))
+            ed_ub_per_slot.append(min(cap_house_load, max_dis * w[t]))
         else:
-            ed_ub_per_slot.append(max_dis)
+            ed_ub_per_slot.append(max_dis * w[t])
 
     # ------------------------------------------------------------------
     # EV constraints (only when active_evs is non-empty)
     # ------------------------------------------------------------------
-    # Row counts for EV constraints
-    num_evs = len(active_evs)
-    ev_soc_rows = num_evs * m  # cumulative SOC upper bound per EV
-    ev_deadline_rows = sum(
-        1
-        for ev in active_evs
-        if ev.deadline_slot is not None and ev.target_kwh > ev.initial_soc_kwh + 1e-9
-    )
-    # Post-deadline zero-charge rows: for EVs with a deadline and no
-    # charge-past-target, ev_c[t] = 0 for all t > deadline_slot.
-    ev_post_deadline_rows = sum(
-        m - 1 - max(0, min(ev.deadline_slot, m - 1))
-        for ev in active_evs
-        if ev.deadline_slot is not None
-        and ev.target_kwh > ev.initial_soc_kwh + 1e-9
-        and not ev.charge_past_target
-    )
-    # Target-cap rows: for EVs with a deadline and no charge-past-target,
-    # Σ_{k≤D} ev_c[k] ≤ target_kwh - initial_soc_kwh
-    # Caps EV charging at the economic target for pre-deadline slots,
-    # preventing overcharge to full capacity_kwh.
-    ev_target_rows = sum(
-        1
-        for ev in active_evs
-        if ev.deadline_slot is not None
-        and ev.target_kwh > ev.initial_soc_kwh + 1e-9
-        and not ev.charge_past_target
-    )
-    # Surplus-only rows: for charge-past-target EVs, ev_c[t]/eff ≤ max(0, pv[t] - base_load[t])
-    ev_surplus_rows = sum(1 for ev in active_evs if ev.charge_past_target) * m
-    # Battery-first rows (issue #775): for charge-past-target EVs, the EV may
-    # only absorb PV surplus that the house battery cannot take.  One shared
-    # row per slot: ec[t] + Σ ev_c[t]/eff ≤ max(0, pv[t] - base_load[t]).
-    ev_battery_first_rows = sum(1 for ev in active_evs if ev.charge_past_target) * m
-    ev_total_rows = (
-        ev_soc_rows
-        + ev_deadline_rows
-        + ev_target_rows
-        + ev_post_deadline_rows
-        + ev_surplus_rows
-        + ev_battery_first_rows
+    # Index of the first charge-past-target EV (into active_evs).  The
+    # battery-first row is shared across all such EVs, so it is emitted
+    # once, by this EV (issue #775).
+    first_past_target_ev = next(
+        (i for i, e in enumerate(active_evs) if e.charge_past_target), None
     )
+    surplus_kwh = np.maximum(pv_avail - base_load, 0.0)
+    for ev_idx, ev in enumerate(active_evs):
+        ev_off = ev_var_offsets[ev_idx]
+        # EV SOC upper bound: Σ_{k≤t} ev_c[k] ≤ cap − init for every t.
+        # ev_c[k] ≥ 0, so the prefix sums are non-decreasing and the
+        # whole family is implied by its last row — a single full-horizon
+        # row replaces the m cumulative rows.
+        headroom = max(ev.capacity_kwh - ev.initial_soc_kwh, 0.0)
+        ub.add(1, np.zeros(m), ev_off + t_idx, 1.0, headroom)
 
-    if ev_total_rows > 0:
-        # Extend A_ub and b_ub to accommodate EV rows
-        existing_rows = soc_rows + mutex_rows + cycle_rows
-        A_ub_old = A_ub
-        b_ub_old = b_ub
-        A_ub = np.zeros((existing_rows + ev_total_rows, n_vars))
-        b_ub = np.zeros(existing_rows + ev_total_rows)
-        A_ub[:existing_rows, :] = A_ub_old
-        b_ub[:existing_rows] = b_ub_old
-
-        ev_row = existing_rows
-        # Index of the first charge-past-target EV (into active_evs).  The
-        # battery-first row is shared across all such EVs, so it is emitted
-        # once, by this EV (issue #775).
-        first_past_target_ev = next(
-            (i for i, e in enumerate(active_evs) if e.charge_past_target), None
+        has_deadline = (
+            ev.deadline_slot is not None and ev.target_kwh > ev.initial_soc_kwh + 1e-9
         )
-        for ev_idx, ev in enumerate(active_evs):
-            ev_off = ev_var_offsets[ev_idx]
-            # EV SOC upper bound per slot: Σ_{k≤t} ev_c[k] ≤ cap − init
-            #   For each t in 0..m-1:
-            #   Σ_{k=0..t} ev_c[k] ≤ ev.capacity_kwh - ev.initial_soc_kwh
-            headroom = max(ev.capacity_kwh - ev.initial_soc_kwh, 0.0)
-            for t in range(m):
-                for k in range(t + 1):
-                    A_ub[ev_row + t, ev_off + k] = 1.0
-                b_ub[ev_row + t] = headroom
-            ev_row += m
-
-            # EV deadline soft constraint:
-            # initial_soc + Σ_{k≤D} ev_c[k] + penalty ≥ target
-            # → -Σ_{k≤D} ev_c[k] - penalty ≤ initial_soc - target
-            if (
-                ev.deadline_slot is not None
-                and ev.target_kwh > ev.initial_soc_kwh + 1e-9
-            ):
-                d = ev.deadline_slot
-                # Clamp deadline to valid range
-                d = max(0, min(d, m - 1))
-                for k in range(d + 1):
-                    A_ub[ev_row, ev_off + k] = -1.0
-                A_ub[ev_row, ev_pen_offsets[ev_idx]] = -1.0
-                b_ub[ev_row] = ev.initial_soc_kwh - ev.target_kwh
-                ev_row += 1
-
-            # EV target-cap constraint:
-            # Σ_{k≤D} ev_c[k] ≤ target_kwh - initial_soc_kwh
-            # Caps EV charging at the economic target for pre-deadline
-            # slots.  Without this, the benefit coefficient on ev_c[t]
-            # would drive charging all the way to capacity_kwh
-            # regardless of the actual shortfall.
-            # Does NOT apply when charge_past_target is enabled — that
-            # mode intentionally allows charging beyond target_kwh via
-            # a separate surplus-only mechanism.
-            if (
-                ev.deadline_slot is not None
-                and ev.target_kwh > ev.initial_soc_kwh + 1e-9
-                and not ev.charge_past_target
-            ):
-                shortfall = ev.target_kwh - ev.initial_soc_kwh
-                d = ev.deadline_slot
-                d = max(0, min(d, m - 1))
-                for k in range(d + 1):
-                    A_ub[ev_row, ev_off + k] = 1.0
-                b_ub[ev_row] = shortfall
-                ev_row += 1
+        d = 0
+        if ev.deadline_slot is not None:
+            # Clamp deadline to valid range
+            d = max(0, min(ev.deadline_slot, m - 1))
+        pre_deadline = ev_off + np.arange(d + 1)
+
+        # EV deadline soft constraint:
+        # initial_soc + Σ_{k≤D} ev_c[k] + penalty ≥ target
+        # → -Σ_{k≤D} ev_c[k] - penalty ≤ initial_soc - target
+        if has_deadline:
+            ub.add(
+                1,
+                0,
+                np.append(pre_deadline, ev_pen_offsets[ev_idx]),
+                -1.0,
+                ev.initial_soc_kwh - ev.target_kwh,
+            )
+
+        # EV target-cap constraint:
+        # Σ_{k≤D} ev_c[k] ≤ target_kwh - initial_soc_kwh
+        # Caps EV charging at the economic target for pre-deadline
+        # slots.  Without this, the benefit coefficient on ev_c[t]
+        # would drive charging all the way to capacity_kwh
+        # regardless of the actual shortfall.
+        # Does NOT apply when charge_past_target is enabled — that
+        # mode intentionally allows charging beyond target_kwh via
+        # a separate surplus-only mechanism.
+        if has_deadline and not ev.charge_past_target:
+            ub.add(1, 0, pre_deadline, 1.0, ev.target_kwh - ev.initial_soc_kwh)
 
             # Post-deadline zero-charge constraint:
             # For EVs with a deadline and no charge-past-target,
             # ev_c[t] = 0 for all t > deadline_slot.
             # This prevents the MILP from charging after the deadline
             # unless charge_past_target is enabled (which uses surplus PV).
-            if (
-                ev.deadline_slot is not None
-                and ev.target_kwh > ev.initial_soc_kwh + 1e-9
-                and not ev.charge_past_target
-            ):
-                d = ev.deadline_slot
-                d = max(0, min(d, m - 1))
-                for t in range(d + 1, m):
-                    A_ub[ev_row, ev_off + t] = 1.0
-                    b_ub[ev_row] = 0.0
-                    ev_row += 1
-
-            # Surplus-only constraint for charge-past-target EVs:
-            # ev_c[t] / charger_eff ≤ max(0, pv[t] - base_load[t])
-            # This ensures past-target charging ONLY uses genuine PV
-            # surplus — never battery discharge or grid import.
-            if ev.charge_past_target:
-                for t in range(m):
-                    surplus_kwh = max(pv_avail[t] - base_load[t], 0.0)
-                    A_ub[ev_row + t, ev_off + t] = 1.0 / ev.charger_efficiency
-                    b_ub[ev_row + t] = surplus_kwh
-                ev_row += m
-
-            # Battery-first constraint for charge-past-target EVs (issue #775):
-            #   ec[t] + Σ_ev ev_c[t] / charger_eff ≤ max(0, pv[t] - base_load[t])
-            # The house battery must take its share of the slot's PV surplus
-            # BEFORE the EV absorbs any.  Without this, a charge-past-target
-            # EV valued at its avoided-future-import cost (issue #630) can
-            # outrank the battery's charge credit and divert surplus PV that
-            # the battery needs for its scheduled discharge window — the EV
-            # and battery then oscillate for the same surplus across replans.
-            #
-            # The row is shared across all charge-past-target EVs (the battery
-            # is a single resource), so it is only emitted for the first such
-            # EV; every charge-past-target EV's ev_c[t] contributes to it.
-            # Pre-deadline (below-target) EVs are deliberately excluded — they
-            # keep their deadline benefit and may charge ahead of the battery.
-            if ev.charge_past_target and ev_idx == first_past_target_ev:
-                for t in range(m):
-                    surplus_kwh = max(pv_avail[t] - base_load[t], 0.0)
-                    A_ub[ev_row + t, ec_off + t] = 1.0
-                    for other_idx, other in enumerate(active_evs):
-                        if other.charge_past_target:
-                            A_ub[
-                                ev_row + t,
-                                ev_var_offsets[other_idx] + t,
-                            ] = 1.0 / other.charger_efficiency
-                    b_ub[ev_row + t] = surplus_kwh
-                ev_row += m
+            post = np.arange(d + 1, m)
+            ub.add(len(post), np.arange(len(post)), ev_off + post, 1.0, 0.0)
+
+        # Surplus-only constraint for charge-past-target EVs:
+        # ev_c[t] / charger_eff ≤ max(0, pv[t] - base_load[t])
+        # This ensures past-target charging ONLY uses genuine PV
+        # surplus — never battery discharge or grid import.
+        if ev.charge_past_target:
+            ub.add(m, t_idx, ev_off + t_idx, 1.0 / ev.charger_efficiency, surplus_kwh)
+
+        # Battery-first constraint for charge-past-target EVs (issue #775):
+        #   ec[t] + Σ_ev ev_c[t] / charger_eff ≤ max(0, pv[t] - base_load[t])
+        # The house battery must take its share of the slot's PV surplus
+        # BEFORE the EV absorbs any.  Without this, a charge-past-target
+        # EV valued at its avoided-future-import cost (issue #630) can
+        # outrank the battery's charge credit and divert surplus PV that
+        # the battery needs for its scheduled discharge window — the EV
+        # and battery then oscillate for the same surplus across replans.
+        #
+        # The row is shared across all charge-past-target EVs (the battery
+        # is a single resource), so it is only emitted for the first such
+        # EV; every charge-past-target EV's ev_c[t] contributes to it.
+        # Pre-deadline (below-target) EVs are deliberately excluded — they
+        # keep their deadline benefit and may charge ahead of the battery.
+        if ev.charge_past_target and ev_idx == first_past_target_ev:
+            shared = [(ec_off, 1.0)] + [
+                (ev_var_offsets[other_idx], 1.0 / other.charger_efficiency)
+                for other_idx, other in enumerate(active_evs)
+                if other.charge_past_target
+            ]
+            ub.add(
+                m,
+                np.tile(t_idx, len(shared)),
+                np.concatenate([off + t_idx for off, _v in shared]),
+                np.repeat([v for _o, v in shared], m),
+                surplus_kwh,
+            )
 
     # ------------------------------------------------------------------
     # Session EV grid-charge prevention (issue #615).
@@ -379,54 +460,37 @@ def _build_constraints(
     # session load is met.
     #   ec[t] / charge_eff  ≤ max(0, pv_avail[t] - total_session_ac[t])
     # ------------------------------------------------------------------
-    session_rows = len(session_slots_set) if _has_session_demand else 0
-    if session_rows > 0:
-        # Compute per-slot total AC-side session EV load
-        session_ac_by_slot: dict[int, float] = {}
+    if _has_session_demand and session_slots_set:
+        # Per-slot total AC-side session EV load (kW × hours).  The DC/AC
+        # efficiency conversion cancels out by definition, so this is
+        # simply the AC power multiplied by the slot duration.
+        session_ac = 0.0
         for ev_idx in session_ev_indices:
-            ev = active_evs[ev_idx]
-            skw = ev.session_charge_kw
+            skw = active_evs[ev_idx].session_charge_kw
             assert skw is not None
-            # AC-side session load per slot (kW × hours).  The DC/AC
-            # efficiency conversion cancels out by definition, so this is
-            # simply the AC power multiplied by the slot duration.
-            session_ac = skw * slot_hours
-            for t in session_slots_set:
-                session_ac_by_slot[t] = session_ac_by_slot.get(t, 0.0) + session_ac
-
-        session_t_list = sorted(session_slots_set)
-        existing_rows = soc_rows + mutex_rows + cycle_rows + ev_total_rows
-        A_ub_old = A_ub
-        b_ub_old = b_ub
-        A_ub = np.zeros((existing_rows + session_rows, n_vars))
-        b_ub = np.zeros(existing_rows + session_rows)
-        A_ub[:existing_rows, :] = A_ub_old
-        b_ub[:existing_rows] = b_ub_old
-        for row, t in enumerate(session_t_list):
-            A_ub[existing_rows + row, ec_off + t] = 1.0 / charge_eff
-            b_ub[existing_rows + row] = max(
-                pv_avail[t] - session_ac_by_slot.get(t, 0.0), 0.0
-            )
-        ev_total_rows += session_rows
+            session_ac += skw * slot_hours
+        session_t = np.array(sorted(session_slots_set), dtype=np.int64)
+        ub.add(
+            len(session_t),
+            np.arange(len(session_t)),
+            ec_off + session_t,
+            1.0 / charge_eff,
+            np.maximum(pv_avail[session_t] - session_ac, 0.0),
+        )
 
     # ------------------------------------------------------------------
     # Fuse constraint (soft): gi[t] - gi_pen[t] ≤ max_grid_import_per_slot_kwh
     # The penalty variable gi_pen[t] absorbs any excess at high cost,
     # preventing infeasibility when house base load alone exceeds the fuse.
     # ------------------------------------------------------------------
-    fuse_rows = m if fuse_active else 0
     if fuse_active:
-        existing_rows = soc_rows + mutex_rows + cycle_rows + ev_total_rows
-        A_ub_old = A_ub
-        b_ub_old = b_ub
-        A_ub = np.zeros((existing_rows + fuse_rows, n_vars))
-        b_ub = np.zeros(existing_rows + fuse_rows)
-        A_ub[:existing_rows, :] = A_ub_old
-        b_ub[:existing_rows] = b_ub_old
-        for t in range(m):
-            A_ub[existing_rows + t, gi_off + t] = 1.0
-            A_ub[existing_rows + t, gi_pen_off + t] = -1.0
-            b_ub[existing_rows + t] = max_grid_import_per_slot_kwh
+        ub.add(
+            m,
+            np.tile(t_idx, 2),
+            np.concatenate([gi_off + t_idx, gi_pen_off + t_idx]),
+            np.repeat([1.0, -1.0], m),
+            max_grid_import_per_slot_kwh * w,
+        )
 
     # ------------------------------------------------------------------
     # Variable bounds: all ≥ 0, charge/discharge capped by power limits.
@@ -434,13 +498,17 @@ def _build_constraints(
     # violations) and non-negative (violations cannot be negative).
     # ------------------------------------------------------------------
     unbounded: tuple[float, float | None] = (0.0, None)
-    bounds: list[tuple[float, float | None]] = list(
-        [(0.0, max_charge_per_slot)] * m  # ec[t]
+    bounds: list[tuple[float | None, float | None]] = list(
+        [(0.0, float(ec_ub[t])) for t in range(m)]  # ec[t]
         + [(0.0, float(ed_ub_per_slot[t])) for t in range(m)]  # ed[t]
         + [unbounded] * m  # gi[t] (unbounded above)
         + [
-            ((0.0, max_grid_export_per_slot_kwh) if export_limit_active else unbounded)
-            for _t in range(m)
+            (
+                (0.0, max_grid_export_per_slot_kwh * float(w[t]))
+                if export_limit_active
+                else unbounded
+            )
+            for t in range(m)
         ]  # ge[t] (hard export cap when active, else unbounded above)
         + [
             (pv_avail[t], pv_avail[t]) for t in range(m)
@@ -460,13 +528,19 @@ def _build_constraints(
                 session_dc = min(session_dc, ev.max_charge_per_slot)
                 bounds.append((session_dc, session_dc))
             else:
-                bounds.append((0.0, ev.max_charge_per_slot))
+                bounds.append((0.0, ev.max_charge_per_slot * float(w[t])))
         # ev deadline penalty: [0, unbounded)
         bounds.append((0.0, None))
     # --- Fuse penalty bounds ---
     if fuse_active:
         bounds += [unbounded] * m  # gi_pen[t] (penalty, ≥ 0)
+    # --- SoC state variables: free — the soft bounds live in A_ub so an
+    # out-of-range initial SoC stays feasible via the penalty variables.
+    bounds += [(None, None)] * m  # soc[t]
 
+    A_eq_cached, A_ub_cached = skeleton if skeleton is not None else (None, None)
+    A_eq, b_eq = eq.build(n_vars, A_eq_cached)
+    A_ub, b_ub = ub.build(n_vars, A_ub_cached)
     return {
         "A_eq": A_eq,
         "b_eq": b_eq,
@@ -475,4 +549,5 @@ def _build_constraints(
         "bounds": bounds,
         "ev_discharge_guard_active": ev_discharge_guard_active,
         "ed_ub_per_slot": ed_ub_per_slot,
+        "ec_ub_per_slot": ec_ub,
     }
@@ -13,6 +13,44 @@ from custom_components.hsem.models.ev_config import EVConfig
 from custom_components.hsem.models.planned_slot import PlannedSlot
 
 
+def _terminal_soc_credit(
+    ec_sol: np.ndarray,  # type: ignore[name-defined]
+    ed_sol: np.ndarray,  # type: ignore[name-defined]
+    current_kwh: float,
+    usable_kwh: float,
+    replacement_price_per_kwh: float | None,
+) -> float:
+    """Return the terminal-SoC credit at end-of-horizon (diagnostic).
+
+    This matches cost_function.py's terminal_soc_value calculation:
+    ``terminal_soc_value = (initial_kwh - final_kwh) * replacement_price``.
+
+    The LP objective already INCLUDES this term (see ``_build_objective``),
+    so the solution itself reflects this valuation.  This post-hoc value is
+    retained as a diagnostic consistency check and for the diagnostics dict.
+    Positive when the plan ends with less energy (penalty), negative when it
+    ends with more energy (credit).
+    """
+    from custom_components.hsem.utils.logger import log_planner
+
+    # Compute final SoC from the LP solution
+    final_soc_kwh = current_kwh + float(np.sum(ec_sol)) - float(np.sum(ed_sol))
+    final_soc_kwh = max(0.0, min(final_soc_kwh, usable_kwh))  # clamp to bounds
+
+    if replacement_price_per_kwh is None or abs(replacement_price_per_kwh) <= 1e-9:
+        return 0.0
+    terminal_soc_credit = (current_kwh - final_soc_kwh) * replacement_price_per_kwh
+    log_planner(
+        "debug",
+        "[milp] Terminal-SoC credit: initial=%.3f  final=%.3f  repl_price=%.4f  credit=%.4f",
+        current_kwh,
+        final_soc_kwh,
+        replacement_price_per_kwh,
+        terminal_soc_credit,
+    )
+    return terminal_soc_credit
+
+
 def _compute_milp_diagnostics(
     result: Any,  # scipy.optimize.OptimizeResult
     out_slots: list[PlannedSlot],
@@ -0,0 +1,98 @@
+"""Per-slot marginal energy values from the LP dual solution.
+
+Extracted from ``solve_milp`` so the orchestrator remains under 30 KB.
+
+HiGHS returns a dual value (``marginals``) for every row: the change in the
+optimal objective per unit increase of the row's right-hand side.  Two
+families are written back to the slots, in currency per kWh and without
+the time discount the objective applies:
+
+- ``marginal_energy_value`` — value of one more kWh in the battery at the
+  start of the slot (for the first slot: of the energy stored now).
+  Injecting δ kWh at slot t shifts the SoC of every slot t' ≥ t by δ,
+  i.e. lowers the right-hand side of the upper SoC rows t' ≥ t and raises
+  that of the lower SoC rows by δ, so::
+
+      value[t] = Σ_{t'≥t} (μ_up[t'] − μ_lo[t'])
+
+  This holds for both the cumulative (short horizon) and the ``soc[t]``
+  state (long horizon) form of the SoC bounds, which are always the first
+  ``2m`` rows of ``A_ub``.  The value is zero while no SoC bound binds
+  later in the horizon: extra energy then has no use the plan is short of.
+- ``marginal_load_cost`` — cost of one more kWh of house load in the slot,
+  the dual of the slot's energy-balance row (the first ``m`` rows of
+  ``A_eq``).  It is the import price while the slot imports and the
+  export price while it exports, but can sit anywhere in between when the
+  battery is the marginal supplier.
+
+The integer mode (``scipy.optimize.milp``) reports no duals; the fields
+then stay ``None``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from custom_components.hsem.utils.units import hours_ahead
+
+if TYPE_CHECKING:
+    from custom_components.hsem.models.planned_slot import PlannedSlot
+
+
+def slot_discounts(
+    slots: list[PlannedSlot],
+    future_idx: list[int],
+    now: datetime,
+    time_discount_rate: float,
+) -> np.ndarray:
+    """Return the objective's time-discount factor per LP slot.
+
+    Mirrors ``_build_objective``: ``rate ** hours`` to the slot midpoint,
+    1.0 when discounting is off.
+    """
+    if time_discount_rate >= 1.0 - 1e-9:
+        return np.ones(len(future_idx))
+    hours = [
+        hours_ahead(now, s.start + (s.end - s.start) / 2)
+        for s in (slots[i] for i in future_idx)
+    ]
+    factors: np.ndarray = np.power(time_discount_rate, np.asarray(hours, dtype=float))
+    return factors
+
+
+def _write_marginal_values(
+    out_slots: list[PlannedSlot],
+    slots: list[PlannedSlot],
+    future_idx: list[int],
+    now: datetime,
+    result: Any,
+    m: int,
+    time_discount_rate: float,
+) -> bool:
+    """Write the dual-based marginal values into *out_slots* (in place).
+
+    Returns:
+        ``True`` when the solver reported duals and the fields were
+        written, ``False`` otherwise (fields left ``None``).
+    """
+    eqlin = getattr(result, "eqlin", None)
+    ineqlin = getattr(result, "ineqlin", None)
+    if eqlin is None or ineqlin is None or m == 0:
+        return False
+    mu = np.asarray(ineqlin.marginals, dtype=float)
+    pi = np.asarray(eqlin.marginals, dtype=float)
+    if mu.size < 2 * m or pi.size < m:
+        return False
+
+    discounts = slot_discounts(slots, future_idx, now, time_discount_rate)
+    # Reverse cumulative sum: Σ over t' ≥ t of the SoC-bound duals.
+    stored = np.cumsum((mu[:m] - mu[m : 2 * m])[::-1])[::-1] / discounts
+    load = pi[:m] / discounts
+    # ``+ 0.0`` turns a rounded negative zero into 0.0.
+    for lp_t, slot_i in enumerate(future_idx):
+        out_slots[slot_i].marginal_energy_value = round(float(stored[lp_t]), 4) + 0.0
+        out_slots[slot_i].marginal_load_cost = round(float(load[lp_t]), 4) + 0.0
+    return True
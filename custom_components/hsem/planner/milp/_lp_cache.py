@@ -0,0 +1,190 @@
+"""Reusable LP constraint skeletons across coordinator cycles.
+
+Between two planner runs the LP usually keeps the same *shape*: the same
+number of future slots, the same active EVs, the same efficiencies and
+power limits.  Only prices, forecasts, the current SoC and the EV targets
+move — and those land in the objective, the right-hand sides and the
+variable bounds, never in the constraint matrices.
+
+This module caches the sparse ``(A_eq, A_ub)`` pair keyed by everything
+that determines the matrix coefficients and row layout.  On a hit
+``_build_constraints`` skips the triplet assembly and COO → CSR
+conversion and only recomputes ``b_eq``, ``b_ub`` and ``bounds``.
+
+Flags that only move bounds or right-hand sides (``no_export``, the grid
+export cap, ``battery_export_blocked``, the fuse limit in kWh) are
+deliberately *not* part of the key — they cannot change the matrices.
+
+Invalidation is explicit and counted: :func:`invalidate_lp_structure_cache`
+clears every skeleton (called on an options update), and a cached matrix
+whose shape disagrees with the rows built this cycle is dropped and
+rebuilt.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from custom_components.hsem.utils.logger import log_planner
+
+if TYPE_CHECKING:
+    from custom_components.hsem.models.ev_config import EVConfig
+
+type _StructureKey = tuple[Any, ...]
+
+# A handful of shapes covers the common alternation (e.g. EV plugged /
+# unplugged, horizon length changing when tomorrow's prices arrive).
+_MAX_ENTRIES = 8
+
+
+class LPStructureCache:
+    """Bounded LRU of ``(A_eq, A_ub)`` skeletons with hit/miss counters.
+
+    Thread-safe: ``solve_milp`` runs in the executor and several config
+    entries may plan concurrently.
+    """
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES) -> None:
+        """Create an empty cache holding at most *max_entries* skeletons."""
+        self._max_entries = max_entries
+        self._entries: OrderedDict[_StructureKey, tuple[Any, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.last_invalidation_reason: str | None = None
+
+    def lookup(self, key: _StructureKey) -> tuple[Any, Any] | None:
+        """Return the cached skeleton for *key*, counting the hit or miss."""
+        with self._lock:
+            skeleton = self._entries.get(key)
+            if skeleton is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return skeleton
+
+    def store(self, key: _StructureKey, skeleton: tuple[Any, Any]) -> None:
+        """Remember *skeleton* for *key*, evicting the least recently used."""
+        with self._lock:
+            self._entries[key] = skeleton
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, reason: str) -> None:
+        """Drop every cached skeleton and count the invalidation."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            self.last_invalidation_reason = reason
+        log_planner("debug", "[milp] LP structure cache invalidated (%s)", reason)
+
+    def stats(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot of the counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "last_invalidation_reason": self.last_invalidation_reason,
+            }
+
+
+LP_STRUCTURE_CACHE = LPStructureCache()
+
+
+def invalidate_lp_structure_cache(reason: str) -> None:
+    """Explicitly drop all cached LP skeletons (e.g. after an options change)."""
+    LP_STRUCTURE_CACHE.invalidate(reason)
+
+
+def lp_structure_cache_stats() -> dict[str, Any]:
+    """Return the process-wide LP structure cache counters."""
+    return LP_STRUCTURE_CACHE.stats()
+
+
+def _structure_key(
+    m: int,
+    n_vars: int,
+    active_evs: list[EVConfig],
+    charge_eff: float,
+    discharge_eff: float,
+    max_charge_per_slot: float,
+    max_dis: float,
+    fuse_active: bool,
+    session_slots_set: set[int],
+    has_session_demand: bool,
+    slot_weights: Any = None,
+) -> _StructureKey:
+    """Return the key that fixes the constraint-matrix coefficients.
+
+    Mirrors every branch of ``_build_constraints`` that adds rows or sets a
+    coefficient: the SoC row form, mutex scaling, per-EV charger efficiency
+    and deadline/target flags (which decide the deadline, target-cap,
+    post-deadline and surplus-only rows), the session slots, the fuse and
+    the per-slot weights of a compressed horizon (mutex coefficients).
+    """
+    from custom_components.hsem.planner.milp import _constraints
+
+    ev_keys = []
+    for ev in active_evs:
+        deadline = (
+            None if ev.deadline_slot is None else max(0, min(ev.deadline_slot, m - 1))
+        )
+        has_deadline = (
+            ev.deadline_slot is not None and ev.target_kwh > ev.initial_soc_kwh + 1e-9
+        )
+        ev_keys.append(
+            (
+                ev.charger_efficiency,
+                deadline,
+                has_deadline,
+                ev.charge_past_target,
+            )
+        )
+    return (
+        m,
+        n_vars,
+        m > _constraints._SOC_STATE_ROWS_MIN_SLOTS,
+        charge_eff,
+        discharge_eff,
+        max_charge_per_slot,
+        max_dis,
+        fuse_active,
+        tuple(ev_keys),
+        tuple(sorted(session_slots_set)) if has_session_demand else (),
+        None if slot_weights is None else tuple(float(w) for w in slot_weights),
+    )
+
+
+def _build_constraints_cached(
+    key: _StructureKey, *args: Any, **kwargs: Any
+) -> tuple[dict, bool]:
+    """Call ``_build_constraints`` reusing a cached skeleton when possible.
+
+    Returns ``(constraints, hit)``.  A skeleton whose shape no longer
+    matches the rows built this cycle is invalidated and rebuilt, so a
+    stale entry can never reach the solver.
+    """
+    from custom_components.hsem.planner.milp._constraints import _build_constraints
+
+    skeleton = LP_STRUCTURE_CACHE.lookup(key)
+    if skeleton is not None:
+        constraints = _build_constraints(*args, skeleton=skeleton, **kwargs)
+        A_eq, A_ub = skeleton
+        if (
+            A_eq.shape[0] == len(constraints["b_eq"])
+            and A_ub.shape[0] == len(constraints["b_ub"])
+            and A_eq.shape[1] == len(constraints["bounds"])
+        ):
+            return constraints, True
+        LP_STRUCTURE_CACHE.invalidate("shape_mismatch")
+
+    constraints = _build_constraints(*args, **kwargs)
+    LP_STRUCTURE_CACHE.store(key, (constraints["A_eq"], constraints["A_ub"]))
+    return constraints, False
@@ -53,9 +53,14 @@ def _build_objective(
     current_kwh: float = 0.0,
     pv_avail: np.ndarray | None = None,  # type: ignore[name-defined]
     base_load: np.ndarray | None = None,  # type: ignore[name-defined]
+    slot_weights: np.ndarray | None = None,  # type: ignore[name-defined]
 ) -> np.ndarray:  # type: ignore[name-defined]
     """Build the linear objective vector for the MILP.
 
+    ``slot_weights`` (length in base slots per LP slot, see
+    ``_build_constraints``) scales the battery's per-slot absorption limit
+    on merged horizon blocks.
+
     Returns:
         Numpy array ``c_obj`` of length ``n_vars``.
     """
@@ -309,8 +314,11 @@ def _build_objective(
                 slot_surplus = 0.0
                 if pv_avail is not None and base_load is not None:
                     slot_surplus = max(float(pv_avail[t]) - float(base_load[t]), 0.0)
+                slot_charge_cap = max_charge_per_slot * (
+                    1.0 if slot_weights is None else float(slot_weights[t])
+                )
                 battery_absorption = min(
-                    max_charge_per_slot, max(usable_kwh - current_kwh, 0.0)
+                    slot_charge_cap, max(usable_kwh - current_kwh, 0.0)
                 )
                 battery_takes_all = battery_absorption >= slot_surplus - 1e-9
                 if battery_takes_all and slot_surplus > 1e-9:
@@ -0,0 +1,304 @@
+"""Run HiGHS on the assembled LP, optionally as a true MILP.
+
+Extracted from ``solve_milp`` so the orchestrator remains under 30 KB.
+
+Two modes:
+
+- **LP (default)** — ``scipy.optimize.linprog``.  Binary charge/discharge
+  flags are relaxed; the mutex row ``ec/max_charge + ed/max_dis ≤ 1`` stands
+  in for exclusivity and ``_write_milp_results_to_slots`` resolves any
+  fractional overlap.
+- **Integer (opt-in)** — ``scipy.optimize.milp`` (HiGHS branch-and-bound)
+  with two binary indicators per slot, ``u_c[t]`` and ``u_d[t]``:
+
+  .. code-block:: text
+
+      ec[t] − max_charge_per_slot · u_c[t] ≤ 0
+      ed[t] − ed_ub[t] · u_d[t]            ≤ 0
+      u_c[t] + u_d[t]                      ≤ 1
+
+  The schedule is exclusive by construction.  The solve is bounded by a
+  relative MIP gap and a wall-clock budget; when the budget runs out or
+  branch-and-bound fails, the LP relaxation is solved instead.
+
+Both modes return the same ``result`` shape (``x`` holds only the LP
+columns) plus a ``solver`` stats dict for the diagnostics.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from custom_components.hsem.utils.logger import log_planner
+
+# Default relative MIP gap (fraction) and wall-clock budget (seconds) for
+# the integer mode.  Overridable per installation via the options flow.
+DEFAULT_MIP_REL_GAP = 0.005
+DEFAULT_MIP_TIME_LIMIT_S = 5.0
+
+# HiGHS ``milp`` status codes (scipy.optimize.milp).
+_MIP_STATUS_OPTIMAL = 0
+_MIP_STATUS_TIME_LIMIT = 1
+
+
+def _run_highs(
+    c_obj: Any,
+    A_ub: Any,
+    b_ub: Any,
+    A_eq: Any,
+    b_eq: Any,
+    bounds: list[tuple[float | None, float | None]],
+    *,
+    time_limit_s: float,
+    m: int,
+    ec_off: int,
+    ed_off: int,
+    max_charge_per_slot: Any,
+    ed_ub_per_slot: list[float],
+    integer_mode: bool = False,
+    mip_rel_gap: float | None = None,
+    mip_time_limit_s: float | None = None,
+) -> tuple[Any | None, dict[str, Any]]:
+    """Solve the LP (or MILP) and return ``(result, solver_stats)``.
+
+    ``result`` is ``None`` when no usable solution was found.
+    ``solver_stats`` always carries ``mode`` (``"lp"`` or ``"mip"``),
+    ``wall_time_s``, ``fallback_reason``, the LP size (``n_vars``,
+    ``n_eq_rows``, ``n_ub_rows``, ``nnz``) and ``iterations`` (HiGHS
+    simplex / IPM iterations, or branch-and-bound nodes for ``"mip"``); the
+    integer mode adds ``mip_status``, ``mip_wall_time_s``, ``mip_gap``,
+    ``mip_dual_bound`` and ``mip_node_count``.  ``None`` gap / budget use
+    the module defaults.
+    """
+    stats: dict[str, Any] = {
+        "mode": "lp",
+        "fallback_reason": None,
+        "n_vars": len(c_obj),
+        "n_eq_rows": A_eq.shape[0],
+        "n_ub_rows": A_ub.shape[0],
+        "nnz": A_eq.nnz + A_ub.nnz,
+    }
+    start = time.perf_counter()
+
+    if integer_mode:
+        result, mip_stats = _solve_mip(
+            c_obj,
+            A_ub,
+            b_ub,
+            A_eq,
+            b_eq,
+            bounds,
+            m=m,
+            ec_off=ec_off,
+            ed_off=ed_off,
+            max_charge_per_slot=max_charge_per_slot,
+            ed_ub_per_slot=ed_ub_per_slot,
+            mip_rel_gap=(
+                DEFAULT_MIP_REL_GAP if mip_rel_gap is None else max(mip_rel_gap, 0.0)
+            ),
+            time_limit_s=(
+                DEFAULT_MIP_TIME_LIMIT_S
+                if mip_time_limit_s is None
+                else max(mip_time_limit_s, 0.1)
+            ),
+        )
+        stats.update(mip_stats)
+        if result is not None:
+            stats["mode"] = "mip"
+            stats["iterations"] = stats["mip_node_count"]
+            stats["wall_time_s"] = time.perf_counter() - start
+            return result, stats
+        log_planner(
+            "debug",
+            "[milp] Integer solve gave no result (%s) — falling back to LP relaxation",
+            stats["fallback_reason"],
+        )
+
+    result = _solve_lp(c_obj, A_ub, b_ub, A_eq, b_eq, bounds, time_limit_s)
+    stats["iterations"] = getattr(result, "nit", None)
+    stats["wall_time_s"] = time.perf_counter() - start
+    return result, stats
+
+
+def _solve_lp(
+    c_obj: Any,
+    A_ub: Any,
+    b_ub: Any,
+    A_eq: Any,
+    b_eq: Any,
+    bounds: list[tuple[float | None, float | None]],
+    time_limit_s: float,
+) -> Any | None:
+    """Solve the relaxed LP with ``linprog``; ``None`` on any failure."""
+    from scipy.optimize import linprog
+
+    try:
+        result = linprog(
+            c_obj,
+            A_ub=A_ub,
+            b_ub=b_ub,
+            A_eq=A_eq,
+            b_eq=b_eq,
+            bounds=bounds,
+            method="highs",
+            options={"time_limit": time_limit_s, "disp": False},
+        )
+    except Exception as exc:
+        log_planner("warning", "[milp] Solver raised an exception: %s", exc)
+        return None
+
+    if not result.success:
+        log_planner(
+            "debug",
+            "[milp] Solver returned status=%s (%s)",
+            result.status,
+            result.message,
+        )
+        return None
+    return result
+
+
+def _solve_mip(
+    c_obj: Any,
+    A_ub: Any,
+    b_ub: Any,
+    A_eq: Any,
+    b_eq: Any,
+    bounds: list[tuple[float | None, float | None]],
+    *,
+    m: int,
+    ec_off: int,
+    ed_off: int,
+    max_charge_per_slot: Any,
+    ed_ub_per_slot: list[float],
+    mip_rel_gap: float,
+    time_limit_s: float,
+) -> tuple[Any | None, dict[str, Any]]:
+    """Solve with binary charge/discharge indicators via ``scipy.optimize.milp``.
+
+    The binaries ``u_c[t]``, ``u_d[t]`` are appended after the LP columns
+    and sliced off again, so callers index ``result.x`` exactly as for the
+    LP.  Returns ``(None, stats)`` on timeout or failure.
+    """
+    import numpy as np
+    from scipy.optimize import Bounds, LinearConstraint, OptimizeResult, milp
+    from scipy.sparse import coo_matrix, hstack, vstack
+
+    n_vars = len(c_obj)
+    uc_off = n_vars
+    ud_off = n_vars + m
+    t_idx = np.arange(m)
+
+    # Link rows: ec − cap·u_c ≤ 0, ed − cap·u_d ≤ 0, u_c + u_d ≤ 1.
+    rows = np.repeat(np.arange(3), 2)[:, None] * m + t_idx  # 2 entries per row
+    cols = np.concatenate(
+        [
+            ec_off + t_idx,
+            uc_off + t_idx,
+            ed_off + t_idx,
+            ud_off + t_idx,
+            uc_off + t_idx,
+            ud_off + t_idx,
+        ]
+    )
+    vals = np.concatenate(
+        [
+            np.ones(m),
+            -np.broadcast_to(np.asarray(max_charge_per_slot, dtype=float), (m,)),
+            np.ones(m),
+            -np.asarray(ed_ub_per_slot, dtype=float),
+            np.ones(m),
+            np.ones(m),
+        ]
+    )
+    link = coo_matrix((vals, (rows.ravel(), cols)), shape=(3 * m, n_vars + 2 * m))
+    link_rhs = np.concatenate([np.zeros(2 * m), np.ones(m)])
+
+    a_ub = vstack([hstack([A_ub, coo_matrix((A_ub.shape[0], 2 * m))]), link])
+    a_eq = hstack([A_eq, coo_matrix((A_eq.shape[0], 2 * m))])
+    # scipy ships no stubs: ``Bounds``/``LinearConstraint`` parameters are
+    # inferred as ``float`` from their defaults, hence the ``Any`` arrays.
+    lb: Any = np.asarray(
+        [-np.inf if lo is None else lo for lo, _hi in bounds] + [0.0] * (2 * m),
+        dtype=float,
+    )
+    ub: Any = np.asarray(
+        [np.inf if hi is None else hi for _lo, hi in bounds] + [1.0] * (2 * m),
+        dtype=float,
+    )
+    ub_rhs: Any = np.concatenate([b_ub, link_rhs])
+    integrality = np.concatenate([np.zeros(n_vars), np.ones(2 * m)])
+
+    stats: dict[str, Any] = {
+        "mip_rel_gap_target": mip_rel_gap,
+        "mip_time_limit_s": time_limit_s,
+    }
+    start = time.perf_counter()
+    try:
+        res = milp(
+            np.pad(np.asarray(c_obj, dtype=float), (0, 2 * m)),
+            integrality=integrality,
+            bounds=Bounds(lb, ub),
+            constraints=[
+                LinearConstraint(a_ub.tocsr(), -np.inf, ub_rhs),
+                LinearConstraint(a_eq.tocsr(), b_eq, b_eq),
+            ],
+            options={
+                "time_limit": time_limit_s,
+                "mip_rel_gap": mip_rel_gap,
+                "disp": False,
+            },
+        )
+    except Exception as exc:
+        log_planner("warning", "[milp] Integer solver raised an exception: %s", exc)
+        stats["mip_wall_time_s"] = time.perf_counter() - start
+        stats["fallback_reason"] = "error"
+        return None, stats
+
+    stats.update(
+        mip_status=int(res.status),
+        mip_wall_time_s=time.perf_counter() - start,
+        mip_gap=_finite_or_none(getattr(res, "mip_gap", None)),
+        mip_dual_bound=_finite_or_none(getattr(res, "mip_dual_bound", None)),
+        mip_node_count=getattr(res, "mip_node_count", None),
+    )
+    # A time-limited solve keeps its incumbent when HiGHS reports a gap for
+    # it: that bounds how far the schedule can be from optimal, which the
+    # LP relaxation does not.
+    stats["mip_time_limit_hit"] = res.status == _MIP_STATUS_TIME_LIMIT
+    has_incumbent = res.status == _MIP_STATUS_OPTIMAL or (
+        stats["mip_time_limit_hit"] and stats["mip_gap"] is not None
+    )
+    if res.x is None or not has_incumbent:
+        stats["fallback_reason"] = (
+            "timeout" if stats["mip_time_limit_hit"] else "failed"
+        )
+        return None, stats
+
+    log_planner(
+        "debug",
+        "[milp] Integer solve: %.0f ms  gap=%s  nodes=%s%s",
+        stats["mip_wall_time_s"] * 1000.0,
+        stats["mip_gap"],
+        stats["mip_node_count"],
+        "  (time limit, incumbent kept)" if stats["mip_time_limit_hit"] else "",
+    )
+    result = OptimizeResult(
+        x=res.x[:n_vars],
+        fun=res.fun,
+        success=True,
+        status=res.status,
+        message=res.message,
+    )
+    return result, stats
+
+
+def _finite_or_none(value: Any) -> float | None:
+    """Return *value* as a float, or ``None`` when missing or non-finite."""
+    import math
+
+    if value is None:
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
@@ -5,7 +5,6 @@ Extracted from ``solve_milp`` so the orchestrator remains under 30 KB.
 
 from __future__ import annotations
 
-import copy
 from datetime import datetime
 
 import numpy as np
@@ -77,7 +76,7 @@ def _write_milp_results_to_slots(
 
     from custom_components.hsem.utils.recommendations import Recommendations
 
-    out_slots: list[PlannedSlot] = [copy.copy(s) for s in slots]
+    out_slots: list[PlannedSlot] = [s.clone() for s in slots]
 
     # Reset charge/discharge, energy-flow, and EV fields on all future slots;
     # past slots keep TimePassed.
@@ -270,8 +269,9 @@ def _write_milp_results_to_slots(
     # Write MILP-derived EV charging decisions to output slots
     # ------------------------------------------------------------------
     if active_evs:
-        # Pre-compute full slot hours for power calculation (same for all slots
-        # when interval is uniform).
+        # Pre-compute the base slot hours for the charger's rated power cap.
+        # Merged horizon blocks (``horizon_compression``) are longer; their
+        # target power uses their own duration below.
         first_future_slot = out_slots[future_idx[0]]
         full_slot_hours = slot_duration_hours(
             first_future_slot.start, first_future_slot.end
@@ -327,7 +327,7 @@ def _write_milp_results_to_slots(
                     ac_power_w = round(
                         (
                             ev_dc_to_ac_kwh(ev_dc_kwh, ev.charger_efficiency)
-                            / full_slot_hours
+                            / slot_duration_hours(slot_start, slot_end)
                         )
                         * 1000
                     )
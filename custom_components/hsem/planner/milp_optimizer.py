@@ -2,10 +2,11 @@
 
 Formulated as a continuous LP via ``scipy.optimize.linprog`` with HiGHS.
 Binary flags relaxed to continuous; mutex constraint prevents
-simultaneous charge+discharge.
+simultaneous charge+discharge.  Opt-in ``integer_mode`` solves a true
+MILP with binary indicators instead.  Constraint matrices are sparse (CSR).
 
-Decision variables per slot t (9+n*1 for EVs + fuse penalties):
-ec, ed, gi, ge, pv, m (=max(ec,ed)), s_max_pen, s_min_pen, curt.
+Decision variables per slot t (9+n*1 for EVs + fuse penalties + SoC state):
+ec, ed, gi, ge, pv, m (=max(ec,ed)), s_max_pen, s_min_pen, curt, soc.
 
 Objective: Σ p_imp·gi - p_exp·ge + cycle_cost·m + p_soc·penalties.
 
@@ -24,7 +25,6 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 from custom_components.hsem.models.ev_config import EVConfig
-from custom_components.hsem.utils.datetime_utils import as_tz
 from custom_components.hsem.utils.logger import log_planner
 from custom_components.hsem.utils.misc import clamp_efficiency
 from custom_components.hsem.utils.units import (
@@ -69,6 +69,10 @@ def solve_milp(
     main_fuse_phases: int = 3,
     max_grid_export_power_kw: float | None = None,
     battery_export_min_price: float = 0.0,
+    integer_mode: bool = False,
+    mip_rel_gap: float | None = None,
+    mip_time_limit_s: float | None = None,
+    slot_weights: list[float] | None = None,
 ) -> tuple[list[PlannedSlot], dict] | None:
     """Solve the LP and return a deep-copy slot list with MILP recommendations.
 
@@ -94,6 +98,8 @@ def solve_milp(
     - ``ev_second_charger_calculated_power`` — target AC power (W) for the second EV.
     - ``estimated_net_consumption_kwh`` — recomputed after EV decisions.
     - ``estimated_cost_currency`` — recomputed after EV decisions.
+    - ``marginal_energy_value`` / ``marginal_load_cost`` — per-slot LP duals
+      (see ``milp/_duals.py``); left ``None`` in integer mode.
 
     The SoC simulation (:func:`~soc_simulation.simulate_soc`) must be run
     by the caller **after** receiving these slots with
@@ -184,6 +190,20 @@ def solve_milp(
             Per-slot hard floor below which intentional battery-to-grid
             discharge is forbidden (issue #752). `0.0` disables it.
             Caps `ed[t]` to `base_load[t]/discharge_eff` on blocked slots.
+        integer_mode:
+            Opt-in true MILP via ``scipy.optimize.milp`` with binary
+            charge/discharge indicators (see ``milp/_solve.py``).  Falls
+            back to the LP relaxation on timeout or failure.
+        mip_rel_gap:
+            Relative MIP gap (fraction) at which branch-and-bound stops.
+            ``None`` uses ``DEFAULT_MIP_REL_GAP``.
+        mip_time_limit_s:
+            Wall-clock budget (s) for the integer solve.  ``None`` uses
+            ``DEFAULT_MIP_TIME_LIMIT_S``.
+        slot_weights:
+            Length of each slot in base slots, parallel to *slots*.  Set by
+            ``horizon_compression`` for merged blocks so per-slot power
+            limits scale with the block.  ``None`` means uniform slots.
 
     Returns:
         A tuple ``(slots, diagnostics)`` where:
@@ -228,7 +248,7 @@ def solve_milp(
 
     try:
         import numpy as np
-        from scipy.optimize import linprog
+        import scipy.optimize  # noqa: F401
     except ImportError:
         log_planner("debug", "[milp] scipy/numpy not available — MILP disabled")
         return None
@@ -253,9 +273,11 @@ def solve_milp(
     # ------------------------------------------------------------------
     # Identify future (active) vs. past (fixed-zero) slot indices
     # ------------------------------------------------------------------
-    future_mask = [as_tz(s.end, now.tzinfo) > now for s in slots]
+    from custom_components.hsem.models.slot_frame import SlotFrame
+
+    frame = SlotFrame.from_slots(slots)
     # Indices of future slots in the full slot list
-    future_idx = [i for i, m in enumerate(future_mask) if m]
+    future_idx = np.flatnonzero(frame.future_mask(now)).tolist()
 
     if not future_idx:
         return None
@@ -263,8 +285,9 @@ def solve_milp(
     # ------------------------------------------------------------------
     # Build per-slot data arrays (future slots only)
     # ------------------------------------------------------------------
-    p_imp = np.array([slots[i].price.import_price for i in future_idx], dtype=float)
-    p_exp = np.array([slots[i].price.export_price for i in future_idx], dtype=float)
+    future = frame.take(future_idx)
+    p_imp = future["import_price"]
+    p_exp = future["export_price"]
 
     from custom_components.hsem.planner.milp._price_sanitise import sanitize_prices
 
@@ -288,15 +311,7 @@ def solve_milp(
     # ev_planned_load_kwh and ev_accounted_load_kwh).  base_load is NOT
     # increased because the battery never feeds the EV — any remaining EV
     # demand after PV goes to the grid.
-    net_load = np.array(
-        [
-            slots[i].avg_house_consumption_kwh
-            + slots[i].ev_planned_load_kwh
-            - slots[i].solcast_pv_estimate_kwh
-            for i in future_idx
-        ],
-        dtype=float,
-    )
+    net_load = future.net_load_kwh
     pv_avail = np.maximum(-net_load, 0.0)  # PV surplus after house consumption
     base_load = np.maximum(net_load, 0.0)  # remaining demand after PV
 
@@ -310,9 +325,7 @@ def solve_milp(
     # which provides zero financial benefit when EV charging is reimbursed
     # (issue #592).
     # ------------------------------------------------------------------
-    ev_accounted = np.array(
-        [slots[i].ev_accounted_load_kwh for i in future_idx], dtype=float
-    )
+    ev_accounted = future["ev_accounted_load_kwh"]
 
     # ------------------------------------------------------------------
     # EV co-optimisation: when ev_configs is provided, the MILP decides EV
@@ -327,13 +340,8 @@ def solve_milp(
                 active_evs.append(ev)
         if active_evs:
             # Recompute net_load without EV planned loads
-            net_load = np.array(
-                [
-                    slots[i].avg_house_consumption_kwh
-                    - slots[i].solcast_pv_estimate_kwh
-                    for i in future_idx
-                ],
-                dtype=float,
+            net_load = (
+                future["avg_house_consumption_kwh"] - future["solcast_pv_estimate_kwh"]
             )
             pv_avail = np.maximum(-net_load, 0.0)
             base_load = np.maximum(net_load, 0.0)
@@ -353,6 +361,11 @@ def solve_milp(
         )
 
     m = len(future_idx)  # number of active LP slots
+    lp_weights = (
+        None
+        if slot_weights is None
+        else np.asarray(slot_weights, dtype=float)[future_idx]
+    )
 
     # ------------------------------------------------------------------
     # Session-aware EV demand (issue #615).
@@ -389,6 +402,8 @@ def solve_milp(
     #        curt(0..m-1)]
     #   + [evN_c(0..m-1) for each active EV]      ← EV DC charge per slot
     #   + [evN_target_pen for each active EV]      ← deadline target slack
+    #   + [gi_pen(0..m-1)] when the main fuse is active
+    #   + [soc(0..m-1)]                             ← SoC state per slot
     # ------------------------------------------------------------------
     ec_off, ed_off, gi_off, ge_off, pv_off, m_off = 0, m, 2 * m, 3 * m, 4 * m, 5 * m
     s_max_off = 6 * m
@@ -436,6 +451,13 @@ def solve_milp(
         gi_pen_off = 0  # unused when fuse is inactive
         max_grid_import_per_slot_kwh = 0.0
 
+    # --- SoC state variables ---
+    # soc[t] is the battery energy (kWh above the floor) at the end of slot
+    # t.  Appended last so every other offset is unaffected; the sparse
+    # SoC recurrence rows reference soc[t] and soc[t-1] only.
+    soc_off = n_vars
+    n_vars += m
+
     # Grid export power cap (issue #726): hard per-slot bound on ge[t].
     from custom_components.hsem.planner.milp._export_cap import _resolve_export_cap
 
@@ -457,7 +479,11 @@ def solve_milp(
     p_imp_max = float(np.max(p_imp)) if m > 0 else 0.1
     p_soc = max(p_imp_max, 0.1) * 100.0
 
-    from custom_components.hsem.planner.milp._constraints import _build_constraints
+    from custom_components.hsem.planner.milp._lp_cache import (
+        _build_constraints_cached,
+        _structure_key,
+        lp_structure_cache_stats,
+    )
     from custom_components.hsem.planner.milp._objective import _build_objective
 
     c_obj = _build_objective(
@@ -492,9 +518,26 @@ def solve_milp(
         current_kwh=current_kwh,
         pv_avail=pv_avail,
         base_load=base_load,
+        slot_weights=lp_weights,
     )
 
-    constraints = _build_constraints(
+    # The constraint matrices only depend on the LP shape, so an unchanged
+    # shape reuses last cycle's skeleton and only rhs/bounds are rebuilt.
+    structure_key = _structure_key(
+        m,
+        n_vars,
+        active_evs,
+        charge_eff,
+        discharge_eff,
+        max_charge_per_slot,
+        max_dis,
+        fuse_active,
+        session_slots_set,
+        _has_session_demand,
+        lp_weights,
+    )
+    constraints, lp_cache_hit = _build_constraints_cached(
+        structure_key,
         m,
         n_vars,
         ec_off,
@@ -530,6 +573,8 @@ def solve_milp(
         max_grid_export_per_slot_kwh=max_grid_export_per_slot_kwh,
         export_limit_active=export_limit_active,
         battery_export_blocked=battery_export_blocked,
+        soc_off=soc_off,
+        slot_weights=lp_weights,
     )
 
     A_eq = constraints["A_eq"]
@@ -552,74 +597,49 @@ def solve_milp(
         return None
 
     # ------------------------------------------------------------------
-    # Solve using HiGHS
+    # Solve using HiGHS (LP relaxation, or opt-in MILP with binaries)
     # ------------------------------------------------------------------
-    try:
-        result = linprog(
-            c_obj,
-            A_ub=A_ub,
-            b_ub=b_ub,
-            A_eq=A_eq,
-            b_eq=b_eq,
-            bounds=bounds,
-            method="highs",
-            options={"time_limit": _SOLVER_TIME_LIMIT_S, "disp": False},
-        )
-    except Exception as exc:
-        log_planner("warning", "[milp] Solver raised an exception: %s", exc)
-        return None
-
-    if not result.success:
-        log_planner(
-            "debug",
-            "[milp] Solver returned status=%s (%s)",
-            result.status,
-            result.message,
-        )
+    from custom_components.hsem.planner.milp._solve import _run_highs
+
+    result, solver_stats = _run_highs(
+        c_obj,
+        A_ub,
+        b_ub,
+        A_eq,
+        b_eq,
+        bounds,
+        time_limit_s=_SOLVER_TIME_LIMIT_S,
+        m=m,
+        ec_off=ec_off,
+        ed_off=ed_off,
+        max_charge_per_slot=constraints["ec_ub_per_slot"],
+        ed_ub_per_slot=constraints["ed_ub_per_slot"],
+        integer_mode=integer_mode,
+        mip_rel_gap=mip_rel_gap,
+        mip_time_limit_s=mip_time_limit_s,
+    )
+    if result is None:
         return None
 
-    # ------------------------------------------------------------------
-    # Compute terminal-SoC credit at end-of-horizon (diagnostic).
-    # This matches cost_function.py's terminal_soc_value calculation:
-    # terminal_soc_value = (initial_kwh - final_kwh) * replacement_price
-    #
-    # The LP objective now INCLUDES this term (see c_obj construction
-    # above), so the solution itself already reflects this valuation.
-    # This post-hoc calculation is retained as a diagnostic consistency
-    # check and for the diagnostics dict.
-    # ------------------------------------------------------------------
     ec_sol = result.x[ec_off : ec_off + m]
     ed_sol = result.x[ed_off : ed_off + m]
 
-    # Compute final SoC from the LP solution
-    final_soc_kwh = current_kwh + float(np.sum(ec_sol)) - float(np.sum(ed_sol))
-    final_soc_kwh = max(0.0, min(final_soc_kwh, usable_kwh))  # clamp to bounds
-
-    # Terminal-SoC credit: positive when plan ends with less energy (penalty),
-    # negative when plan ends with more energy (credit).
-    terminal_soc_credit = 0.0
-    if replacement_price_per_kwh is not None and abs(replacement_price_per_kwh) > 1e-9:
-        terminal_soc_credit = (current_kwh - final_soc_kwh) * replacement_price_per_kwh
-        log_planner(
-            "debug",
-            "[milp] Terminal-SoC credit: initial=%.3f  final=%.3f  repl_price=%.4f  credit=%.4f",
-            current_kwh,
-            final_soc_kwh,
-            replacement_price_per_kwh,
-            terminal_soc_credit,
-        )
-
-    # Pre-compute curtailment solution (needed by both write-out and diagnostics)
-    curt_sol_full = result.x[curt_off : curt_off + m]
-
     # Import helpers here to avoid circular imports with the milp package __init__
     from custom_components.hsem.planner.milp._diagnostics import (
         _compute_milp_diagnostics,
+        _terminal_soc_credit,
     )
     from custom_components.hsem.planner.milp._write_results import (
         _write_milp_results_to_slots,
     )
 
+    terminal_soc_credit = _terminal_soc_credit(
+        ec_sol, ed_sol, current_kwh, usable_kwh, replacement_price_per_kwh
+    )
+
+    # Pre-compute curtailment solution (needed by both write-out and diagnostics)
+    curt_sol_full = result.x[curt_off : curt_off + m]
+
     # Write MILP decision variables into output slots
     out_slots = _write_milp_results_to_slots(
         slots,
@@ -670,6 +690,18 @@ def solve_milp(
         terminal_soc_credit,
         _min_action_kwh=_MIN_ACTION_KWH,
     )
+    diagnostics["solver"] = solver_stats
+
+    # Dual values → per-slot marginal energy value and load cost.
+    from custom_components.hsem.planner.milp._duals import _write_marginal_values
+
+    diagnostics["duals"] = _write_marginal_values(
+        out_slots, slots, future_idx, now, result, m, time_discount_rate
+    )
+    diagnostics["lp_structure_cache"] = {
+        "hit": lp_cache_hit,
+        **lp_structure_cache_stats(),
+    }
 
     return out_slots, diagnostics
 
@@ -677,22 +709,21 @@ def solve_milp(
 def is_scipy_available() -> bool:
     """Return ``True`` if scipy is importable in the current environment.
 
-    The import result is cached at module level so that the blocking
-    ``import scipy.optimize`` happens exactly once at import time rather
-    than on every planner run inside the Home Assistant event loop.
+    The first call imports ``scipy.optimize`` (about half a second) and
+    caches the result; :mod:`~custom_components.hsem.utils.prewarm` makes
+    that call on the executor at setup so integration import and the event
+    loop never pay it.
     """
+    global _SCIPY_AVAILABLE  # noqa: PLW0603 — process-wide import cache
+    if _SCIPY_AVAILABLE is None:
+        try:
+            import scipy.optimize  # noqa: F401
+
+            _SCIPY_AVAILABLE = True
+        except ImportError:
+            _SCIPY_AVAILABLE = False
     return _SCIPY_AVAILABLE
 
 
-# --- Module-level cache: computed once at import time --------------------
-def _check_scipy() -> bool:
-    """Check whether scipy is importable.  Called once at module load."""
-    try:
-        import scipy.optimize  # noqa: F401
-
-        return True
-    except ImportError:
-        return False
-
-
-_SCIPY_AVAILABLE: bool = _check_scipy()
+# ``None`` until the first is_scipy_available() call.
+_SCIPY_AVAILABLE: bool | None = None
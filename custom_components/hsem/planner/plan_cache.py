@@ -0,0 +1,249 @@
+"""Content-addressed memoization of :func:`run_planner`.
+
+``HSEMDataUpdateCoordinator._should_replan`` decides *when* a re-plan is
+warranted, but options reloads, forced recalculations and repeated event
+triggers often hand the planner an input that is identical to the last one
+apart from the wall-clock time inside the same slot.  Re-solving such an
+input only reproduces the plan already in hand.
+
+This module hashes a normalised view of the :class:`PlannerInput` and keeps
+the resulting :class:`PlannerOutput` in a small LRU:
+
+- ``now_iso`` is replaced by the start of the slot it falls in, so every
+  cycle inside one slot shares a key.  With an EV planned load enabled the
+  exact ``now_iso`` is kept: the EV planner sizes the current slot's charge
+  and charger power by the minutes left in it;
+- the battery SoC and the live PV / house power are bucketed
+  (``_SOC_BUCKET_PCT``, ``_LIVE_POWER_BUCKET_W``) so sensor jitter does not
+  defeat the cache;
+- all other floats are rounded to ``_FLOAT_DIGITS`` decimals, datetimes use
+  ISO format, and nested dataclasses / lists / dicts are walked;
+- the solar forecast corrector is represented by its serialised state.
+
+Every field of :class:`PlannerInput` is part of the key unless it is
+normalised above, so a new field is covered without touching this module.
+Because the key *is* the content, option changes that reach the planner
+produce a new key by construction; the coordinator still calls
+:meth:`PlanCache.invalidate` on an options reload, so no plan computed
+under the old options is served again.
+
+Entries are stored and returned as deep copies: the coordinator applies
+window hysteresis and freezes EV charger power on the output in place, and
+those edits must not leak into the cached plan.
+"""
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+from typing import Any
+
+from custom_components.hsem.models.planner_input import PlannerInput
+from custom_components.hsem.models.planner_output import PlannerOutput
+from custom_components.hsem.utils.logger import log_planner
+
+# A plan is reused only inside one slot; a couple of entries cover the
+# common alternation (e.g. an option toggled off and on again).
+_MAX_ENTRIES = 4
+
+# Battery SoC granularity (percentage points) of the key.
+_SOC_BUCKET_PCT = 0.5
+
+# Live PV / house power granularity (W) of the key.  Only the current slot
+# uses these values.
+_LIVE_POWER_BUCKET_W = 50.0
+
+# Decimals kept for every other float in the key.
+_FLOAT_DIGITS = 6
+
+# Fields that need a dedicated normalisation (see module docstring).
+_SPECIAL_FIELDS = frozenset(
+    {
+        "now_iso",
+        "battery_soc_pct",
+        "live_solar_production_w",
+        "live_house_consumption_w",
+        "solar_corrector",
+    }
+)
+
+
+def planner_input_fingerprint(inp: PlannerInput) -> str:
+    """Return a stable SHA-256 hex digest of the normalised *inp*."""
+    payload: dict[str, Any] = {
+        f.name: _normalise(getattr(inp, f.name))
+        for f in dataclasses.fields(inp)
+        if f.name not in _SPECIAL_FIELDS
+    }
+    payload["now_iso"] = (
+        inp.now_iso
+        if inp.ev_planned_load_enabled or inp.ev_second_planned_load_enabled
+        else _slot_start_iso(inp.now_iso, inp.interval_minutes)
+    )
+    payload["battery_soc_pct"] = _bucket(inp.battery_soc_pct, _SOC_BUCKET_PCT)
+    payload["live_solar_production_w"] = _bucket(
+        inp.live_solar_production_w, _LIVE_POWER_BUCKET_W
+    )
+    payload["live_house_consumption_w"] = _bucket(
+        inp.live_house_consumption_w, _LIVE_POWER_BUCKET_W
+    )
+    corrector = inp.solar_corrector
+    payload["solar_corrector"] = (
+        _normalise(corrector.to_dict()) if hasattr(corrector, "to_dict") else None
+    )
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def planning_fingerprint(inp: PlannerInput) -> str:
+    """Return the fingerprint of *inp* at slot resolution, live power excluded.
+
+    Used to decide whether a plan solved for an earlier input still fits a
+    newer one: the slot, SoC bucket, prices and forecasts must match, while
+    the live PV / house power (which moves every few seconds) and the time
+    inside the slot may differ.
+    """
+    return planner_input_fingerprint(
+        dataclasses.replace(
+            inp,
+            now_iso=_slot_start_iso(inp.now_iso, inp.interval_minutes),
+            live_solar_production_w=0.0,
+            live_house_consumption_w=0.0,
+        )
+    )
+
+
+class PlanCache:
+    """Bounded LRU of planner outputs keyed by input fingerprint.
+
+    Thread-safe: lookups run in the executor alongside the planner and
+    several config entries may plan concurrently.
+    """
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES) -> None:
+        """Create an empty cache holding at most *max_entries* plans."""
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, PlannerOutput] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.last_invalidation_reason: str | None = None
+        self.last_fingerprint: str | None = None
+        self.last_hit: bool | None = None
+
+    def run(
+        self,
+        inp: PlannerInput,
+        planner: Callable[[PlannerInput], PlannerOutput] | None = None,
+    ) -> PlannerOutput:
+        """Return the plan for *inp*, running *planner* only on a miss.
+
+        *planner* defaults to :func:`run_planner`.  The planner is a pure
+        function of its input, so every output is cached — when missing
+        data arrives later the input, and hence the key, changes.
+        """
+        key = planner_input_fingerprint(inp)
+        with self._lock:
+            self.last_fingerprint = key
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.last_hit = True
+                output = copy.deepcopy(cached)
+            else:
+                self.misses += 1
+                self.last_hit = False
+        if cached is not None:
+            log_planner("debug", "[plan_cache] hit %s — reusing plan", key[:12])
+            return output
+
+        if planner is None:
+            from custom_components.hsem.planner.engine_core import run_planner
+
+            planner = run_planner
+        output = planner(inp)
+        self._store(key, copy.deepcopy(output))
+        return output
+
+    def _store(self, key: str, output: PlannerOutput) -> None:
+        with self._lock:
+            self._entries[key] = output
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, reason: str) -> None:
+        """Drop every cached plan and count the invalidation."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            self.last_invalidation_reason = reason
+        log_planner("debug", "[plan_cache] invalidated (%s)", reason)
+
+    def stats(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot of the counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "entries": len(self._entries),
+                "invalidations": self.invalidations,
+                "last_invalidation_reason": self.last_invalidation_reason,
+                "last_hit": self.last_hit,
+                "last_fingerprint": (
+                    self.last_fingerprint[:12] if self.last_fingerprint else None
+                ),
+            }
+
+
+def _slot_start_iso(now_iso: str, interval_minutes: int) -> str:
+    """Floor *now_iso* to the start of its planner slot."""
+    try:
+        now = datetime.fromisoformat(now_iso)
+    except TypeError, ValueError:
+        return str(now_iso)
+    step = max(int(interval_minutes), 1)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    minutes = (now - midnight) // timedelta(minutes=1)
+    return (midnight + timedelta(minutes=minutes - minutes % step)).isoformat()
+
+
+def _bucket(value: float, size: float) -> int:
+    """Return the index of the *size*-wide bucket holding *value*."""
+    return round(float(value) / size)
+
+
+def _normalise(value: Any) -> Any:
+    """Return a JSON-friendly, rounding-stable view of *value*."""
+    if isinstance(value, bool) or value is None or isinstance(value, int | str):
+        return value
+    if isinstance(value, float):
+        return round(value, _FLOAT_DIGITS) + 0.0 if math.isfinite(value) else None
+    if isinstance(value, Enum):
+        return _normalise(value.value)
+    if isinstance(value, datetime | date | time):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            f.name: _normalise(getattr(value, f.name))
+            for f in dataclasses.fields(value)
+        }
+    if isinstance(value, dict):
+        return {str(k): _normalise(v) for k, v in value.items()}
+    if isinstance(value, set | frozenset):
+        return sorted((_normalise(v) for v in value), key=repr)
+    if isinstance(value, list | tuple):
+        return [_normalise(v) for v in value]
+    return repr(value)
@@ -0,0 +1,260 @@
+"""Rolling-horizon decomposition for multi-day planning horizons.
+
+With a week of price forecasts the LP grows with the horizon (672 slots
+at 15 minutes), although only the next day's decisions are ever applied
+before the planner runs again.  This stage splits the horizon in two:
+
+.. code-block:: text
+
+    now ──── head (default 24 h): solve_milp ────┬── tail: solve_dp ──────▶
+                                                 │  hourly blocks,
+              terminal-SoC value ◀── −dV/dE ─────┘  coarse SoC grid
+
+- The **head** is solved at full fidelity by :func:`solve_milp` (EV
+  co-optimisation, fuse, integer mode).  An EV deadline beyond the head is
+  pulled in to the head's last slot, as for any deadline past the horizon.
+- The **tail** is a reduced model: :func:`solve_dp` on a coarse SoC grid
+  over hourly blocks (merged and expanded back as in
+  :mod:`~custom_components.hsem.planner.horizon_compression`), with EV
+  loads fixed.  Its cost-to-go ``V(E)`` at the tail's first slot is passed back to the
+  head as the value of the energy the head leaves in the battery, through
+  the existing terminal-SoC price (``replacement_price_per_kwh``).  That
+  price is the slope ``−dV/dE`` at the tail's start energy, i.e. the
+  tail's first ``marginal_energy_value``.
+- The slope depends on where the head ends, so the two are iterated: the
+  head's end energy becomes the tail's start energy, until it moves by
+  less than one SoC step or *max_iterations* head solves have run.  The
+  tail is finally re-planned from the head's end energy, so the SoC is
+  continuous across the split.
+
+The head LP keeps the same size whatever the horizon length; the tail DP
+grows linearly but is cheap on its coarse blocks and grid, so a week-long lookahead
+costs about as much per cycle as a two-day one.  Opt-in via
+``hsem_planner_rolling_horizon``; takes precedence over horizon compression.
+
+Pure Python, no HA imports — testable with plain pytest.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.planner.dp_optimizer import solve_dp
+from custom_components.hsem.planner.horizon_compression import (
+    expand_block_plan,
+    merge_slot_blocks,
+    plan_horizon_blocks,
+)
+from custom_components.hsem.planner.milp_optimizer import solve_milp
+from custom_components.hsem.utils.datetime_utils import as_tz
+from custom_components.hsem.utils.logger import log_planner
+from custom_components.hsem.utils.misc import clamp_efficiency
+
+DEFAULT_HEAD_HOURS = 24.0
+DEFAULT_MAX_ITERATIONS = 3
+
+# The tail's reduced model: SoC intervals and block length (minutes).  A
+# 6-day tail of 15-minute slots plans in about 15 ms.
+DEFAULT_TAIL_SOC_LEVELS = 40
+DEFAULT_TAIL_BLOCK_MINUTES = 60
+
+# The MILP treats the first two hours of an active EV session as fixed
+# per-slot demand, so the head never gets shorter than that.
+_MIN_HEAD_HOURS = 2.0
+
+
+def split_horizon(
+    slots: list[PlannedSlot], now: datetime, head_hours: float = DEFAULT_HEAD_HOURS
+) -> int:
+    """Return the index of the first slot starting after the head window."""
+    cutoff = now + timedelta(hours=max(head_hours, _MIN_HEAD_HOURS))
+    for i, slot in enumerate(slots):
+        if as_tz(slot.start, now.tzinfo) >= cutoff:
+            return i
+    return len(slots)
+
+
+def _head_end_kwh(
+    head_slots: list[PlannedSlot], now: datetime, current_kwh: float, usable_kwh: float
+) -> float:
+    """Battery energy at the end of the head plan (storage side)."""
+    end = current_kwh
+    for slot in head_slots:
+        if as_tz(slot.end, now.tzinfo) > now:
+            end += slot.batteries_charged_kwh - slot.batteries_discharged_kwh
+    return min(max(end, 0.0), usable_kwh)
+
+
+def solve_milp_rolling(
+    slots: list[PlannedSlot],
+    now: datetime,
+    current_kwh: float,
+    usable_kwh: float,
+    max_charge_per_slot: float,
+    max_discharge_per_slot: float | None,
+    cycle_cost_per_kwh: float = 0.0,
+    charge_efficiency_pct: float = 97.0,
+    discharge_efficiency_pct: float = 97.0,
+    time_discount_rate: float = 1.0,
+    replacement_price_per_kwh: float | None = None,
+    *,
+    head_hours: float = DEFAULT_HEAD_HOURS,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    tail_soc_levels: int = DEFAULT_TAIL_SOC_LEVELS,
+    tail_block_minutes: int = DEFAULT_TAIL_BLOCK_MINUTES,
+    min_export_price: float = 0.0,
+    no_export: bool = False,
+    main_fuse_amps: float | None = None,
+    main_fuse_phases: int = 3,
+    max_grid_export_power_kw: float | None = None,
+    battery_export_min_price: float = 0.0,
+    **kwargs: Any,
+) -> tuple[list[PlannedSlot], dict] | None:
+    """Solve the head with ``solve_milp`` and the tail with ``solve_dp``.
+
+    Takes the same arguments as :func:`solve_milp` plus the decomposition
+    settings, and returns the same ``(slots, diagnostics)`` shape with one
+    slot per input slot.  ``diagnostics`` is the head solve's, with a
+    ``rolling_horizon`` entry reporting the split, the iterations and the
+    terminal value passed to the head.  Without a tail this is a plain
+    ``solve_milp`` call.
+    """
+    shared: dict[str, Any] = {
+        "cycle_cost_per_kwh": cycle_cost_per_kwh,
+        "charge_efficiency_pct": charge_efficiency_pct,
+        "discharge_efficiency_pct": discharge_efficiency_pct,
+        "time_discount_rate": time_discount_rate,
+        "min_export_price": min_export_price,
+        "no_export": no_export,
+        "main_fuse_amps": main_fuse_amps,
+        "main_fuse_phases": main_fuse_phases,
+        "max_grid_export_power_kw": max_grid_export_power_kw,
+        "battery_export_min_price": battery_export_min_price,
+    }
+    split = split_horizon(slots, now, head_hours)
+    head, tail = slots[:split], slots[split:]
+    groups = plan_horizon_blocks(tail, now, 0.0, tail_block_minutes)
+    blocks, weights = merge_slot_blocks(tail, groups)
+    stats: dict[str, Any] = {
+        "head_hours": head_hours,
+        "head_slots": len(head),
+        "tail_slots": len(tail),
+        "tail_blocks": len(blocks),
+        "iterations": 0,
+        "converged": True,
+    }
+
+    def solve_tail(start_kwh: float) -> tuple[list[PlannedSlot], dict] | None:
+        return solve_dp(
+            blocks,
+            now,
+            start_kwh,
+            usable_kwh,
+            max_charge_per_slot,
+            max_discharge_per_slot,
+            replacement_price_per_kwh=replacement_price_per_kwh,
+            soc_levels=tail_soc_levels,
+            slot_weights=weights,
+            **shared,
+        )
+
+    tail_kwh = min(max(current_kwh, 0.0), usable_kwh)
+    tail_result = solve_tail(tail_kwh) if tail and head else None
+    if tail_result is None:
+        result = solve_milp(
+            slots,
+            now,
+            current_kwh,
+            usable_kwh,
+            max_charge_per_slot,
+            max_discharge_per_slot,
+            replacement_price_per_kwh=replacement_price_per_kwh,
+            **shared,
+            **kwargs,
+        )
+        if result is not None:
+            result[1]["rolling_horizon"] = {
+                **stats,
+                "tail_slots": 0,
+                "tail_blocks": 0,
+            }
+        return result
+
+    def solve_head(
+        tail_plan: list[PlannedSlot],
+    ) -> tuple[list[PlannedSlot], dict] | None:
+        # Value of one more kWh at the tail's start, undiscounted.
+        stats["terminal_value_per_kwh"] = round(
+            max(tail_plan[0].marginal_energy_value or 0.0, 0.0), 4
+        )
+        stats["iterations"] += 1
+        return solve_milp(
+            head,
+            now,
+            current_kwh,
+            usable_kwh,
+            max_charge_per_slot,
+            max_discharge_per_slot,
+            replacement_price_per_kwh=stats["terminal_value_per_kwh"],
+            **shared,
+            **kwargs,
+        )
+
+    end_kwh = tail_kwh
+    head_result = solve_head(tail_result[0])
+    while head_result is not None:
+        end_kwh = _head_end_kwh(head_result[0], now, current_kwh, usable_kwh)
+        stats["converged"] = (
+            abs(end_kwh - tail_kwh) <= tail_result[1]["soc_step_kwh"] + 1e-9
+        )
+        if stats["converged"] or stats["iterations"] >= max_iterations:
+            break
+        tail_kwh = end_kwh
+        tail_result = solve_tail(tail_kwh)
+        if tail_result is None:
+            return None
+        head_result = solve_head(tail_result[0])
+    if head_result is None:
+        return None
+
+    # Re-plan the tail from where the head ends, so the SoC is continuous.
+    if abs(end_kwh - tail_kwh) > 1e-6:
+        tail_result = solve_tail(end_kwh)
+        if tail_result is None:
+            return None
+    head_slots, diagnostics = head_result
+    block_plan, tail_diag = tail_result
+    tail_slots = expand_block_plan(
+        tail,
+        groups,
+        block_plan,
+        max_charge_per_slot=max_charge_per_slot,
+        max_discharge_per_slot=(
+            max_discharge_per_slot if max_discharge_per_slot is not None else usable_kwh
+        ),
+        charge_eff=clamp_efficiency(charge_efficiency_pct),
+        discharge_eff=clamp_efficiency(discharge_efficiency_pct),
+        ev_co_optimised=False,
+    )
+    stats.update(
+        head_end_kwh=round(end_kwh, 3),
+        tail_objective=tail_diag["objective"],
+        tail_soc_levels=tail_diag["soc_levels"],
+    )
+    diagnostics["rolling_horizon"] = stats
+    log_planner(
+        "debug",
+        "[milp] Rolling horizon: head %d slots, tail %d slots in %d blocks, "
+        "%d iteration(s) "
+        "(converged=%s)  terminal value=%.4f/kWh  head end=%.3f kWh",
+        len(head),
+        len(tail),
+        len(blocks),
+        stats["iterations"],
+        stats["converged"],
+        stats["terminal_value_per_kwh"],
+        end_kwh,
+    )
+    return head_slots + tail_slots, diagnostics
@@ -0,0 +1,381 @@
+"""Array kernel for the battery SoC simulation.
+
+:func:`~custom_components.hsem.planner.soc_simulation.simulate_soc` walks one
+candidate's ``PlannedSlot`` list at a time.  The selector runs it once per
+candidate, so a cycle with ten candidates makes ten passes over the same
+time grid, each paying the per-slot attribute access, ``as_tz`` calls and
+debug formatting.
+
+:func:`simulate_soc_arrays` runs the same recurrence over a 2-D batch
+(``candidates × slots``).  The SoC chain is sequential in time, so only the
+charge clamp, discharge and capacity update run in a loop over slots (each
+a numpy operation over the candidate axis); net demand, grid flows and
+rounding are computed on whole arrays.  Past / current slots are decided
+once per column from epoch seconds.
+
+The kernel mirrors ``simulate_soc`` branch for branch — including the
+recommendation clean-ups (charge → wait when the battery is full, forced
+discharge → wait when nothing was discharged) and the 3- / 2-decimal
+rounding of the written fields — and is checked against it by a
+differential test.  **Any change to** ``simulate_soc`` **must be made here
+too.**
+
+:func:`simulate_soc_batch` is the ``PlannedSlot`` boundary: it packs the
+candidates into a batch via :class:`~custom_components.hsem.models.slot_frame.SlotFrame`,
+runs the kernel and writes the results back.  It falls back to per-candidate
+``simulate_soc`` for a single candidate (the scalar loop is faster there),
+when the candidates do not share one time grid, or when debug logging is on
+(so the per-slot trace still reaches ``hsem.log``).
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.models.slot_frame import SlotFrame
+from custom_components.hsem.planner.soc_simulation import simulate_soc
+from custom_components.hsem.utils.logger import HSEM_LOGGER
+from custom_components.hsem.utils.misc import clamp_efficiency
+from custom_components.hsem.utils.recommendations import (
+    CHARGE_RECS as _CHARGE_RECS,
+    Recommendations,
+)
+
+_WAIT = Recommendations.BatteriesWaitMode.value
+_FORCE_RECS = frozenset(
+    {
+        Recommendations.ForceBatteriesDischarge.value,
+        Recommendations.ForceExport.value,
+    }
+)
+
+# Fields read from / written back to the slots by ``simulate_soc_batch``.
+_INPUT_FIELDS = (
+    "solcast_pv_estimate_kwh",
+    "avg_house_consumption_kwh",
+    "ev_planned_load_kwh",
+    "ev_accounted_load_kwh",
+    "batteries_charged_kwh",
+    "batteries_discharged_kwh",
+    "grid_import_kwh",
+    "grid_export_kwh",
+)
+_OUTPUT_FIELDS = (
+    "batteries_charged_kwh",
+    "batteries_discharged_kwh",
+    "grid_import_kwh",
+    "grid_export_kwh",
+    "estimated_battery_capacity_kwh",
+    "estimated_battery_soc_pct",
+    "recommendation",
+)
+
+# Tolerance (in units of the last kept decimal) inside which a value is
+# treated as a rounding tie and re-rounded with Python's ``round``.
+_TIE_TOLERANCE = 1e-6
+
+
+@dataclass
+class SocArrays:
+    """Result of :func:`simulate_soc_arrays` (all ``candidates × slots``).
+
+    Attributes:
+        capacity_kwh: Usable kWh above the floor at slot end (3 decimals).
+        soc_pct: Absolute SoC (%) at slot end (2 decimals).
+        charged_kwh: Battery-side charge after clamping (3 decimals).
+        discharged_kwh: Energy removed from the battery (3 decimals).
+        grid_import_kwh: Grid import (3 decimals).
+        grid_export_kwh: Grid export (3 decimals).
+        recommendation: ``object`` array of recommendations after clean-up.
+    """
+
+    capacity_kwh: np.ndarray
+    soc_pct: np.ndarray
+    charged_kwh: np.ndarray
+    discharged_kwh: np.ndarray
+    grid_import_kwh: np.ndarray
+    grid_export_kwh: np.ndarray
+    recommendation: np.ndarray
+
+
+def simulate_soc_arrays(
+    start_s: np.ndarray,
+    end_s: np.ndarray,
+    now: datetime,
+    *,
+    pv_kwh: np.ndarray,
+    house_kwh: np.ndarray,
+    ev_planned_kwh: np.ndarray,
+    ev_accounted_kwh: np.ndarray,
+    charged_kwh: np.ndarray,
+    discharged_kwh: np.ndarray,
+    grid_import_kwh: np.ndarray,
+    grid_export_kwh: np.ndarray,
+    recommendation: np.ndarray,
+    current_kwh: float,
+    usable_kwh: float,
+    max_capacity_kwh: float,
+    max_charge_per_slot: float,
+    max_discharge_per_slot: float | None,
+    rated_kwh: float = 0.0,
+    end_of_discharge_soc_pct: float = 0.0,
+    charge_efficiency_pct: float = 100.0,
+    discharge_efficiency_pct: float = 100.0,
+    milp_prepopulated: np.ndarray | bool = False,
+) -> SocArrays:
+    """Forward-simulate SoC for a batch of candidates on one time grid.
+
+    ``start_s`` / ``end_s`` are the shared slot boundaries (epoch seconds,
+    length *n*).  The per-slot inputs are ``candidates × n`` arrays (a 1-D
+    array is treated as a single candidate); their meaning is that of the
+    same-named ``PlannedSlot`` fields.  The flow inputs are only read for
+    past slots (kept) and for ``milp_prepopulated`` rows (used verbatim).
+    ``milp_prepopulated`` is a bool or a per-candidate bool array.  The
+    remaining arguments are those of ``simulate_soc``.
+
+    Only the capacity chain runs slot by slot; everything that does not
+    depend on it (net demand, EV hold, the grid flows, rounding) is computed
+    on whole arrays before and after the loop.
+    """
+    # Work on time-major (slots × candidates) arrays so a slot is one row.
+    pv, house, ev_inj, ev_acc, chg_in, dis_in, gi_in, ge_in = (
+        np.ascontiguousarray(np.atleast_2d(np.asarray(a, dtype=np.float64)).T)
+        for a in (
+            pv_kwh,
+            house_kwh,
+            ev_planned_kwh,
+            ev_accounted_kwh,
+            charged_kwh,
+            discharged_kwh,
+            grid_import_kwh,
+            grid_export_kwh,
+        )
+    )
+    rec = np.atleast_2d(np.asarray(recommendation, dtype=object)).T.copy()
+    n, batch = chg_in.shape
+    prepop = np.broadcast_to(np.asarray(milp_prepopulated, dtype=bool), (batch,))
+
+    ce = clamp_efficiency(charge_efficiency_pct)
+    de = clamp_efficiency(discharge_efficiency_pct)
+    max_dis = np.inf if max_discharge_per_slot is None else max_discharge_per_slot
+
+    now_ts = now.timestamp()
+    future = np.asarray(end_s) > now_ts
+    current = future & (np.asarray(start_s) <= now_ts)
+
+    ev_load = ev_inj + ev_acc
+    net = house - ev_acc - pv
+    deficit = net > 0
+    is_charge = _rec_mask(rec, _CHARGE_RECS)
+    is_force = _rec_mask(rec, _FORCE_RECS)
+    hold = (ev_load > 1e-9) | (rec == _WAIT)
+    # Surplus-branch PV left after the EV; independent of the battery state.
+    pv_surplus = np.abs(net)
+    pv_for_ev = np.minimum(ev_load, pv_surplus)
+    pv_after_ev = np.maximum(pv_surplus - pv_for_ev, 0.0)
+    net_over_de = net / de
+
+    sched = np.zeros((n, batch))
+    discharge = np.zeros((n, batch))
+    cap_end = np.zeros((n, batch))
+    cleared = np.zeros((n, batch), dtype=bool)
+    pv_left = np.zeros((n, batch))
+    extra_in = np.zeros((n, batch))
+
+    cap = np.full(batch, float(current_kwh))
+    for t in np.flatnonzero(future).tolist():
+        if current[t]:
+            cap[:] = current_kwh
+        room = np.maximum(max_capacity_kwh - cap, 0.0)
+        chg = np.maximum(
+            np.minimum(np.minimum(chg_in[t], room), max_charge_per_slot), 0.0
+        )
+        clr = is_charge[t] & (chg <= 1e-9) & (room <= 1e-9)
+
+        # Deficit branch (net > 0).
+        max_dc = np.minimum(cap, max_dis)
+        dis = np.maximum(
+            np.where(is_force[t], max_dc, np.minimum(net_over_de[t], max_dc)), 0.0
+        )
+        dis[hold[t] | clr] = 0.0
+        dis = np.where(prepop, dis_in[t], np.where(deficit[t], dis, 0.0))
+
+        # Surplus branch (net <= 0): scheduled charge plus extra PV capture.
+        left = np.maximum(pv_after_ev[t] - np.minimum(chg / ce, pv_after_ev[t]), 0.0)
+        extra = np.maximum(
+            np.minimum(
+                np.minimum(left, np.maximum(room - chg, 0.0) / ce),
+                np.maximum(max_charge_per_slot - chg, 0.0) / ce,
+            ),
+            0.0,
+        )
+        stored = np.where(prepop | deficit[t], chg, chg + np.maximum(extra * ce, 0.0))
+
+        cap = np.minimum(np.maximum(cap + stored - dis, 0.0), usable_kwh)
+        sched[t] = chg
+        discharge[t] = dis
+        cap_end[t] = cap
+        cleared[t] = clr
+        pv_left[t] = left
+        extra_in[t] = extra
+
+    # --- Grid flows from the per-slot charge / discharge ---
+    hold |= cleared
+    house_from_battery = discharge * de
+    gi_d = np.maximum(net - house_from_battery, 0.0) + sched / ce + ev_load
+    ge_d = np.where(hold, 0.0, np.maximum(house_from_battery - net, 0.0))
+    grid_charge = sched - np.minimum(sched / ce, pv_after_ev) * ce
+    gi_s = np.where(grid_charge > 1e-9, grid_charge / ce, 0.0) + np.maximum(
+        ev_load - pv_for_ev, 0.0
+    )
+    ge_s = np.maximum(pv_left - extra_in, 0.0)
+
+    # --- Outputs: past slots keep their flows, prepopulated rows too ---
+    fut = future[:, None]
+    flows = fut & ~prepop
+    cap_out = np.where(fut, _round(cap_end, 3), 0.0)
+    if rated_kwh > 1e-9:
+        floor_kwh = rated_kwh * end_of_discharge_soc_pct / 100
+        soc_out = np.where(fut, _round((cap_end + floor_kwh) / rated_kwh * 100, 2), 0.0)
+    elif usable_kwh > 1e-9:
+        soc_out = np.where(fut, _round(cap_end / usable_kwh * 100, 2), 0.0)
+    else:
+        soc_out = np.zeros((n, batch))
+    chg_out = np.where(fut, _round(sched, 3), chg_in)
+    dis_out = np.where(flows, _round(discharge, 3), dis_in)
+    gi_out = np.where(flows, _round(np.where(deficit, gi_d, gi_s), 3), gi_in)
+    ge_out = np.where(flows, _round(np.where(deficit, ge_d, ge_s), 3), ge_in)
+
+    rec[cleared | (fut & is_force & (discharge <= 1e-9))] = _WAIT
+
+    return SocArrays(
+        capacity_kwh=cap_out.T,
+        soc_pct=soc_out.T,
+        charged_kwh=chg_out.T,
+        discharged_kwh=dis_out.T,
+        grid_import_kwh=gi_out.T,
+        grid_export_kwh=ge_out.T,
+        recommendation=rec.T,
+    )
+
+
+def simulate_soc_batch(
+    candidates: list[list[PlannedSlot]],
+    now: datetime,
+    current_kwh: float,
+    usable_kwh: float,
+    max_capacity_kwh: float,
+    max_charge_per_slot: float,
+    max_discharge_per_slot: float | None,
+    rated_kwh: float = 0.0,
+    end_of_discharge_soc_pct: float = 0.0,
+    charge_efficiency_pct: float = 100.0,
+    discharge_efficiency_pct: float = 100.0,
+    *,
+    milp_prepopulated: list[bool] | None = None,
+) -> None:
+    """Simulate every slot list in *candidates* in place, as ``simulate_soc``.
+
+    ``milp_prepopulated`` gives the per-candidate flag (default all
+    ``False``).  Writes the same fields ``simulate_soc`` writes.
+    """
+    flags = milp_prepopulated or [False] * len(candidates)
+    if (
+        len(candidates) < 2
+        or HSEM_LOGGER.isEnabledFor(logging.DEBUG)
+        or not _same_grid(candidates)
+    ):
+        for slots, flag in zip(candidates, flags, strict=True):
+            simulate_soc(
+                slots,
+                now,
+                current_kwh,
+                usable_kwh,
+                max_capacity_kwh,
+                max_charge_per_slot,
+                max_discharge_per_slot,
+                rated_kwh=rated_kwh,
+                end_of_discharge_soc_pct=end_of_discharge_soc_pct,
+                charge_efficiency_pct=charge_efficiency_pct,
+                discharge_efficiency_pct=discharge_efficiency_pct,
+                milp_prepopulated=flag,
+            )
+        return
+
+    first = SlotFrame.from_slots(candidates[0], fields=_INPUT_FIELDS)
+    frames = [first] + [
+        SlotFrame.from_slots(slots, fields=_INPUT_FIELDS, grid=first)
+        for slots in candidates[1:]
+    ]
+
+    def _stack(name: str) -> np.ndarray:
+        return np.stack([f[name] for f in frames])
+
+    result = simulate_soc_arrays(
+        frames[0].start_s,
+        frames[0].end_s,
+        now,
+        pv_kwh=_stack("solcast_pv_estimate_kwh"),
+        house_kwh=_stack("avg_house_consumption_kwh"),
+        ev_planned_kwh=_stack("ev_planned_load_kwh"),
+        ev_accounted_kwh=_stack("ev_accounted_load_kwh"),
+        charged_kwh=_stack("batteries_charged_kwh"),
+        discharged_kwh=_stack("batteries_discharged_kwh"),
+        grid_import_kwh=_stack("grid_import_kwh"),
+        grid_export_kwh=_stack("grid_export_kwh"),
+        recommendation=np.stack([f.recommendation for f in frames]),
+        current_kwh=current_kwh,
+        usable_kwh=usable_kwh,
+        max_capacity_kwh=max_capacity_kwh,
+        max_charge_per_slot=max_charge_per_slot,
+        max_discharge_per_slot=max_discharge_per_slot,
+        rated_kwh=rated_kwh,
+        end_of_discharge_soc_pct=end_of_discharge_soc_pct,
+        charge_efficiency_pct=charge_efficiency_pct,
+        discharge_efficiency_pct=discharge_efficiency_pct,
+        milp_prepopulated=np.asarray(flags, dtype=bool),
+    )
+    for row, (slots, frame) in enumerate(zip(candidates, frames, strict=True)):
+        frame.columns["batteries_charged_kwh"] = result.charged_kwh[row]
+        frame.columns["batteries_discharged_kwh"] = result.discharged_kwh[row]
+        frame.columns["grid_import_kwh"] = result.grid_import_kwh[row]
+        frame.columns["grid_export_kwh"] = result.grid_export_kwh[row]
+        frame.columns["estimated_battery_capacity_kwh"] = result.capacity_kwh[row]
+        frame.columns["estimated_battery_soc_pct"] = result.soc_pct[row]
+        frame.recommendation = result.recommendation[row]
+        frame.write_slots(slots, fields=_OUTPUT_FIELDS)
+
+
+def _same_grid(candidates: list[list[PlannedSlot]]) -> bool:
+    """Return True when every candidate has the first one's slot boundaries."""
+    first = candidates[0]
+    return all(
+        len(slots) == len(first)
+        and all(
+            a.start == b.start and a.end == b.end
+            for a, b in zip(slots, first, strict=True)
+        )
+        for slots in candidates[1:]
+    )
+
+
+def _rec_mask(rec: np.ndarray, values: frozenset[str]) -> np.ndarray:
+    """Return a boolean mask of cells whose recommendation is in *values*."""
+    mask: np.ndarray = np.vectorize(values.__contains__, otypes=[bool])(rec)
+    return mask
+
+
+def _round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Round like Python's ``round`` (numpy alone differs near ties)."""
+    out: np.ndarray = np.round(values, ndigits)
+    scaled = np.abs(values) * 10.0**ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < _TIE_TOLERANCE
+    if near_tie.any():
+        out = out.copy()
+        out[near_tie] = [round(v, ndigits) for v in values[near_tie].tolist()]
+    return out
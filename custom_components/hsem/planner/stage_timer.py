@@ -0,0 +1,79 @@
+"""Per-stage wall-clock and CPU timing of :func:`run_planner`.
+
+``run_planner`` calls :meth:`StageTimer.mark` at the end of each stage; the
+elapsed time since the previous mark is booked to that stage.  With
+profiling disabled :func:`stage_timer` returns a shared no-op timer, so the
+instrumentation costs one empty method call per stage.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from custom_components.hsem.models.planner_profile import PlannerProfile
+
+# Keys copied from the MILP ``diagnostics["solver"]`` dict into the profile.
+_LP_KEYS = ("n_vars", "n_eq_rows", "n_ub_rows", "nnz", "iterations", "mode")
+
+
+class StageTimer:
+    """Books wall-clock and CPU time to consecutive planner stages."""
+
+    __slots__ = ("_cpu", "_profile", "_wall")
+
+    def __init__(self) -> None:
+        """Start timing the first stage now."""
+        self._profile = PlannerProfile()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def mark(self, stage: str) -> None:
+        """Close *stage* and start timing the next one."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        profile = self._profile
+        profile.wall_ms[stage] = round(
+            profile.wall_ms.get(stage, 0.0) + (wall - self._wall) * 1000.0, 3
+        )
+        profile.cpu_ms[stage] = round(
+            profile.cpu_ms.get(stage, 0.0) + (cpu - self._cpu) * 1000.0, 3
+        )
+        self._wall, self._cpu = wall, cpu
+
+    def record_lp(self, diagnostics: dict[str, Any] | None) -> None:
+        """Copy the LP size and iteration count from MILP *diagnostics*."""
+        solver = (diagnostics or {}).get("solver")
+        if not solver:
+            return
+        lp = {key: solver.get(key) for key in _LP_KEYS}
+        wall_s = solver.get("wall_time_s")
+        lp["solve_ms"] = round(wall_s * 1000.0, 3) if wall_s is not None else None
+        self._profile.lp = lp
+
+    def profile(self) -> PlannerProfile | None:
+        """Return the timings recorded so far."""
+        return self._profile
+
+
+class _NullStageTimer:
+    """Stand-in for :class:`StageTimer` when profiling is disabled."""
+
+    __slots__ = ()
+
+    def mark(self, stage: str) -> None:
+        """Do nothing."""
+
+    def record_lp(self, diagnostics: dict[str, Any] | None) -> None:
+        """Do nothing."""
+
+    def profile(self) -> PlannerProfile | None:
+        """Return ``None``: nothing was recorded."""
+        return None
+
+
+_NULL_TIMER = _NullStageTimer()
+
+
+def stage_timer(enabled: bool) -> StageTimer | _NullStageTimer:
+    """Return a running :class:`StageTimer`, or the no-op timer."""
+    return StageTimer() if enabled else _NULL_TIMER
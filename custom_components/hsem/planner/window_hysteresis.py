@@ -10,6 +10,7 @@ from custom_components.hsem.utils.logger import log_planner
 from custom_components.hsem.utils.recommendations import (
     CHARGE_RECS as _CHARGE_RECS,
     DISCHARGE_RECS as _DISCHARGE_RECS,
+    Recommendations,
 )
 
 # ---------------------------------------------------------------------------
@@ -38,6 +39,11 @@ def apply_window_hysteresis(
     ``missing_input_entities``, ``None``) are never held — only actionable
     recommendations are subject to the hold timer.
 
+    When the current slot carries a ``marginal_energy_value`` (optimizer
+    dual), a held battery action that loses money at the margin is not
+    held: charging at a price above the value of stored energy, or
+    discharging at a price below it (see :func:`_hold_loses_money`).
+
     Args:
         slots:
             Ordered list of planned slots (mutated in place).
@@ -95,6 +101,21 @@ def apply_window_hysteresis(
 
     # Recommendation changed — check hold time
     elapsed_minutes = (now - previous_current_slot_start).total_seconds() / 60.0
+    if elapsed_minutes < window_hysteresis_minutes and _hold_loses_money(
+        current_slot, previous_current_recommendation
+    ):
+        log_planner(
+            "debug",
+            "[window_hysteresis] Not holding '%s' on current slot: marginal "
+            "energy value %.4f makes it uneconomic (import=%.4f export=%.4f). "
+            "Switching to '%s'.",
+            previous_current_recommendation,
+            current_slot.marginal_energy_value,
+            current_slot.price.import_price,
+            current_slot.price.export_price,
+            new_rec,
+        )
+        return new_rec, new_start
     if elapsed_minutes < window_hysteresis_minutes:
         # Hold the previous recommendation
         log_planner(
@@ -132,3 +153,31 @@ def _rec_category(rec: str | None) -> str:
     if rec in _DISCHARGE_RECS:
         return "discharge"
     return "neutral"
+
+
+def _hold_loses_money(slot: PlannedSlot, held_rec: str) -> bool:
+    """Return True when holding *held_rec* on *slot* loses money at the margin.
+
+    Compares the slot's ``marginal_energy_value`` — what one more kWh in the
+    battery is worth to the plan — with the price the held action trades
+    it at: grid charging pays the import price, solar charging forgoes the
+    export price, discharging saves the import price and exporting earns
+    the export price.  Conversion losses are ignored.  Without a marginal
+    value (heuristic plan, integer-mode MILP) the hold always applies.
+    """
+    value = slot.marginal_energy_value
+    if value is None:
+        return False
+    price = slot.price
+    if held_rec == Recommendations.BatteriesChargeGrid.value:
+        return price.import_price > value + 1e-6
+    if held_rec == Recommendations.BatteriesChargeSolar.value:
+        return price.export_price > value + 1e-6
+    if held_rec == Recommendations.BatteriesDischargeMode.value:
+        return price.import_price < value - 1e-6
+    if held_rec in (
+        Recommendations.ForceBatteriesDischarge.value,
+        Recommendations.ForceExport.value,
+    ):
+        return price.export_price < value - 1e-6
+    return False
@@ -75,6 +75,9 @@ from custom_components.hsem.custom_sensors.ocpp_sensors import (
 from custom_components.hsem.custom_sensors.plan_explanation_sensor import (
     HSEMPlanExplanationSensor,
 )
+from custom_components.hsem.custom_sensors.planner_profile_sensor import (
+    HSEMPlannerProfileSensor,
+)
 from custom_components.hsem.custom_sensors.prediction_accuracy_sensor import (
     HSEMPredictionAccuracySensor,
 )
@@ -166,6 +169,9 @@ async def async_setup_entry(  # NOSONAR -- HA platform callback, must be async
         config_entry, coordinator
     )
 
+    # Planner profile sensor — rolling per-stage planner timings.
+    planner_profile_sensor = HSEMPlannerProfileSensor(config_entry, coordinator)
+
     # Financial sensors — export income, import cost, and net grid balance.
     export_income_sensor = HSEMExportIncomeSensor(config_entry, coordinator)
     import_cost_sensor = HSEMImportCostSensor(config_entry, coordinator)
@@ -208,6 +214,7 @@ async def async_setup_entry(  # NOSONAR -- HA platform callback, must be async
             pv_curtailment_sensor,
             daily_plan_vs_actual_sensor,
             effective_discharge_floor_sensor,
+            planner_profile_sensor,
             savings_sensor,
             export_income_sensor,
             import_cost_sensor,
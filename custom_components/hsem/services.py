@@ -1,12 +1,14 @@
 """Service handlers for the HSEM integration.
 
-This module implements the five HSEM services:
+This module implements the six HSEM services:
 
 - ``force_recalculation`` — Re-run the full planning pipeline immediately.
 - ``set_temporary_override`` — Force a specific working mode on the select entity.
 - ``clear_override`` — Reset the force-mode select to ``"auto"``.
 - ``export_diagnostics`` — Return a structured diagnostics dump as service response.
 - ``create_dashboard`` — Log the path to the bundled dashboard YAML.
+- ``simulate`` — Re-plan what-if variants of the last planner input and
+  return their plans as service response, without touching hardware.
 
 All services are integration-level actions; the coordinator is looked up from
 the only configured HSEM entry.  Service schemas are defined in ``services.yaml``.
@@ -31,6 +33,11 @@ from custom_components.hsem.utils.logger import HSEM_LOGGER as _LOGGER
 from custom_components.hsem.utils.sensornames.diagnostics import (
     get_force_working_mode_selector_entity_id,
 )
+from custom_components.hsem.utils.what_if import (
+    MAX_SCENARIOS,
+    Scenario,
+    run_scenarios,
+)
 
 # ---------------------------------------------------------------------------
 # Supported override modes
@@ -55,6 +62,7 @@ SERVICE_SET_TEMPORARY_OVERRIDE = "set_temporary_override"
 SERVICE_CLEAR_OVERRIDE = "clear_override"
 SERVICE_EXPORT_DIAGNOSTICS = "export_diagnostics"
 SERVICE_CREATE_DASHBOARD = "create_dashboard"
+SERVICE_SIMULATE = "simulate"
 
 # ---------------------------------------------------------------------------
 # Voluptuous schemas for input validation
@@ -82,6 +90,24 @@ SCHEMA_CREATE_DASHBOARD = vol.Schema(
     }
 )
 
+SCHEMA_SIMULATE = vol.Schema(
+    {
+        vol.Required("scenarios"): vol.All(
+            [
+                vol.Schema(
+                    {
+                        vol.Optional("name"): vol.All(
+                            vol.Coerce(str), vol.Length(min=1)
+                        ),
+                        vol.Optional("overrides", default={}): dict,
+                    }
+                )
+            ],
+            vol.Length(min=1, max=MAX_SCENARIOS),
+        ),
+    }
+)
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -333,6 +359,60 @@ async def async_handle_create_dashboard(
     return result
 
 
+async def async_handle_simulate(
+    call: ServiceCall,
+) -> dict[str, Any]:  # NOSONAR
+    """Plan what-if scenarios against the most recent planner input.
+
+    Each scenario replaces a few :class:`PlannerInput` fields on the last
+    cycle's input and is planned with the same prices, forecasts and
+    battery state.  Nothing is applied to the inverter and the coordinator
+    state is left untouched.
+
+    Args:
+        call: The service call with a ``scenarios`` list in ``data``; each
+            entry has an optional ``name`` and an ``overrides`` dict.
+            ``call.hass`` provides the Home Assistant instance.
+
+    Returns:
+        A dict with the snapshot time (``now``) and one result per scenario
+        (``scenarios``): winner, scores and a compact per-slot schedule.
+
+    Raises:
+        ServiceValidationError: When the coordinator is not found or a
+            scenario overrides an unknown or snapshot field.
+        HomeAssistantError: When no planner cycle has completed yet.
+    """
+    coordinator = _get_coordinator(call.hass)
+    if coordinator is None:
+        raise ServiceValidationError(
+            "HSEM coordinator not found — integration may not be configured."
+        )
+    planner_input = getattr(coordinator, "_last_planner_input", None)
+    if planner_input is None:
+        raise HomeAssistantError(
+            "HSEM simulate: no planner cycle has completed yet. "
+            "Wait for the first update cycle to finish."
+        )
+
+    try:
+        scenarios = [
+            Scenario(
+                name=raw.get("name", f"scenario_{index + 1}"),
+                overrides=dict(raw["overrides"]),
+            )
+            for index, raw in enumerate(call.data["scenarios"])
+        ]
+    except ValueError as err:
+        raise ServiceValidationError(f"HSEM simulate: {err}") from err
+
+    results = await call.hass.async_add_executor_job(
+        run_scenarios, planner_input, scenarios
+    )
+    _LOGGER.info("HSEM service: simulate completed — %d scenario(s)", len(results))
+    return {"now": planner_input.now_iso, "scenarios": results}
+
+
 # ---------------------------------------------------------------------------
 # Service registration
 # ---------------------------------------------------------------------------
@@ -363,6 +443,11 @@ SERVICE_HANDLER_MAP: dict[str, tuple[vol.Schema, Any, SupportsResponse]] = {
         async_handle_set_temporary_override,
         SupportsResponse.NONE,
     ),
+    SERVICE_SIMULATE: (
+        SCHEMA_SIMULATE,
+        async_handle_simulate,
+        SupportsResponse.ONLY,
+    ),
 }
 
 
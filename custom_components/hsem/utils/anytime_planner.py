@@ -0,0 +1,281 @@
+"""Deadline-aware ("anytime") planner orchestration.
+
+A full planner run includes the MILP candidate, which can take seconds on
+slow hardware (and up to the HiGHS time budget).  The coordinator waits for
+it before writing to the inverter, so a slow solve delays actuation at the
+slot boundary.
+
+:class:`AnytimePlanner` (opt-in, ``hsem_planner_anytime``) runs a re-plan
+as two executor jobs started together:
+
+- the full solve, through the caller's planner (plan cache, worker process);
+- a heuristic run of the same input with
+  :attr:`~custom_components.hsem.models.planner_input.PlannerInput.planner_heuristic_only`
+  set, which skips the MILP and plans with the rule-based candidates and
+  the numpy DP candidate only.
+
+Both get the whole deadline, so a plan is applied after ``deadline_s``
+unless the heuristic run alone takes longer.  A full solve that meets the
+deadline is used and the heuristic result is dropped (a job still queued
+is cancelled).  Otherwise the heuristic plan is returned, and when the full solve
+completes later the optimal plan is held for the caller
+(:meth:`AnytimePlanner.take_optimal`) and ``on_optimal`` is called so the
+coordinator can run another cycle to swap it in.  A newer re-plan supersedes
+a pending solve; its result is then dropped (the plan cache still keeps it).
+A held plan whose slot, SoC bucket, prices or forecasts no longer match the
+swap cycle's input is dropped as stale and the cycle re-plans instead
+(:func:`~custom_components.hsem.planner.plan_cache.planning_fingerprint`).
+
+The module has no Home Assistant imports; executor jobs go through the
+running loop's default executor, which Home Assistant sets to its own pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import time
+from collections.abc import Callable
+from dataclasses import replace
+from typing import Any
+
+from custom_components.hsem.models.planner_input import PlannerInput
+from custom_components.hsem.models.planner_output import PlannerOutput
+from custom_components.hsem.planner.candidate_generator import CANDIDATE_MILP
+from custom_components.hsem.planner.plan_cache import planning_fingerprint
+from custom_components.hsem.utils.logger import log_planner
+
+# Default wait for the full solve before falling back (seconds).
+DEFAULT_DEADLINE_S = 1.0
+
+MODE_OPTIMAL = "optimal"
+MODE_HEURISTIC = "heuristic"
+
+
+def _timed(
+    planner: Callable[[PlannerInput], PlannerOutput], inp: PlannerInput
+) -> tuple[PlannerOutput, float]:
+    """Run *planner* on *inp*; return the output and its wall-clock ms."""
+    started = time.perf_counter()
+    output = planner(inp)
+    return output, round((time.perf_counter() - started) * 1000.0, 1)
+
+
+class AnytimePlanner:
+    """Race a full planner run against a deadline with a heuristic fallback.
+
+    Not thread-safe: every method runs on the event loop.
+    """
+
+    def __init__(self) -> None:
+        """Create an orchestrator with no pending solve."""
+        self._generation = 0
+        self._pending: tuple[PlannerInput, PlannerOutput] | None = None
+        self.mode: str | None = None
+        self.deadline_s = DEFAULT_DEADLINE_S
+        self.optimal_plans = 0
+        self.heuristic_plans = 0
+        self.swaps = 0
+        self.superseded = 0
+        self.stale = 0
+        self.errors = 0
+        self.last_heuristic_ms: float | None = None
+        self.last_optimal_ms: float | None = None
+        self.last_optimal_has_milp: bool | None = None
+        self.last_error: str | None = None
+
+    @property
+    def has_optimal(self) -> bool:
+        """Return True when a background solve finished and awaits a swap."""
+        return self._pending is not None
+
+    @property
+    def serving_heuristic(self) -> bool:
+        """Return True while the applied plan is the heuristic fallback."""
+        return self.mode == MODE_HEURISTIC
+
+    def take_optimal(
+        self, current: PlannerInput
+    ) -> tuple[PlannerInput, PlannerOutput] | None:
+        """Return and clear the pending optimal plan and the input it solved.
+
+        A pending plan that no longer fits *current* (another slot, SoC
+        bucket, prices or forecasts) is dropped and ``None`` is returned, so
+        the caller re-plans with its fresh input.
+        """
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return None
+        if planning_fingerprint(pending[0]) != planning_fingerprint(current):
+            self.stale += 1
+            log_planner(
+                "debug",
+                "[anytime] dropping optimal plan solved for %s: the planning "
+                "input changed since",
+                pending[0].now_iso,
+            )
+            return None
+        self.mode = MODE_OPTIMAL
+        self.swaps += 1
+        return pending
+
+    async def async_plan(
+        self,
+        inp: PlannerInput,
+        planner: Callable[[PlannerInput], PlannerOutput],
+        *,
+        deadline_s: float = DEFAULT_DEADLINE_S,
+        on_optimal: Callable[[], None] | None = None,
+    ) -> PlannerOutput:
+        """Return the full plan for *inp* if ready within *deadline_s*.
+
+        The heuristic run starts together with the full solve, so otherwise
+        its plan is returned at the deadline (or as soon as it finishes,
+        when it takes longer) and the full solve continues in the
+        background; ``on_optimal`` is called on the event loop once the
+        optimal plan can be taken with :meth:`take_optimal`.
+
+        A full solve that fails falls back to the heuristic plan.
+
+        Raises:
+            Exception: Whatever *planner* raised, when the heuristic run
+                failed as well.
+        """
+        from custom_components.hsem.planner.engine_core import run_planner
+
+        loop = asyncio.get_running_loop()
+        self._generation += 1
+        generation = self._generation
+        self._pending = None
+        self.deadline_s = deadline_s
+
+        full = loop.run_in_executor(None, _timed, planner, inp)
+        # The planner caches derived values on the battery schedules; the
+        # concurrent heuristic run gets copies of its own.
+        heuristic = loop.run_in_executor(
+            None,
+            _timed,
+            run_planner,
+            replace(
+                inp,
+                planner_heuristic_only=True,
+                battery_schedules=[copy.copy(s) for s in inp.battery_schedules],
+            ),
+        )
+        done, _ = await asyncio.wait({full}, timeout=deadline_s)
+        if not done:
+            # Past the deadline: apply whichever plan is ready first.
+            done, _ = await asyncio.wait(
+                {full, heuristic}, return_when=asyncio.FIRST_COMPLETED
+            )
+        if full in done and full.exception() is None:
+            heuristic.cancel()
+            return self._use_optimal(*full.result())
+
+        try:
+            output, self.last_heuristic_ms = await heuristic
+        except Exception as err:  # noqa: BLE001 — fall back to the full solve
+            self._record_error(f"heuristic: {type(err).__name__}: {err}")
+            try:
+                result = await full
+            except Exception as full_err:
+                self._record_error(f"optimizer: {type(full_err).__name__}: {full_err}")
+                raise
+            return self._use_optimal(*result)
+
+        if full.done():
+            if (failure := full.exception()) is None:
+                return self._use_optimal(*full.result())
+            self._record_error(f"optimizer: {type(failure).__name__}: {failure}")
+            reason = "the optimizer failed"
+        else:
+            full.add_done_callback(
+                lambda fut: self._on_full_done(fut, inp, generation, on_optimal)
+            )
+            reason = (
+                f"the optimizer did not finish within {deadline_s:g} s; "
+                "the optimal plan follows when it does"
+            )
+        self.mode = MODE_HEURISTIC
+        self.heuristic_plans += 1
+        output.warnings.append(f"Heuristic plan: {reason}")
+        log_planner(
+            "info",
+            "[anytime] applying heuristic plan '%s' (%.0f ms): %s",
+            output.winner_name,
+            self.last_heuristic_ms,
+            reason,
+        )
+        return output
+
+    def _use_optimal(self, output: PlannerOutput, elapsed_ms: float) -> PlannerOutput:
+        """Book a full-solve plan returned within the deadline."""
+        self.mode = MODE_OPTIMAL
+        self.optimal_plans += 1
+        self.last_optimal_ms = elapsed_ms
+        self.last_optimal_has_milp = _has_milp(output)
+        return output
+
+    def _on_full_done(
+        self,
+        fut: asyncio.Future[tuple[PlannerOutput, float]],
+        inp: PlannerInput,
+        generation: int,
+        on_optimal: Callable[[], None] | None,
+    ) -> None:
+        """Hold a late optimal plan for :meth:`take_optimal`."""
+        if fut.cancelled():
+            return
+        if (err := fut.exception()) is not None:
+            self._record_error(f"optimizer: {type(err).__name__}: {err}")
+            return
+        output, self.last_optimal_ms = fut.result()
+        if generation != self._generation:
+            self.superseded += 1
+            log_planner(
+                "debug",
+                "[anytime] optimal plan finished after %.0f ms but a newer "
+                "re-plan superseded it",
+                self.last_optimal_ms,
+            )
+            return
+        self._pending = (inp, output)
+        self.optimal_plans += 1
+        self.last_optimal_has_milp = _has_milp(output)
+        log_planner(
+            "info",
+            "[anytime] optimal plan '%s' ready after %.0f ms (heuristic %.0f ms)",
+            output.winner_name,
+            self.last_optimal_ms,
+            self.last_heuristic_ms,
+        )
+        if on_optimal is not None:
+            on_optimal()
+
+    def _record_error(self, message: str) -> None:
+        self.errors += 1
+        self.last_error = message
+        log_planner("warning", "[anytime] %s", message)
+
+    def stats(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot of the counters and timings."""
+        return {
+            "mode": self.mode,
+            "deadline_s": self.deadline_s,
+            "last_heuristic_ms": self.last_heuristic_ms,
+            "last_optimal_ms": self.last_optimal_ms,
+            "last_optimal_has_milp": self.last_optimal_has_milp,
+            "optimal_plans": self.optimal_plans,
+            "heuristic_plans": self.heuristic_plans,
+            "swaps": self.swaps,
+            "superseded": self.superseded,
+            "stale": self.stale,
+            "pending": self.has_optimal,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+def _has_milp(output: PlannerOutput) -> bool:
+    """Return True when the MILP candidate took part in *output*."""
+    return any(c.name == CANDIDATE_MILP for c in output.candidates)
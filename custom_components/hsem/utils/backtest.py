@@ -0,0 +1,636 @@
+"""Historical backtest: replay weeks or months of recorded data through HSEM.
+
+:func:`run_backtest` steps through a :class:`~custom_components.hsem.utils.backtest_data.BacktestSeries`
+slot by slot, the way the coordinator does live:
+
+1. Build a :class:`PlannerInput` for the slot from a template (battery and
+   planner settings), the realised SoC, the recorded prices and Solcast
+   forecast for the planning horizon, and 1/3/7/14-day hourly consumption
+   averages computed from the load *before* the slot's day.
+2. Run :func:`~custom_components.hsem.planner.run_planner` (every
+   ``replan_every`` slots; the plan is reused in between) and keep the
+   winner name and score for plan hysteresis, as the coordinator does.
+3. Realise the slot: the planned recommendation and charge are replayed
+   through :func:`~custom_components.hsem.planner.soc_simulation.simulate_soc`
+   with the *actual* PV and load, which yields the grid flows and the SoC
+   carried into the next slot.
+4. Book the realised flows in a :class:`FinancialTracker` and a
+   :class:`SavingsTracker`, fed exactly as the coordinator feeds them.
+
+Prices are taken as known for the whole horizon (day-ahead prices are
+published before the day starts) and the PV forecast is the single recorded
+forecast per slot.  EV planned loads and the solar forecast corrector are
+not simulated.
+
+:func:`run_sweep` runs one backtest per :class:`BacktestConfig` in worker
+processes; :func:`parameter_grid` builds the configs for a cartesian sweep,
+e.g. over ``battery_cycle_cost_per_kwh``, ``planner_hysteresis_percentage``
+and ``solcast_likelihood``.  ``scripts/backtest.py`` is the command-line
+front end.
+"""
+
+from __future__ import annotations
+
+import csv
+import dataclasses
+import itertools
+import multiprocessing
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from custom_components.hsem.models.financial_tracker import (
+    FinancialDayEntry,
+    FinancialTracker,
+)
+from custom_components.hsem.models.hourly_consumption_average import (
+    HourlyConsumptionAverage,
+)
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.models.planner_input import PlannerInput
+from custom_components.hsem.models.planner_output import PlannerOutput
+from custom_components.hsem.models.price_point import PricePoint
+from custom_components.hsem.models.savings_tracker import SavingsTracker
+from custom_components.hsem.models.solcast_slot import SolcastSlot
+from custom_components.hsem.utils.backtest_data import PV_LIKELIHOODS, BacktestSeries
+from custom_components.hsem.utils.misc import clamp_efficiency
+from custom_components.hsem.utils.recommendations import CHARGE_RECS
+from custom_components.hsem.utils.units import max_energy_per_slot_kwh
+
+# Consumption-average windows in days, matching PlannerInput.weight_*.
+_AVERAGE_WINDOWS = (1, 3, 7, 14)
+
+_PLANNER_INPUT_FIELDS = frozenset(f.name for f in dataclasses.fields(PlannerInput))
+
+# Inputs the backtest owns; a config may not override them.  Every field
+# _BacktestRun forces on the template or on each cycle's input belongs here.
+_BACKTEST_OWNED_FIELDS = frozenset(
+    {
+        "now_iso",
+        "interval_minutes",
+        "interval_length_hours",
+        "live_solar_production_w",
+        "live_house_consumption_w",
+        "ev_planned_load_enabled",
+        "ev_second_planned_load_enabled",
+        "ev_session_charge_kw",
+        "ev_second_session_charge_kw",
+        "solar_corrector",
+        "battery_soc_pct",
+        "price_points",
+        "solcast_slots",
+        "consumption_averages",
+        "previous_winner_name",
+        "previous_winner_score",
+    }
+)
+
+
+@dataclass
+class BacktestConfig:
+    """One parameter set of a backtest sweep.
+
+    Attributes:
+        name:
+            Label used in result tables.
+        overrides:
+            :class:`PlannerInput` fields replaced on the template, e.g.
+            ``{"battery_cycle_cost_per_kwh": 0.1}``.
+        solcast_likelihood:
+            Forecast series fed to the planner (``pv_estimate``,
+            ``pv_estimate10`` or ``pv_estimate90``), as selected by the
+            Solcast likelihood option live.
+    """
+
+    name: str = "default"
+    overrides: dict[str, Any] = field(default_factory=dict)
+    solcast_likelihood: str = "pv_estimate"
+
+    def __post_init__(self) -> None:
+        """Reject overrides the planner or the backtest does not accept."""
+        unknown = sorted(set(self.overrides) - _PLANNER_INPUT_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown PlannerInput field(s): {', '.join(unknown)}")
+        owned = sorted(set(self.overrides) & _BACKTEST_OWNED_FIELDS)
+        if owned:
+            raise ValueError(
+                f"set by the backtest, not overridable: {', '.join(owned)}"
+            )
+        if self.solcast_likelihood not in PV_LIKELIHOODS:
+            raise ValueError(f"unknown solcast_likelihood {self.solcast_likelihood!r}")
+
+
+@dataclass
+class BacktestResult:
+    """Realised outcome of one backtest run.
+
+    Money values are in the price currency; ``net_cost`` is import cost
+    minus export income, ``no_battery_cost`` what the same PV and load
+    would have cost without a battery, and ``savings`` their difference.
+    ``actual_savings`` and ``baseline_cost`` are the
+    :class:`SavingsTracker` totals shown live on the savings sensor.
+    """
+
+    name: str
+    params: dict[str, Any]
+    slots: int = 0
+    planner_runs: int = 0
+    grid_import_kwh: float = 0.0
+    grid_export_kwh: float = 0.0
+    import_cost: float = 0.0
+    export_income: float = 0.0
+    net_cost: float = 0.0
+    no_battery_cost: float = 0.0
+    savings: float = 0.0
+    actual_savings: float = 0.0
+    baseline_cost: float = 0.0
+    battery_charged_kwh: float = 0.0
+    battery_discharged_kwh: float = 0.0
+    equivalent_cycles: float = 0.0
+    final_soc_pct: float = 0.0
+    runtime_s: float = 0.0
+    daily: list[dict[str, Any]] = field(default_factory=list, repr=False)
+
+
+def parameter_grid(**axes: Iterable[Any]) -> list[BacktestConfig]:
+    """Return one :class:`BacktestConfig` per combination of *axes* values.
+
+    ``solcast_likelihood`` selects the forecast series; every other keyword
+    is a :class:`PlannerInput` field::
+
+        parameter_grid(
+            battery_cycle_cost_per_kwh=[0.0, 0.1],
+            solcast_likelihood=["pv_estimate", "pv_estimate10"],
+        )
+    """
+    names = list(axes)
+    configs = []
+    for values in itertools.product(*(list(axes[n]) for n in names)):
+        params = dict(zip(names, values))
+        likelihood = params.pop("solcast_likelihood", "pv_estimate")
+        label = ", ".join(f"{n}={v}" for n, v in zip(names, values))
+        configs.append(
+            BacktestConfig(
+                name=label or "default",
+                overrides=params,
+                solcast_likelihood=likelihood,
+            )
+        )
+    return configs
+
+
+class _BacktestRun:
+    """State of one backtest: realised SoC, trackers and planner memory."""
+
+    def __init__(
+        self,
+        series: BacktestSeries,
+        template: PlannerInput,
+        config: BacktestConfig,
+    ) -> None:
+        self.series = series
+        self.config = config
+        self.template = dataclasses.replace(
+            template,
+            interval_minutes=series.interval_minutes,
+            live_solar_production_w=0.0,
+            live_house_consumption_w=0.0,
+            ev_planned_load_enabled=False,
+            ev_second_planned_load_enabled=False,
+            ev_session_charge_kw=None,
+            ev_second_session_charge_kw=None,
+            solar_corrector=None,
+            **config.overrides,
+        )
+        inp = self.template
+        forecast = series.pv_forecast_kwh.get(config.solcast_likelihood)
+        if forecast is None:
+            raise ValueError(f"series has no {config.solcast_likelihood} forecast")
+        self.forecast = forecast
+        self.slots_per_hour = 60 // series.interval_minutes
+        self.step = timedelta(minutes=series.interval_minutes)
+        self.dates = [s.date() for s in series.starts]
+        self.daily_load = self._daily_hourly_load()
+        self.day_avg_import = self._day_average_import_prices()
+        self._averages: dict[date, list[HourlyConsumptionAverage]] = {}
+
+        self.rated = inp.battery_rated_capacity_kwh
+        self.eod_pct = inp.battery_end_of_discharge_soc_pct
+        max_soc = min(max(inp.battery_max_soc_pct, self.eod_pct), 100.0)
+        self.usable = max(self.rated * (max_soc - self.eod_pct) / 100.0, 0.0)
+        self.max_charge = max_energy_per_slot_kwh(
+            inp.battery_max_charge_power_w,
+            series.interval_minutes,
+            efficiency_fraction=clamp_efficiency(inp.battery_charge_efficiency_pct),
+        )
+        self.max_discharge = (
+            max_energy_per_slot_kwh(
+                inp.battery_max_discharge_power_w, series.interval_minutes
+            )
+            if inp.battery_max_discharge_power_w is not None
+            else None
+        )
+        self.soc_pct = inp.battery_soc_pct
+        self.previous_winner_name: str | None = None
+        self.previous_winner_score = 0.0
+
+    # ------------------------------------------------------------------
+    # Recorded-data views
+    # ------------------------------------------------------------------
+
+    def _daily_hourly_load(self) -> dict[date, list[float]]:
+        """Return measured load per calendar day as 24 hourly kWh totals."""
+        load: dict[date, list[float]] = {}
+        for day, start, kwh in zip(
+            self.dates, self.series.starts, self.series.load_actual_kwh
+        ):
+            load.setdefault(day, [0.0] * 24)[start.hour] += kwh
+        return load
+
+    def _day_average_import_prices(self) -> dict[date, float]:
+        """Return the mean positive import price per calendar day."""
+        totals: dict[date, list[float]] = {}
+        for day, price in zip(self.dates, self.series.import_price):
+            if price > 0:
+                acc = totals.setdefault(day, [0.0, 0.0])
+                acc[0] += price
+                acc[1] += 1
+        return {day: s / n for day, (s, n) in totals.items()}
+
+    def consumption_averages(self, day: date) -> list[HourlyConsumptionAverage]:
+        """Return hourly 1/3/7/14-day load averages for the days before *day*."""
+        cached = self._averages.get(day)
+        if cached is not None:
+            return cached
+        history = [
+            self.daily_load[d]
+            for d in (
+                day - timedelta(days=k) for k in range(1, _AVERAGE_WINDOWS[-1] + 1)
+            )
+            if d in self.daily_load
+        ]
+        averages = []
+        for hour in range(24):
+            values = [h[hour] for h in history]
+            avg_1d, avg_3d, avg_7d, avg_14d = (
+                sum(values[:n]) / len(values[:n]) if values else 0.0
+                for n in _AVERAGE_WINDOWS
+            )
+            averages.append(
+                HourlyConsumptionAverage(hour, avg_1d, avg_3d, avg_7d, avg_14d)
+            )
+        self._averages[day] = averages
+        return averages
+
+    def planner_input(self, index: int) -> PlannerInput:
+        """Return the planner input for the slot at *index*."""
+        series = self.series
+        now = series.starts[index]
+        today = self.dates[index]
+        since_midnight = now.hour * self.slots_per_hour + now.minute // (
+            series.interval_minutes
+        )
+        first = max(index - since_midnight, 0)
+        # Plan at most up to the end of the recorded data, in whole hours.
+        hours_left = (len(series) - first) // self.slots_per_hour
+        horizon = min(self.template.interval_length_hours, hours_left)
+        last = min(first + horizon * self.slots_per_hour, len(series))
+
+        price_points: list[PricePoint] = []
+        pv_by_hour: dict[tuple[int, int], float] = {}
+        for i in range(first, last):
+            start = series.starts[i]
+            day_offset = (self.dates[i] - today).days
+            price_points.append(
+                PricePoint(
+                    hour=start.hour,
+                    import_price=series.import_price[i],
+                    export_price=series.export_price[i],
+                    day_offset=day_offset,
+                    slot_in_day=(
+                        (start.hour * 60 + start.minute) // series.interval_minutes
+                        if self.slots_per_hour > 1
+                        else None
+                    ),
+                )
+            )
+            key = (day_offset, start.hour)
+            pv_by_hour[key] = pv_by_hour.get(key, 0.0) + self.forecast[i]
+        return dataclasses.replace(
+            self.template,
+            now_iso=now.isoformat(),
+            interval_length_hours=max(horizon, now.hour + 1),
+            battery_soc_pct=self.soc_pct,
+            price_points=price_points,
+            solcast_slots=[
+                SolcastSlot(hour=h, pv_estimate=round(kwh, 4), day_offset=d)
+                for (d, h), kwh in pv_by_hour.items()
+            ],
+            consumption_averages=self.consumption_averages(today),
+            previous_winner_name=self.previous_winner_name,
+            previous_winner_score=self.previous_winner_score,
+        )
+
+    # ------------------------------------------------------------------
+    # Stepping
+    # ------------------------------------------------------------------
+
+    def remember_winner(self, output: PlannerOutput) -> None:
+        """Keep the winner name and score for hysteresis, as the coordinator does."""
+        if not (output.winner_name and output.candidates):
+            return
+        score = 0.0
+        for candidate in output.candidates:
+            cost = getattr(candidate, "_cost", None)
+            if candidate.name == output.winner_name and cost is not None:
+                score = cost.score
+                break
+        self.previous_winner_name = output.winner_name
+        self.previous_winner_score = score
+
+    def realise(self, index: int, planned: PlannedSlot | None) -> PlannedSlot:
+        """Replay the planned slot with measured PV and load; advance the SoC."""
+        from custom_components.hsem.planner.soc_simulation import simulate_soc
+
+        now = self.series.starts[index]
+        slot = (
+            planned.clone()
+            if planned is not None
+            else PlannedSlot(start=now, end=now + self.step)
+        )
+        slot.solcast_pv_estimate_kwh = self.series.pv_actual_kwh[index]
+        slot.avg_house_consumption_kwh = self.series.load_actual_kwh[index]
+        slot.ev_planned_load_kwh = 0.0
+        slot.ev_accounted_load_kwh = 0.0
+        current = min(
+            max(self.rated * (self.soc_pct - self.eod_pct) / 100.0, 0.0), self.usable
+        )
+        simulate_soc(
+            [slot],
+            now,
+            current,
+            self.usable,
+            self.usable,
+            self.max_charge,
+            self.max_discharge,
+            rated_kwh=self.rated,
+            end_of_discharge_soc_pct=self.eod_pct,
+            charge_efficiency_pct=self.template.battery_charge_efficiency_pct,
+            discharge_efficiency_pct=self.template.battery_discharge_efficiency_pct,
+        )
+        if self.rated > 0:
+            self.soc_pct = (
+                self.eod_pct + slot.estimated_battery_capacity_kwh / self.rated * 100.0
+            )
+        return slot
+
+
+def run_backtest(
+    series: BacktestSeries,
+    template: PlannerInput,
+    config: BacktestConfig | None = None,
+    *,
+    replan_every: int = 1,
+    warmup_days: int = 1,
+) -> BacktestResult:
+    """Simulate HSEM over *series* and return the realised financial outcome.
+
+    Args:
+        series: Recorded prices, forecasts, PV and load.
+        template: Battery and planner settings; its ``battery_soc_pct`` is
+            the SoC at the first simulated slot.  A diagnostics dump loaded
+            with :func:`~custom_components.hsem.utils.diagnostics.load_planner_input_from_dump`
+            reproduces a live installation.
+        config: Parameter overrides and forecast likelihood for this run.
+        replan_every: Run the planner every this many slots and follow the
+            last plan in between.  ``1`` replans every slot like the
+            coordinator; larger values trade fidelity for speed.
+        warmup_days: Leading calendar days used only as consumption
+            history; simulation starts at the following midnight.
+
+    Raises:
+        ValueError: The series is shorter than the warm-up, or the config
+            names a forecast the series does not contain.
+    """
+    from custom_components.hsem.planner.engine_core import run_planner
+
+    config = config or BacktestConfig()
+    started = time.perf_counter()
+    run = _BacktestRun(series, template, config)
+    first_day = run.dates[0] + timedelta(days=warmup_days)
+    start_index = next((i for i, d in enumerate(run.dates) if d >= first_day), None)
+    if start_index is None:
+        raise ValueError(
+            f"series ends before the {warmup_days}-day warm-up is complete"
+        )
+
+    financial = FinancialTracker(today=run.dates[start_index].isoformat())
+    financial.accumulate(0.0, 0.0)
+    savings = SavingsTracker(_today=run.dates[start_index].isoformat())
+    result = BacktestResult(
+        name=config.name,
+        params={**config.overrides, "solcast_likelihood": config.solcast_likelihood},
+    )
+    plan: dict[datetime, PlannedSlot] = {}
+    planned_at = -replan_every
+    import_total = export_total = 0.0
+
+    for i in range(start_index, len(series)):
+        now = series.starts[i]
+        if i - planned_at >= replan_every or now not in plan:
+            output = run_planner(run.planner_input(i))
+            plan = {s.start: s for s in output.slots}
+            planned_at = i
+            result.planner_runs += 1
+            run.remember_winner(output)
+        slot = run.realise(i, plan.get(now))
+
+        import_price = series.import_price[i]
+        export_price = series.export_price[i]
+        import_total += slot.grid_import_kwh
+        export_total += slot.grid_export_kwh
+        financial.check_day_rollover(now)
+        financial.accumulate(import_total, export_total, import_price, export_price)
+
+        day = run.dates[i]
+        savings.check_day_rollover(day.isoformat())
+        avg_import = run.day_avg_import.get(day, 0.0)
+        charge_saving = 0.0
+        if (
+            slot.recommendation in CHARGE_RECS
+            and import_price < avg_import
+            and slot.batteries_charged_kwh > 1e-9
+        ):
+            charge_saving = slot.batteries_charged_kwh * (avg_import - import_price)
+        savings.accumulate(
+            export_revenue_delta=slot.grid_export_kwh * export_price,
+            charge_savings_delta=charge_saving,
+            baseline_cost_delta=slot.grid_import_kwh * import_price,
+            switch_on=True,
+        )
+
+        net_load = series.load_actual_kwh[i] - series.pv_actual_kwh[i]
+        result.no_battery_cost += (
+            max(net_load, 0.0) * import_price - max(-net_load, 0.0) * export_price
+        )
+        result.battery_charged_kwh += slot.batteries_charged_kwh
+        result.battery_discharged_kwh += slot.batteries_discharged_kwh
+        result.slots += 1
+
+    result.grid_import_kwh = round(import_total, 3)
+    result.grid_export_kwh = round(export_total, 3)
+    result.import_cost = round(financial.import_cost_total, 4)
+    result.export_income = round(financial.export_income_total, 4)
+    result.net_cost = round(result.import_cost - result.export_income, 4)
+    result.no_battery_cost = round(result.no_battery_cost, 4)
+    result.savings = round(result.no_battery_cost - result.net_cost, 4)
+    result.actual_savings = round(savings.actual_savings, 4)
+    result.baseline_cost = round(savings.baseline_cost, 4)
+    result.battery_charged_kwh = round(result.battery_charged_kwh, 3)
+    result.battery_discharged_kwh = round(result.battery_discharged_kwh, 3)
+    result.equivalent_cycles = (
+        round(result.battery_discharged_kwh / run.usable, 2) if run.usable > 0 else 0.0
+    )
+    result.final_soc_pct = round(run.soc_pct, 1)
+    result.daily = _daily_rows(financial)
+    result.runtime_s = round(time.perf_counter() - started, 2)
+    return result
+
+
+def _daily_rows(financial: FinancialTracker) -> list[dict[str, Any]]:
+    """Return per-day import cost / export income, including the open day."""
+    entries = dict(financial.daily_log)
+    entries[financial.today] = FinancialDayEntry(
+        date=financial.today,
+        import_cost=financial.import_cost_today,
+        export_income=financial.export_income_today,
+    )
+    return [
+        {
+            **entries[d].as_dict(),
+            "net_cost": round(entries[d].import_cost - entries[d].export_income, 3),
+        }
+        for d in sorted(entries)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Parameter sweeps
+# ---------------------------------------------------------------------------
+
+# Per-worker copy of the sweep inputs, set once by _init_worker so the
+# series is pickled once per process rather than once per config.
+_worker_args: tuple[BacktestSeries, PlannerInput, dict[str, Any]] | None = None
+
+
+def _init_worker(
+    series: BacktestSeries, template: PlannerInput, kwargs: dict[str, Any]
+) -> None:
+    global _worker_args  # noqa: PLW0603 — process-local sweep inputs
+    _worker_args = (series, template, kwargs)
+
+
+def _run_in_worker(config: BacktestConfig) -> BacktestResult:
+    assert _worker_args is not None
+    series, template, kwargs = _worker_args
+    return run_backtest(series, template, config, **kwargs)
+
+
+def run_sweep(
+    series: BacktestSeries,
+    template: PlannerInput,
+    configs: Iterable[BacktestConfig],
+    *,
+    workers: int | None = None,
+    replan_every: int = 1,
+    warmup_days: int = 1,
+) -> list[BacktestResult]:
+    """Run one backtest per config, spread over worker processes.
+
+    Args:
+        series: Recorded data shared by every run.
+        template: Battery and planner settings shared by every run.
+        configs: Parameter sets to compare.
+        workers: Number of worker processes; defaults to the CPU count.
+            ``1`` runs in the calling process.
+        replan_every: See :func:`run_backtest`.
+        warmup_days: See :func:`run_backtest`.
+
+    Returns:
+        One :class:`BacktestResult` per config, in config order.
+    """
+    configs = list(configs)
+    kwargs = {"replan_every": replan_every, "warmup_days": warmup_days}
+    workers = min(workers or os.cpu_count() or 1, len(configs) or 1)
+    if workers <= 1:
+        return [run_backtest(series, template, c, **kwargs) for c in configs]
+    # Spawned like the planner worker process: no forked copies of the
+    # caller's locks or threads.
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(series, template, kwargs),
+    ) as pool:
+        return list(pool.map(_run_in_worker, configs))
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+_CSV_COLUMNS = (
+    "name",
+    "slots",
+    "planner_runs",
+    "grid_import_kwh",
+    "grid_export_kwh",
+    "import_cost",
+    "export_income",
+    "net_cost",
+    "no_battery_cost",
+    "savings",
+    "actual_savings",
+    "baseline_cost",
+    "battery_charged_kwh",
+    "battery_discharged_kwh",
+    "equivalent_cycles",
+    "final_soc_pct",
+    "runtime_s",
+)
+
+
+def format_table(results: Iterable[BacktestResult]) -> str:
+    """Render *results* as a Markdown table, cheapest net cost first."""
+    rows = sorted(results, key=lambda r: r.net_cost)
+    lines = [
+        "| config | net cost | import | export | savings | cycles | runs | s |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    lines.extend(
+        f"| {r.name} | {r.net_cost:.2f} | {r.import_cost:.2f} "
+        f"| {r.export_income:.2f} | {r.savings:.2f} | {r.equivalent_cycles:.1f} "
+        f"| {r.planner_runs} | {r.runtime_s:.1f} |"
+        for r in rows
+    )
+    return "\n".join(lines)
+
+
+def write_csv(results: Iterable[BacktestResult], path: str | Path) -> None:
+    """Write one CSV row per result, parameters as extra columns."""
+    rows = list(results)
+    param_columns = sorted({p for r in rows for p in r.params})
+    with Path(path).open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow([*_CSV_COLUMNS, *param_columns])
+        for r in rows:
+            writer.writerow(
+                [getattr(r, c) for c in _CSV_COLUMNS]
+                + [r.params.get(p) for p in param_columns]
+            )
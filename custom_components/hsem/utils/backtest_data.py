@@ -0,0 +1,297 @@
+"""Recorded time series for the backtest engine.
+
+A :class:`BacktestSeries` holds equally spaced slots of recorded data:
+import / export prices, the Solcast PV forecast (one series per likelihood,
+``pv_estimate`` / ``pv_estimate10`` / ``pv_estimate90``), and the PV
+production and house load that actually happened.  Three loaders build one:
+
+- :func:`load_csv` — one row per slot;
+- :func:`load_parquet` — the same columns in a Parquet file (needs pandas
+  with a Parquet engine, which HSEM itself does not depend on);
+- :func:`load_recorder` — hourly long-term statistics read straight from a
+  copy of the Home Assistant recorder database (``home-assistant_v2.db``).
+
+CSV and Parquet columns
+-----------------------
+``start`` (ISO-8601 with UTC offset), ``import_price``, ``export_price``,
+``pv_actual_kwh``, ``load_actual_kwh`` and ``pv_estimate`` are required;
+``pv_estimate10`` and ``pv_estimate90`` are optional.  Energy columns are
+kWh per slot.
+"""
+
+from __future__ import annotations
+
+import csv
+import sqlite3
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from zoneinfo import ZoneInfo
+
+#: Solcast likelihood columns; ``pv_estimate`` is required.
+PV_LIKELIHOODS = ("pv_estimate", "pv_estimate10", "pv_estimate90")
+
+REQUIRED_COLUMNS = (
+    "start",
+    "import_price",
+    "export_price",
+    "pv_actual_kwh",
+    "load_actual_kwh",
+    "pv_estimate",
+)
+
+# Recorder fields read from the ``sum`` column (cumulative energy meters);
+# all others are read from ``mean`` (prices, forecast power in kW).
+_RECORDER_SUM_FIELDS = frozenset({"pv_actual_kwh", "load_actual_kwh"})
+
+
+@dataclass
+class BacktestSeries:
+    """Equally spaced recorded slots for one backtest.
+
+    Attributes:
+        starts:
+            Timezone-aware slot start times, ``interval_minutes`` apart.
+        interval_minutes:
+            Slot width in minutes (5, 15, 30 or 60).
+        import_price / export_price:
+            Prices per slot in local currency/kWh.
+        pv_actual_kwh / load_actual_kwh:
+            Measured PV production and house load per slot (kWh).
+        pv_forecast_kwh:
+            Forecast PV per slot (kWh), keyed by Solcast likelihood.
+    """
+
+    starts: list[datetime]
+    interval_minutes: int
+    import_price: list[float]
+    export_price: list[float]
+    pv_actual_kwh: list[float]
+    load_actual_kwh: list[float]
+    pv_forecast_kwh: dict[str, list[float]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        """Validate spacing and series lengths."""
+        n = len(self.starts)
+        if n == 0:
+            raise ValueError("backtest series is empty")
+        if 60 % self.interval_minutes:
+            raise ValueError(
+                f"interval_minutes must divide 60, got {self.interval_minutes}"
+            )
+        if "pv_estimate" not in self.pv_forecast_kwh:
+            raise ValueError("backtest series needs a pv_estimate forecast")
+        for name, values in (
+            ("import_price", self.import_price),
+            ("export_price", self.export_price),
+            ("pv_actual_kwh", self.pv_actual_kwh),
+            ("load_actual_kwh", self.load_actual_kwh),
+            *self.pv_forecast_kwh.items(),
+        ):
+            if len(values) != n:
+                raise ValueError(f"{name} has {len(values)} values, expected {n}")
+        step = timedelta(minutes=self.interval_minutes)
+        for i in range(1, n):
+            if self.starts[i] - self.starts[i - 1] != step:
+                raise ValueError(
+                    f"slot {i} starts at {self.starts[i].isoformat()}, "
+                    f"expected {self.interval_minutes} min after the previous slot"
+                )
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return len(self.starts)
+
+
+def _float(row: Mapping[str, Any], column: str, line: int) -> float:
+    value = row.get(column)
+    if value is None or value == "":
+        raise ValueError(f"row {line}: missing {column}")
+    try:
+        return float(value)
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"row {line}: {column}={value!r} is not a number") from err
+
+
+def series_from_rows(rows: Iterable[Mapping[str, Any]]) -> BacktestSeries:
+    """Build a :class:`BacktestSeries` from per-slot records.
+
+    Each record maps the column names listed in the module docstring to
+    values; ``start`` may be a timezone-aware :class:`datetime` or an
+    ISO-8601 string.  The slot width is inferred from the first two rows.
+
+    Raises:
+        ValueError: A required column is missing or not numeric, a start is
+            not timezone-aware, or the slots are not equally spaced.
+    """
+    starts: list[datetime] = []
+    columns: dict[str, list[float]] = {
+        c: [] for c in (*REQUIRED_COLUMNS[1:], *PV_LIKELIHOODS[1:])
+    }
+    optional_present: set[str] = set()
+    for line, row in enumerate(rows, start=1):
+        raw_start = row.get("start")
+        start = (
+            raw_start
+            if isinstance(raw_start, datetime)
+            else datetime.fromisoformat(str(raw_start))
+        )
+        if start.tzinfo is None:
+            raise ValueError(f"row {line}: start {raw_start!r} has no UTC offset")
+        starts.append(start)
+        for column in REQUIRED_COLUMNS[1:]:
+            columns[column].append(_float(row, column, line))
+        for column in PV_LIKELIHOODS[1:]:
+            if row.get(column) not in (None, ""):
+                optional_present.add(column)
+                columns[column].append(_float(row, column, line))
+            else:
+                columns[column].append(0.0)
+    if len(starts) < 2:
+        raise ValueError("backtest series needs at least two slots")
+    interval = int((starts[1] - starts[0]).total_seconds() // 60)
+    forecasts = {
+        c: columns[c]
+        for c in PV_LIKELIHOODS
+        if c == "pv_estimate" or c in optional_present
+    }
+    return BacktestSeries(
+        starts=starts,
+        interval_minutes=interval,
+        import_price=columns["import_price"],
+        export_price=columns["export_price"],
+        pv_actual_kwh=columns["pv_actual_kwh"],
+        load_actual_kwh=columns["load_actual_kwh"],
+        pv_forecast_kwh=forecasts,
+    )
+
+
+def load_csv(path: str | Path) -> BacktestSeries:
+    """Load a backtest series from a CSV file with one row per slot."""
+    with Path(path).open(encoding="utf-8", newline="") as fh:
+        return series_from_rows(csv.DictReader(fh))
+
+
+def load_parquet(path: str | Path) -> BacktestSeries:
+    """Load a backtest series from a Parquet file with one row per slot.
+
+    Raises:
+        ImportError: pandas (with pyarrow or fastparquet) is not installed.
+    """
+    try:
+        import pandas as pd  # type: ignore[import-not-found,import-untyped,unused-ignore]
+    except ImportError as err:
+        raise ImportError(
+            "Parquet backtest data needs pandas and pyarrow: pip install pandas pyarrow"
+        ) from err
+    frame = pd.read_parquet(path)
+    if "start" in frame.columns:
+        frame["start"] = frame["start"].map(
+            lambda v: v.to_pydatetime() if hasattr(v, "to_pydatetime") else v
+        )
+    return series_from_rows(frame.to_dict("records"))
+
+
+def load_recorder(
+    db_path: str | Path,
+    statistic_ids: Mapping[str, str],
+    *,
+    start: datetime,
+    end: datetime,
+    time_zone: str,
+) -> BacktestSeries:
+    """Load an hourly backtest series from recorder long-term statistics.
+
+    Reads the ``statistics`` table of a recorder SQLite database (use a
+    copy; HA keeps the live file locked while running).  Cumulative energy
+    meters (``pv_actual_kwh``, ``load_actual_kwh``) are converted from the
+    hourly ``sum`` to per-hour deltas; prices and forecasts use the hourly
+    ``mean`` (a forecast *power* sensor in kW averages to kWh per hour).
+    Hours without a statistics row repeat the previous value for means and
+    count as zero energy for meters.
+
+    Args:
+        db_path: Path to ``home-assistant_v2.db``.
+        statistic_ids: Maps series columns (``import_price``,
+            ``export_price``, ``pv_actual_kwh``, ``load_actual_kwh``,
+            ``pv_estimate`` and optionally ``pv_estimate10`` /
+            ``pv_estimate90``) to recorder statistic ids, e.g.
+            ``{"load_actual_kwh": "sensor.house_energy"}``.
+        start: First hour to load (timezone-aware).
+        end: End of the range (exclusive, timezone-aware).
+        time_zone: IANA zone the slots are expressed in, e.g.
+            ``"Europe/Copenhagen"``.
+
+    Raises:
+        ValueError: A required column has no statistic id, or a statistic id
+            is not in the database.
+    """
+    missing = [c for c in REQUIRED_COLUMNS[1:] if c not in statistic_ids]
+    if missing:
+        raise ValueError(f"no statistic id for: {', '.join(missing)}")
+    tz = ZoneInfo(time_zone)
+    first = start.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+    hours = int((end - first).total_seconds() // 3600)
+    if hours < 2:
+        raise ValueError("recorder range must cover at least two hours")
+    first_ts = first.timestamp()
+
+    conn = sqlite3.connect(f"file:{Path(db_path)}?mode=ro", uri=True)
+    try:
+        values: dict[str, list[float]] = {}
+        for column, statistic_id in statistic_ids.items():
+            row = conn.execute(
+                "SELECT id FROM statistics_meta WHERE statistic_id = ?",
+                (statistic_id,),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"statistic {statistic_id!r} not in {db_path}")
+            is_sum = column in _RECORDER_SUM_FIELDS
+            # One hour earlier for meters: the first delta needs a previous sum.
+            query_from = first_ts - (3600 if is_sum else 0)
+            cursor = conn.execute(
+                f"SELECT start_ts, {'sum' if is_sum else 'COALESCE(mean, state)'} "
+                "FROM statistics WHERE metadata_id = ? AND start_ts >= ? "
+                "AND start_ts < ? ORDER BY start_ts",
+                (row[0], query_from, first_ts + hours * 3600),
+            )
+            by_hour = {
+                int(round((ts - first_ts) / 3600)): v
+                for ts, v in cursor
+                if v is not None
+            }
+            values[column] = _hourly_series(by_hour, hours, is_sum)
+    finally:
+        conn.close()
+
+    return series_from_rows(
+        {
+            "start": (first + timedelta(hours=h)).astimezone(tz),
+            **{column: series[h] for column, series in values.items()},
+        }
+        for h in range(hours)
+    )
+
+
+def _hourly_series(by_hour: dict[int, float], hours: int, is_sum: bool) -> list[float]:
+    """Return per-hour values from ``{hour_index: value}`` recorder rows."""
+    out: list[float] = []
+    if is_sum:
+        previous = by_hour.get(-1)
+        for h in range(hours):
+            current = by_hour.get(h)
+            if current is None or previous is None:
+                out.append(0.0)
+            else:
+                # Meter resets produce a negative delta: count them as zero.
+                out.append(max(current - previous, 0.0))
+            if current is not None:
+                previous = current
+        return out
+    last = next((by_hour[h] for h in sorted(by_hour) if h >= 0), 0.0)
+    for h in range(hours):
+        last = by_hour.get(h, last)
+        out.append(float(last))
+    return out
@@ -210,7 +210,8 @@ def _planner_input_from_dict(data: dict[str, Any]) -> PlannerInput:
     """Reconstruct a :class:`PlannerInput` from a serialised dictionary.
 
     Inverse of :func:`_planner_input_to_dict`.  Handles the ``HH:MM:SS`` →
-    :class:`datetime.time` conversion for battery schedules.
+    :class:`datetime.time` conversion for battery schedules and parses the
+    ISO-8601 EV deadlines back to :class:`datetime.datetime`.
 
     Args:
         data: A dictionary previously produced by :func:`_planner_input_to_dict`.
@@ -251,6 +252,13 @@ def _planner_input_from_dict(data: dict[str, Any]) -> PlannerInput:
             inp_data["battery_max_discharge_power_w"]
         )
 
+    # EV deadlines are serialised as ISO-8601 strings; the planner compares
+    # them with slot datetimes.
+    for field_name in ("ev_planned_load_deadline", "ev_second_planned_load_deadline"):
+        val = inp_data.get(field_name)
+        if isinstance(val, str):
+            inp_data[field_name] = datetime.fromisoformat(val)
+
     return PlannerInput(**inp_data)
 
 
@@ -0,0 +1,118 @@
+"""Rolling statistics over recent planner profiles and cycle times.
+
+The tracker keeps two windows of the last :data:`DEFAULT_WINDOW` entries,
+summarised as p50 / p95 / max for the *Planner Profile* diagnostic sensor:
+
+- the per-stage :class:`PlannerProfile` of every fresh full solve (cache
+  hits and heuristic plans have no meaningful stage breakdown);
+- the wall time the coordinator waited for its plan in *every* cycle,
+  tagged with where the plan came from (:data:`PLAN_SOURCES`), overall and
+  per source.  This is what a cycle costs on the host, whatever served it.
+
+This module has **no** Home Assistant dependencies and is fully testable with
+plain ``pytest``.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any
+
+from custom_components.hsem.models.planner_profile import PlannerProfile
+
+# Number of planner runs kept for the rolling percentiles.
+DEFAULT_WINDOW = 200
+
+# Pseudo-stage holding the whole-run totals.
+TOTAL_STAGE = "total"
+
+# Where a cycle's plan came from.
+PLAN_SOURCE_FULL = "full"  # planner run (MILP included)
+PLAN_SOURCE_CACHE = "cache"  # plan-cache hit
+PLAN_SOURCE_HEURISTIC = "heuristic"  # anytime fallback after the deadline
+PLAN_SOURCE_SWAP = "swap"  # anytime optimal plan swapped in
+PLAN_SOURCES = (
+    PLAN_SOURCE_FULL,
+    PLAN_SOURCE_CACHE,
+    PLAN_SOURCE_HEURISTIC,
+    PLAN_SOURCE_SWAP,
+)
+
+# Key of the all-sources summary of cycle times.
+ALL_SOURCES = "all"
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    """Return the nearest-rank *pct* percentile of the sorted *ordered*."""
+    rank = max(math.ceil(pct / 100.0 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _summarise(samples: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    """Return ``{stage: {p50, p95, max}}`` over per-run stage timings."""
+    stages: dict[str, list[float]] = {}
+    for sample in samples:
+        for stage, value in sample.items():
+            stages.setdefault(stage, []).append(value)
+    summary: dict[str, dict[str, float]] = {}
+    for stage, values in stages.items():
+        ordered = sorted(values)
+        summary[stage] = {
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "max": ordered[-1],
+        }
+    return summary
+
+
+class PlannerProfileTracker:
+    """Ring buffers of recent planner profiles and cycle times."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        """Create an empty tracker keeping the last *window* entries of each."""
+        self._wall: deque[dict[str, float]] = deque(maxlen=window)
+        self._cpu: deque[dict[str, float]] = deque(maxlen=window)
+        self._cycles: deque[tuple[str, float]] = deque(maxlen=window)
+        self.last: PlannerProfile | None = None
+
+    def record(self, profile: PlannerProfile) -> None:
+        """Add the profile of one planner run."""
+        self._wall.append({**profile.wall_ms, TOTAL_STAGE: profile.total_wall_ms})
+        self._cpu.append({**profile.cpu_ms, TOTAL_STAGE: profile.total_cpu_ms})
+        self.last = profile
+
+    def record_cycle(self, source: str, wall_ms: float) -> None:
+        """Add the wall time one cycle waited for its plan from *source*."""
+        self._cycles.append((source, round(wall_ms, 3)))
+
+    def summary(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot; empty before the first cycle."""
+        last = self.last
+        if last is None and not self._cycles:
+            return {}
+        summary: dict[str, Any] = {
+            "samples": len(self._wall),
+            "last_total_wall_ms": last.total_wall_ms if last else None,
+            "last_total_cpu_ms": last.total_cpu_ms if last else None,
+            "last_wall_ms": dict(last.wall_ms) if last else {},
+            "wall_ms": _summarise(list(self._wall)),
+            "cpu_ms": _summarise(list(self._cpu)),
+            "lp": dict(last.lp) if last else {},
+            "cycles": {},
+        }
+        if self._cycles:
+            last_source, last_ms = self._cycles[-1]
+            counts = {source: 0 for source in PLAN_SOURCES}
+            for source, _ms in self._cycles:
+                counts[source] = counts.get(source, 0) + 1
+            summary["cycles"] = {
+                "samples": len(self._cycles),
+                "last_source": last_source,
+                "last_wall_ms": last_ms,
+                "count": counts,
+                "wall_ms": _summarise(
+                    [{ALL_SOURCES: ms, source: ms} for source, ms in self._cycles]
+                ),
+            }
+        return summary
@@ -0,0 +1,188 @@
+"""Out-of-process execution of :func:`run_planner`.
+
+By default the coordinator runs the planner on Home Assistant's shared
+executor.  The numpy/scipy solve then competes with every other
+integration's blocking jobs and holds the GIL for the Python-heavy passes,
+which shows up as UI latency spikes at slot boundaries.
+
+:class:`PlannerWorker` (opt-in, ``hsem_planner_worker_process``) moves the
+solve into one long-lived child process:
+
+- the child is started with the ``spawn`` method (forking a threaded event
+  loop process is unsafe) and imports numpy, scipy and the planner once;
+- each request sends the input serialised by
+  :func:`~custom_components.hsem.utils.diagnostics._planner_input_to_dict`
+  plus the pickled solar corrector, which that helper deliberately drops;
+- a run that exceeds ``timeout_s`` or a child that dies is killed and
+  replaced on the next request;
+- any worker failure falls back to an in-process :func:`run_planner` call,
+  so a broken worker never costs a plan.
+
+With verbose logging enabled the planner always runs in-process so the
+``[core]`` / ``[soc_sim]`` traces keep reaching ``hsem.log``; the child has
+no handler for them.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import multiprocessing
+import threading
+import time
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any, cast
+
+from custom_components.hsem.models.planner_input import PlannerInput
+from custom_components.hsem.models.planner_output import PlannerOutput
+from custom_components.hsem.utils.logger import HSEM_LOGGER, log_planner
+
+# Wall-clock limit for one planner run in the worker (seconds).
+DEFAULT_TIMEOUT_S = 60.0
+
+# Grace period for the child to exit after its pipe is closed (seconds).
+_JOIN_TIMEOUT_S = 2.0
+
+
+class PlannerWorkerError(Exception):
+    """The worker could not produce a plan (timeout, crash or planner error)."""
+
+
+def _worker_main(conn: Connection) -> None:
+    """Serve planner requests on *conn* until the parent closes it."""
+    # Pre-import the numeric stack so the first solve is not slower.
+    import numpy as np  # noqa: F401
+
+    from custom_components.hsem.planner.engine_core import run_planner
+    from custom_components.hsem.utils.diagnostics import _planner_input_from_dict
+
+    with contextlib.suppress(ImportError):
+        import scipy.optimize  # noqa: F401
+
+    while True:
+        try:
+            data, corrector = conn.recv()
+        except EOFError:
+            return
+        try:
+            inp = _planner_input_from_dict(data)
+            inp.solar_corrector = corrector
+            reply: tuple[str, Any] = ("ok", run_planner(inp))
+        except Exception as err:  # noqa: BLE001 — reported to the parent
+            reply = ("error", f"{type(err).__name__}: {err}")
+        conn.send(reply)
+
+
+class PlannerWorker:
+    """A long-lived planner process with timeout, restart and fallback.
+
+    Thread-safe: requests are serialised on a lock because the child
+    solves one input at a time.  :meth:`run` blocks the calling executor
+    thread while the child solves, but that thread only waits on a pipe and
+    does not hold the GIL.
+    """
+
+    def __init__(self, timeout_s: float = DEFAULT_TIMEOUT_S) -> None:
+        """Create a worker; the child process starts on the first request."""
+        self.timeout_s = timeout_s
+        self._process: BaseProcess | None = None
+        self._conn: Connection | None = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.fallbacks = 0
+        self.starts = 0
+        self.last_error: str | None = None
+        self.last_duration_s: float | None = None
+
+    def run(self, inp: PlannerInput) -> PlannerOutput:
+        """Return the plan for *inp*, solved in the worker when possible."""
+        from custom_components.hsem.planner.engine_core import run_planner
+
+        if HSEM_LOGGER.isEnabledFor(logging.DEBUG):
+            return run_planner(inp)
+        with self._lock:
+            started = time.monotonic()
+            try:
+                output = self._solve(inp)
+            except PlannerWorkerError as err:
+                self.fallbacks += 1
+                self.last_error = str(err)
+            else:
+                self.runs += 1
+                self.last_duration_s = round(time.monotonic() - started, 3)
+                return output
+        log_planner(
+            "warning",
+            "[worker] planner worker failed (%s) — planning in-process",
+            self.last_error,
+        )
+        return run_planner(inp)
+
+    def _solve(self, inp: PlannerInput) -> PlannerOutput:
+        from custom_components.hsem.utils.diagnostics import _planner_input_to_dict
+
+        conn = self._ensure_started()
+        try:
+            conn.send((_planner_input_to_dict(inp), inp.solar_corrector))
+            if not conn.poll(self.timeout_s):
+                self._stop(kill=True)
+                raise PlannerWorkerError(f"timed out after {self.timeout_s:g} s")
+            status, payload = conn.recv()
+        except (EOFError, OSError) as err:
+            self._stop()
+            raise PlannerWorkerError(f"worker process died ({err!r})") from err
+        if status != "ok":
+            raise PlannerWorkerError(payload)
+        return cast(PlannerOutput, payload)
+
+    def _ensure_started(self) -> Connection:
+        if self._process is not None and self._process.is_alive():
+            assert self._conn is not None
+            return self._conn
+        self._stop()
+        ctx = multiprocessing.get_context("spawn")
+        parent, child = ctx.Pipe()
+        process = ctx.Process(
+            target=_worker_main, args=(child,), name="hsem-planner", daemon=True
+        )
+        process.start()
+        child.close()
+        self._process, self._conn = process, parent
+        self.starts += 1
+        log_planner("debug", "[worker] started planner worker pid=%s", process.pid)
+        return parent
+
+    def _stop(self, *, kill: bool = False) -> None:
+        conn, process = self._conn, self._process
+        self._conn = self._process = None
+        if conn is not None:
+            conn.close()
+        if process is None:
+            return
+        if not kill:
+            process.join(_JOIN_TIMEOUT_S)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def shutdown(self) -> None:
+        """Stop the child process; a later :meth:`run` starts a new one."""
+        with self._lock:
+            self._stop()
+
+    def stats(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot of the counters.
+
+        Lock-free so the event loop never waits behind a running solve.
+        """
+        process = self._process
+        return {
+            "runs": self.runs,
+            "fallbacks": self.fallbacks,
+            "restarts": max(self.starts - 1, 0),
+            "alive": process is not None and process.is_alive(),
+            "timeout_s": self.timeout_s,
+            "last_duration_s": self.last_duration_s,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,136 @@
+"""Background import of the numerical stack at integration setup.
+
+``scipy.optimize`` takes about half a second to import and HiGHS allocates
+its solver state on the first solve.  The MILP optimizer imports scipy
+lazily (:func:`~custom_components.hsem.planner.milp_optimizer.is_scipy_available`),
+so neither cost lands on Home Assistant's integration import.
+:class:`NumericPrewarm` pays both on the executor right after
+``async_setup_entry`` starts:
+
+- :func:`prewarm_numeric_stack` imports numpy and ``scipy.optimize`` and
+  solves a two-variable LP with HiGHS, timing each step;
+- a cycle that starts before it has finished (typically the first one,
+  during ``async_setup_entry``) does not wait for it: the coordinator
+  serves a heuristic plan without the MILP and queues a full re-plan that
+  awaits :meth:`NumericPrewarm.async_wait`.  With anytime planning enabled
+  the import counts against the deadline like any slow solve.
+
+The timings are kept for the degraded-mode diagnostic sensor.  The module
+has no Home Assistant imports.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from custom_components.hsem.utils.logger import HSEM_LOGGER as _LOGGER
+
+
+@dataclass
+class PrewarmStats:
+    """Wall-clock cost of warming up the numerical stack (milliseconds)."""
+
+    numpy_import_ms: float = 0.0
+    scipy_import_ms: float | None = None
+    first_solve_ms: float | None = None
+    scipy_available: bool = False
+    total_ms: float = 0.0
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats as a plain dict for sensor attributes."""
+        return asdict(self)
+
+
+def _ms_since(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000.0, 1)
+
+
+def prewarm_numeric_stack() -> PrewarmStats:
+    """Import numpy and scipy and solve a tiny LP; blocking (executor only)."""
+    stats = PrewarmStats()
+    started = time.perf_counter()
+
+    step = time.perf_counter()
+    import numpy as np
+
+    stats.numpy_import_ms = _ms_since(step)
+
+    from custom_components.hsem.planner.milp_optimizer import is_scipy_available
+
+    step = time.perf_counter()
+    stats.scipy_available = is_scipy_available()
+    stats.scipy_import_ms = _ms_since(step)
+    if stats.scipy_available:
+        from scipy.optimize import linprog
+
+        step = time.perf_counter()
+        try:
+            # min x0 + x1  s.t.  x0 + x1 >= 1,  0 <= x <= 1
+            linprog(
+                np.ones(2),
+                A_ub=-np.ones((1, 2)),
+                b_ub=np.array([-1.0]),
+                bounds=[(0.0, 1.0)] * 2,
+                method="highs",
+            )
+            stats.first_solve_ms = _ms_since(step)
+        except Exception as err:  # noqa: BLE001 — a warm-up must never fail setup
+            stats.error = f"{type(err).__name__}: {err}"
+
+    stats.total_ms = _ms_since(started)
+    return stats
+
+
+class NumericPrewarm:
+    """Run :func:`prewarm_numeric_stack` once in the background.
+
+    Not thread-safe: every method runs on the event loop.
+    """
+
+    def __init__(self) -> None:
+        """Create a prewarm that has not started."""
+        self._future: asyncio.Future[PrewarmStats] | None = None
+        self.stats: PrewarmStats | None = None
+
+    @property
+    def ready(self) -> bool:
+        """Return True unless a started prewarm is still running."""
+        return self._future is None or self._future.done()
+
+    def start(self) -> None:
+        """Start the prewarm on the loop's default executor (idempotent)."""
+        if self._future is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._future = loop.run_in_executor(None, prewarm_numeric_stack)
+        self._future.add_done_callback(self._on_done)
+
+    async def async_wait(self) -> None:
+        """Wait for a started prewarm to finish; its failure is not raised."""
+        if self._future is None or self._future.done():
+            return
+        with contextlib.suppress(Exception):
+            await asyncio.shield(self._future)
+
+    def _on_done(self, future: asyncio.Future[PrewarmStats]) -> None:
+        if future.cancelled():
+            return
+        err = future.exception()
+        if err is not None:
+            self.stats = PrewarmStats(error=f"{type(err).__name__}: {err}")
+            _LOGGER.warning("HSEM numeric prewarm failed: %s", err)
+            return
+        self.stats = future.result()
+        _LOGGER.debug(
+            "HSEM numeric prewarm done in %.1f ms "
+            "(numpy %.1f ms, scipy %s ms, first LP %s ms)",
+            self.stats.total_ms,
+            self.stats.numpy_import_ms,
+            self.stats.scipy_import_ms,
+            self.stats.first_solve_ms,
+        )
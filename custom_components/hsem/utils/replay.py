@@ -0,0 +1,264 @@
+"""Bulk offline replay of diagnostics dumps.
+
+A diagnostics dump (:func:`~custom_components.hsem.utils.diagnostics.build_diagnostics_dump`)
+carries the full :class:`PlannerInput` of one production cycle and a summary
+of the plan HSEM produced for it.  :func:`replay_directory` re-runs the
+current planner on every dump in a directory, spread over worker processes,
+and compares each new plan with the recorded one:
+
+- winning candidate, selector score and money cost (``total_cost``);
+- wall-clock time of the replayed ``run_planner`` call;
+- slots whose recommendation changed.
+
+:func:`format_table` renders the results as a compact Markdown table and
+:func:`write_csv` as one CSV row per dump.  ``scripts/replay_dumps.py`` is
+the command-line front end.
+
+Dumps never contain the solar forecast corrector (a runtime object), so a
+dump recorded with PV auto-correction active replays with raw forecasts.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import multiprocessing
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from custom_components.hsem.models.planner_output import PlannerOutput
+from custom_components.hsem.utils.diagnostics import load_planner_input_from_dump
+
+# Changed slots listed per dump in the table; the CSV keeps them all.
+_TABLE_MAX_SLOT_DIFFS = 3
+
+# Score / cost differences below this are rounding in the dump (4 decimals).
+_COST_TOLERANCE = 1e-3
+
+
+@dataclass
+class SlotDiff:
+    """A slot whose recommendation differs between recorded and replayed plan."""
+
+    start: str
+    recorded: str | None
+    replayed: str | None
+
+
+@dataclass
+class ReplayResult:
+    """Recorded-versus-replayed comparison for one diagnostics dump.
+
+    Attributes:
+        dump:
+            File name of the dump.
+        recorded_winner / replayed_winner:
+            Name of the winning candidate.
+        recorded_score / replayed_score:
+            Selector objective of the plan (``PlanCostBreakdown.score``).
+        recorded_total_cost / replayed_total_cost:
+            Money outcome of the plan (``PlanCostBreakdown.total_cost``).
+        solve_ms:
+            Wall-clock milliseconds of the replayed ``run_planner`` call.
+        slot_diffs:
+            Slots whose recommendation changed, in time order.
+        error:
+            ``"<ExceptionType>: <message>"`` when the dump could not be
+            loaded or replayed; all other fields are then unset.
+    """
+
+    dump: str
+    recorded_winner: str | None = None
+    replayed_winner: str | None = None
+    recorded_score: float | None = None
+    replayed_score: float | None = None
+    recorded_total_cost: float | None = None
+    replayed_total_cost: float | None = None
+    solve_ms: float | None = None
+    slot_diffs: list[SlotDiff] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def matches(self) -> bool:
+        """Return True when the replay reproduces the recorded plan."""
+        return (
+            self.error is None
+            and self.recorded_winner == self.replayed_winner
+            and not self.slot_diffs
+            and _close(self.recorded_score, self.replayed_score)
+            and _close(self.recorded_total_cost, self.replayed_total_cost)
+        )
+
+
+def _close(recorded: float | None, replayed: float | None) -> bool:
+    if recorded is None or replayed is None:
+        return recorded is replayed
+    return abs(recorded - replayed) <= _COST_TOLERANCE
+
+
+def _slot_diffs(
+    recorded: list[dict[str, Any]], output: PlannerOutput
+) -> list[SlotDiff]:
+    """Return the slots whose recommendation differs, keyed by slot start."""
+    before = {s["start"]: s.get("recommendation") for s in recorded}
+    after = {s.start.isoformat(): s.recommendation for s in output.slots}
+    return [
+        SlotDiff(start=start, recorded=before.get(start), replayed=after.get(start))
+        for start in sorted(before.keys() | after.keys())
+        if before.get(start) != after.get(start)
+    ]
+
+
+def compare_dump(dump: dict[str, Any], name: str = "") -> ReplayResult:
+    """Replay one loaded dump and compare it with its recorded output."""
+    from custom_components.hsem.planner.engine_core import run_planner
+
+    recorded = dump.get("planner_output") or {}
+    recorded_cost = recorded.get("plan_cost") or {}
+    inp = load_planner_input_from_dump(dump)
+    started = time.perf_counter()
+    output = run_planner(inp)
+    solve_ms = (time.perf_counter() - started) * 1000.0
+    return ReplayResult(
+        dump=name,
+        recorded_winner=(recorded.get("explanation") or {}).get("winner_name"),
+        replayed_winner=output.explanation.winner_name,
+        recorded_score=recorded_cost.get("score"),
+        replayed_score=(
+            round(output.plan_cost.score, 4) if output.plan_cost is not None else None
+        ),
+        recorded_total_cost=recorded_cost.get("total_cost"),
+        replayed_total_cost=(
+            round(output.plan_cost.total_cost, 4)
+            if output.plan_cost is not None
+            else None
+        ),
+        solve_ms=round(solve_ms, 1),
+        slot_diffs=_slot_diffs(recorded.get("slots") or [], output),
+    )
+
+
+def replay_file(path: str | Path) -> ReplayResult:
+    """Load the dump at *path*, replay it and compare; never raises."""
+    path = Path(path)
+    try:
+        dump = json.loads(path.read_text(encoding="utf-8"))
+        return compare_dump(dump, path.name)
+    except Exception as err:  # noqa: BLE001 — reported in the table
+        return ReplayResult(dump=path.name, error=f"{type(err).__name__}: {err}")
+
+
+def replay_directory(
+    directory: str | Path,
+    *,
+    pattern: str = "*.json",
+    workers: int | None = None,
+) -> list[ReplayResult]:
+    """Replay every dump matching *pattern* in *directory*, in file-name order.
+
+    Args:
+        directory: Directory holding the diagnostics dumps.
+        pattern: Glob selecting the dump files.
+        workers: Number of worker processes; defaults to the CPU count.
+            ``1`` replays in the calling process.
+
+    Returns:
+        One :class:`ReplayResult` per file, in file-name order.
+    """
+    paths = sorted(Path(directory).glob(pattern))
+    workers = min(workers or os.cpu_count() or 1, len(paths) or 1)
+    if workers <= 1:
+        return [replay_file(path) for path in paths]
+    # Spawned workers import the planner once each; forking is avoided for
+    # consistency with the planner worker process.
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(replay_file, paths))
+
+
+def _fmt(value: float | None, digits: int) -> str:
+    return "—" if value is None else f"{value:.{digits}f}"
+
+
+def format_table(results: Iterable[ReplayResult]) -> str:
+    """Render *results* as a Markdown table with a one-line summary."""
+    rows = list(results)
+    lines = [
+        "| dump | winner | score | total_cost | solve ms | slot diffs |",
+        "|---|---|---|---|---|---|",
+    ]
+    for r in rows:
+        if r.error is not None:
+            lines.append(f"| {r.dump} | ERROR | | | | {r.error} |")
+            continue
+        winner = (
+            r.replayed_winner
+            if r.recorded_winner == r.replayed_winner
+            else f"{r.recorded_winner} → {r.replayed_winner}"
+        )
+        diffs = ", ".join(
+            f"{d.start[11:16]} {d.recorded}→{d.replayed}"
+            for d in r.slot_diffs[:_TABLE_MAX_SLOT_DIFFS]
+        )
+        if len(r.slot_diffs) > _TABLE_MAX_SLOT_DIFFS:
+            diffs += f", +{len(r.slot_diffs) - _TABLE_MAX_SLOT_DIFFS} more"
+        lines.append(
+            f"| {r.dump} | {winner} "
+            f"| {_fmt(r.recorded_score, 4)} → {_fmt(r.replayed_score, 4)} "
+            f"| {_fmt(r.recorded_total_cost, 4)} → {_fmt(r.replayed_total_cost, 4)} "
+            f"| {_fmt(r.solve_ms, 1)} | {len(r.slot_diffs)}"
+            f"{': ' + diffs if diffs else ''} |"
+        )
+    errors = sum(r.error is not None for r in rows)
+    matched = sum(r.matches for r in rows)
+    lines.append("")
+    lines.append(
+        f"{len(rows)} dumps: {matched} identical, "
+        f"{len(rows) - matched - errors} changed, {errors} errors"
+    )
+    return "\n".join(lines)
+
+
+def write_csv(results: Iterable[ReplayResult], path: str | Path) -> None:
+    """Write one CSV row per result to *path*; slot diffs as ``start=a>b``."""
+    columns = [
+        "dump",
+        "matches",
+        "recorded_winner",
+        "replayed_winner",
+        "recorded_score",
+        "replayed_score",
+        "recorded_total_cost",
+        "replayed_total_cost",
+        "solve_ms",
+        "slot_diff_count",
+        "slot_diffs",
+        "error",
+    ]
+    with Path(path).open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(columns)
+        for r in results:
+            writer.writerow(
+                [
+                    r.dump,
+                    r.matches,
+                    r.recorded_winner,
+                    r.replayed_winner,
+                    r.recorded_score,
+                    r.replayed_score,
+                    r.recorded_total_cost,
+                    r.replayed_total_cost,
+                    r.solve_ms,
+                    len(r.slot_diffs),
+                    ";".join(
+                        f"{d.start}={d.recorded}>{d.replayed}" for d in r.slot_diffs
+                    ),
+                    r.error,
+                ]
+            )
@@ -516,3 +516,23 @@ def get_pv_curtailment_sensor_unique_id(entry_id: str) -> str:
 def get_pv_curtailment_sensor_entity_id() -> str:
     """Return the entity_id for the PV curtailment sensor."""
     return f"sensor.{s(f'{DOMAIN}_pv_curtailment_sensor')}"
+
+
+# Planner Profile Sensor
+def get_planner_profile_sensor_name() -> str:
+    """Return the display name for the planner profile sensor."""
+    return "Planner Profile"
+
+
+def get_planner_profile_sensor_unique_id(entry_id: str) -> str:
+    """Return a unique ID for the planner profile sensor.
+
+    Args:
+        entry_id (str): The config entry ID for uniqueness across entries.
+    """
+    return f"{DOMAIN}_{entry_id}_planner_profile_sensor"
+
+
+def get_planner_profile_sensor_entity_id() -> str:
+    """Return the entity_id for the planner profile sensor."""
+    return f"sensor.{s(f'{DOMAIN}_planner_profile_sensor')}"
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# ruff: noqa: T201
+"""
+Backtest HSEM on recorded data and sweep planner parameters.
+
+Steps the planner slot by slot through recorded prices, Solcast forecasts,
+PV production and house load, feeds the realised SoC forward and reports
+what each parameter set would have cost.  See
+``custom_components/hsem/utils/backtest.py`` for the simulation model.
+
+Usage
+-----
+Run from the repository root with the development environment active.
+
+CSV or Parquet data (columns: start, import_price, export_price,
+pv_actual_kwh, load_actual_kwh, pv_estimate[, pv_estimate10, pv_estimate90]):
+
+    python scripts/backtest.py data.csv --template dump.json \\
+        --sweep battery_cycle_cost_per_kwh=0,0.05,0.1 \\
+        --sweep solcast_likelihood=pv_estimate,pv_estimate10 --csv sweep.csv
+
+A copy of the recorder database (hourly long-term statistics):
+
+    python scripts/backtest.py home-assistant_v2.db --tz Europe/Copenhagen \\
+        --start 2026-01-01T00:00:00+01:00 --end 2026-02-01T00:00:00+01:00 \\
+        --stat import_price=sensor.energi_data_service \\
+        --stat export_price=sensor.energi_data_service_export \\
+        --stat pv_actual_kwh=sensor.inverter_total_yield \\
+        --stat load_actual_kwh=sensor.house_consumption_energy \\
+        --stat pv_estimate=sensor.solcast_pv_forecast_power_now
+
+``--template`` takes a diagnostics dump (``hsem.export_diagnostics``) so the
+backtest uses the battery and planner settings of a live installation;
+without it the PlannerInput defaults are used.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.hsem.models.planner_input import PlannerInput  # noqa: E402
+from custom_components.hsem.utils.backtest import (  # noqa: E402
+    format_table,
+    parameter_grid,
+    run_sweep,
+    write_csv,
+)
+from custom_components.hsem.utils.backtest_data import (  # noqa: E402
+    BacktestSeries,
+    load_csv,
+    load_parquet,
+    load_recorder,
+)
+from custom_components.hsem.utils.diagnostics import (  # noqa: E402
+    load_planner_input_from_dump,
+)
+
+
+def _value(text: str) -> Any:
+    """Parse a sweep value as JSON (numbers, booleans) or keep it as text."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _pairs(items: list[str], option: str) -> dict[str, str]:
+    pairs = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"{option} expects KEY=VALUE, got {item!r}")
+        pairs[key.strip()] = value.strip()
+    return pairs
+
+
+def _load_series(args: argparse.Namespace) -> BacktestSeries:
+    path = Path(args.data)
+    if path.suffix == ".parquet":
+        return load_parquet(path)
+    if path.suffix == ".db":
+        if not (args.start and args.end and args.tz):
+            raise SystemExit("recorder data needs --start, --end and --tz")
+        return load_recorder(
+            path,
+            _pairs(args.stat, "--stat"),
+            start=datetime.fromisoformat(args.start),
+            end=datetime.fromisoformat(args.end),
+            time_zone=args.tz,
+        )
+    return load_csv(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Backtest HSEM on recorded data and sweep planner parameters."
+    )
+    parser.add_argument("data", help="CSV, Parquet or recorder .db file")
+    parser.add_argument("--template", help="Diagnostics dump with the settings")
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        metavar="FIELD=V1,V2",
+        help="PlannerInput field (or solcast_likelihood) and values to sweep",
+    )
+    parser.add_argument(
+        "--stat",
+        action="append",
+        default=[],
+        metavar="COLUMN=STATISTIC_ID",
+        help="Recorder statistic for a series column (.db data only)",
+    )
+    parser.add_argument("--start", help="First hour to load (.db data only)")
+    parser.add_argument("--end", help="End of the range, exclusive (.db data only)")
+    parser.add_argument("--tz", help="IANA time zone of the slots (.db data only)")
+    parser.add_argument(
+        "--soc", type=float, help="Battery SoC %% at the first simulated slot"
+    )
+    parser.add_argument(
+        "--replan-every",
+        type=int,
+        default=1,
+        help="Run the planner every N slots (default: 1, like live)",
+    )
+    parser.add_argument(
+        "--warmup-days",
+        type=int,
+        default=1,
+        help="Leading days used only as consumption history (default: 1)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count; 1 = in-process)",
+    )
+    parser.add_argument("--csv", help="Also write the results to this CSV")
+    args = parser.parse_args()
+
+    series = _load_series(args)
+    if args.template:
+        dump = json.loads(Path(args.template).read_text(encoding="utf-8"))
+        template = load_planner_input_from_dump(dump)
+    else:
+        template = PlannerInput()
+    if args.soc is not None:
+        template.battery_soc_pct = args.soc
+
+    axes = {
+        key: [_value(v) for v in values.split(",")]
+        for key, values in _pairs(args.sweep, "--sweep").items()
+    }
+    configs = parameter_grid(**axes)
+    print(
+        f"{len(series)} slots of {series.interval_minutes} min from "
+        f"{series.starts[0].isoformat()}; {len(configs)} parameter set(s)"
+    )
+    results = run_sweep(
+        series,
+        template,
+        configs,
+        workers=args.workers,
+        replan_every=args.replan_every,
+        warmup_days=args.warmup_days,
+    )
+    print(format_table(results))
+    if args.csv:
+        write_csv(results, args.csv)
+        print(f"\nCSV written to {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
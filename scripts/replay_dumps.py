@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# ruff: noqa: T201
+"""
+Replay a directory of HSEM diagnostics dumps against the current planner.
+
+Each dump (saved from the ``hsem.export_diagnostics`` service or the HA
+diagnostics download) is re-planned in a worker process and compared with
+the plan HSEM recorded: winner, score, total cost, solve time and the slots
+whose recommendation changed.
+
+Usage
+-----
+Run from the repository root with the development environment active:
+
+    python scripts/replay_dumps.py /path/to/dumps
+    python scripts/replay_dumps.py /path/to/dumps --workers 4 --csv replay.csv
+
+The exit status is 1 when any dump changed or failed to replay, so the
+script can gate a planner change in CI.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.hsem.utils.replay import (  # noqa: E402
+    format_table,
+    replay_directory,
+    write_csv,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay HSEM diagnostics dumps and compare the plans."
+    )
+    parser.add_argument("directory", help="Directory holding the dump files")
+    parser.add_argument(
+        "--pattern", default="*.json", help="Glob selecting dump files (*.json)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count; 1 = in-process)",
+    )
+    parser.add_argument("--csv", help="Also write the full comparison to this CSV")
+    args = parser.parse_args()
+
+    results = replay_directory(
+        args.directory, pattern=args.pattern, workers=args.workers
+    )
+    print(format_table(results))
+    if args.csv:
+        write_csv(results, args.csv)
+        print(f"\nCSV written to {args.csv}")
+    return 0 if all(r.matches for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Planner performance benchmarks for HSEM."""
@@ -0,0 +1,173 @@
+"""Benchmark scenario matrix for the HSEM planner.
+
+Each :class:`BenchmarkCase` is one point of the matrix
+
+- slot interval: 5 / 15 / 60 minutes,
+- horizon: 24 / 48 / 72 hours,
+- connected EVs: 0 / 1 / 2,
+- grid limits: none, or a 16 A three-phase main fuse plus a 3 kW export cap,
+
+built on the summer-day fixture with one price and PV curve per calendar day
+in the horizon.
+
+:func:`capture_planner_calls` runs :func:`run_planner` once and records the
+arguments it passes to ``generate_candidates``, ``solve_milp``,
+``simulate_soc_batch`` and ``score_plan``, so those functions can be timed
+on the exact inputs the planner gives them.
+"""
+
+from __future__ import annotations
+
+import importlib
+import itertools
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import patch
+
+from custom_components.hsem.models.planner_input import PlannerInput
+from custom_components.hsem.models.price_point import PricePoint
+from custom_components.hsem.models.solcast_slot import SolcastSlot
+from custom_components.hsem.planner import run_planner
+from tests.planner.fixtures import make_summer_day_input
+
+INTERVALS_MIN = (5, 15, 60)
+HORIZONS_H = (24, 48, 72)
+EV_COUNTS = (0, 1, 2)
+GRID_LIMITS = (False, True)
+
+# Functions patched by capture_planner_calls: benchmark name → patch target.
+_CAPTURE_TARGETS = {
+    "generate_candidates": (
+        "custom_components.hsem.planner.engine_core.generate_candidates"
+    ),
+    "solve_milp": "custom_components.hsem.planner.candidate_generator.solve_milp",
+    "simulate_soc": (
+        "custom_components.hsem.planner.candidate_selector.simulate_soc_batch"
+    ),
+    "score_plan": "custom_components.hsem.planner.engine_core.score_plan",
+}
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """One point of the benchmark matrix."""
+
+    interval_minutes: int
+    horizon_hours: int
+    ev_count: int
+    grid_limits: bool
+
+    @property
+    def case_id(self) -> str:
+        """Return the stable key used in ``budgets.json``."""
+        limits = "limits" if self.grid_limits else "nolimits"
+        return (
+            f"{self.interval_minutes}m-{self.horizon_hours}h-ev{self.ev_count}-{limits}"
+        )
+
+    def planner_input(self) -> PlannerInput:
+        """Return the :class:`PlannerInput` for this case."""
+        inp = make_summer_day_input(
+            interval_minutes=self.interval_minutes,
+            interval_length_hours=self.horizon_hours,
+        )
+        days = range(self.horizon_hours // 24 + 1)
+        inp.price_points = [
+            PricePoint(
+                hour=p.hour,
+                import_price=round(p.import_price * (1 + 0.1 * d), 4),
+                export_price=round(p.export_price * (1 + 0.1 * d), 4),
+                day_offset=d,
+            )
+            for d in days
+            for p in inp.price_points
+        ]
+        inp.solcast_slots = [
+            SolcastSlot(
+                hour=s.hour,
+                pv_estimate=round(s.pv_estimate * (1 - 0.15 * d), 3),
+                day_offset=d,
+            )
+            for d in days
+            for s in inp.solcast_slots
+        ]
+        now = datetime.fromisoformat(inp.now_iso)
+        if self.ev_count >= 1:
+            inp = replace(
+                inp,
+                ev_planned_load_enabled=True,
+                ev_planned_load_connected=True,
+                ev_planned_load_current_soc_pct=20.0,
+                ev_planned_load_target_soc_pct=80.0,
+                ev_planned_load_battery_capacity_kwh=60.0,
+                ev_planned_load_charger_power_kw=11.0,
+                ev_planned_load_deadline=now + timedelta(hours=20),
+            )
+        if self.ev_count >= 2:
+            inp = replace(
+                inp,
+                ev_second_planned_load_enabled=True,
+                ev_second_planned_load_connected=True,
+                ev_second_planned_load_current_soc_pct=30.0,
+                ev_second_planned_load_target_soc_pct=90.0,
+                ev_second_planned_load_battery_capacity_kwh=40.0,
+                ev_second_planned_load_charger_power_kw=7.4,
+                ev_second_planned_load_deadline=now + timedelta(hours=30),
+            )
+        if self.grid_limits:
+            inp = replace(
+                inp,
+                main_fuse_amps=16.0,
+                main_fuse_phases=3,
+                max_grid_export_power_kw=3.0,
+            )
+        return inp
+
+
+def benchmark_cases() -> Iterator[BenchmarkCase]:
+    """Yield every case of the matrix."""
+    for interval, horizon, evs, limits in itertools.product(
+        INTERVALS_MIN, HORIZONS_H, EV_COUNTS, GRID_LIMITS
+    ):
+        yield BenchmarkCase(interval, horizon, evs, limits)
+
+
+def capture_planner_calls(inp: PlannerInput) -> dict[str, tuple]:
+    """Run the planner on *inp* and return ``{name: (args, kwargs)}``.
+
+    Only the first call of each function is kept.  ``solve_milp`` is absent
+    when scipy is not installed.
+    """
+    calls: dict[str, tuple] = {}
+    with ExitStack() as stack:
+        for name, target in _CAPTURE_TARGETS.items():
+            module_name, attr = target.rsplit(".", 1)
+            original = getattr(importlib.import_module(module_name), attr)
+            stack.enter_context(patch(target, _passthrough(original, calls, name)))
+        run_planner(inp)
+    return calls
+
+
+def _passthrough(
+    fn: Callable[..., Any], calls: dict[str, tuple], name: str
+) -> Callable[..., Any]:
+    def record(*args: Any, **kwargs: Any) -> Any:
+        if name not in calls:
+            # The planner edits slot lists after (and, for the SoC batch,
+            # inside) these calls: keep pristine copies.
+            if name == "simulate_soc":
+                slots = [s.clone() for s in args[0][0]]
+                flags = kwargs.get("milp_prepopulated") or [False]
+                calls[name] = (
+                    (slots, *args[1:]),
+                    {**kwargs, "milp_prepopulated": flags[0]},
+                )
+            else:
+                slots = [s.clone() for s in args[0]]
+                calls[name] = ((slots, *args[1:]), dict(kwargs))
+        return fn(*args, **kwargs)
+
+    return record
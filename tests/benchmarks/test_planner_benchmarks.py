@@ -0,0 +1,184 @@
+"""Planner performance benchmarks with per-case regression budgets.
+
+Times ``run_planner``, ``generate_candidates``, ``solve_milp``,
+``simulate_soc`` and ``score_plan`` on every case of the scenario matrix
+(see :mod:`tests.benchmarks.scenarios`) and records the peak traced memory
+of one extra run under :mod:`tracemalloc`.  A case fails when its best
+time or its peak memory exceeds the stored budget in ``budgets.json`` by
+more than the margin.
+
+The suite is opt-in because timings depend on the machine:
+
+- ``HSEM_BENCHMARK=1`` runs it;
+- ``HSEM_BENCHMARK_MARGIN`` is the allowed overshoot as a fraction of the
+  budget (default ``1.0``, i.e. twice the budget; shared CI runners are
+  noisy);
+- ``HSEM_BENCHMARK_UPDATE=1`` records the measurements as the new budgets
+  instead of checking them.
+"""
+
+from __future__ import annotations
+
+import functools
+import gc
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from custom_components.hsem.planner import run_planner
+from custom_components.hsem.planner.candidate_generator import generate_candidates
+from custom_components.hsem.planner.cost_function import score_plan
+from custom_components.hsem.planner.milp_optimizer import solve_milp
+from custom_components.hsem.planner.soc_simulation import simulate_soc
+from tests.benchmarks.scenarios import (
+    BenchmarkCase,
+    benchmark_cases,
+    capture_planner_calls,
+)
+
+pytestmark = [
+    pytest.mark.slow,
+    # The 5-minute, 72-hour cases exceed the suite-wide 30 s default.
+    pytest.mark.timeout(300),
+    pytest.mark.skipif(
+        not os.environ.get("HSEM_BENCHMARK"),
+        reason="planner benchmarks run only with HSEM_BENCHMARK=1",
+    ),
+]
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+
+# Timed runs per measurement, after one untimed warm-up run.  As with
+# ``timeit`` the best run is compared with the budget: slower runs measure
+# the machine, not the planner.
+_REPEATS = 5
+
+# Absolute slack on top of the relative margin so sub-millisecond and
+# small-allocation cases do not flap on timer and allocator noise.
+_TIME_SLACK_MS = 2.0
+_MEMORY_SLACK_KIB = 64.0
+
+_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "run_planner": run_planner,
+    "generate_candidates": generate_candidates,
+    "solve_milp": solve_milp,
+    "simulate_soc": simulate_soc,
+    "score_plan": score_plan,
+}
+
+_CASES = list(benchmark_cases())
+
+# Measurements of this session, written to BUDGETS_PATH in update mode.
+_measured: dict[str, dict[str, dict[str, float]]] = {}
+
+
+def _margin() -> float:
+    return float(os.environ.get("HSEM_BENCHMARK_MARGIN", "1.0"))
+
+
+def _updating() -> bool:
+    return bool(os.environ.get("HSEM_BENCHMARK_UPDATE"))
+
+
+def _load_budgets() -> dict[str, dict[str, dict[str, float]]]:
+    if not BUDGETS_PATH.exists():
+        return {}
+    budgets: dict[str, dict[str, dict[str, float]]] = json.loads(
+        BUDGETS_PATH.read_text(encoding="utf-8")
+    )
+    return budgets
+
+
+@functools.cache
+def _captured(case: BenchmarkCase) -> dict[str, tuple]:
+    return capture_planner_calls(case.planner_input())
+
+
+def _call_factory(
+    name: str, case: BenchmarkCase
+) -> Callable[[], tuple[tuple, dict[str, Any]]]:
+    """Return a factory for fresh ``(args, kwargs)`` of one benchmark call."""
+    if name == "run_planner":
+        return lambda: ((case.planner_input(),), {})
+    calls = _captured(case)
+    if name not in calls:
+        pytest.skip(f"{name} is not called for this case (scipy missing?)")
+    args, kwargs = calls[name]
+    if name == "simulate_soc":
+        # simulate_soc writes into its slots: simulate a fresh copy each run.
+        return lambda: (([s.clone() for s in args[0]], *args[1:]), kwargs)
+    return lambda: (args, kwargs)
+
+
+def _measure(
+    fn: Callable[..., Any], make_call: Callable[[], tuple[tuple, dict[str, Any]]]
+) -> dict[str, float]:
+    """Return the best wall time and the peak traced memory of *fn*."""
+    args, kwargs = make_call()
+    fn(*args, **kwargs)
+    times = []
+    for _ in range(_REPEATS):
+        args, kwargs = make_call()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            fn(*args, **kwargs)
+            times.append((time.perf_counter() - started) * 1000.0)
+        finally:
+            gc.enable()
+    args, kwargs = make_call()
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "time_ms": round(min(times), 3),
+        "peak_kib": round(peak / 1024.0, 1),
+    }
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _write_budgets() -> Iterator[None]:
+    yield
+    if _updating() and _measured:
+        budgets = _load_budgets()
+        for case_id, functions in _measured.items():
+            budgets.setdefault(case_id, {}).update(functions)
+        BUDGETS_PATH.write_text(
+            json.dumps(budgets, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+
+
+@pytest.mark.parametrize("name", list(_FUNCTIONS))
+@pytest.mark.parametrize("case", _CASES, ids=[c.case_id for c in _CASES])
+def test_within_budget(case: BenchmarkCase, name: str) -> None:
+    result = _measure(_FUNCTIONS[name], _call_factory(name, case))
+    if _updating():
+        _measured.setdefault(case.case_id, {})[name] = result
+        return
+
+    budget = _load_budgets().get(case.case_id, {}).get(name)
+    if budget is None:
+        pytest.fail(
+            f"no budget for {case.case_id}/{name}; "
+            "record one with HSEM_BENCHMARK_UPDATE=1"
+        )
+    margin = 1.0 + _margin()
+    time_limit = budget["time_ms"] * margin + _TIME_SLACK_MS
+    memory_limit = budget["peak_kib"] * margin + _MEMORY_SLACK_KIB
+    assert result["time_ms"] <= time_limit, (
+        f"{case.case_id}/{name}: {result['time_ms']:.1f} ms exceeds the "
+        f"{budget['time_ms']:.1f} ms budget by more than {_margin():.0%}"
+    )
+    assert result["peak_kib"] <= memory_limit, (
+        f"{case.case_id}/{name}: peak {result['peak_kib']:.0f} KiB exceeds the "
+        f"{budget['peak_kib']:.0f} KiB budget by more than {_margin():.0%}"
+    )
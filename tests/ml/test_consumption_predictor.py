@@ -238,12 +238,11 @@ class TestConsumptionPredictor:
             reference,
         )
 
-        assert predictor._X is not None
+        assert predictor._cont is not None
         assert predictor._y is not None
         assert predictor._y.tolist() == pytest.approx([1.0, 2.0, 4.0])
-        assert predictor._X[:, predictor._lag_offset].tolist() == pytest.approx(
-            [0.0, 1.0, 0.0]
-        )
+        lag_column = predictor._lag_offset - predictor._n_onehot
+        assert predictor._cont[:, lag_column].tolist() == pytest.approx([0.0, 1.0, 0.0])
 
     def test_sequential_inference_skips_nonexistent_spring_slots(
         self,
@@ -344,3 +343,114 @@ class TestConsumptionPredictor:
         assert predictor.trained is True
         assert predictor.last_fit_samples == 2
         assert math.isfinite(predictor.predict(0, 0, NOW, float("nan")))
+
+    def test_group_means_match_weighted_average_without_dense_matrix(self) -> None:
+        """Group sums come from the integer group index, not a one-hot row."""
+        p = _predictor(decay_days=3.0, alpha=0.0, slots_per_day=96)
+        history = [_mk(7, 5, 1.0), _mk(14, 5, 3.0), _mk(1, 6, 2.0), _mk(8, 6, 4.0)]
+        p.train(history, NOW)
+
+        assert p._cont is not None
+        assert p._cont.shape == (4, 2)
+        assert p.group_count == 2
+        weights = [math.exp(-7 / 3.0), math.exp(-14 / 3.0)]
+        expected = (weights[0] * 1.0 + weights[1] * 3.0) / sum(weights)
+        dow = (NOW - timedelta(days=7)).weekday()
+        assert p._coef is not None
+        assert p._coef[dow * 96 + 5] == pytest.approx(expected)
+
+
+class TestTemperatureIndex:
+    """Sorted-index nearest-temperature lookups."""
+
+    def test_nearest_reading_by_physical_time(self) -> None:
+        from custom_components.hsem.ml.temperature_index import TemperatureIndex
+
+        base = datetime(2026, 6, 4, 12, 0, tzinfo=UTC)
+        index = TemperatureIndex(
+            {
+                base + timedelta(minutes=20): 12.0,
+                base: 10.0,
+                base + timedelta(minutes=10): float("nan"),
+                base + timedelta(minutes=40): 14.0,
+            }
+        )
+
+        assert len(index) == 3
+        assert index.nearest(base - timedelta(hours=1)) == 10.0
+        assert index.nearest(base + timedelta(minutes=9)) == 10.0
+        assert index.nearest(base + timedelta(minutes=10)) == 10.0  # tie: earlier
+        assert index.nearest(base + timedelta(minutes=31)) == 14.0
+        assert index.nearest(base + timedelta(days=1)) == 14.0
+        assert index.nearest_many(
+            [base + timedelta(minutes=m) for m in (0, 19, 35)]
+        ).tolist() == [10.0, 12.0, 14.0]
+
+    def test_empty_index(self) -> None:
+        from custom_components.hsem.ml.temperature_index import TemperatureIndex
+
+        index = TemperatureIndex({NOW: float("inf")})
+
+        assert len(index) == 0
+        assert index.nearest(NOW) is None
+        assert math.isnan(index.nearest_many([NOW, NOW])[1])
+
+    def test_training_matches_per_sample_lookup(self) -> None:
+        p = _predictor(slots_per_day=96, use_temperature=True)
+        history = [_mk(d, s, 0.5 + 0.01 * s) for d in range(1, 4) for s in range(96)]
+        temperatures = {
+            NOW - timedelta(minutes=37 * i): 10.0 + (i % 11) for i in range(300)
+        }
+
+        p.train(history, NOW, temperatures)
+
+        assert p._cont is not None
+        column = p._temp_offset - p._n_onehot
+        expected = [
+            min(temperatures.items(), key=lambda item: abs(item[0] - ts))[1]
+            for ts, _slot, _energy in sorted(history)
+        ]
+        assert p._cont[:, column].tolist() == expected
+
+    def test_training_accepts_prebuilt_index(self) -> None:
+        from custom_components.hsem.ml.temperature_index import TemperatureIndex
+
+        history = [_mk(d, s, 0.5 + 0.01 * s) for d in range(1, 4) for s in range(96)]
+        temperatures = {
+            NOW - timedelta(minutes=37 * i): 10.0 + (i % 11) for i in range(300)
+        }
+        from_dict = _predictor(slots_per_day=96, use_temperature=True)
+        from_index = _predictor(slots_per_day=96, use_temperature=True)
+
+        from_dict.train(history, NOW, temperatures)
+        from_index.train(history, NOW, TemperatureIndex(temperatures, NOW.tzinfo))
+
+        assert from_dict._cont is not None and from_index._cont is not None
+        assert from_index._cont.tolist() == from_dict._cont.tolist()
+
+    def test_sequential_naive_temperatures_use_slot_timezone(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        tz = ZoneInfo("Pacific/Auckland")
+        predictor = _predictor(slots_per_day=24, use_temperature=True)
+        predictor.train([_mk(2, 0, 1.0), _mk(1, 0, 1.0)], NOW)
+        seen: list[float | None] = []
+
+        def fake_predict(
+            _timestamp: datetime,
+            _slot: int,
+            temperature: float | None,
+            prev_energy: float = 0.0,
+        ) -> float:
+            seen.append(temperature)
+            return 1.0
+
+        monkeypatch.setattr(predictor, "_predict_from_features", fake_predict)
+        naive = {datetime(2026, 6, 4, 12, 0): 10.0, datetime(2026, 6, 4, 13, 0): 20.0}
+
+        predictor.predict_sequential(
+            [datetime(2026, 6, 4, hour, 0, tzinfo=tz) for hour in (12, 13)], naive
+        )
+
+        assert seen == [10.0, 20.0]
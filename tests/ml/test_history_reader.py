@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 from zoneinfo import ZoneInfo
 
 import pytest
 
-from custom_components.hsem.ml.history_reader import HistoryReader
+from homeassistant.components.recorder.statistics import statistics_during_period
+
+from custom_components.hsem.ml.history_reader import (
+    EnergyHistorySeries,
+    HistoryReader,
+)
 from custom_components.hsem.utils.datetime_utils import utc_key
 
 STOCKHOLM = ZoneInfo("Europe/Stockholm")
@@ -309,3 +314,235 @@ async def test_instantaneous_history_filters_nonfinite_temperature() -> None:
         )
 
     assert readings == [(finite_timestamp.astimezone(STOCKHOLM), 18.5)]
+
+
+class _Recorder:
+    """Accumulator states every 5 minutes, served like ``get_significant_states``."""
+
+    def __init__(self, start: datetime, end: datetime) -> None:
+        count = int((end - start) / timedelta(minutes=5))
+        self.states = [
+            _state(start + timedelta(minutes=5 * i), round(0.1 * i + (i % 7) * 0.01, 3))
+            for i in range(count)
+        ]
+        self.starts: list[datetime] = []
+        self.now = start
+
+    async def async_add_executor_job(self, _func, _hass, start, end, *_args):
+        self.starts.append(start)
+        before = [s for s in self.states if s.last_updated < start]
+        window = [s for s in self.states if start <= s.last_updated <= end]
+        if before and not (window and window[0].last_updated == start):
+            # HA's start-time state
+            window.insert(
+                0, SimpleNamespace(last_updated=start, state=before[-1].state)
+            )
+        return {ENTITY_ID: window}
+
+
+@pytest.mark.asyncio
+async def test_energy_series_appends_new_slots_and_evicts_expired() -> None:
+    first = datetime(2026, 8, 20, 10, 7, tzinfo=STOCKHOLM)
+    recorder = _Recorder(first - timedelta(days=2), first + timedelta(days=2))
+    reader = HistoryReader(MagicMock())
+    series = EnergyHistorySeries(ENTITY_ID)
+
+    with (
+        patch(
+            "custom_components.hsem.ml.history_reader.get_instance",
+            return_value=recorder,
+        ),
+        patch(
+            "custom_components.hsem.ml.history_reader.hsem_now",
+            side_effect=lambda: recorder.now,
+        ),
+    ):
+        recorder.now = first
+        await series.refresh(reader, first, days=0, max_days=1)
+        later = first + timedelta(hours=3, minutes=20)
+        recorder.now = later
+        samples = await series.refresh(reader, later, days=0, max_days=1)
+        full = await reader.read_energy_history(ENTITY_ID, days=0, max_days=1)
+
+    assert utc_key(recorder.starts[1]) == datetime(2026, 8, 20, 7, 45, tzinfo=UTC)
+    assert samples == full
+    assert utc_key(samples[0][0]) >= utc_key(later) - timedelta(days=1)
+    assert series.processed_until == datetime(2026, 8, 20, 11, 15, tzinfo=UTC)
+
+
+@pytest.mark.asyncio
+async def test_energy_series_resyncs_from_full_window_daily() -> None:
+    first = datetime(2026, 8, 20, 10, 7, tzinfo=STOCKHOLM)
+    recorder = _Recorder(first - timedelta(days=2), first + timedelta(days=2))
+    reader = HistoryReader(MagicMock())
+    series = EnergyHistorySeries(ENTITY_ID)
+
+    with (
+        patch(
+            "custom_components.hsem.ml.history_reader.get_instance",
+            return_value=recorder,
+        ),
+        patch(
+            "custom_components.hsem.ml.history_reader.hsem_now",
+            side_effect=lambda: recorder.now,
+        ),
+    ):
+        for hours in (0, 1, 25):
+            recorder.now = first + timedelta(hours=hours)
+            await series.refresh(reader, recorder.now, days=0, max_days=1)
+
+    window_starts = [
+        utc_key(now) - timedelta(days=1) for now in (first, first + timedelta(hours=25))
+    ]
+    assert utc_key(recorder.starts[0]) == window_starts[0]
+    assert utc_key(recorder.starts[1]) == datetime(2026, 8, 20, 7, 45, tzinfo=UTC)
+    assert utc_key(recorder.starts[2]) == window_starts[1]
+    assert series.full_fetch_at == first + timedelta(hours=25)
+
+
+@pytest.mark.asyncio
+async def test_energy_series_without_minimum_span_returns_empty() -> None:
+    now = datetime(2026, 8, 20, 10, 7, tzinfo=STOCKHOLM)
+    recorder = _Recorder(now - timedelta(hours=6), now + timedelta(hours=1))
+    recorder.now = now
+    series = EnergyHistorySeries(ENTITY_ID)
+
+    with (
+        patch(
+            "custom_components.hsem.ml.history_reader.get_instance",
+            return_value=recorder,
+        ),
+        patch(
+            "custom_components.hsem.ml.history_reader.hsem_now",
+            return_value=now,
+        ),
+    ):
+        samples = await series.refresh(HistoryReader(MagicMock()), now, days=1)
+
+    assert samples == []
+    assert series.processed_until is None
+
+
+def _stat_rows(
+    start: datetime, count: int, minutes: int, change: float
+) -> list[dict[str, float]]:
+    return [
+        {
+            "start": (start + timedelta(minutes=minutes * i)).timestamp(),
+            "end": (start + timedelta(minutes=minutes * (i + 1))).timestamp(),
+            "change": change,
+        }
+        for i in range(count)
+    ]
+
+
+def _statistics_fixture() -> tuple[list[dict[str, float]], list[dict[str, float]]]:
+    """Hourly rows 04:00-07:00 UTC, 5-minute rows 06:00-07:45 minus 06:35."""
+    short_term = [
+        row
+        for row in _stat_rows(datetime(2026, 8, 20, 6, 0, tzinfo=UTC), 21, 5, 0.1)
+        if row["start"] != datetime(2026, 8, 20, 6, 35, tzinfo=UTC).timestamp()
+    ]
+    hourly = _stat_rows(datetime(2026, 8, 20, 4, 0, tzinfo=UTC), 3, 60, 1.0)
+    return short_term, hourly
+
+
+def test_statistics_slots_sum_short_term_and_skip_hours_for_short_slots() -> None:
+    short_term, hourly = _statistics_fixture()
+    now = datetime(2026, 8, 20, 7, 50, tzinfo=UTC)
+
+    history = HistoryReader._compute_statistics_slots(short_term, hourly, now, 15)
+
+    by_slot = {utc_key(start): energy for start, _index, energy in history}
+    # An hourly total has no intra-hour profile to spread over 15-min slots.
+    assert datetime(2026, 8, 20, 4, 0, tzinfo=UTC) not in by_slot
+    assert datetime(2026, 8, 20, 6, 30, tzinfo=UTC) not in by_slot  # gap
+    assert datetime(2026, 8, 20, 7, 45, tzinfo=UTC) not in by_slot  # in progress
+    assert by_slot[datetime(2026, 8, 20, 7, 30, tzinfo=UTC)] == pytest.approx(0.3)
+    assert len(by_slot) == 6
+    start, index, _energy = history[0]
+    assert (start.hour, start.minute, index) == (8, 0, 32)
+
+
+def test_statistics_slots_fill_older_hours_for_hourly_slots() -> None:
+    short_term, hourly = _statistics_fixture()
+    now = datetime(2026, 8, 20, 7, 50, tzinfo=UTC)
+
+    history = HistoryReader._compute_statistics_slots(short_term, hourly, now, 60)
+
+    by_slot = {utc_key(start): energy for start, _index, energy in history}
+    # 06:00 overlaps the 5-minute rows (and has a gap); 07:00 is in progress.
+    assert by_slot == {
+        datetime(2026, 8, 20, 4, 0, tzinfo=UTC): pytest.approx(1.0),
+        datetime(2026, 8, 20, 5, 0, tzinfo=UTC): pytest.approx(1.0),
+    }
+
+
+@pytest.mark.asyncio
+async def test_energy_statistics_read_recent_slots_from_states() -> None:
+    now = datetime(2026, 8, 20, 10, 7, tzinfo=STOCKHOLM)
+    short_term, hourly = _statistics_fixture()
+    states = [
+        _state(datetime(2026, 8, 20, 7, 44, 50, tzinfo=UTC), 100.0),
+        _state(datetime(2026, 8, 20, 7, 59, 50, tzinfo=UTC), 100.4),
+    ]
+
+    periods: list[str] = []
+
+    async def executor(func, _hass, start, _end, *args):
+        if func is statistics_during_period:
+            periods.append(args[1])
+            return {ENTITY_ID: short_term if args[1] == "5minute" else hourly}
+        assert utc_key(start) == datetime(2026, 8, 20, 7, 30, tzinfo=UTC)
+        return {ENTITY_ID: states}
+
+    with (
+        patch(
+            "custom_components.hsem.ml.history_reader.get_instance",
+            return_value=SimpleNamespace(async_add_executor_job=executor),
+        ),
+        patch(
+            "custom_components.hsem.ml.history_reader.hsem_now",
+            return_value=now,
+        ),
+    ):
+        history = await HistoryReader(MagicMock()).read_energy_statistics(
+            ENTITY_ID, days=0
+        )
+
+    assert periods == ["5minute"]  # hourly rows only serve hourly slots
+    assert len(history) == 6 + 1
+    assert utc_key(history[-1][0]) == datetime(2026, 8, 20, 7, 45, tzinfo=UTC)
+    assert history[-1][2] == pytest.approx(0.4)
+
+
+@pytest.mark.asyncio
+async def test_energy_statistics_without_statistics_read_states() -> None:
+    now = datetime(2026, 8, 20, 10, 7, tzinfo=STOCKHOLM)
+    states = [
+        _state(datetime(2026, 8, 20, 7, 29, 50, tzinfo=UTC), 100.0),
+        _state(datetime(2026, 8, 20, 7, 44, 50, tzinfo=UTC), 100.25),
+    ]
+    calls: list[object] = []
+
+    async def executor(func, *_args):
+        calls.append(func)
+        return {} if func is statistics_during_period else {ENTITY_ID: states}
+
+    with (
+        patch(
+            "custom_components.hsem.ml.history_reader.get_instance",
+            return_value=SimpleNamespace(async_add_executor_job=executor),
+        ),
+        patch(
+            "custom_components.hsem.ml.history_reader.hsem_now",
+            return_value=now,
+        ),
+    ):
+        history = await HistoryReader(MagicMock()).read_energy_statistics(
+            ENTITY_ID, days=0
+        )
+
+    assert [energy for _start, _index, energy in history] == [0.25]
+    assert calls[:1] == [statistics_during_period]
+    assert len(calls) == 2
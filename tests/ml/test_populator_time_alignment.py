@@ -14,7 +14,11 @@ from homeassistant.core import HomeAssistant
 
 from custom_components.hsem.ml import populator
 from custom_components.hsem.ml.consumption_predictor import ConsumptionPredictor
-from custom_components.hsem.ml.history_reader import HistoryReader
+from custom_components.hsem.ml.history_reader import (
+    EnergyHistorySeries,
+    HistoryReader,
+)
+from custom_components.hsem.ml.temperature_index import TemperatureIndex
 from custom_components.hsem.models.hourly_recommendation import HourlyRecommendation
 from custom_components.hsem.models.sensor_config import SensorConfig
 from custom_components.hsem.utils.datetime_utils import slot_key, utc_key
@@ -47,6 +51,7 @@ class _FakeReader:
         self.actuals = actuals or {}
         self.temperatures = temperatures or {}
         self.energy_calls: list[str] = []
+        self.energy_since: list[object] = []
         self.actual_calls: list[str] = []
         self.temperature_calls: list[str] = []
 
@@ -56,6 +61,7 @@ class _FakeReader:
         **_kwargs: object,
     ) -> list[_HistorySample]:
         self.energy_calls.append(entity_id)
+        self.energy_since.append(_kwargs.get("since"))
         return list(self.histories.get(entity_id, []))
 
     async def read_today_actuals(
@@ -102,7 +108,7 @@ class _FakePredictor:
         self.last_fit_time: datetime | None = NOW if trained else None
         self._raw_groups: dict[tuple[int, int], list[tuple[float, float]]] = {}
         self.training_histories: list[list[_HistorySample]] = []
-        self.training_temperatures: list[dict[datetime, float] | None] = []
+        self.training_temperatures: list[TemperatureIndex | None] = []
         self.prediction_temperatures: list[float | None] = []
         self.prediction_requests: list[tuple[int, int]] = []
         self.sequential_requests: list[list[datetime]] = []
@@ -112,12 +118,10 @@ class _FakePredictor:
         self,
         history: list[_HistorySample],
         reference_time: datetime,
-        temperatures: dict[datetime, float] | None,
+        temperatures: TemperatureIndex | None,
     ) -> None:
         self.training_histories.append(list(history))
-        self.training_temperatures.append(
-            dict(temperatures) if temperatures is not None else None
-        )
+        self.training_temperatures.append(temperatures)
         if self.remain_untrained:
             return
         self.trained = True
@@ -411,9 +415,14 @@ async def test_temperature_history_is_used_for_training_and_inference() -> None:
     assert success is True
     assert predictor is not None
     assert predictor.use_temperature is True
-    assert predictor.training_temperatures[-1] == {
-        utc_key(timestamp): value for timestamp, value in temperature_history
-    }
+    # One index serves the fit and the inference lookup.
+    index = predictor.training_temperatures[-1]
+    assert index is not None
+    assert len(index) == 2
+    assert [index.nearest(timestamp) for timestamp, _ in temperature_history] == [
+        4.0,
+        11.5,
+    ]
     assert predictor.prediction_temperatures == [11.5]
     assert recommendation.avg_house_consumption_kwh == 0.5
 
@@ -538,7 +547,7 @@ def test_predictor_uses_physical_age_and_temperature_identity_across_fold() -> N
         use_temperature=True,
     )
 
-    assert predictor._lookup_temperature(temperatures, fold_one) == 20.0
+    assert TemperatureIndex(temperatures).nearest(fold_one) == 20.0
 
     predictor.train(
         [(fold_zero, 8, 1.0), (fold_one, 8, 1.1)],
@@ -857,3 +866,35 @@ async def test_reused_predictor_refreshes_decay_as_history_grows() -> None:
     assert reused_predictor.decay_days == pytest.approx(15.0)
     assert reused_predictor.actual_history_days == pytest.approx(30.0)
     assert reader.energy_calls == ["sensor.import", "sensor.import"]
+
+
+@pytest.mark.asyncio
+async def test_restored_history_series_fetches_only_the_gap() -> None:
+    hass = _FakeHass()
+    reader = _FakeReader({"sensor.import": _history(NOW)})
+    cfg = _cfg()
+    processed_until = slot_key(NOW - timedelta(hours=1), 15)
+    series = EnergyHistorySeries(
+        entity_id="sensor.import",
+        samples=_history(NOW),
+        processed_until=processed_until,
+        full_fetch_at=NOW - timedelta(hours=2),
+    )
+
+    assert not populator.restore_history_series(
+        cast(HomeAssistant, hass),
+        _cfg(energy_entity="sensor.other"),
+        series,
+        None,
+    )
+    assert populator.restore_history_series(
+        cast(HomeAssistant, hass), cfg, series, None
+    )
+    success, _predictor = await _populate(hass, reader, cfg, [])
+
+    assert success is True
+    assert reader.energy_since == [processed_until - timedelta(minutes=15)]
+    restored = populator.get_history_series(cast(HomeAssistant, hass), cfg)
+    assert restored is not None
+    assert restored[0] is series
+    assert series.processed_until == slot_key(NOW, 15)
@@ -0,0 +1,175 @@
+"""Tests for the on-disk ML predictor snapshot.
+
+Coverage
+--------
+- A snapshot round-trips the fitted predictor (predictions, uncertainty,
+  fit fingerprints, ``training_context``) and the history series.
+- A restored predictor skips the refit until enough new samples arrive.
+- Snapshots of another version, or unreadable files, are ignored.
+- The coordinator writes a snapshot after a refit and warm-starts the
+  predictor and its history series from it after a restart.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+NOW = datetime(2026, 6, 4, 12, 0, tzinfo=UTC)
+
+
+def _history(days: int = 10) -> list[tuple[datetime, int, float]]:
+    start = NOW - timedelta(days=days)
+    return [
+        (start + timedelta(minutes=15 * i), i % 96, 0.2 + 0.01 * (i % 7))
+        for i in range(days * 96)
+    ]
+
+
+def _store():
+    try:
+        from custom_components.hsem.ml import predictor_store
+
+        return predictor_store
+    except Exception as exc:
+        pytest.skip(f"numpy/HA not available in test environment: {exc}")
+
+
+def _trained_snapshot():
+    store = _store()
+    from custom_components.hsem.ml.consumption_predictor import ConsumptionPredictor
+    from custom_components.hsem.ml.history_reader import EnergyHistorySeries
+
+    history = _history()
+    temperatures = {ts: 10.0 + (i % 12) for i, (ts, _s, _e) in enumerate(history)}
+    predictor = ConsumptionPredictor(
+        decay_days=7.0, use_temperature=True, use_sequential=True
+    )
+    predictor.training_context = ("sensor.import", None, False, 15, 14, "sensor.t")
+    predictor.actual_history_days = 10.0
+    predictor.train(history, NOW, temperatures)
+    series = EnergyHistorySeries(
+        entity_id="sensor.import",
+        samples=list(history),
+        processed_until=NOW,
+        full_fetch_at=NOW - timedelta(hours=2),
+    )
+    return store, store.PredictorSnapshot(predictor, series), history, temperatures
+
+
+def test_snapshot_round_trips_predictor_and_series(tmp_path: Path) -> None:
+    store, snapshot, _history_, _temperatures = _trained_snapshot()
+    path = store.snapshot_path(str(tmp_path), "entry")
+
+    assert store.write_snapshot(path, snapshot)
+    restored = store.read_snapshot(path)
+
+    assert path.parent.name == ".storage"
+    assert restored is not None
+    before, after = snapshot.predictor, restored.predictor
+    assert after.trained
+    assert after.training_context == before.training_context
+    assert after.last_fit_time == before.last_fit_time
+    assert after.use_temperature and after.use_sequential
+    assert after._last_fit_fingerprints == before._last_fit_fingerprints
+    assert after._raw_groups == before._raw_groups
+    for slot in (0, 30, 95):
+        assert after.predict_with_std(slot, 1, NOW, 12.0) == pytest.approx(
+            before.predict_with_std(slot, 1, NOW, 12.0)
+        )
+
+    assert restored.export_series is None
+    series = restored.import_series
+    assert series is not None
+    assert series.entity_id == "sensor.import"
+    assert series.processed_until == NOW
+    assert series.full_fetch_at == NOW - timedelta(hours=2)
+    assert snapshot.import_series is not None
+    assert series.samples == snapshot.import_series.samples
+
+
+def test_restored_predictor_keeps_the_retrain_gate(tmp_path: Path) -> None:
+    store, snapshot, history, temperatures = _trained_snapshot()
+    path = store.snapshot_path(str(tmp_path), "entry")
+    store.write_snapshot(path, snapshot)
+    restored = store.read_snapshot(path)
+    assert restored is not None
+    predictor = restored.predictor
+
+    predictor.train(history, NOW + timedelta(minutes=5), temperatures)
+
+    assert predictor.last_fit_time == NOW
+
+
+def test_other_version_or_corrupt_snapshot_is_ignored(tmp_path: Path) -> None:
+    store, snapshot, _history_, _temperatures = _trained_snapshot()
+    path = store.snapshot_path(str(tmp_path), "entry")
+
+    assert store.read_snapshot(path) is None
+
+    store.write_snapshot(path, snapshot)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(store, "SNAPSHOT_VERSION", store.SNAPSHOT_VERSION + 1)
+        assert store.read_snapshot(path) is None
+
+    path.write_bytes(b"not an npz file")
+    assert store.read_snapshot(path) is None
+
+
+@pytest.mark.asyncio
+async def test_coordinator_saves_after_refit_and_restores_on_restart(
+    tmp_path: Path,
+) -> None:
+    store, snapshot, _history_, _temperatures = _trained_snapshot()
+    from custom_components.hsem.coordinator import HSEMDataUpdateCoordinator
+    from custom_components.hsem.ml import populator
+    from custom_components.hsem.models.sensor_config import SensorConfig
+
+    async def run_inline(func, *args):
+        return func(*args)
+
+    def coordinator():
+        coord = object.__new__(HSEMDataUpdateCoordinator)
+        coord.hass = MagicMock()
+        coord.hass.config.config_dir = str(tmp_path)
+        coord.hass.async_add_executor_job = run_inline
+        coord._config_entry = MagicMock(entry_id="entry")
+        coord._ml_predictor = None
+        coord._ml_snapshot_restored = False
+        coord._ml_snapshot_fit_time = None
+        return coord
+
+    cfg = SensorConfig()
+    cfg.recommendation_interval_minutes = 15
+    cfg.ml_consumption_energy_entity = "sensor.import"
+    running = coordinator()
+    running._ml_predictor = snapshot.predictor
+    assert snapshot.import_series is not None
+    populator.restore_history_series(running.hass, cfg, snapshot.import_series, None)
+    try:
+        await running._async_save_ml_snapshot(cfg)
+        path = store.snapshot_path(str(tmp_path), "entry")
+        assert path.exists()
+        assert running._ml_snapshot_fit_time == NOW
+
+        # Unchanged fit: no rewrite.
+        path.unlink()
+        await running._async_save_ml_snapshot(cfg)
+        assert not path.exists()
+        running._ml_snapshot_fit_time = None
+        await running._async_save_ml_snapshot(cfg)
+
+        restarted = coordinator()
+        await restarted._async_restore_ml_snapshot(cfg)
+        restored_series = populator.get_history_series(restarted.hass, cfg)
+    finally:
+        populator._processed_history_cache.clear()
+
+    assert restarted._ml_snapshot_restored
+    assert restarted._ml_predictor is not None
+    assert restarted._ml_predictor.last_fit_time == NOW
+    assert restored_series is not None
+    assert restored_series[0].processed_until == NOW
@@ -0,0 +1,91 @@
+"""Tests for the columnar SlotFrame.
+
+Coverage
+--------
+- ``from_slots`` → ``write_slots`` / ``to_slots`` round-trips every field
+  bit-for-bit, including prices, recommendations and boundaries.
+- ``future_mask`` compares absolute instants, so the repeated autumn hour
+  is handled correctly.
+- ``take`` copies rows; ``write_slots`` can limit itself to some fields and
+  rejects a length mismatch.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.models.slot_frame import FLOAT_FIELDS, SlotFrame
+from custom_components.hsem.utils.prices import SlotPrice
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+
+
+def _slots(start: datetime, n: int, minutes: int = 60) -> list[PlannedSlot]:
+    slots = []
+    for i in range(n):
+        s_start = start + timedelta(minutes=minutes * i)
+        slot = PlannedSlot(
+            start=s_start,
+            end=s_start + timedelta(minutes=minutes),
+            price=SlotPrice(0.1 * i + 1 / 3, -0.05 * i),
+            recommendation=None if i % 2 else "batteries_wait_mode",
+        )
+        for k, name in enumerate(FLOAT_FIELDS):
+            setattr(slot, name, (i + 1) * (k + 1) / 7.0)
+        slots.append(slot)
+    return slots
+
+
+def test_round_trip_is_lossless() -> None:
+    slots = _slots(datetime(2024, 6, 15, 0, 0, tzinfo=_TZ), 6)
+    frame = SlotFrame.from_slots(slots)
+    assert len(frame) == 6
+    assert frame.duration_hours.tolist() == [1.0] * 6
+
+    rebuilt = frame.to_slots()
+    assert [asdict(s) for s in rebuilt] == [asdict(s) for s in slots]
+
+
+def test_future_mask_uses_absolute_time_over_dst() -> None:
+    # Autumn fall-back: 02:00-03:00 local occurs twice on 2024-10-27.  Slots
+    # are built in UTC (as ``TimeSeriesIndex`` does) and ``now`` is 02:07 in
+    # the *second* pass; only slots ending after 01:07 UTC are in the future.
+    utc = ZoneInfo("UTC")
+    slots = [
+        PlannedSlot(
+            start=(
+                datetime(2024, 10, 26, 23, 0, tzinfo=utc) + timedelta(minutes=15 * i)
+            ).astimezone(_TZ),
+            end=(
+                datetime(2024, 10, 26, 23, 15, tzinfo=utc) + timedelta(minutes=15 * i)
+            ).astimezone(_TZ),
+        )
+        for i in range(12)
+    ]
+    now = datetime(2024, 10, 27, 1, 7, tzinfo=utc).astimezone(_TZ)
+    assert now.fold == 1
+
+    frame = SlotFrame.from_slots(slots)
+    assert frame.future_mask(now).tolist() == [i >= 8 for i in range(12)]
+    assert frame.duration_hours.tolist() == [0.25] * 12
+
+
+def test_take_copies_and_partial_write_back() -> None:
+    slots = _slots(datetime(2024, 6, 15, 0, 0, tzinfo=_TZ), 4)
+    frame = SlotFrame.from_slots(slots)
+    tail = frame.take([2, 3])
+    tail["grid_import_kwh"][:] = 9.0
+    tail.recommendation[:] = "force_export"
+    assert frame["grid_import_kwh"][2] != pytest.approx(9.0)
+
+    tail.write_slots(slots[2:], fields=("grid_import_kwh",))
+    assert [s.grid_import_kwh for s in slots[2:]] == [9.0, 9.0]
+    assert slots[2].recommendation == "batteries_wait_mode"
+
+    with pytest.raises(ValueError, match="4 slots"):
+        tail.write_slots(slots)
@@ -157,6 +157,15 @@ class TestSlotMutationHelpers:
         slots = [_make_simple_slot(hour=h) for h in range(5)]
         assert len(_copy_slots(slots)) == 5
 
+    def test_copy_slots_preserves_every_field(self):
+        """Each copy is a distinct object equal to its original."""
+        slots = [_make_simple_slot(hour=h) for h in range(3)]
+        slots[1].grid_import_kwh = 1.25
+        copied = _copy_slots(slots)
+        assert copied == slots
+        assert all(c is not s for c, s in zip(copied, slots, strict=True))
+        assert all(type(c) is PlannedSlot for c in copied)
+
     def test_clear_all_charge_discharge_resets_recommendations(self):
         """All charge and discharge recommendations are cleared."""
         slots = [
@@ -0,0 +1,165 @@
+"""Tests for batched plan scoring.
+
+Coverage
+--------
+- Row *i* of ``score_plans`` equals ``score_plan`` on candidate *i*, with
+  discounting, terminal-SoC / deferred-export, grid limit, overrides, NaN
+  prices, past slots and candidates of different lengths.
+- The array forms of the charge-premium and deferred-export helpers match
+  the scalar helpers, NaN export prices included.
+- ``score_plan_arrays`` accepts plain matrices and returns one value per
+  candidate for every term.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.planner.cost_batch import score_plan_arrays, score_plans
+from custom_components.hsem.planner.cost_function import CostWeights, score_plan
+from custom_components.hsem.planner.cost_helpers import (
+    compute_charge_premium,
+    compute_charge_premium_array,
+    deferred_export_price_array,
+    deferred_export_price_by_slot,
+)
+from custom_components.hsem.utils.prices import SlotPrice
+from custom_components.hsem.utils.recommendations import Recommendations
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+_START = datetime(2024, 6, 15, 0, 0, tzinfo=_TZ)
+_NOW = _START + timedelta(hours=3, minutes=5)
+_RECS = [None, "batteries_charge_grid", *(r.value for r in Recommendations)]
+
+
+def _slots(rng: random.Random, n: int) -> list[PlannedSlot]:
+    slots = []
+    for i in range(n):
+        start = _START + timedelta(minutes=15 * i)
+        imp = math.nan if rng.random() < 0.05 else rng.uniform(-0.2, 3.0)
+        slot = PlannedSlot(
+            start=start,
+            end=start + timedelta(minutes=15),
+            price=SlotPrice(imp, rng.uniform(-0.3, 2.0)),
+            recommendation=rng.choice(_RECS),
+        )
+        slot.solcast_pv_estimate_kwh = rng.choice([0.0, rng.uniform(0.0, 2.0)])
+        slot.avg_house_consumption_kwh = rng.uniform(0.0, 1.0)
+        slot.grid_import_kwh = rng.choice([0.0, rng.uniform(0.0, 3.0)])
+        slot.grid_export_kwh = rng.choice([0.0, rng.uniform(0.0, 3.0)])
+        slot.batteries_charged_kwh = rng.choice([0.0, rng.uniform(0.0, 1.5)])
+        slot.batteries_discharged_kwh = rng.choice([0.0, rng.uniform(0.0, 1.5)])
+        slot.estimated_battery_soc_pct = rng.uniform(0.0, 100.0)
+        slots.append(slot)
+    return slots
+
+
+def _weights() -> CostWeights:
+    return CostWeights(
+        grid_limit_kw=4.0,
+        override_penalty_per_slot=0.2,
+        cycle_cost_per_kwh=0.1,
+        charge_efficiency_pct=95.0,
+        discharge_efficiency_pct=93.0,
+        battery_export_min_price=0.4,
+        battery_usable_capacity_kwh=9.0,
+        max_charge_per_slot_kwh=0.8,
+        time_discount_rate=0.99,
+    )
+
+
+@pytest.mark.parametrize("now", [_NOW, None])
+def test_rows_match_score_plan(now: datetime | None) -> None:
+    rng = random.Random(3)
+    candidates = [_slots(rng, 96), _slots(rng, 96), _slots(rng, 80)]
+    batch = score_plans(
+        candidates,
+        _weights(),
+        slot_duration_hours=0.25,
+        now=now,
+        initial_battery_kwh=4.0,
+        replacement_price_per_kwh=1.5,
+    )
+    assert len(batch) == 3
+    for row, slots in enumerate(candidates):
+        single = score_plan(
+            slots,
+            _weights(),
+            slot_duration_hours=0.25,
+            now=now,
+            initial_battery_kwh=4.0,
+            replacement_price_per_kwh=1.5,
+        )
+        assert asdict(batch.breakdown(row)) == asdict(single)
+
+
+def test_array_helpers_match_scalar_helpers() -> None:
+    rng = random.Random(5)
+    slots = _slots(rng, 48)
+    slots[7].price = SlotPrice(0.5, math.nan)
+    expected_deferred = deferred_export_price_by_slot(
+        slots, usable_kwh=9.0, max_charge_per_slot=0.8, now=_NOW
+    )
+
+    def col(values: list[float]) -> np.ndarray:
+        return np.array([values])
+
+    deferred = deferred_export_price_array(
+        col([s.solcast_pv_estimate_kwh for s in slots]),
+        col([s.avg_house_consumption_kwh for s in slots]),
+        col([s.price.export_price for s in slots]),
+        np.array([[s.end > _NOW for s in slots]]),
+        usable_kwh=9.0,
+        max_charge_per_slot=0.8,
+    )
+    assert [
+        None if math.isnan(v) else v for v in deferred[0].tolist()
+    ] == expected_deferred
+
+    imp_obj = [max(s.price.import_price, 0.0) for s in slots]
+    imp_obj = [0.0 if math.isnan(p) else p for p in imp_obj]
+    premium = compute_charge_premium_array(
+        replacement_price_per_kwh=1.5,
+        imp_price_obj=col(imp_obj),
+        exp_price=col([s.price.export_price for s in slots]),
+        charge_eff=0.95,
+        deferred_export_price=deferred,
+    )
+    assert premium[0].tolist() == [
+        compute_charge_premium(
+            replacement_price_per_kwh=1.5,
+            imp_price_obj=imp,
+            exp_price=s.price.export_price,
+            charge_eff=0.95,
+            deferred_export_price=d,
+        )
+        for imp, s, d in zip(imp_obj, slots, expected_deferred, strict=True)
+    ]
+
+
+def test_score_plan_arrays_on_matrices() -> None:
+    ones = np.ones((2, 4))
+    result = score_plan_arrays(
+        import_price=ones * 0.5,
+        export_price=ones * 0.1,
+        grid_import_kwh=np.array([[1.0, 1.0, 0.0, 0.0], [0.0, 0.0, 0.0, 2.0]]),
+        grid_export_kwh=np.zeros((2, 4)),
+        batteries_charged_kwh=np.zeros((2, 4)),
+        batteries_discharged_kwh=np.zeros((2, 4)),
+        pv_kwh=np.zeros((2, 4)),
+        soc_pct=ones * 50.0,
+        active=np.array([[True, False, True, True], [True] * 4]),
+        override=np.zeros((2, 4), dtype=bool),
+        weights=CostWeights(),
+    )
+    assert result.import_cost.tolist() == pytest.approx([0.5, 1.0])
+    assert result.score.tolist() == pytest.approx([0.5, 1.0])
+    assert [bd.total for bd in result.breakdowns()] == pytest.approx([0.5, 1.0])
@@ -0,0 +1,274 @@
+"""Tests for the numpy dynamic-programming optimizer (scipy-free candidate).
+
+Coverage
+--------
+- DP charges in cheap slots and discharges in expensive ones.
+- Charge limits, the SoC range and no-export mode are respected; the
+  limits scale with ``slot_weights`` for merged blocks.
+- Degenerate inputs (no battery, no slots) return ``None``.
+- The DP score is within 1 % of the MILP score on the benchmark fixtures.
+- The generator adds the ``dp`` candidate only when the MILP is skipped
+  (heuristic-only run) or unavailable.
+- Performance: a 96-slot horizon solves in well under 100 ms.
+"""
+
+from __future__ import annotations
+
+import math
+import time as time_module
+from collections.abc import Callable
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.models.planner_input import PlannerInput
+from custom_components.hsem.models.planner_output import PlannerOutput
+from custom_components.hsem.planner import candidate_generator, run_planner
+from custom_components.hsem.planner.candidate_generator import (
+    CANDIDATE_DP,
+    CANDIDATE_MILP,
+)
+from custom_components.hsem.planner.dp_optimizer import solve_dp
+from custom_components.hsem.planner.milp_optimizer import is_scipy_available
+from custom_components.hsem.utils.prices import SlotPrice
+from custom_components.hsem.utils.recommendations import Recommendations
+from tests.planner.fixtures import (
+    make_flat_price_input,
+    make_negative_price_input,
+    make_summer_day_input,
+    make_winter_day_input,
+)
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+_NOW = datetime(2024, 6, 15, 0, 0, tzinfo=_TZ)
+
+
+def _make_slot(
+    start: datetime,
+    *,
+    import_price: float,
+    pv_kwh: float = 0.0,
+    consumption_kwh: float = 0.3,
+    hours: float = 1.0,
+) -> PlannedSlot:
+    s = PlannedSlot(
+        start=start,
+        end=start + timedelta(hours=hours),
+        price=SlotPrice(
+            import_price=import_price, export_price=round(import_price * 0.8, 4)
+        ),
+    )
+    s.avg_house_consumption_kwh = consumption_kwh
+    s.solcast_pv_estimate_kwh = pv_kwh
+    s.ev_planned_load_kwh = 0.0
+    s.estimated_net_consumption_kwh = consumption_kwh - pv_kwh
+    return s
+
+
+def _arbitrage_slots(cheap: list[int], expensive: list[int]) -> list[PlannedSlot]:
+    """24 hourly slots: 0.05 in *cheap* hours, 3.00 in *expensive*, else 0.50."""
+    return [
+        _make_slot(
+            _NOW + timedelta(hours=h),
+            import_price=0.05 if h in cheap else 3.00 if h in expensive else 0.50,
+        )
+        for h in range(24)
+    ]
+
+
+def _score(output: PlannerOutput, name: str) -> float:
+    candidate = next(c for c in output.candidates if c.name == name)
+    assert candidate._cost is not None
+    return float(candidate._cost.score)
+
+
+def _names(output: PlannerOutput) -> set[str]:
+    return {c.name for c in output.candidates}
+
+
+def test_dp_charges_cheap_and_discharges_expensive() -> None:
+    cheap, expensive = [0, 1, 2, 3], [20, 21, 22, 23]
+
+    result = solve_dp(
+        _arbitrage_slots(cheap, expensive),
+        _NOW,
+        current_kwh=0.0,
+        usable_kwh=9.0,
+        max_charge_per_slot=5.0,
+        max_discharge_per_slot=5.0,
+    )
+
+    assert result is not None
+    slots, diag = result
+    charge_hours = {
+        s.start.hour
+        for s in slots
+        if s.recommendation == Recommendations.BatteriesChargeGrid.value
+    }
+    discharge_hours = {s.start.hour for s in slots if s.batteries_discharged_kwh > 0}
+    assert charge_hours and charge_hours <= set(cheap)
+    assert discharge_hours and discharge_hours <= set(expensive)
+    assert diag["engine"] == CANDIDATE_DP
+    assert diag["has_violations"] is False
+    assert diag["objective"] < 0
+
+
+def test_dp_respects_charge_limit_and_soc_range() -> None:
+    usable_kwh, max_charge = 5.0, 1.5
+
+    result = solve_dp(
+        _arbitrage_slots([0, 1, 2, 3, 4, 5], [18, 19]),
+        _NOW,
+        current_kwh=1.0,
+        usable_kwh=usable_kwh,
+        max_charge_per_slot=max_charge,
+        max_discharge_per_slot=None,
+    )
+
+    assert result is not None
+    energy = 1.0
+    for slot in result[0]:
+        assert slot.batteries_charged_kwh <= max_charge + 1e-6
+        energy += slot.batteries_charged_kwh - slot.batteries_discharged_kwh
+        assert -1e-6 <= energy <= usable_kwh + 1e-6
+
+
+def test_dp_limits_scale_with_slot_weights() -> None:
+    # Hours 0-1 merged into one 2-hour block: it may charge twice the limit.
+    slots = _arbitrage_slots([0, 1], [22, 23])[1:]
+    slots[0] = _make_slot(_NOW, import_price=0.05, consumption_kwh=0.6, hours=2.0)
+    weights = [2.0] + [1.0] * (len(slots) - 1)
+
+    result = solve_dp(
+        slots,
+        _NOW,
+        current_kwh=0.0,
+        usable_kwh=9.0,
+        max_charge_per_slot=1.5,
+        max_discharge_per_slot=1.5,
+        slot_weights=weights,
+    )
+
+    assert result is not None
+    out = result[0]
+    assert out[0].batteries_charged_kwh == pytest.approx(3.0, abs=1e-6)
+    for slot, weight in zip(out, weights, strict=True):
+        assert slot.batteries_charged_kwh <= 1.5 * weight + 1e-6
+        assert slot.batteries_discharged_kwh <= 1.5 * weight + 1e-6
+
+
+def test_dp_no_export_never_discharges_beyond_house_load() -> None:
+    slots = _arbitrage_slots([0, 1, 2], [20, 21])
+
+    result = solve_dp(
+        slots,
+        _NOW,
+        current_kwh=9.0,
+        usable_kwh=9.0,
+        max_charge_per_slot=5.0,
+        max_discharge_per_slot=5.0,
+        discharge_efficiency_pct=100.0,
+        no_export=True,
+    )
+
+    assert result is not None
+    assert any(slot.batteries_discharged_kwh > 0 for slot in result[0])
+    for slot in result[0]:
+        assert slot.batteries_discharged_kwh <= slot.avg_house_consumption_kwh + 1e-6
+        assert slot.grid_export_kwh == pytest.approx(0.0, abs=1e-6)
+
+
+@pytest.mark.parametrize(
+    ("usable_kwh", "slots"),
+    [(0.0, _arbitrage_slots([0], [12])), (9.0, [])],
+    ids=["no_battery", "no_slots"],
+)
+def test_dp_returns_none_on_degenerate_input(
+    usable_kwh: float, slots: list[PlannedSlot]
+) -> None:
+    assert (
+        solve_dp(
+            slots,
+            _NOW,
+            current_kwh=0.0,
+            usable_kwh=usable_kwh,
+            max_charge_per_slot=5.0,
+            max_discharge_per_slot=None,
+        )
+        is None
+    )
+
+
+@pytest.mark.skipif(not is_scipy_available(), reason="scipy not available")
+@pytest.mark.parametrize(
+    "make_input",
+    [
+        make_summer_day_input,
+        make_winter_day_input,
+        make_flat_price_input,
+        make_negative_price_input,
+    ],
+)
+def test_dp_score_close_to_milp(make_input: Callable[[], PlannerInput]) -> None:
+    inp = make_input()
+
+    milp = _score(run_planner(inp), CANDIDATE_MILP)
+    dp = _score(run_planner(replace(inp, planner_heuristic_only=True)), CANDIDATE_DP)
+
+    assert dp >= milp - 1e-6
+    assert dp - milp <= max(0.01 * abs(milp), 0.01)
+
+
+@pytest.mark.skipif(not is_scipy_available(), reason="scipy not available")
+def test_generator_adds_dp_only_without_milp() -> None:
+    inp = make_summer_day_input()
+
+    full = run_planner(inp)
+    heuristic = run_planner(replace(inp, planner_heuristic_only=True))
+
+    assert CANDIDATE_MILP in _names(full)
+    assert CANDIDATE_DP not in _names(full)
+    assert CANDIDATE_MILP not in _names(heuristic)
+    assert CANDIDATE_DP in _names(heuristic)
+    assert heuristic.winner_name == CANDIDATE_DP
+
+
+def test_generator_adds_dp_without_scipy() -> None:
+    with mock.patch.object(candidate_generator, "is_scipy_available", lambda: False):
+        output = run_planner(make_winter_day_input())
+
+    assert CANDIDATE_MILP not in _names(output)
+    assert CANDIDATE_DP in _names(output)
+
+
+def test_dp_solves_96_slot_horizon_under_100ms() -> None:
+    slots = []
+    for i in range(96):
+        price = 0.10 + 0.20 * abs(math.sin(i * math.pi / 24))
+        slots.append(
+            _make_slot(
+                _NOW + timedelta(minutes=30 * i),
+                import_price=round(price, 4),
+                pv_kwh=max(0.0, 0.3 * math.sin(i * math.pi / 32)),
+                consumption_kwh=0.15,
+                hours=0.5,
+            )
+        )
+
+    t_start = time_module.perf_counter()
+    result = solve_dp(
+        slots,
+        _NOW,
+        current_kwh=5.0,
+        usable_kwh=9.0,
+        max_charge_per_slot=2.5,
+        max_discharge_per_slot=2.5,
+    )
+    elapsed = time_module.perf_counter() - t_start
+
+    assert result is not None
+    assert elapsed < 0.10, f"DP took {elapsed * 1000:.1f} ms on 96 slots"
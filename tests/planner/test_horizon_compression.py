@@ -0,0 +1,231 @@
+"""Tests for the variable-resolution MILP horizon.
+
+Coverage
+--------
+- Slots inside the full-resolution window stay single; later slots merge
+  into clock-aligned blocks, and the window never drops below two hours.
+- A compressed 192-slot solve hands the LP ~3x fewer slots, returns one
+  slot per input slot, respects the per-slot limits and lands within 1 %
+  of the full-resolution cost.
+- EV deadlines inside a merged block move to the previous block.
+- A horizon that fits the window is solved exactly as before.
+- The generator routes through the compression only when enabled.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.hsem.models.ev_config import EVConfig
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.planner.horizon_compression import (
+    _remap_ev_deadlines,
+    _spread,
+    plan_horizon_blocks,
+    solve_milp_compressed,
+)
+from custom_components.hsem.planner.milp_optimizer import is_scipy_available, solve_milp
+from custom_components.hsem.utils.prices import SlotPrice
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+_MIDNIGHT = datetime(2024, 6, 15, 0, 0, tzinfo=_TZ)
+_NOW = _MIDNIGHT + timedelta(minutes=5)
+
+_MAX_CHARGE = 1.25
+_EXPORT_CAP_KW = 5.0
+
+requires_scipy = pytest.mark.skipif(
+    not is_scipy_available(), reason="scipy not available in this environment"
+)
+
+
+def _make_slots(n: int) -> list[PlannedSlot]:
+    """Build *n* 15-minute slots with a daily price wave and midday PV."""
+    slots = []
+    for i in range(n):
+        start = _MIDNIGHT + timedelta(minutes=15 * i)
+        hour = start.hour + start.minute / 60.0
+        imp = 1.0 + 0.8 * math.sin(2 * math.pi * (hour - 9.0) / 24.0) + 0.001 * i
+        s = PlannedSlot(
+            start=start,
+            end=start + timedelta(minutes=15),
+            price=SlotPrice(
+                import_price=round(imp, 4), export_price=round(imp * 0.6, 4)
+            ),
+        )
+        s.avg_house_consumption_kwh = 0.15 + 0.05 * (i % 3)
+        s.solcast_pv_estimate_kwh = max(0.0, 0.9 * math.sin(math.pi * (hour - 6) / 14))
+        s.estimated_net_consumption_kwh = (
+            s.avg_house_consumption_kwh - s.solcast_pv_estimate_kwh
+        )
+        slots.append(s)
+    return slots
+
+
+def _kwargs(**overrides: Any) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {
+        "current_kwh": 2.0,
+        "usable_kwh": 10.0,
+        "max_charge_per_slot": _MAX_CHARGE,
+        "max_discharge_per_slot": _MAX_CHARGE,
+        "cycle_cost_per_kwh": 0.05,
+        "max_grid_export_power_kw": _EXPORT_CAP_KW,
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+def _grid_cost(slots: list[PlannedSlot]) -> float:
+    return sum(
+        s.grid_import_kwh * s.price.import_price
+        - s.grid_export_kwh * s.price.export_price
+        for s in slots
+    )
+
+
+def test_blocks_keep_window_and_align_to_the_hour() -> None:
+    slots = _make_slots(48)
+    groups = plan_horizon_blocks(slots, _NOW, full_resolution_hours=6.0)
+
+    assert [i for g in groups for i in g] == list(range(48))
+    # 00:00 … 06:00 start before the 06:05 cutoff and stay single; the
+    # first merged block is the partial hour 06:15–07:00.
+    single = [g for g in groups if len(g) == 1]
+    assert [g[0] for g in single] == list(range(25))
+    assert groups[25] == [25, 26, 27]
+    assert all(len(g) == 4 for g in groups[26:])
+    for g in groups[26:]:
+        assert slots[g[0]].start.minute == 0
+
+
+def test_full_resolution_window_has_a_two_hour_floor() -> None:
+    groups = plan_horizon_blocks(_make_slots(24), _NOW, full_resolution_hours=0.0)
+    # 00:00 … 02:00 start before now + 2 h; 02:15 onwards merge.
+    assert all(len(g) == 1 for g in groups[:9])
+    assert groups[9] == [9, 10, 11]
+
+
+def test_spread_prefers_then_levels() -> None:
+    # 1.0 kWh: 0.3 is taken from the preferred source, the other 0.7 lifts
+    # the grid-side occupancy (0.0, 0.0, 0.2) to a common level of 0.3.
+    alloc = _spread(
+        1.0, [1.0, 1.0, 1.0], preferred=[0.3, 0.0, 0.0], occupancy=[0.0, 0.0, 0.2]
+    )
+    assert alloc == pytest.approx([0.6, 0.3, 0.1], abs=1e-6)
+    # A cap diverts the remainder to the other sub-slots.
+    alloc = _spread(
+        1.0, [0.4, 1.0, 1.0], preferred=[0.3, 0.0, 0.0], occupancy=[0.0, 0.0, 0.2]
+    )
+    assert alloc == pytest.approx([0.4, 0.4, 0.2], abs=1e-6)
+
+
+def test_ev_deadline_inside_a_block_moves_earlier() -> None:
+    ev = EVConfig(enabled=True, capacity_kwh=60.0, deadline_slot=5)
+    future_groups = [[0], [1], [2, 3, 4, 5], [6, 7, 8, 9]]
+    assert _remap_ev_deadlines([ev], future_groups)[0].deadline_slot == 2
+    ev.deadline_slot = 4
+    assert _remap_ev_deadlines([ev], future_groups)[0].deadline_slot == 1
+    ev.deadline_slot = 500
+    assert _remap_ev_deadlines([ev], future_groups)[0].deadline_slot == 3
+
+
+@requires_scipy
+def test_compressed_solve_cuts_lp_slots_and_keeps_plan_quality() -> None:
+    slots = _make_slots(192)
+    full = solve_milp(slots, _NOW, **_kwargs())
+    compressed = solve_milp_compressed(slots, _NOW, **_kwargs())
+    assert full is not None and compressed is not None
+    out, diag = compressed
+
+    stats = diag["horizon_compression"]
+    assert stats["slots"] == 192
+    assert stats["slots"] / stats["lp_slots"] > 2.5
+    assert len(out) == len(slots)
+    assert [s.start for s in out] == [s.start for s in slots]
+
+    soc = 2.0
+    for s in out:
+        assert s.batteries_charged_kwh <= _MAX_CHARGE + 1e-9
+        assert s.batteries_discharged_kwh <= _MAX_CHARGE + 1e-9
+        assert not (s.batteries_charged_kwh > 0 and s.batteries_discharged_kwh > 0)
+        assert s.grid_export_kwh <= _EXPORT_CAP_KW * 0.25 + 1e-3
+        soc += s.batteries_charged_kwh - s.batteries_discharged_kwh
+        assert -0.01 <= soc <= 10.0 + 0.01
+
+    full_cost = _grid_cost(full[0])
+    assert _grid_cost(out) == pytest.approx(full_cost, rel=0.01)
+
+
+@requires_scipy
+def test_compressed_ev_charging_meets_target_at_original_deadline() -> None:
+    ev = EVConfig(
+        enabled=True,
+        capacity_kwh=60.0,
+        initial_soc_kwh=20.0,
+        target_kwh=40.0,
+        max_charge_per_slot=2.75,
+        deadline_slot=150,
+    )
+    slots = _make_slots(192)
+    result = solve_milp_compressed(slots, _NOW, **_kwargs(ev_configs=[ev]))
+    assert result is not None
+    out, diag = result
+    assert diag["ev"]["ev0"]["deadline_met"] is True
+    delivered = sum(s.ev_total_planned_load_kwh for s in out[:151])
+    assert delivered * ev.charger_efficiency == pytest.approx(20.0, abs=0.05)
+    assert sum(s.ev_total_planned_load_kwh for s in out[151:]) == pytest.approx(0.0)
+    rated_w = ev.max_charge_per_slot / ev.charger_efficiency / 0.25 * 1000
+    assert max(s.ev_charger_calculated_power for s in out) <= rated_w + 1
+
+
+@requires_scipy
+def test_short_horizon_is_solved_unchanged() -> None:
+    slots = _make_slots(20)
+    plain = solve_milp(slots, _NOW, **_kwargs())
+    compressed = solve_milp_compressed(slots, _NOW, **_kwargs())
+    assert plain is not None and compressed is not None
+    assert compressed[1]["horizon_compression"]["lp_slots"] == 20
+    assert [s.batteries_charged_kwh for s in compressed[0]] == [
+        s.batteries_charged_kwh for s in plain[0]
+    ]
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_generator_uses_compression_only_when_enabled(
+    monkeypatch: pytest.MonkeyPatch, enabled: bool
+) -> None:
+    from custom_components.hsem.planner import candidate_generator
+    from tests.planner.fixtures import make_winter_day_input
+
+    calls: dict[str, Any] = {}
+
+    def _spy(name: str) -> Any:
+        def _record(*args: Any, **kwargs: Any) -> None:
+            calls[name] = kwargs
+
+        return _record
+
+    monkeypatch.setattr(candidate_generator, "is_scipy_available", lambda: True)
+    monkeypatch.setattr(candidate_generator, "solve_milp", _spy("plain"))
+    monkeypatch.setattr(
+        candidate_generator, "solve_milp_compressed", _spy("compressed")
+    )
+    inp = make_winter_day_input()
+    inp.planner_horizon_compression = enabled
+    inp.planner_horizon_full_resolution_hours = 4.0
+    inp.planner_horizon_block_minutes = 120
+
+    candidate_generator.generate_candidates(
+        _make_slots(24), inp, _NOW, max_charge_per_slot=2.0, usable_kwh=8.0
+    )
+    if enabled:
+        assert set(calls) == {"compressed"}
+        assert calls["compressed"]["full_resolution_hours"] == pytest.approx(4.0)
+        assert calls["compressed"]["block_minutes"] == 120
+    else:
+        assert set(calls) == {"plain"}
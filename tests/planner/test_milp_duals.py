@@ -0,0 +1,113 @@
+"""Tests for the LP dual values written as per-slot marginal energy values.
+
+Coverage
+--------
+- Charging slots value stored energy at the charge cost; the discharge
+  window values it at what the discharge earns.
+- ``marginal_load_cost`` is the import price in importing slots and the
+  export price in exporting slots.
+- Both the cumulative (short horizon) and the ``soc[t]`` state (long
+  horizon) form of the SoC bounds give these values.
+- The values agree with the DP optimizer's cost-to-go slopes.
+- The time discount is removed from the values.
+- Integer mode reports no duals; the fields stay ``None``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.planner.dp_optimizer import solve_dp
+from custom_components.hsem.planner.milp_optimizer import is_scipy_available, solve_milp
+from custom_components.hsem.utils.prices import SlotPrice
+
+pytestmark = pytest.mark.skipif(
+    not is_scipy_available(), reason="scipy not available in this environment"
+)
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+_NOW = datetime(2024, 6, 15, 0, 0, tzinfo=_TZ)
+_CHEAP = (0, 1, 2, 3)
+_EXPENSIVE = (20, 21, 22, 23)
+_BATTERY: dict[str, Any] = {
+    "current_kwh": 2.0,
+    "usable_kwh": 9.0,
+    "max_charge_per_slot": 5.0,
+    "max_discharge_per_slot": 5.0,
+}
+
+
+def _slots(days: int = 1) -> list[PlannedSlot]:
+    """Hourly slots: 0.05 at night, 3.00 in the evening, 0.50 otherwise."""
+    slots = []
+    for h in range(24 * days):
+        price = 0.05 if h % 24 in _CHEAP else 3.00 if h % 24 in _EXPENSIVE else 0.50
+        start = _NOW + timedelta(hours=h)
+        s = PlannedSlot(
+            start=start,
+            end=start + timedelta(hours=1),
+            price=SlotPrice(import_price=price, export_price=round(price * 0.8, 4)),
+        )
+        s.avg_house_consumption_kwh = 0.3
+        s.estimated_net_consumption_kwh = 0.3
+        slots.append(s)
+    return slots
+
+
+@pytest.mark.parametrize("days", [1, 5], ids=["cumulative_rows", "soc_state_rows"])
+def test_marginal_values_follow_prices(days: int) -> None:
+    result = solve_milp(_slots(days), _NOW, **_BATTERY)
+
+    assert result is not None
+    slots, diag = result
+    assert diag["duals"] is True
+    for s in slots:
+        assert s.marginal_energy_value is not None
+        if s.start.hour in _CHEAP:
+            # Storing a kWh costs its grid energy plus the charge-loss term.
+            assert s.marginal_energy_value == pytest.approx(
+                0.05 / 0.97 + 0.03 * 0.05, abs=1e-3
+            )
+            assert s.marginal_load_cost == pytest.approx(0.05)
+        if s.start.hour in _EXPENSIVE:
+            # The battery exports in the evening: load is worth the export price.
+            assert s.marginal_load_cost == pytest.approx(2.40)
+            assert 0.5 < s.marginal_energy_value < 3.0
+
+
+def test_marginal_values_match_dp() -> None:
+    lp = solve_milp(_slots(), _NOW, **_BATTERY)
+    dp = solve_dp(_slots(), _NOW, **_BATTERY)
+
+    assert lp is not None and dp is not None
+    for a, b in zip(lp[0], dp[0], strict=True):
+        if a.start.hour in _CHEAP + _EXPENSIVE:
+            assert a.marginal_energy_value == pytest.approx(
+                b.marginal_energy_value, abs=2e-3
+            ), a.start
+    assert all(s.marginal_load_cost is None for s in dp[0])
+
+
+def test_marginal_values_are_undiscounted() -> None:
+    plain = solve_milp(_slots(), _NOW, **_BATTERY)
+    discounted = solve_milp(_slots(), _NOW, time_discount_rate=0.99, **_BATTERY)
+
+    assert plain is not None and discounted is not None
+    for a, b in zip(plain[0], discounted[0], strict=True):
+        if a.start.hour in _CHEAP:
+            assert b.marginal_load_cost == pytest.approx(a.marginal_load_cost)
+
+
+def test_integer_mode_has_no_duals() -> None:
+    result = solve_milp(_slots(), _NOW, integer_mode=True, **_BATTERY)
+
+    assert result is not None
+    slots, diag = result
+    assert diag["solver"]["mode"] == "mip"
+    assert diag["duals"] is False
+    assert all(s.marginal_energy_value is None for s in slots)
@@ -0,0 +1,213 @@
+"""Tests for the opt-in integer (true MILP) solver mode.
+
+Coverage
+--------
+- Binary indicators make charge/discharge exclusive where the LP
+  relaxation happily does both in one slot.
+- ``solve_milp(integer_mode=True)`` reports ``mode="mip"`` with gap and
+  timing statistics in ``diagnostics["solver"]``.
+- A timeout without an incumbent (or a failure) of branch-and-bound falls
+  back to the LP relaxation and records the reason; a time-limited solve
+  with a reported gap keeps its incumbent.
+- The default mode never calls ``scipy.optimize.milp``.
+- The options-flow gap (%) and budget (s) reach ``solve_milp``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.planner.milp._solve import _run_highs
+from custom_components.hsem.planner.milp_optimizer import is_scipy_available, solve_milp
+from custom_components.hsem.utils.prices import SlotPrice
+
+pytestmark = pytest.mark.skipif(
+    not is_scipy_available(), reason="scipy not available in this environment"
+)
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+_NOW = datetime(2024, 6, 15, 0, 0, tzinfo=_TZ)
+
+
+def _make_slots(prices: list[float]) -> list[PlannedSlot]:
+    slots = []
+    for i, price in enumerate(prices):
+        start = _NOW + timedelta(hours=i)
+        s = PlannedSlot(
+            start=start,
+            end=start + timedelta(hours=1),
+            price=SlotPrice(import_price=price, export_price=price * 0.5),
+        )
+        s.avg_house_consumption_kwh = 0.6
+        s.solcast_pv_estimate_kwh = 0.0
+        s.ev_planned_load_kwh = 0.0
+        s.estimated_net_consumption_kwh = 0.6
+        slots.append(s)
+    return slots
+
+
+def _solve(slots: list[PlannedSlot], **kwargs: Any) -> tuple[list, dict]:
+    out = solve_milp(
+        slots,
+        _NOW,
+        current_kwh=2.0,
+        usable_kwh=8.0,
+        max_charge_per_slot=2.0,
+        max_discharge_per_slot=2.0,
+        cycle_cost_per_kwh=0.01,
+        **kwargs,
+    )
+    assert out is not None, "MILP must return a solution"
+    return out
+
+
+_PRICES = [0.10, 0.10, 0.45, 0.50, 0.12, 0.40, 0.55, 0.15]
+
+
+def test_binaries_forbid_fractional_charge_and_discharge() -> None:
+    """Both flows capped at half the mutex: LP overlaps, MIP does not."""
+    from scipy.sparse import csr_matrix
+
+    kwargs: dict[str, Any] = {
+        "time_limit_s": 2.0,
+        "m": 1,
+        "ec_off": 0,
+        "ed_off": 1,
+        "max_charge_per_slot": 1.0,
+        "ed_ub_per_slot": [1.0],
+    }
+    bounds: list[tuple[float | None, float | None]] = [(0.0, 0.5), (0.0, 0.5)]
+    c_obj = [-1.0, -1.0]  # reward both flows
+    a_ub = csr_matrix([[1.0, 1.0]])  # relaxed mutex ec/1 + ed/1 ≤ 1
+    a_eq = csr_matrix((0, 2))
+    problem: tuple[Any, ...] = (c_obj, a_ub, [1.0], a_eq, [], bounds)
+
+    lp, lp_stats = _run_highs(*problem, **kwargs)
+    assert lp_stats["mode"] == "lp"
+    assert lp is not None
+    assert lp.x == pytest.approx([0.5, 0.5])
+
+    mip, mip_stats = _run_highs(*problem, integer_mode=True, **kwargs)
+    assert mip_stats["mode"] == "mip"
+    assert mip is not None
+    assert len(mip.x) == 2  # binaries are sliced off
+    assert min(mip.x) == pytest.approx(0.0, abs=1e-9)
+    assert max(mip.x) == pytest.approx(0.5)
+
+
+def test_integer_mode_reports_gap_and_timing() -> None:
+    out_slots, diag = _solve(_make_slots(_PRICES), integer_mode=True, mip_rel_gap=0.01)
+    solver = diag["solver"]
+    assert solver["mode"] == "mip"
+    assert solver["fallback_reason"] is None
+    assert solver["mip_status"] == 0
+    assert solver["mip_rel_gap_target"] == pytest.approx(0.01)
+    assert solver["mip_gap"] is not None and solver["mip_gap"] <= 0.01 + 1e-9
+    assert solver["mip_wall_time_s"] >= 0.0
+    assert solver["wall_time_s"] >= solver["mip_wall_time_s"]
+    for s in out_slots:
+        assert not (
+            (s.batteries_charged_kwh or 0.0) > 1e-6
+            and (s.batteries_discharged_kwh or 0.0) > 1e-6
+        )
+
+
+def test_integer_mode_matches_lp_cost_when_relaxation_is_integral() -> None:
+    """On a plain arbitrage day the LP vertex is already exclusive."""
+    slots = _make_slots(_PRICES)
+    lp_slots, _ = _solve(slots)
+    mip_slots, _ = _solve(slots, integer_mode=True, mip_rel_gap=0.0)
+    lp_cost = sum(s.estimated_cost_currency or 0.0 for s in lp_slots)
+    mip_cost = sum(s.estimated_cost_currency or 0.0 for s in mip_slots)
+    assert mip_cost == pytest.approx(lp_cost, abs=1e-6)
+
+
+@pytest.mark.parametrize(
+    ("status", "reason"), [(1, "timeout"), (4, "failed")], ids=["timeout", "failed"]
+)
+def test_mip_without_result_falls_back_to_lp(
+    monkeypatch: pytest.MonkeyPatch, status: int, reason: str
+) -> None:
+    import scipy.optimize
+
+    def _no_result(*args: Any, **kwargs: Any) -> Any:
+        return scipy.optimize.OptimizeResult(
+            status=status, x=None, success=False, message="stub"
+        )
+
+    slots = _make_slots(_PRICES)
+    expected = _solve(slots)[0]
+    monkeypatch.setattr(scipy.optimize, "milp", _no_result)
+
+    out_slots, diag = _solve(slots, integer_mode=True, mip_time_limit_s=0.5)
+    assert diag["solver"]["mode"] == "lp"
+    assert diag["solver"]["fallback_reason"] == reason
+    assert diag["solver"]["mip_time_limit_s"] == pytest.approx(0.5)
+    assert [s.batteries_charged_kwh for s in out_slots] == pytest.approx(
+        [s.batteries_charged_kwh for s in expected]
+    )
+
+
+def test_time_limit_keeps_incumbent_with_gap(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import scipy.optimize
+
+    real_milp = scipy.optimize.milp
+
+    def _time_limited(*args: Any, **kwargs: Any) -> Any:
+        res = real_milp(*args, **kwargs)
+        res.status = 1
+        res.mip_gap = 0.02
+        return res
+
+    monkeypatch.setattr(scipy.optimize, "milp", _time_limited)
+
+    out_slots, diag = _solve(_make_slots(_PRICES), integer_mode=True)
+    solver = diag["solver"]
+    assert solver["mode"] == "mip"
+    assert solver["fallback_reason"] is None
+    assert solver["mip_time_limit_hit"] is True
+    assert solver["mip_gap"] == pytest.approx(0.02)
+    assert any((s.batteries_charged_kwh or 0.0) > 0 for s in out_slots)
+
+
+def test_default_mode_never_calls_milp(monkeypatch: pytest.MonkeyPatch) -> None:
+    import scipy.optimize
+
+    def _boom(*args: Any, **kwargs: Any) -> Any:
+        raise AssertionError("milp must not be called in LP mode")
+
+    monkeypatch.setattr(scipy.optimize, "milp", _boom)
+    _, diag = _solve(_make_slots(_PRICES))
+    assert diag["solver"]["mode"] == "lp"
+    assert "mip_status" not in diag["solver"]
+
+
+def test_generator_passes_options_to_solver(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Gap is configured in percent and converted to a fraction."""
+    from custom_components.hsem.planner import candidate_generator
+    from tests.planner.fixtures import make_winter_day_input
+
+    captured: dict[str, Any] = {}
+
+    def _spy(*args: Any, **kwargs: Any) -> None:
+        captured.update(kwargs)
+
+    monkeypatch.setattr(candidate_generator, "solve_milp", _spy)
+    inp = make_winter_day_input()
+    inp.planner_milp_integer_mode = True
+    inp.planner_milp_gap_percentage = 2.0
+    inp.planner_milp_time_budget_seconds = 7.5
+
+    candidate_generator.generate_candidates(
+        _make_slots(_PRICES), inp, _NOW, max_charge_per_slot=2.0, usable_kwh=8.0
+    )
+    assert captured["integer_mode"] is True
+    assert captured["mip_rel_gap"] == pytest.approx(0.02)
+    assert captured["mip_time_limit_s"] == pytest.approx(7.5)
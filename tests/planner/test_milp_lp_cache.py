@@ -0,0 +1,175 @@
+"""Tests for the MILP LP structure cache.
+
+Coverage
+--------
+- A second solve with the same LP shape reuses the cached skeleton and
+  returns exactly what a fresh assembly would (new prices, SoC, bounds).
+- Changing the shape (EV plugged in, efficiency) misses the cache.
+- Bound-only flags (``no_export``) keep the key and are still honoured.
+- Invalidation is explicit and counted; a wrong-shape skeleton is dropped.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.hsem.models.ev_config import EVConfig
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.planner.milp import _lp_cache
+from custom_components.hsem.planner.milp._lp_cache import (
+    LPStructureCache,
+    invalidate_lp_structure_cache,
+)
+from custom_components.hsem.planner.milp_optimizer import is_scipy_available, solve_milp
+from custom_components.hsem.utils.prices import SlotPrice
+
+pytestmark = pytest.mark.skipif(
+    not is_scipy_available(), reason="scipy not available in this environment"
+)
+
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+_NOW = datetime(2024, 6, 15, 0, 0, tzinfo=_TZ)
+
+
+def _make_slots(n: int, price_scale: float = 1.0, load_kwh: float = 0.15) -> list:
+    """Build *n* 15-minute slots with a daily price wave and midday PV."""
+    slots = []
+    for i in range(n):
+        start = _NOW + timedelta(minutes=15 * i)
+        hour = start.hour + start.minute / 60.0
+        imp = price_scale * (1.0 + 0.8 * math.sin(2 * math.pi * (hour - 9.0) / 24.0))
+        s = PlannedSlot(
+            start=start,
+            end=start + timedelta(minutes=15),
+            price=SlotPrice(
+                import_price=round(imp + 0.001 * i, 4),
+                export_price=round(imp * 0.6, 4),
+            ),
+        )
+        s.avg_house_consumption_kwh = load_kwh
+        s.solcast_pv_estimate_kwh = max(0.0, 0.9 * math.sin(math.pi * (hour - 6) / 14))
+        s.ev_planned_load_kwh = 0.0
+        s.estimated_net_consumption_kwh = load_kwh - s.solcast_pv_estimate_kwh
+        slots.append(s)
+    return slots
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Give every test its own empty cache."""
+    monkeypatch.setattr(_lp_cache, "LP_STRUCTURE_CACHE", LPStructureCache())
+
+
+def _solve(slots: list, **kwargs: Any) -> tuple[list, dict]:
+    out = solve_milp(
+        slots,
+        _NOW,
+        current_kwh=kwargs.pop("current_kwh", 2.0),
+        usable_kwh=10.0,
+        max_charge_per_slot=1.25,
+        max_discharge_per_slot=1.25,
+        cycle_cost_per_kwh=0.05,
+        **kwargs,
+    )
+    assert out is not None, "MILP must return a solution"
+    return out
+
+
+def _charged(out: tuple[list, dict]) -> list[float]:
+    return [s.batteries_charged_kwh or 0.0 for s in out[0]]
+
+
+def _ev(target_kwh: float = 40.0) -> EVConfig:
+    return EVConfig(
+        enabled=True,
+        capacity_kwh=60.0,
+        initial_soc_kwh=20.0,
+        target_kwh=target_kwh,
+        max_charge_per_slot=2.75,
+        deadline_slot=40,
+    )
+
+
+def test_second_cycle_hits_and_matches_fresh_assembly() -> None:
+    """A hit must give the same plan as a cold build with the new inputs."""
+    _solve(_make_slots(96))
+
+    slots = _make_slots(96, price_scale=1.3, load_kwh=0.25)
+    warm = _solve(slots, current_kwh=6.0)
+    assert warm[1]["lp_structure_cache"]["hit"] is True
+    assert warm[1]["lp_structure_cache"]["hits"] == 1
+
+    invalidate_lp_structure_cache("test")
+    cold = _solve(slots, current_kwh=6.0)
+    assert cold[1]["lp_structure_cache"]["hit"] is False
+    assert _charged(warm) == pytest.approx(_charged(cold), abs=1e-9)
+
+
+def test_shape_changes_miss_the_cache() -> None:
+    """EV count and efficiency change the matrices and must miss."""
+    slots = _make_slots(48)
+    _solve(slots)
+    assert _solve(slots, ev_configs=[_ev()])[1]["lp_structure_cache"]["hit"] is False
+    assert (
+        _solve(slots, charge_efficiency_pct=90.0)[1]["lp_structure_cache"]["hit"]
+        is False
+    )
+    # EV target moves only a right-hand side while it stays above the SoC.
+    assert (
+        _solve(slots, ev_configs=[_ev(target_kwh=45.0)])[1]["lp_structure_cache"]["hit"]
+        is True
+    )
+
+
+def test_bound_only_flag_keeps_key_and_is_honoured() -> None:
+    """no_export lives in the bounds: same key, different plan."""
+    slots = _make_slots(48)
+    _solve(slots)
+    warm = _solve(slots, no_export=True)
+    assert warm[1]["lp_structure_cache"]["hit"] is True
+
+    invalidate_lp_structure_cache("test")
+    cold = _solve(slots, no_export=True)
+    assert _charged(warm) == pytest.approx(_charged(cold), abs=1e-9)
+
+
+def test_invalidation_is_counted_and_clears_entries() -> None:
+    slots = _make_slots(24)
+    _solve(slots)
+    invalidate_lp_structure_cache("options_updated")
+    stats = _lp_cache.lp_structure_cache_stats()
+    assert stats["entries"] == 0
+    assert stats["invalidations"] == 1
+    assert stats["last_invalidation_reason"] == "options_updated"
+    assert _solve(slots)[1]["lp_structure_cache"]["hit"] is False
+
+
+def test_wrong_shape_skeleton_is_rebuilt() -> None:
+    """A stale skeleton must never reach the solver."""
+    from scipy.sparse import csr_matrix
+
+    slots = _make_slots(24)
+    _solve(slots)
+    cache = _lp_cache.LP_STRUCTURE_CACHE
+    (key,) = cache._entries
+    cache._entries[key] = (csr_matrix((1, 1)), csr_matrix((1, 1)))
+
+    out = _solve(slots)
+    assert out[1]["lp_structure_cache"]["hit"] is False
+    assert cache.last_invalidation_reason == "shape_mismatch"
+    assert cache._entries[key][0].shape[0] == 2 * 24
+
+
+def test_lru_is_bounded() -> None:
+    cache = LPStructureCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.store((key,), (None, None))
+    assert cache.lookup(("a",)) is None
+    assert cache.lookup(("c",)) is not None
+    assert cache.stats()["entries"] == 2
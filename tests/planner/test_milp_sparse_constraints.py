@@ -0,0 +1,166 @@
+"""Tests for the sparse MILP constraint assembly.
+
+Coverage
+--------
+- ``linprog`` receives CSR matrices, never dense arrays.
+- On long horizons each SoC bound row touches only ``soc[t]`` and its
+  penalty variable (two non-zeros) instead of a cumulative sum.
+- The ``soc[t]`` state variables equal ``current_kwh + Σ(ec − ed)``.
+- The state-variable and cumulative SoC forms reach the same optimum.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.hsem.models.ev_config import EVConfig
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.planner.milp import _constraints
+from custom_components.hsem.planner.milp_optimizer import is_scipy_available, solve_milp
+from custom_components.hsem.utils.prices import SlotPrice
+
+pytestmark = pytest.mark.skipif(
+    not is_scipy_available(), reason="scipy not available in this environment"
+)
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+_NOW = datetime(2024, 6, 15, 0, 0, tzinfo=_TZ)
+
+
+def _make_quarter_hour_slots(n: int) -> list[PlannedSlot]:
+    """Build *n* 15-minute slots with a daily price wave and midday PV."""
+    slots = []
+    for i in range(n):
+        start = _NOW + timedelta(minutes=15 * i)
+        hour = start.hour + start.minute / 60.0
+        imp = 1.0 + 0.8 * math.sin(2 * math.pi * (hour - 9.0) / 24.0) + 0.001 * i
+        s = PlannedSlot(
+            start=start,
+            end=start + timedelta(minutes=15),
+            price=SlotPrice(
+                import_price=round(imp, 4), export_price=round(imp * 0.6, 4)
+            ),
+        )
+        s.avg_house_consumption_kwh = 0.15
+        s.solcast_pv_estimate_kwh = max(0.0, 0.9 * math.sin(math.pi * (hour - 6) / 14))
+        s.ev_planned_load_kwh = 0.0
+        s.estimated_net_consumption_kwh = (
+            s.avg_house_consumption_kwh - s.solcast_pv_estimate_kwh
+        )
+        slots.append(s)
+    return slots
+
+
+def _solve_capturing(
+    monkeypatch: pytest.MonkeyPatch, slots: list[PlannedSlot], **kwargs: Any
+) -> dict:
+    """Run ``solve_milp`` and capture the ``linprog`` call and its result."""
+    import scipy.optimize
+
+    real_linprog = scipy.optimize.linprog
+    captured: dict = {}
+
+    def _spy(c: Any, **lp_kwargs: Any) -> Any:
+        result = real_linprog(c, **lp_kwargs)
+        captured.update(lp_kwargs, c=c, result=result)
+        return result
+
+    monkeypatch.setattr(scipy.optimize, "linprog", _spy)
+    out = solve_milp(
+        slots,
+        _NOW,
+        current_kwh=kwargs.pop("current_kwh", 2.0),
+        usable_kwh=10.0,
+        max_charge_per_slot=1.25,
+        max_discharge_per_slot=1.25,
+        cycle_cost_per_kwh=0.05,
+        **kwargs,
+    )
+    assert out is not None, "MILP must return a solution"
+    return captured
+
+
+def test_linprog_receives_sparse_matrices(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Both constraint matrices must be handed to HiGHS in CSR form."""
+    from scipy.sparse import issparse
+
+    captured = _solve_capturing(monkeypatch, _make_quarter_hour_slots(24))
+    assert issparse(captured["A_ub"])
+    assert issparse(captured["A_eq"])
+    assert captured["A_ub"].format == "csr"
+
+
+def test_long_horizon_soc_rows_have_two_nonzeros(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A 192-slot horizon must not build cumulative O(m²) SoC rows."""
+    m = 192
+    captured = _solve_capturing(monkeypatch, _make_quarter_hour_slots(m))
+    a_ub = captured["A_ub"]
+    soc_row_nnz = a_ub.getnnz(axis=1)[: 2 * m]
+    assert soc_row_nnz.max() == 2
+    # Whole matrix stays linear in the horizon (a handful of entries per slot).
+    assert a_ub.nnz < 20 * m
+    assert captured["A_eq"].nnz < 20 * m
+
+
+def test_two_ev_horizon_stays_linear(monkeypatch: pytest.MonkeyPatch) -> None:
+    """EV cumulative SoC caps collapse to one full-horizon row per EV."""
+    m = 192
+    evs = [
+        EVConfig(
+            enabled=True,
+            capacity_kwh=60.0,
+            initial_soc_kwh=20.0,
+            target_kwh=40.0,
+            max_charge_per_slot=2.75,
+            deadline_slot=m - 1,
+        ),
+        EVConfig(
+            enabled=True,
+            capacity_kwh=40.0,
+            initial_soc_kwh=30.0,
+            target_kwh=30.0,
+            max_charge_per_slot=1.8,
+            charge_past_target=True,
+        ),
+    ]
+    captured = _solve_capturing(
+        monkeypatch, _make_quarter_hour_slots(m), ev_configs=evs
+    )
+    assert captured["A_ub"].nnz < 30 * m
+
+
+def test_soc_state_matches_cumulative_flows(monkeypatch: pytest.MonkeyPatch) -> None:
+    """soc[t] must equal current_kwh + Σ_{k≤t}(ec[k] − ed[k])."""
+    import numpy as np
+
+    m = 192
+    captured = _solve_capturing(
+        monkeypatch, _make_quarter_hour_slots(m), current_kwh=3.0
+    )
+    x = captured["result"].x
+    ec, ed = x[0:m], x[m : 2 * m]
+    soc = x[len(x) - m :]
+    assert soc == pytest.approx(3.0 + np.cumsum(ec - ed), abs=1e-6)
+
+
+@pytest.mark.parametrize("n_slots", [48, 192])
+def test_state_and_cumulative_soc_rows_reach_same_optimum(
+    monkeypatch: pytest.MonkeyPatch, n_slots: int
+) -> None:
+    """The two SoC row forms are the same LP and must share the optimum."""
+    slots = _make_quarter_hour_slots(n_slots)
+
+    monkeypatch.setattr(_constraints, "_SOC_STATE_ROWS_MIN_SLOTS", 10**6)
+    cumulative = _solve_capturing(monkeypatch, slots)["result"].fun
+
+    monkeypatch.setattr(_constraints, "_SOC_STATE_ROWS_MIN_SLOTS", 0)
+    state = _solve_capturing(monkeypatch, slots)["result"].fun
+
+    assert state == pytest.approx(cumulative, rel=1e-7, abs=1e-7)
@@ -0,0 +1,125 @@
+"""Tests for the content-addressed planner output cache.
+
+Coverage
+--------
+- The fingerprint ignores the wall-clock time inside a slot and SoC / live
+  power jitter inside a bucket, but changes with the slot, prices, config
+  scalars and the solar corrector state.  With an EV planned load the exact
+  time is part of the key.
+- A repeated input is served from the cache without re-running the planner
+  and yields the same plan as a fresh run.
+- Edits to a returned plan never leak into the cached copy.
+- Counters, invalidation and the LRU bound.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any
+
+from custom_components.hsem.models.planner_input import PlannerInput
+from custom_components.hsem.models.planner_output import PlannerOutput
+from custom_components.hsem.planner import run_planner
+from custom_components.hsem.planner.plan_cache import (
+    PlanCache,
+    planner_input_fingerprint,
+)
+from custom_components.hsem.utils.solar_corrector import SolarForecastCorrector
+from tests.planner.fixtures import make_winter_day_input
+
+_NOW = "2024-01-15T10:05:00+01:00"
+
+
+def _input(**overrides: Any) -> PlannerInput:
+    inp = make_winter_day_input(now_iso=_NOW, interval_minutes=15)
+    return replace(inp, **overrides)
+
+
+class _CountingPlanner:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, inp: PlannerInput) -> PlannerOutput:
+        self.calls += 1
+        return run_planner(inp)
+
+
+def test_fingerprint_is_stable_inside_a_slot_and_bucket() -> None:
+    base = planner_input_fingerprint(_input())
+    assert planner_input_fingerprint(_input(now_iso="2024-01-15T10:14:59+01:00")) == (
+        base
+    )
+    assert planner_input_fingerprint(_input(battery_soc_pct=80.2)) == base
+    assert planner_input_fingerprint(_input(live_house_consumption_w=10.0)) == base
+
+
+def test_fingerprint_keeps_exact_time_with_ev_planned_load() -> None:
+    later = "2024-01-15T10:14:59+01:00"
+    for field in ("ev_planned_load_enabled", "ev_second_planned_load_enabled"):
+        assert planner_input_fingerprint(
+            _input(**{field: True})
+        ) != planner_input_fingerprint(_input(now_iso=later, **{field: True}))
+
+
+def test_fingerprint_changes_with_planning_data() -> None:
+    base = planner_input_fingerprint(_input())
+    inp = _input()
+    inp.price_points[3] = replace(
+        inp.price_points[3], import_price=inp.price_points[3].import_price + 0.01
+    )
+    corrector = SolarForecastCorrector()
+    corrector.hour_factors[12] = 0.8
+    changed = [
+        _input(now_iso="2024-01-15T10:15:00+01:00"),
+        _input(battery_soc_pct=81.0),
+        _input(planner_hysteresis_percentage=6.0),
+        _input(solar_corrector=corrector),
+        inp,
+    ]
+    assert all(planner_input_fingerprint(c) != base for c in changed)
+
+
+def test_repeated_input_hits_and_matches_fresh_plan() -> None:
+    cache = PlanCache()
+    planner = _CountingPlanner()
+    first = cache.run(_input(), planner)
+    second = cache.run(_input(now_iso="2024-01-15T10:12:00+01:00"), planner)
+
+    assert planner.calls == 1
+    assert second is not first
+    assert [s.recommendation for s in second.slots] == [
+        s.recommendation for s in first.slots
+    ]
+    assert second.winner_name == first.winner_name
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["last_hit"] is True
+
+
+def test_returned_plan_edits_do_not_leak_into_cache() -> None:
+    cache = PlanCache()
+    planner = _CountingPlanner()
+    first = cache.run(_input(), planner)
+    expected = first.slots[0].recommendation
+    first.slots[0].recommendation = "edited"
+
+    assert cache.run(_input(), planner).slots[0].recommendation == expected
+
+
+def test_invalidation_and_lru_bound() -> None:
+    cache = PlanCache(max_entries=2)
+    planner = _CountingPlanner()
+    for soc in (40.0, 50.0, 60.0):
+        cache.run(_input(battery_soc_pct=soc), planner)
+    assert cache.stats()["entries"] == 2
+
+    cache.run(_input(battery_soc_pct=40.0), planner)
+    assert planner.calls == 4  # evicted
+
+    cache.invalidate("test")
+    stats = cache.stats()
+    assert stats["entries"] == 0
+    assert stats["invalidations"] == 1
+    assert stats["last_invalidation_reason"] == "test"
+    cache.run(_input(battery_soc_pct=60.0), planner)
+    assert planner.calls == 5
@@ -0,0 +1,139 @@
+"""Tests for the rolling-horizon decomposition.
+
+Coverage
+--------
+- The head ends at the first slot after ``now + head_hours``, with a
+  two-hour floor.
+- A 7-day solve returns one slot per input slot, respects the per-slot
+  limits and SoC range, converges within the iteration bound and lands
+  within 2 % of the full-horizon cost.
+- Expensive tail prices raise the terminal value, so the head keeps more
+  energy for the tail than a head-only solve.
+- A horizon that fits the head is solved exactly as before.
+- The generator routes through the rolling horizon only when enabled, in
+  preference to horizon compression.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.planner.milp_optimizer import solve_milp
+from custom_components.hsem.planner.rolling_horizon import (
+    solve_milp_rolling,
+    split_horizon,
+)
+from custom_components.hsem.utils.prices import SlotPrice
+from tests.planner.test_horizon_compression import (
+    _MAX_CHARGE,
+    _NOW,
+    _grid_cost,
+    _kwargs,
+    _make_slots,
+    requires_scipy,
+)
+
+
+def test_split_at_head_window_with_two_hour_floor() -> None:
+    slots = _make_slots(192)
+    # 00:00 … 23:45 start before the 24:05 cutoff; 00:15 tomorrow is tail.
+    assert split_horizon(slots, _NOW, 24.0) == 97
+    assert split_horizon(slots, _NOW, 0.0) == 9
+    assert split_horizon(slots[:20], _NOW, 24.0) == 20
+
+
+@requires_scipy
+def test_rolling_week_matches_full_solve() -> None:
+    slots = _make_slots(7 * 96)
+    full = solve_milp(slots, _NOW, **_kwargs())
+    rolling = solve_milp_rolling(slots, _NOW, **_kwargs())
+    assert full is not None and rolling is not None
+    out, diag = rolling
+
+    stats = diag["rolling_horizon"]
+    assert (stats["head_slots"], stats["tail_slots"]) == (97, 575)
+    assert stats["tail_blocks"] == 144
+    assert 1 <= stats["iterations"] <= 3
+    assert stats["terminal_value_per_kwh"] > 0
+    assert [s.start for s in out] == [s.start for s in slots]
+
+    soc = 2.0
+    for s in out:
+        assert s.batteries_charged_kwh <= _MAX_CHARGE + 1e-6
+        assert s.batteries_discharged_kwh <= _MAX_CHARGE + 1e-6
+        soc += s.batteries_charged_kwh - s.batteries_discharged_kwh
+        assert -0.01 <= soc <= 10.0 + 0.01
+        if s is out[96]:
+            assert soc == pytest.approx(stats["head_end_kwh"], abs=1e-2)
+
+    assert _grid_cost(out) == pytest.approx(_grid_cost(full[0]), rel=0.02)
+
+
+@requires_scipy
+def test_expensive_tail_keeps_energy_in_the_head() -> None:
+    slots = _make_slots(2 * 96)
+    for s in slots[97:]:
+        s.price = SlotPrice(import_price=5.0, export_price=0.1)
+    head_only = solve_milp(slots[:97], _NOW, **_kwargs())
+    rolling = solve_milp_rolling(slots, _NOW, **_kwargs())
+    assert head_only is not None and rolling is not None
+
+    def _end_kwh(plan: list[PlannedSlot]) -> float:
+        return 2.0 + sum(
+            s.batteries_charged_kwh - s.batteries_discharged_kwh for s in plan
+        )
+
+    assert rolling[1]["rolling_horizon"]["terminal_value_per_kwh"] > 1.0
+    assert _end_kwh(rolling[0][:97]) > _end_kwh(head_only[0]) + 1.0
+
+
+@requires_scipy
+def test_short_horizon_is_solved_unchanged() -> None:
+    slots = _make_slots(48)
+    plain = solve_milp(slots, _NOW, **_kwargs())
+    rolling = solve_milp_rolling(slots, _NOW, **_kwargs())
+    assert plain is not None and rolling is not None
+    assert rolling[1]["rolling_horizon"]["tail_slots"] == 0
+    assert [s.batteries_charged_kwh for s in rolling[0]] == [
+        s.batteries_charged_kwh for s in plain[0]
+    ]
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_generator_prefers_rolling_horizon_when_enabled(
+    monkeypatch: pytest.MonkeyPatch, enabled: bool
+) -> None:
+    from custom_components.hsem.planner import candidate_generator
+    from tests.planner.fixtures import make_winter_day_input
+
+    calls: dict[str, Any] = {}
+
+    def _spy(name: str) -> Any:
+        def _record(*args: Any, **kwargs: Any) -> None:
+            calls[name] = kwargs
+
+        return _record
+
+    monkeypatch.setattr(candidate_generator, "is_scipy_available", lambda: True)
+    monkeypatch.setattr(candidate_generator, "solve_milp_rolling", _spy("rolling"))
+    monkeypatch.setattr(
+        candidate_generator, "solve_milp_compressed", _spy("compressed")
+    )
+    inp = make_winter_day_input()
+    inp.planner_horizon_compression = True
+    inp.planner_rolling_horizon = enabled
+    inp.planner_rolling_head_hours = 12.0
+    inp.planner_rolling_iterations = 5
+
+    candidate_generator.generate_candidates(
+        _make_slots(24), inp, _NOW, max_charge_per_slot=2.0, usable_kwh=8.0
+    )
+    if enabled:
+        assert set(calls) == {"rolling"}
+        assert calls["rolling"]["head_hours"] == pytest.approx(12.0)
+        assert calls["rolling"]["max_iterations"] == 5
+    else:
+        assert set(calls) == {"compressed"}
@@ -0,0 +1,160 @@
+"""Differential tests for the array SoC simulation kernel.
+
+Coverage
+--------
+- ``simulate_soc_batch`` writes exactly what ``simulate_soc`` writes, slot
+  for slot, on randomised candidates (prices, PV, load, EV load, charge
+  schedules, recommendations, MILP-prepopulated flows, past/current slots).
+- A 2-D ``simulate_soc_arrays`` call gives each row the result of a
+  single-row call.
+- Candidates on different time grids and debug logging fall back to the
+  per-candidate simulation.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import random
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from custom_components.hsem.models.planned_slot import PlannedSlot
+from custom_components.hsem.models.slot_frame import SlotFrame
+from custom_components.hsem.planner import soc_kernel
+from custom_components.hsem.planner.soc_kernel import (
+    simulate_soc_arrays,
+    simulate_soc_batch,
+)
+from custom_components.hsem.planner.soc_simulation import simulate_soc
+from custom_components.hsem.utils.recommendations import Recommendations
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+_MIDNIGHT = datetime(2024, 6, 15, 0, 0, tzinfo=_TZ)
+_NOW = _MIDNIGHT + timedelta(hours=2, minutes=7, seconds=3)
+
+_RECS = [None, *(r.value for r in Recommendations)]
+
+_PARAMS: dict[str, Any] = {
+    "current_kwh": 3.2,
+    "usable_kwh": 9.0,
+    "max_capacity_kwh": 8.5,
+    "max_charge_per_slot": 1.1,
+    "max_discharge_per_slot": 1.3,
+    "rated_kwh": 10.0,
+    "end_of_discharge_soc_pct": 10.0,
+    "charge_efficiency_pct": 95.0,
+    "discharge_efficiency_pct": 93.0,
+}
+
+
+def _random_slots(rng: random.Random, n: int = 48) -> list[PlannedSlot]:
+    slots = []
+    for i in range(n):
+        start = _MIDNIGHT + timedelta(minutes=15 * i)
+        s = PlannedSlot(start=start, end=start + timedelta(minutes=15))
+        s.solcast_pv_estimate_kwh = max(0.0, rng.uniform(-0.3, 1.2))
+        s.avg_house_consumption_kwh = rng.uniform(0.0, 1.0)
+        s.ev_accounted_load_kwh = rng.choice([0.0, 0.0, 0.0, rng.uniform(0.0, 0.5)])
+        s.ev_planned_load_kwh = rng.choice([0.0, 0.0, 0.0, rng.uniform(0.0, 2.0)])
+        s.batteries_charged_kwh = rng.choice([0.0, rng.uniform(0.0, 1.5)])
+        s.batteries_discharged_kwh = rng.uniform(0.0, 1.0)
+        s.grid_import_kwh = rng.uniform(0.0, 1.0)
+        s.grid_export_kwh = rng.uniform(0.0, 1.0)
+        s.recommendation = rng.choice(_RECS)
+        slots.append(s)
+    return slots
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_batch_matches_simulate_soc(seed: int) -> None:
+    rng = random.Random(seed)
+    base = _random_slots(rng)
+    candidates = []
+    for _ in range(6):
+        cand = copy.deepcopy(base)
+        for s in cand:
+            if rng.random() < 0.5:
+                s.batteries_charged_kwh = rng.choice([0.0, rng.uniform(0.0, 1.5)])
+                s.recommendation = rng.choice(_RECS)
+        candidates.append(cand)
+    flags = [i == 0 for i in range(len(candidates))]
+    params: dict[str, Any] = {**_PARAMS, "current_kwh": rng.uniform(0.0, 8.5)}
+    if seed % 3 == 0:
+        params["max_discharge_per_slot"] = None
+
+    expected = copy.deepcopy(candidates)
+    for slots, flag in zip(expected, flags, strict=True):
+        simulate_soc(slots, _NOW, **params, milp_prepopulated=flag)
+
+    simulate_soc_batch(candidates, _NOW, **params, milp_prepopulated=flags)
+    for got, want in zip(candidates, expected, strict=True):
+        assert [asdict(s) for s in got] == [asdict(s) for s in want]
+
+
+def test_two_dimensional_call_matches_row_calls() -> None:
+    rng = random.Random(99)
+    frames = [SlotFrame.from_slots(_random_slots(rng)) for _ in range(4)]
+
+    def _run(rows: list[SlotFrame]) -> soc_kernel.SocArrays:
+        def col(name: str) -> np.ndarray:
+            return np.stack([f[name] for f in rows])
+
+        return simulate_soc_arrays(
+            rows[0].start_s,
+            rows[0].end_s,
+            _NOW,
+            pv_kwh=col("solcast_pv_estimate_kwh"),
+            house_kwh=col("avg_house_consumption_kwh"),
+            ev_planned_kwh=col("ev_planned_load_kwh"),
+            ev_accounted_kwh=col("ev_accounted_load_kwh"),
+            charged_kwh=col("batteries_charged_kwh"),
+            discharged_kwh=col("batteries_discharged_kwh"),
+            grid_import_kwh=col("grid_import_kwh"),
+            grid_export_kwh=col("grid_export_kwh"),
+            recommendation=np.stack([f.recommendation for f in rows]),
+            **_PARAMS,
+        )
+
+    batch = _run(frames)
+    assert batch.soc_pct.shape == (4, 48)
+    for row, frame in enumerate(frames):
+        single = _run([frame])
+        np.testing.assert_array_equal(batch.soc_pct[row], single.soc_pct[0])
+        np.testing.assert_array_equal(
+            batch.grid_import_kwh[row], single.grid_import_kwh[0]
+        )
+        assert batch.recommendation[row].tolist() == single.recommendation[0].tolist()
+
+
+@pytest.mark.parametrize("reason", ["grid", "debug"])
+def test_falls_back_to_per_candidate_simulation(
+    monkeypatch: pytest.MonkeyPatch, reason: str
+) -> None:
+    rng = random.Random(7)
+    candidates = [_random_slots(rng), _random_slots(rng)]
+    if reason == "grid":
+        candidates[1] = candidates[1][:-1]
+    else:
+        monkeypatch.setattr(
+            soc_kernel.HSEM_LOGGER, "isEnabledFor", lambda level: level >= logging.DEBUG
+        )
+
+    calls: list[int] = []
+
+    def _spy(slots: list[PlannedSlot], *args: object, **kwargs: object) -> None:
+        calls.append(len(slots))
+
+    monkeypatch.setattr(soc_kernel, "simulate_soc", _spy)
+    monkeypatch.setattr(
+        soc_kernel,
+        "simulate_soc_arrays",
+        lambda *a, **k: pytest.fail("kernel must not run"),
+    )
+    simulate_soc_batch(candidates, _NOW, **_PARAMS)
+    assert calls == [len(c) for c in candidates]
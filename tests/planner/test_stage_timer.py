@@ -0,0 +1,144 @@
+"""Tests for per-stage planner profiling.
+
+Coverage
+--------
+- Profiling is off by default: ``PlannerOutput.profile`` is ``None``.
+- With profiling on, every stage is timed and the MILP LP size is recorded.
+- The profile does not affect the plan or output equality.
+- ``StageTimer`` books elapsed time to the stage being closed.
+- The rolling tracker reports nearest-rank p50 / p95 / max per stage.
+- Every cycle's plan wait is tracked per plan source, including cycles
+  without a fresh full solve.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+
+from custom_components.hsem.models.planner_profile import PlannerProfile
+from custom_components.hsem.planner import run_planner
+from custom_components.hsem.planner.stage_timer import StageTimer, stage_timer
+from custom_components.hsem.utils.planner_profile_tracker import (
+    PLAN_SOURCE_CACHE,
+    PLAN_SOURCE_FULL,
+    PLAN_SOURCE_HEURISTIC,
+    PlannerProfileTracker,
+)
+from tests.planner.fixtures import make_summer_day_input
+
+_STAGES = [
+    "populate",
+    "ev_injection",
+    "schedule",
+    "candidates",
+    "selection",
+    "finalize",
+]
+
+
+def test_profiling_disabled_by_default() -> None:
+    assert run_planner(make_summer_day_input()).profile is None
+
+
+def test_profiling_records_every_stage_and_lp_size() -> None:
+    inp = replace(make_summer_day_input(), planner_profiling_enabled=True)
+    profile = run_planner(inp).profile
+
+    assert profile is not None
+    assert list(profile.wall_ms) == _STAGES
+    assert list(profile.cpu_ms) == _STAGES
+    assert all(ms >= 0.0 for ms in profile.wall_ms.values())
+    assert profile.total_wall_ms == pytest.approx(
+        sum(profile.wall_ms.values()), abs=1e-2
+    )
+    if profile.lp:
+        assert profile.lp["n_vars"] > 0
+        assert profile.lp["nnz"] > 0
+        assert profile.lp["solve_ms"] >= 0.0
+
+
+def test_profiling_does_not_change_the_plan() -> None:
+    inp = make_summer_day_input()
+    profiled = run_planner(replace(inp, planner_profiling_enabled=True))
+
+    assert profiled == run_planner(inp)
+
+
+def test_stage_timer_books_time_to_closed_stage(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clock = iter([1.0, 1.0, 1.25, 1.5, 2.0, 2.0])
+    monkeypatch.setattr("time.perf_counter", lambda: next(clock))
+    monkeypatch.setattr("time.process_time", lambda: next(clock))
+    timer = StageTimer()
+    timer.mark("a")
+    timer.mark("b")
+
+    profile = timer.profile()
+    assert profile is not None
+    assert profile.wall_ms == {"a": pytest.approx(250.0), "b": pytest.approx(750.0)}
+    assert profile.cpu_ms == {"a": pytest.approx(500.0), "b": pytest.approx(500.0)}
+
+
+def test_disabled_timer_is_a_no_op() -> None:
+    timer = stage_timer(False)
+    timer.mark("populate")
+    timer.record_lp({"solver": {"n_vars": 10}})
+
+    assert timer.profile() is None
+
+
+def test_tracker_percentiles() -> None:
+    tracker = PlannerProfileTracker(window=100)
+    assert tracker.summary() == {}
+    for ms in range(1, 101):
+        tracker.record(
+            PlannerProfile(
+                wall_ms={"candidates": float(ms)},
+                cpu_ms={"candidates": float(ms) / 2},
+                lp={"n_vars": ms},
+            )
+        )
+
+    summary = tracker.summary()
+    assert summary["samples"] == 100
+    assert summary["wall_ms"]["candidates"] == {"p50": 50.0, "p95": 95.0, "max": 100.0}
+    assert summary["wall_ms"]["total"]["max"] == 100.0
+    assert summary["cpu_ms"]["candidates"]["p95"] == pytest.approx(47.5)
+    assert summary["last_total_wall_ms"] == 100.0
+    assert summary["lp"] == {"n_vars": 100}
+
+
+def test_tracker_window_drops_oldest() -> None:
+    tracker = PlannerProfileTracker(window=2)
+    for ms in (500.0, 1.0, 2.0):
+        tracker.record(PlannerProfile(wall_ms={"schedule": ms}))
+
+    summary = tracker.summary()
+    assert summary["samples"] == 2
+    assert summary["wall_ms"]["schedule"]["max"] == 2.0
+
+
+def test_tracker_records_cycles_by_source() -> None:
+    tracker = PlannerProfileTracker()
+    tracker.record_cycle(PLAN_SOURCE_CACHE, 1.0)
+
+    summary = tracker.summary()
+    assert summary["samples"] == 0
+    assert summary["last_total_wall_ms"] is None
+    assert summary["cycles"]["last_source"] == PLAN_SOURCE_CACHE
+
+    tracker.record(PlannerProfile(wall_ms={"schedule": 400.0}))
+    tracker.record_cycle(PLAN_SOURCE_FULL, 400.0)
+    tracker.record_cycle(PLAN_SOURCE_HEURISTIC, 20.0)
+
+    cycles = tracker.summary()["cycles"]
+    assert cycles["samples"] == 3
+    assert cycles["last_source"] == PLAN_SOURCE_HEURISTIC
+    assert cycles["last_wall_ms"] == 20.0
+    assert cycles["count"] == {"full": 1, "cache": 1, "heuristic": 1, "swap": 0}
+    assert cycles["wall_ms"]["all"] == {"p50": 20.0, "p95": 400.0, "max": 400.0}
+    assert cycles["wall_ms"]["cache"]["max"] == 1.0
+    assert "swap" not in cycles["wall_ms"]
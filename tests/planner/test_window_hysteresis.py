@@ -14,6 +14,8 @@ Acceptance criteria
 3. Neutral recommendations (wait_mode, time_passed, None) do not trigger hold.
 4. Feature disabled (0 min) always allows the switch.
 5. First run (no previous state) always accepts the new recommendation.
+6. A held battery action that loses money at the slot's marginal energy
+   value (optimizer dual) is released.
 """
 
 from __future__ import annotations
@@ -392,3 +394,54 @@ class TestWindowHysteresis:
         assert start == prev_start, (
             "Returned start time must be the previous slot start when held"
         )
+
+    # ------------------------------------------------------------------
+    # Marginal energy value guard
+    # ------------------------------------------------------------------
+
+    def test_uneconomic_held_charge_is_released(self):
+        """A held grid charge is dropped when stored energy is worth less
+        than the import price."""
+        slots = _make_slots(Recommendations.BatteriesDischargeMode.value)
+        slots[0].marginal_energy_value = 0.15
+        rec, start = apply_window_hysteresis(
+            slots,
+            _NOW,
+            window_hysteresis_minutes=30,
+            previous_current_recommendation=Recommendations.BatteriesChargeGrid.value,
+            previous_current_slot_start=_NOW - timedelta(minutes=5),
+        )
+        assert rec == Recommendations.BatteriesDischargeMode.value
+        assert start == slots[0].start
+
+    def test_economic_held_action_is_kept(self):
+        """Held actions that still pay at the marginal value stay held."""
+        for held, value in (
+            (Recommendations.BatteriesChargeGrid.value, 0.25),
+            (Recommendations.BatteriesDischargeMode.value, 0.15),
+            (Recommendations.ForceBatteriesDischarge.value, 0.05),
+        ):
+            slots = _make_slots(Recommendations.BatteriesChargeSolar.value)
+            slots[0].marginal_energy_value = value
+            rec, _ = apply_window_hysteresis(
+                slots,
+                _NOW,
+                window_hysteresis_minutes=30,
+                previous_current_recommendation=held,
+                previous_current_slot_start=_NOW - timedelta(minutes=5),
+            )
+            assert rec == held, f"{held} at value {value} must be held"
+
+    def test_uneconomic_held_discharge_is_released(self):
+        """A held export is dropped when stored energy is worth more than the
+        export price."""
+        slots = _make_slots(Recommendations.BatteriesChargeSolar.value)
+        slots[0].marginal_energy_value = 0.10
+        rec, _ = apply_window_hysteresis(
+            slots,
+            _NOW,
+            window_hysteresis_minutes=30,
+            previous_current_recommendation=Recommendations.ForceBatteriesDischarge.value,
+            previous_current_slot_start=_NOW - timedelta(minutes=5),
+        )
+        assert rec == Recommendations.BatteriesChargeSolar.value
@@ -0,0 +1,98 @@
+"""Tests for the HSEMPlannerProfileSensor diagnostic sensor.
+
+Acceptance criteria
+-------------------
+- ``state`` is ``"disabled"`` while ``CoordinatorData.planner_profile`` is
+  empty and the last run's wall-clock milliseconds otherwise.
+- ``state`` is unavailable before the first coordinator cycle.
+- ``extra_state_attributes`` exposes the rolling per-stage summary and the
+  per-source cycle times.
+- Before the first full solve the state is the last cycle's plan wait.
+- The sensor is wired as a diagnostic entity category.
+"""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from homeassistant.const import STATE_UNAVAILABLE, EntityCategory
+
+from custom_components.hsem.coordinator import CoordinatorData
+from custom_components.hsem.custom_sensors.planner_profile_sensor import (
+    HSEMPlannerProfileSensor,
+)
+from custom_components.hsem.models.planner_profile import PlannerProfile
+from custom_components.hsem.utils.planner_profile_tracker import (
+    PlannerProfileTracker,
+)
+
+
+def _summary() -> dict:
+    tracker = PlannerProfileTracker()
+    tracker.record(
+        PlannerProfile(
+            wall_ms={"schedule": 12.5, "candidates": 300.25},
+            cpu_ms={"schedule": 12.0, "candidates": 290.0},
+            lp={"n_vars": 480, "iterations": 212},
+        )
+    )
+    return tracker.summary()
+
+
+def _make_sensor(data: CoordinatorData | None) -> HSEMPlannerProfileSensor:
+    """Return a bare HSEMPlannerProfileSensor wired to a mock coordinator."""
+    coordinator = MagicMock()
+    coordinator.data = data
+    coordinator.last_update_success = data is not None
+
+    sensor = object.__new__(HSEMPlannerProfileSensor)
+    # Minimal attribute injection — bypasses __init__ CoordinatorEntity plumbing.
+    sensor.coordinator = coordinator
+    sensor._config_entry = MagicMock()
+    sensor._attr_unique_id = "hsem_planner_profile_sensor"
+    sensor.entity_id = "sensor.hsem_planner_profile_sensor"
+    sensor._name = "Planner Profile"
+    return sensor
+
+
+def test_sensor_is_diagnostic_entity() -> None:
+    sensor = _make_sensor(CoordinatorData())
+    assert sensor.entity_category is EntityCategory.DIAGNOSTIC
+
+
+def test_state_disabled_without_profile() -> None:
+    sensor = _make_sensor(CoordinatorData())
+    assert sensor.state == "disabled"
+    assert sensor.extra_state_attributes["enabled"] is False
+    assert sensor.extra_state_attributes["samples"] == 0
+
+
+def test_state_unavailable_before_first_cycle() -> None:
+    sensor = _make_sensor(None)
+    assert sensor.state == STATE_UNAVAILABLE
+    assert sensor.available is False
+
+
+def test_state_and_attributes_with_profile() -> None:
+    sensor = _make_sensor(CoordinatorData(planner_profile=_summary()))
+
+    assert sensor.state == "312.8"
+    attrs = sensor.extra_state_attributes
+    assert attrs["enabled"] is True
+    assert attrs["samples"] == 1
+    assert attrs["last_stage_ms"] == {"schedule": 12.5, "candidates": 300.25}
+    assert attrs["wall_ms"]["candidates"]["p95"] == 300.25
+    assert attrs["cpu_ms"]["total"]["max"] == 302.0
+    assert attrs["lp"] == {"n_vars": 480, "iterations": 212}
+
+
+def test_state_falls_back_to_cycle_time_without_full_solve() -> None:
+    tracker = PlannerProfileTracker()
+    tracker.record_cycle("cache", 0.75)
+    sensor = _make_sensor(CoordinatorData(planner_profile=tracker.summary()))
+
+    assert sensor.state == "0.8"
+    attrs = sensor.extra_state_attributes
+    assert attrs["samples"] == 0
+    assert attrs["cycles"]["last_source"] == "cache"
+    assert attrs["cycles"]["count"]["cache"] == 1
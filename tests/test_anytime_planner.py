@@ -0,0 +1,210 @@
+"""Tests for anytime planning (deadline with heuristic fallback).
+
+Coverage
+--------
+- ``planner_heuristic_only`` drops the MILP candidate from the plan.
+- A full solve within the deadline is used as-is.
+- A slow full solve returns the heuristic plan first; the optimal plan is
+  held for :meth:`AnytimePlanner.take_optimal` and ``on_optimal`` fires.
+- The heuristic run starts with the full solve, so a slow full solve still
+  yields a plan within the deadline.
+- A held plan whose planning input changed is dropped as stale.
+- A newer re-plan supersedes a pending solve.
+- A failing full solve falls back to the heuristic plan.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import replace
+
+import pytest
+
+from custom_components.hsem.models.planner_input import PlannerInput
+from custom_components.hsem.models.planner_output import PlannerOutput
+from custom_components.hsem.planner import run_planner
+from custom_components.hsem.planner.milp_optimizer import (
+    CANDIDATE_MILP,
+    is_scipy_available,
+)
+from custom_components.hsem.utils.anytime_planner import AnytimePlanner
+from tests.planner.fixtures import make_summer_day_input
+
+pytestmark = pytest.mark.skipif(not is_scipy_available(), reason="needs scipy")
+
+
+def _names(output: PlannerOutput) -> set[str]:
+    return {c.name for c in output.candidates}
+
+
+class _GatedPlanner:
+    """``run_planner`` that blocks until :meth:`release` is called."""
+
+    def __init__(self) -> None:
+        self.gate = threading.Event()
+
+    def __call__(self, inp: PlannerInput) -> PlannerOutput:
+        self.gate.wait(30)
+        return run_planner(inp)
+
+    def release(self) -> None:
+        self.gate.set()
+
+
+def test_heuristic_only_skips_milp() -> None:
+    inp = make_summer_day_input()
+
+    assert CANDIDATE_MILP in _names(run_planner(inp))
+    heuristic = run_planner(replace(inp, planner_heuristic_only=True))
+    assert CANDIDATE_MILP not in _names(heuristic)
+    assert heuristic.winner_name
+
+
+@pytest.mark.asyncio
+async def test_full_solve_within_deadline_is_used() -> None:
+    planner = AnytimePlanner()
+    inp = make_summer_day_input()
+
+    output = await planner.async_plan(inp, run_planner, deadline_s=30.0)
+
+    assert output == run_planner(inp)
+    assert not planner.has_optimal
+    stats = planner.stats()
+    assert stats["mode"] == "optimal"
+    assert stats["optimal_plans"] == 1
+    assert stats["heuristic_plans"] == 0
+    assert stats["last_optimal_has_milp"] is True
+    assert stats["last_optimal_ms"] > 0
+    assert stats["last_heuristic_ms"] is None  # the heuristic result is dropped
+
+
+@pytest.mark.asyncio
+async def test_slow_solve_returns_heuristic_then_optimal() -> None:
+    planner = AnytimePlanner()
+    inp = make_summer_day_input()
+    slow = _GatedPlanner()
+    ready = asyncio.Event()
+
+    output = await planner.async_plan(inp, slow, deadline_s=0.05, on_optimal=ready.set)
+
+    assert CANDIDATE_MILP not in _names(output)
+    assert output.warnings[-1].startswith("Heuristic plan:")
+    assert planner.serving_heuristic
+    assert planner.stats()["last_heuristic_ms"] > 0
+    assert not planner.has_optimal
+
+    slow.release()
+    await asyncio.wait_for(ready.wait(), 30)
+
+    solved_input, optimal = planner.take_optimal(inp)  # type: ignore[misc]  # pending after on_optimal
+    assert solved_input is inp
+    assert optimal == run_planner(inp)
+    assert not planner.serving_heuristic
+    assert planner.take_optimal(inp) is None
+    stats = planner.stats()
+    assert stats["heuristic_plans"] == 1
+    assert stats["optimal_plans"] == 1
+    assert stats["swaps"] == 1
+    assert stats["last_optimal_has_milp"] is True
+
+
+@pytest.mark.asyncio
+async def test_slow_solve_yields_a_plan_within_the_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    planner = AnytimePlanner()
+    inp = make_summer_day_input()
+    heuristic = run_planner(
+        replace(make_summer_day_input(), planner_heuristic_only=True)
+    )
+    slow = _GatedPlanner()
+
+    def slow_heuristic(hinp: PlannerInput) -> PlannerOutput:
+        assert hinp.planner_heuristic_only
+        time.sleep(0.3)
+        return heuristic
+
+    monkeypatch.setattr(
+        "custom_components.hsem.planner.engine_core.run_planner", slow_heuristic
+    )
+    started = time.perf_counter()
+    output = await planner.async_plan(inp, slow, deadline_s=0.5)
+    elapsed = time.perf_counter() - started
+    slow.release()
+
+    # A heuristic started only after the deadline would apply at ~0.8 s.
+    assert elapsed < 0.7
+    assert output is heuristic
+    assert planner.serving_heuristic
+    assert planner.stats()["last_heuristic_ms"] >= 300
+
+
+@pytest.mark.asyncio
+async def test_stale_optimal_plan_is_dropped() -> None:
+    planner = AnytimePlanner()
+    inp = make_summer_day_input()
+    slow = _GatedPlanner()
+    ready = asyncio.Event()
+
+    await planner.async_plan(inp, slow, deadline_s=0.05, on_optimal=ready.set)
+    slow.release()
+    await asyncio.wait_for(ready.wait(), 30)
+
+    # Live power jitter does not make the plan stale; a SoC change does.
+    assert planner.has_optimal
+    jitter = replace(inp, live_house_consumption_w=inp.live_house_consumption_w + 400)
+    assert planner.take_optimal(jitter) is not None
+    slow = _GatedPlanner()
+    ready.clear()
+    await planner.async_plan(inp, slow, deadline_s=0.05, on_optimal=ready.set)
+    slow.release()
+    await asyncio.wait_for(ready.wait(), 30)
+    later = replace(inp, battery_soc_pct=inp.battery_soc_pct + 5.0)
+
+    assert planner.take_optimal(later) is None
+    assert not planner.has_optimal
+    assert planner.stats()["stale"] == 1
+    assert planner.stats()["swaps"] == 1
+
+
+@pytest.mark.asyncio
+async def test_newer_plan_supersedes_pending_solve() -> None:
+    planner = AnytimePlanner()
+    inp = make_summer_day_input()
+    slow = _GatedPlanner()
+    calls: list[str] = []
+
+    await planner.async_plan(
+        inp, slow, deadline_s=0.05, on_optimal=lambda: calls.append("first")
+    )
+    output = await planner.async_plan(inp, run_planner, deadline_s=30.0)
+    slow.release()
+    for _ in range(300):
+        if planner.superseded:
+            break
+        await asyncio.sleep(0.1)
+
+    assert CANDIDATE_MILP in _names(output)
+    assert planner.superseded == 1
+    assert calls == []
+    assert not planner.has_optimal
+
+
+@pytest.mark.asyncio
+async def test_failing_solve_falls_back_to_heuristic() -> None:
+    planner = AnytimePlanner()
+
+    def broken(inp: PlannerInput) -> PlannerOutput:
+        raise RuntimeError("solver crashed")
+
+    output = await planner.async_plan(make_summer_day_input(), broken, deadline_s=30.0)
+
+    assert CANDIDATE_MILP not in _names(output)
+    assert "optimizer failed" in output.warnings[-1]
+    stats = planner.stats()
+    assert stats["mode"] == "heuristic"
+    assert stats["errors"] == 1
+    assert stats["last_error"] == "optimizer: RuntimeError: solver crashed"
+    assert not planner.has_optimal
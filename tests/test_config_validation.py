@@ -11,8 +11,10 @@ Covers:
 - Consumption weight validation
 - merge_errors composition helper
 - Integration: flow-level validators delegate to the centralized module
+- The rolling-horizon head is bounded by the planning horizon
 """
 
+from typing import Any, cast
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -916,3 +918,45 @@ class TestFlowValidatorsUseConfigValidator:
             }
         )
         assert errors == {}
+
+    @pytest.mark.asyncio
+    async def test_rolling_head_is_bounded_by_the_horizon(self):
+        import voluptuous as vol
+
+        from custom_components.hsem.flows.battery_economics import (
+            get_battery_economics_step_schema,
+            validate_battery_economics_input,
+        )
+        from custom_components.hsem.flows.init import get_init_step_schema
+
+        init_schema = await get_init_step_schema(None)
+        assert (
+            init_schema({"hsem_recommendation_interval_length": "168"})[  # pyright: ignore[reportIndexIssue]
+                "hsem_recommendation_interval_length"
+            ]
+            == "168"
+        )
+
+        short = await get_battery_economics_step_schema(None, "24")
+        with pytest.raises(vol.Invalid):
+            short({"hsem_planner_rolling_head_hours": 30})
+        user_input = cast(dict[str, Any], short({}))
+        assert user_input["hsem_planner_rolling_head_hours"] == 23
+        user_input["hsem_planner_rolling_horizon"] = True
+        assert await validate_battery_economics_input(user_input, "24") == {}
+
+        user_input["hsem_planner_rolling_head_hours"] = 24
+        assert await validate_battery_economics_input(user_input, "24") == {
+            "hsem_planner_rolling_head_hours": "rolling_head_exceeds_horizon"
+        }
+        assert await validate_battery_economics_input(user_input, "168") == {}
+        user_input["hsem_planner_rolling_horizon"] = False
+        assert await validate_battery_economics_input(user_input, "24") == {}
+
+        week = await get_battery_economics_step_schema(None, "168")
+        assert (
+            week({"hsem_planner_rolling_head_hours": 72})[  # pyright: ignore[reportIndexIssue]
+                "hsem_planner_rolling_head_hours"
+            ]
+            == 72
+        )
@@ -39,6 +39,7 @@ from custom_components.hsem.coordinator import (
     HSEMDataUpdateCoordinator,
 )
 from custom_components.hsem.coordinator_builder import generate_recommendation_intervals
+from custom_components.hsem.planner.plan_cache import PlanCache
 
 # ---------------------------------------------------------------------------
 # Helper: build a bare coordinator instance without calling __init__
@@ -70,6 +71,7 @@ def _make_bare_coordinator() -> HSEMDataUpdateCoordinator:
     coord._cfg = cfg
     coord._options_update_task = None
     coord._options_update_debounce_task = None
+    coord._plan_cache = PlanCache()
     return coord
 
 
@@ -368,6 +370,29 @@ class TestOptionsUpdateBackgroundTask:
         assert task.cancelling() or task.cancelled() or task.done()
         assert coordinator._options_update_task is None
 
+    @pytest.mark.asyncio
+    @patch("custom_components.hsem.coordinator.OPTIONS_UPDATE_DEBOUNCE_SECONDS", 0.0)
+    async def test_options_updated_invalidates_lp_structure_cache(self) -> None:
+        """An options change drops cached MILP skeletons and plans."""
+        from custom_components.hsem.planner.milp._lp_cache import LP_STRUCTURE_CACHE
+
+        coordinator = _make_bare_coordinator()
+        coordinator.hass = MagicMock()
+        coordinator.hass.async_create_task = MagicMock(  # type: ignore[method-assign]  # test monkey-patch
+            side_effect=lambda coro, *, name, **kwargs: (
+                asyncio.get_running_loop().create_task(coro, name=name)
+            )
+        )
+        before = LP_STRUCTURE_CACHE.invalidations
+
+        await coordinator.async_options_updated()
+        await coordinator.async_teardown()
+
+        assert LP_STRUCTURE_CACHE.invalidations == before + 1
+        assert LP_STRUCTURE_CACHE.last_invalidation_reason == "options_updated"
+        assert coordinator._plan_cache.invalidations == 1
+        assert coordinator._plan_cache.last_invalidation_reason == "options_updated"
+
 
 # ---------------------------------------------------------------------------
 # Coordinator recommendation interval generation
@@ -13,6 +13,7 @@ Covers:
 from __future__ import annotations
 
 import json
+from datetime import datetime
 
 import pytest
 
@@ -162,6 +163,18 @@ class TestPlannerInputRoundTrip:
         reconstructed = load_planner_input_from_dump(dump)
         assert reconstructed.battery_max_discharge_power_w is None
 
+    def test_ev_deadline_restored_as_datetime(self) -> None:
+        original = make_summer_day_input()
+        original.ev_planned_load_deadline = datetime.fromisoformat(
+            "2024-06-15T18:00:00+02:00"
+        )
+        dump = build_diagnostics_dump(original, run_planner(original))
+        reconstructed = load_planner_input_from_dump(dump)
+        assert reconstructed.ev_planned_load_deadline == (
+            original.ev_planned_load_deadline
+        )
+        assert reconstructed.ev_second_planned_load_deadline is None
+
     def test_winter_input_roundtrip(self) -> None:
         original = make_winter_day_input()
         dump = build_diagnostics_dump(original, run_planner(original))
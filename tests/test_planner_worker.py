@@ -0,0 +1,81 @@
+"""Tests for the dedicated planner worker process.
+
+Coverage
+--------
+- A plan solved in the worker process equals the in-process plan, and the
+  worker is reused across runs.
+- A killed worker is restarted on the next request.
+- A timeout kills the worker and falls back to an in-process run.
+- Verbose logging bypasses the worker so debug traces stay in ``hsem.log``.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator
+
+import pytest
+
+from custom_components.hsem.planner import run_planner
+from custom_components.hsem.utils import planner_worker
+from custom_components.hsem.utils.planner_worker import PlannerWorker
+from custom_components.hsem.utils.solar_corrector import SolarForecastCorrector
+from tests.planner.fixtures import make_summer_day_input
+
+
+@pytest.fixture
+def worker() -> Iterator[PlannerWorker]:
+    w = PlannerWorker(timeout_s=120.0)
+    yield w
+    w.shutdown()
+
+
+def test_worker_output_matches_in_process(worker: PlannerWorker) -> None:
+    inp = make_summer_day_input()
+    inp.solar_corrector = SolarForecastCorrector(hour_factors={12: 0.8})
+
+    assert worker.run(inp) == run_planner(inp)
+    assert worker.run(inp) == run_planner(inp)
+    stats = worker.stats()
+    assert stats["runs"] == 2
+    assert stats["fallbacks"] == 0
+    assert stats["restarts"] == 0
+    assert stats["alive"] is True
+
+
+def test_dead_worker_is_restarted(worker: PlannerWorker) -> None:
+    inp = make_summer_day_input()
+    worker.run(inp)
+    assert worker._process is not None
+    worker._process.kill()
+    worker._process.join()
+
+    assert worker.run(inp) == run_planner(inp)
+    assert worker.stats()["restarts"] == 1
+    assert worker.stats()["fallbacks"] == 0
+
+
+def test_timeout_falls_back_in_process(worker: PlannerWorker) -> None:
+    inp = make_summer_day_input()
+    worker.timeout_s = 0.0
+
+    assert worker.run(inp) == run_planner(inp)
+    stats = worker.stats()
+    assert stats["fallbacks"] == 1
+    assert stats["alive"] is False
+    assert "timed out" in stats["last_error"]
+
+
+def test_verbose_logging_runs_in_process(
+    worker: PlannerWorker, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        planner_worker.HSEM_LOGGER,
+        "isEnabledFor",
+        lambda level: level >= logging.DEBUG,
+    )
+    inp = make_summer_day_input()
+
+    assert worker.run(inp) == run_planner(inp)
+    assert worker.stats()["runs"] == 0
+    assert worker._process is None
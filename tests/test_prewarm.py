@@ -0,0 +1,194 @@
+"""Tests for the background numpy/scipy prewarm at setup.
+
+Coverage
+--------
+- ``prewarm_numeric_stack`` imports the stack, solves the warm-up LP and
+  times each step.
+- ``NumericPrewarm`` is ready until started, not ready while running, and
+  keeps the stats once done; ``start`` is idempotent.
+- Heuristic-only planner runs never call the lazy scipy check.
+- Setup returns while the prewarm still runs: the first cycle serves a
+  heuristic plan without the MILP and queues one full re-plan, which runs
+  once the prewarm is done (tagged as a full solve; the identical next
+  cycle is a plan-cache hit).  The anytime path is not taken unless it is
+  enabled.
+- ``async_wait`` returns at once when no prewarm runs and swallows a failed
+  prewarm.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest import mock
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.hsem.coordinator import HSEMDataUpdateCoordinator
+from custom_components.hsem.models.planner_output import PlannerOutput
+from custom_components.hsem.planner import candidate_generator, run_planner
+from custom_components.hsem.planner.milp_optimizer import (
+    CANDIDATE_MILP,
+    is_scipy_available,
+)
+from custom_components.hsem.planner.plan_cache import PlanCache
+from custom_components.hsem.utils.anytime_planner import AnytimePlanner
+from custom_components.hsem.utils.planner_profile_tracker import (
+    PLAN_SOURCE_CACHE,
+    PLAN_SOURCE_FULL,
+    PLAN_SOURCE_HEURISTIC,
+)
+from custom_components.hsem.utils.prewarm import (
+    NumericPrewarm,
+    PrewarmStats,
+    prewarm_numeric_stack,
+)
+from tests.planner.fixtures import make_summer_day_input
+
+
+def test_prewarm_imports_stack_and_solves_lp() -> None:
+    stats = prewarm_numeric_stack()
+
+    assert stats.scipy_available is is_scipy_available()
+    assert stats.error is None
+    assert stats.total_ms >= stats.numpy_import_ms
+    if stats.scipy_available:
+        assert stats.first_solve_ms is not None
+    assert set(stats.as_dict()) >= {"numpy_import_ms", "scipy_import_ms", "total_ms"}
+
+
+@pytest.mark.asyncio
+async def test_numeric_prewarm_lifecycle() -> None:
+    prewarm = NumericPrewarm()
+    assert prewarm.ready
+    assert prewarm.stats is None
+
+    prewarm.start()
+    future = prewarm._future
+    prewarm.start()
+    assert prewarm._future is future
+    assert future is not None
+    await future
+    await asyncio.sleep(0)
+
+    assert prewarm.ready
+    assert prewarm.stats is not None
+    assert prewarm.stats.error is None
+
+
+def test_heuristic_only_run_skips_scipy_check() -> None:
+    inp = make_summer_day_input()
+    inp.planner_heuristic_only = True
+
+    with mock.patch.object(
+        candidate_generator, "is_scipy_available", side_effect=AssertionError
+    ):
+        output = run_planner(inp)
+
+    assert output.winner_name
+    assert CANDIDATE_MILP not in {c.name for c in output.candidates}
+
+
+def _coordinator(
+    loop: asyncio.AbstractEventLoop, outputs: list[PlannerOutput]
+) -> HSEMDataUpdateCoordinator:
+    """Return a bare coordinator whose update cycle only runs the planner."""
+    coord = object.__new__(HSEMDataUpdateCoordinator)
+    coord.hass = MagicMock()
+    coord.hass.async_add_executor_job = lambda func, *args: loop.run_in_executor(
+        None, func, *args
+    )
+    coord.hass.async_create_task = lambda coro, **_kwargs: loop.create_task(coro)
+    coord._anytime_planner = AnytimePlanner()
+    coord._plan_cache = PlanCache()
+    coord._planner_worker = None
+    coord._prewarm = NumericPrewarm()
+    coord._prewarm._future = loop.create_future()  # still importing
+    coord._prewarm_replan_task = None
+    coord._update_lock = asyncio.Lock()
+    cfg = _cfg()
+
+    async def cycle() -> None:
+        outputs.append(await coord._async_run_planner(make_summer_day_input(), cfg))
+
+    coord._async_run_update_cycle = cycle  # type: ignore[method-assign]  # planner-only cycle
+    return coord
+
+
+def _cfg() -> MagicMock:
+    cfg = MagicMock()
+    cfg.planner_worker_process = False
+    cfg.planner_anytime = False
+    cfg.ocpp_enabled = False
+    return cfg
+
+
+@pytest.mark.asyncio
+async def test_setup_returns_before_prewarm_finishes() -> None:
+    loop = asyncio.get_running_loop()
+    outputs: list[PlannerOutput] = []
+    coord = _coordinator(loop, outputs)
+    coord._config_entry = MagicMock()
+    coord._init_financial_tracker = AsyncMock()  # type: ignore[method-assign]  # no storage
+
+    with (
+        patch(
+            "custom_components.hsem.coordinator.build_sensor_config",
+            return_value=_cfg(),
+        ),
+        patch("custom_components.hsem.coordinator.async_track_time_change"),
+    ):
+        await asyncio.wait_for(coord.async_setup(), 30)
+
+    assert not coord._prewarm.ready
+    assert len(outputs) == 1
+    assert CANDIDATE_MILP not in {c.name for c in outputs[0].candidates}
+    assert coord._last_plan_source == PLAN_SOURCE_HEURISTIC
+    assert coord._prewarm_replan_task is not None
+    coord._prewarm_replan_task.cancel()
+
+
+@pytest.mark.skipif(not is_scipy_available(), reason="needs scipy")
+@pytest.mark.asyncio
+async def test_coordinator_serves_heuristic_plan_until_prewarm_is_done() -> None:
+    loop = asyncio.get_running_loop()
+    outputs: list[PlannerOutput] = []
+    coord = _coordinator(loop, outputs)
+    cfg = _cfg()
+
+    output = await asyncio.wait_for(
+        coord._async_run_planner(make_summer_day_input(), cfg), 30
+    )
+
+    assert CANDIDATE_MILP not in {c.name for c in output.candidates}
+    assert any(w.startswith("Heuristic plan:") for w in output.warnings)
+    assert coord._last_plan_source == PLAN_SOURCE_HEURISTIC
+    assert coord._plan_cache.misses == 0  # no full solve before the import
+    replan = coord._prewarm_replan_task
+    assert replan is not None and not replan.done()
+
+    # A second early cycle does not queue another re-plan.
+    await coord._async_run_planner(make_summer_day_input(), cfg)
+    assert coord._prewarm_replan_task is replan
+
+    assert coord._prewarm._future is not None
+    coord._prewarm._future.set_result(PrewarmStats())
+    await asyncio.wait_for(replan, 30)
+
+    assert CANDIDATE_MILP in {c.name for c in outputs[-1].candidates}
+    assert coord._anytime_planner.mode is None
+    assert coord._last_plan_source == PLAN_SOURCE_FULL
+
+    # The identical next cycle is served from the plan cache.
+    await coord._async_run_planner(make_summer_day_input(), cfg)
+    assert coord._last_plan_source == PLAN_SOURCE_CACHE
+
+
+@pytest.mark.asyncio
+async def test_failed_prewarm_does_not_block_planning() -> None:
+    prewarm = NumericPrewarm()
+    await prewarm.async_wait()  # never started
+
+    prewarm._future = asyncio.get_running_loop().create_future()
+    prewarm._future.set_exception(ImportError("no scipy"))
+    await prewarm.async_wait()
@@ -0,0 +1,103 @@
+"""Tests for bulk offline replay of diagnostics dumps.
+
+Coverage
+--------
+- Dumps of unchanged inputs replay identically, in worker processes and
+  in-process, in file-name order.
+- A changed recorded recommendation, winner or cost is reported per slot.
+- An unreadable dump becomes an error row instead of aborting the run.
+- The Markdown table and the CSV carry the comparison.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+
+from custom_components.hsem.planner import run_planner
+from custom_components.hsem.utils.diagnostics import (
+    build_diagnostics_dump,
+    dump_to_json,
+)
+from custom_components.hsem.utils.replay import (
+    format_table,
+    replay_directory,
+    replay_file,
+    write_csv,
+)
+from tests.planner.fixtures import make_summer_day_input, make_winter_day_input
+
+
+def _write_dump(directory: Path, name: str, *, winter: bool = False) -> dict:
+    inp = make_winter_day_input() if winter else make_summer_day_input()
+    dump = build_diagnostics_dump(inp, run_planner(inp))
+    (directory / name).write_text(dump_to_json(dump), encoding="utf-8")
+    return dump
+
+
+def test_unchanged_dumps_replay_identically_in_workers(tmp_path: Path) -> None:
+    _write_dump(tmp_path, "b_winter.json", winter=True)
+    _write_dump(tmp_path, "a_summer.json")
+
+    results = replay_directory(tmp_path, workers=2)
+
+    assert [r.dump for r in results] == ["a_summer.json", "b_winter.json"]
+    for r in results:
+        assert r.error is None
+        assert r.matches
+        assert r.replayed_winner == r.recorded_winner
+        assert r.solve_ms is not None
+        assert r.solve_ms > 0
+
+
+def test_changed_plan_is_reported(tmp_path: Path) -> None:
+    dump = _write_dump(tmp_path, "day.json")
+    recorded = dump["planner_output"]
+    slot = recorded["slots"][5]
+    original = slot["recommendation"]
+    slot["recommendation"] = "force_batteries_discharge"
+    recorded["explanation"]["winner_name"] = "old_winner"
+    recorded["plan_cost"]["total_cost"] += 1.0
+    (tmp_path / "day.json").write_text(json.dumps(dump), encoding="utf-8")
+
+    result = replay_file(tmp_path / "day.json")
+
+    assert not result.matches
+    assert result.recorded_winner == "old_winner"
+    assert [(d.start, d.recorded, d.replayed) for d in result.slot_diffs] == [
+        (slot["start"], "force_batteries_discharge", original)
+    ]
+    table = format_table([result])
+    assert f"old_winner → {result.replayed_winner}" in table
+    assert "1 dumps: 0 identical, 1 changed, 0 errors" in table
+
+
+def test_broken_dump_becomes_error_row(tmp_path: Path) -> None:
+    _write_dump(tmp_path, "good.json")
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+
+    results = replay_directory(tmp_path, workers=1)
+
+    broken, good = results
+    assert broken.error is not None
+    assert broken.error.startswith("JSONDecodeError")
+    assert not broken.matches
+    assert good.matches
+    assert "2 dumps: 1 identical, 0 changed, 1 errors" in format_table(results)
+
+
+def test_csv_has_one_row_per_dump(tmp_path: Path) -> None:
+    dumps = tmp_path / "dumps"
+    dumps.mkdir()
+    _write_dump(dumps, "day.json")
+    results = replay_directory(dumps, workers=1)
+
+    write_csv(results, tmp_path / "replay.csv")
+
+    with (tmp_path / "replay.csv").open(encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    assert len(rows) == 1
+    assert rows[0]["dump"] == "day.json"
+    assert rows[0]["matches"] == "True"
+    assert rows[0]["slot_diff_count"] == "0"
@@ -11,6 +11,7 @@ import json
 from collections.abc import Generator
 from datetime import UTC
 from pathlib import Path
+from typing import Any, cast
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -24,6 +25,7 @@ from custom_components.hsem.const import DOMAIN
 from custom_components.hsem.models.planner_input import PlannerInput
 from custom_components.hsem.services import (
     SCHEMA_CREATE_DASHBOARD,
+    SCHEMA_SIMULATE,
     SERVICE_HANDLER_MAP,
     async_register_services,
     async_unregister_services,
@@ -375,3 +377,75 @@ async def test_create_dashboard_passes_custom_path_to_helper(
         mock_hass, dashboard_path=Path("/config/custom.yaml")
     )
     assert result["dashboard_path"] == "/config/custom.yaml"
+
+
+def test_simulate_schema_defaults_overrides() -> None:
+    """simulate schema fills in empty overrides and rejects an empty list."""
+    result = SCHEMA_SIMULATE({"scenarios": [{"name": "current"}]})
+    assert result["scenarios"] == [{"name": "current", "overrides": {}}]  # type: ignore[index]
+
+    with pytest.raises(vol.Invalid):
+        SCHEMA_SIMULATE({"scenarios": []})
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("get_coordinator_patcher")
+async def test_simulate_no_planner_input_raises(
+    mock_hass: MagicMock,
+    mock_coordinator: MagicMock,
+) -> None:
+    """simulate raises when no planner cycle has completed."""
+    mock_coordinator._last_planner_input = None
+    call = _make_service_call(mock_hass, {"scenarios": [{"overrides": {}}]})
+
+    with pytest.raises(HomeAssistantError):
+        await services_module.async_handle_simulate(call)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("get_coordinator_patcher")
+async def test_simulate_rejects_snapshot_override(mock_hass: MagicMock) -> None:
+    """simulate rejects overrides of the snapshot the scenarios share."""
+    call = _make_service_call(
+        mock_hass, {"scenarios": [{"overrides": {"now_iso": "2026-01-01"}}]}
+    )
+
+    with pytest.raises(ServiceValidationError, match="not overridable"):
+        await services_module.async_handle_simulate(call)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("get_coordinator_patcher")
+async def test_simulate_plans_scenarios_without_touching_hardware(
+    mock_hass: MagicMock,
+    mock_coordinator: MagicMock,
+) -> None:
+    """simulate returns one JSON-safe plan per scenario and writes nothing."""
+    from tests.planner.fixtures import make_summer_day_input
+
+    planner_input = make_summer_day_input()
+    mock_coordinator._last_planner_input = planner_input
+    mock_hass.async_add_executor_job = AsyncMock(
+        side_effect=lambda func, *args: func(*args)
+    )
+    data = cast(
+        dict[str, Any],
+        SCHEMA_SIMULATE(
+            {
+                "scenarios": [
+                    {},
+                    {"name": "capped", "overrides": {"battery_max_soc_pct": 60}},
+                ]
+            }
+        ),
+    )
+    call = _make_service_call(mock_hass, data)
+
+    result = await services_module.async_handle_simulate(call)
+
+    json.dumps(result)
+    assert result["now"] == planner_input.now_iso
+    assert [r["name"] for r in result["scenarios"]] == ["scenario_1", "capped"]
+    assert all(r["winner"] and r["schedule"] for r in result["scenarios"])
+    mock_hass.services.async_call.assert_not_called()
+    mock_coordinator._async_handle_update.assert_not_called()
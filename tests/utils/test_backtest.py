@@ -0,0 +1,249 @@
+"""Tests for the historical backtest engine and its data loaders.
+
+Coverage
+--------
+- CSV rows and recorder long-term statistics load into a ``BacktestSeries``;
+  uneven slot spacing and missing columns are rejected.
+- Without a battery the realised cost equals the no-battery cost.
+- With a battery and a daily price spread the backtest saves money, and
+  the daily rows add up to the totals.
+- Sweeps give the same results in worker processes as in-process, in
+  config order; unknown or backtest-owned overrides are rejected.
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+import sqlite3
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.hsem.models.planner_input import PlannerInput
+from custom_components.hsem.utils.backtest import (
+    BacktestConfig,
+    format_table,
+    parameter_grid,
+    run_backtest,
+    run_sweep,
+    write_csv,
+)
+from custom_components.hsem.utils.backtest_data import (
+    load_csv,
+    load_recorder,
+    series_from_rows,
+)
+
+_TZ = ZoneInfo("Europe/Copenhagen")
+
+
+def _rows(days: int) -> list[dict]:
+    """Return hourly summer rows: cheap nights, an evening peak, midday PV."""
+    start = datetime(2024, 6, 1, tzinfo=_TZ)
+    rows = []
+    for i in range(days * 24):
+        t = start + timedelta(hours=i)
+        h = t.hour
+        pv = round(max(math.sin((h - 6) / 14 * math.pi), 0.0) * 4.0, 3)
+        peak = 17 <= h < 22
+        rows.append(
+            {
+                "start": t.isoformat(),
+                "import_price": 0.45 if peak else 0.15,
+                "export_price": 0.30 if peak else 0.05,
+                "pv_actual_kwh": round(pv * 0.9, 3),
+                "load_actual_kwh": 1.2 if peak else 0.4,
+                "pv_estimate": pv,
+                "pv_estimate10": round(pv * 0.6, 3),
+            }
+        )
+    return rows
+
+
+def _template(**kwargs: Any) -> PlannerInput:
+    settings: dict[str, Any] = {
+        "interval_length_hours": 48,
+        "battery_soc_pct": 30.0,
+        "battery_rated_capacity_kwh": 10.0,
+        **kwargs,
+    }
+    return PlannerInput(**settings)
+
+
+def test_load_csv(tmp_path: Path) -> None:
+    rows = _rows(1)
+    path = tmp_path / "data.csv"
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    series = load_csv(path)
+
+    assert len(series) == 24
+    assert series.interval_minutes == 60
+    assert series.starts[0] == datetime(2024, 6, 1, tzinfo=_TZ)
+    assert set(series.pv_forecast_kwh) == {"pv_estimate", "pv_estimate10"}
+    assert series.import_price[18] == pytest.approx(0.45)
+
+
+def test_series_rejects_gaps_and_missing_columns() -> None:
+    rows = _rows(1)
+    with pytest.raises(ValueError, match="expected 60 min"):
+        series_from_rows(rows[:5] + rows[6:])
+    del rows[3]["load_actual_kwh"]
+    with pytest.raises(ValueError, match="row 4: missing load_actual_kwh"):
+        series_from_rows(rows)
+
+
+def test_load_recorder_statistics(tmp_path: Path) -> None:
+    db = tmp_path / "home-assistant_v2.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE statistics_meta (id INTEGER, statistic_id TEXT)")
+    conn.execute(
+        "CREATE TABLE statistics (metadata_id INTEGER, start_ts REAL, "
+        "mean REAL, state REAL, sum REAL)"
+    )
+    ids = {"price": 1, "pv": 2, "load": 3, "forecast": 4}
+    conn.executemany(
+        "INSERT INTO statistics_meta VALUES (?, ?)",
+        [(i, f"sensor.{name}") for name, i in ids.items()],
+    )
+    first = datetime(2024, 6, 1, 10, tzinfo=UTC)
+    for h in range(-1, 3):
+        ts = (first + timedelta(hours=h)).timestamp()
+        conn.executemany(
+            "INSERT INTO statistics VALUES (?, ?, ?, ?, ?)",
+            [
+                (ids["price"], ts, 0.2 + 0.1 * h, None, None),
+                (ids["pv"], ts, None, None, 100.0 + 2.0 * h),
+                (ids["load"], ts, None, None, 50.0 + 0.5 * (h + 1) ** 2),
+                (ids["forecast"], ts, 1.5, None, None),
+            ],
+        )
+    conn.commit()
+    conn.close()
+
+    series = load_recorder(
+        db,
+        {
+            "import_price": "sensor.price",
+            "export_price": "sensor.price",
+            "pv_actual_kwh": "sensor.pv",
+            "load_actual_kwh": "sensor.load",
+            "pv_estimate": "sensor.forecast",
+        },
+        start=first,
+        end=first + timedelta(hours=3),
+        time_zone="Europe/Copenhagen",
+    )
+
+    assert series.starts[0] == datetime(2024, 6, 1, 12, tzinfo=_TZ)
+    assert series.import_price == pytest.approx([0.2, 0.3, 0.4])
+    assert series.pv_actual_kwh == pytest.approx([2.0, 2.0, 2.0])
+    assert series.load_actual_kwh == pytest.approx([0.5, 1.5, 2.5])
+    assert series.pv_forecast_kwh["pv_estimate"] == pytest.approx([1.5] * 3)
+
+
+def test_without_battery_cost_equals_no_battery_cost() -> None:
+    series = series_from_rows(_rows(2))
+
+    result = run_backtest(
+        series, _template(battery_rated_capacity_kwh=0.0), replan_every=6
+    )
+
+    assert result.slots == 24
+    assert result.battery_discharged_kwh == pytest.approx(0.0)
+    assert result.net_cost == pytest.approx(result.no_battery_cost, abs=1e-3)
+    assert result.savings == pytest.approx(0.0, abs=1e-3)
+
+
+def test_battery_saves_money_and_daily_rows_add_up() -> None:
+    series = series_from_rows(_rows(3))
+
+    result = run_backtest(series, _template())
+
+    assert result.slots == 48
+    assert result.planner_runs == 48
+    assert result.battery_discharged_kwh > 0
+    assert result.savings > 0
+    assert [d["date"] for d in result.daily] == ["2024-06-02", "2024-06-03"]
+    assert sum(d["import_cost"] for d in result.daily) == pytest.approx(
+        result.import_cost, abs=1e-2
+    )
+    assert sum(d["export_income"] for d in result.daily) == pytest.approx(
+        result.export_income, abs=1e-2
+    )
+    assert result.net_cost == pytest.approx(
+        result.import_cost - result.export_income, abs=1e-3
+    )
+    assert 0.0 <= result.final_soc_pct <= 100.0
+
+
+def test_sweep_in_workers_matches_in_process(tmp_path: Path) -> None:
+    series = series_from_rows(_rows(2))
+    configs = parameter_grid(
+        battery_cycle_cost_per_kwh=[0.0, 0.5],
+        solcast_likelihood=["pv_estimate10"],
+    )
+
+    in_process = run_sweep(series, _template(), configs, workers=1, replan_every=4)
+    in_workers = run_sweep(series, _template(), configs, workers=2, replan_every=4)
+
+    assert [r.name for r in in_workers] == [
+        "battery_cycle_cost_per_kwh=0.0, solcast_likelihood=pv_estimate10",
+        "battery_cycle_cost_per_kwh=0.5, solcast_likelihood=pv_estimate10",
+    ]
+    assert [r.net_cost for r in in_workers] == [r.net_cost for r in in_process]
+    assert in_workers[1].params == {
+        "battery_cycle_cost_per_kwh": 0.5,
+        "solcast_likelihood": "pv_estimate10",
+    }
+    assert "battery_cycle_cost_per_kwh=0.5" in format_table(in_workers)
+
+    path = tmp_path / "sweep.csv"
+    write_csv(in_workers, path)
+    with path.open(encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    assert [r["battery_cycle_cost_per_kwh"] for r in rows] == ["0.0", "0.5"]
+    assert float(rows[0]["net_cost"]) == pytest.approx(in_workers[0].net_cost)
+
+
+@pytest.mark.parametrize(
+    "field_name",
+    [
+        "interval_length_hours",
+        "live_solar_production_w",
+        "live_house_consumption_w",
+        "ev_planned_load_enabled",
+        "ev_second_planned_load_enabled",
+        "ev_session_charge_kw",
+        "ev_second_session_charge_kw",
+        "solar_corrector",
+    ],
+)
+def test_config_rejects_fields_the_run_forces(field_name: str) -> None:
+    with pytest.raises(ValueError, match=f"not overridable: {field_name}"):
+        BacktestConfig(overrides={field_name: None})
+
+
+def test_config_rejects_unknown_and_owned_fields() -> None:
+    with pytest.raises(ValueError, match="unknown PlannerInput field"):
+        BacktestConfig(overrides={"cycle_cost": 0.1})
+    with pytest.raises(ValueError, match="not overridable"):
+        BacktestConfig(overrides={"battery_soc_pct": 80.0})
+    with pytest.raises(ValueError, match="solcast_likelihood"):
+        BacktestConfig(solcast_likelihood="pv_estimate50")
+    series = series_from_rows(
+        [{k: v for k, v in r.items() if k != "pv_estimate10"} for r in _rows(2)]
+    )
+    with pytest.raises(ValueError, match="no pv_estimate10 forecast"):
+        run_backtest(
+            series, _template(), BacktestConfig(solcast_likelihood="pv_estimate10")
+        )
+    with pytest.raises(ValueError, match="warm-up"):
+        run_backtest(series, _template(), warmup_days=2)
@@ -0,0 +1,132 @@
+"""Tests for batched what-if planning.
+
+Coverage
+--------
+- A scenario without overrides reproduces the live plan.
+- Overrides change the plan; ISO-8601 EV deadlines are parsed.
+- ``PopulationCache`` populates once per shared snapshot and yields the
+  same plan as an uncached run; a changed live reading repopulates.
+- Threaded and sequential batches return the same results, in order.
+- Unknown and snapshot fields are rejected; a failing scenario becomes an
+  error entry instead of failing the batch.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+from custom_components.hsem.planner import run_planner
+from custom_components.hsem.planner.engine_population import PopulationCache
+from custom_components.hsem.utils.what_if import (
+    MAX_SCENARIOS,
+    Scenario,
+    run_scenarios,
+)
+from tests.planner.fixtures import make_summer_day_input
+
+
+def test_scenario_without_overrides_reproduces_live_plan() -> None:
+    inp = make_summer_day_input()
+
+    (result,) = run_scenarios(inp, [Scenario()])
+
+    live = run_planner(inp)
+    assert result["winner"] == live.winner_name
+    assert [s["recommendation"] for s in result["schedule"]] == [
+        s.recommendation for s in live.slots
+    ]
+    assert result["score"] == pytest.approx(live.plan_cost.score, abs=1e-4)  # type: ignore[union-attr]
+    assert result["winner"] in result["candidate_scores"]
+    json.dumps(result)
+
+
+def test_overrides_change_the_plan() -> None:
+    inp = make_summer_day_input()
+
+    current, capped = run_scenarios(
+        inp, [Scenario(), Scenario("capped", {"battery_max_soc_pct": 60.0})]
+    )
+
+    assert capped["name"] == "capped"
+    assert max(s["soc_pct"] for s in capped["schedule"]) <= 60.0 + 1e-6
+    assert max(s["soc_pct"] for s in current["schedule"]) > 60.0
+
+
+def test_iso_deadline_override_is_parsed() -> None:
+    inp = make_summer_day_input()
+    scenario = Scenario(
+        overrides={"ev_planned_load_deadline": "2024-06-15T18:00:00+02:00"}
+    )
+
+    applied = scenario.apply(inp)
+
+    assert isinstance(applied.ev_planned_load_deadline, datetime)
+    assert inp.ev_planned_load_deadline is None
+
+
+def test_population_cache_populates_once_per_snapshot() -> None:
+    inp = make_summer_day_input()
+    cache = PopulationCache()
+
+    first = run_planner(inp, population=cache)
+    second = run_planner(replace(inp, battery_cycle_cost_per_kwh=0.2), population=cache)
+
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert first.slots == run_planner(inp).slots
+    assert (
+        second.slots == run_planner(replace(inp, battery_cycle_cost_per_kwh=0.2)).slots
+    )
+
+    run_planner(replace(inp, live_house_consumption_w=2500.0), population=cache)
+    assert cache.misses == 2
+
+
+def test_threaded_batch_matches_sequential() -> None:
+    inp = make_summer_day_input()
+    scenarios = [
+        Scenario(f"cycle_cost_{cost}", {"battery_cycle_cost_per_kwh": cost})
+        for cost in (0.0, 0.1, 0.2, 0.3)
+    ]
+
+    threaded = run_scenarios(inp, scenarios, workers=4)
+    sequential = run_scenarios(inp, scenarios, workers=1)
+
+    assert [r["name"] for r in threaded] == [s.name for s in scenarios]
+    for a, b in zip(threaded, sequential, strict=True):
+        assert a["schedule"] == b["schedule"]
+        assert a["candidate_scores"] == b["candidate_scores"]
+
+
+@pytest.mark.parametrize(
+    ("overrides", "message"),
+    [
+        ({"no_such_field": 1}, "unknown PlannerInput field"),
+        ({"price_points": []}, "not overridable"),
+    ],
+    ids=["unknown", "snapshot"],
+)
+def test_invalid_overrides_are_rejected(overrides: dict, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        Scenario(overrides=overrides)
+
+
+def test_too_many_scenarios_are_rejected() -> None:
+    with pytest.raises(ValueError, match="at most"):
+        run_scenarios(make_summer_day_input(), [Scenario()] * (MAX_SCENARIOS + 1))
+
+
+def test_failing_scenario_becomes_error_entry() -> None:
+    inp = make_summer_day_input()
+
+    bad, good = run_scenarios(
+        inp,
+        [Scenario("bad", {"battery_rated_capacity_kwh": "ten"}), Scenario()],
+    )
+
+    assert bad["error"].startswith("TypeError")
+    assert "schedule" not in bad
+    assert good["winner"]